@@ -0,0 +1,92 @@
+"""Helpers shared by the benchmarks."""
+
+import base64
+import contextlib
+import io
+import os
+import time
+import timeit
+from typing import Any, Callable
+
+from env.classes.keys import KeyManager
+from env.classes.signing import OnionSigning
+
+
+def random_onion_address() -> str:
+    # v3 onion addresses are 56 base32 characters
+    return base64.b32encode(os.urandom(35)).decode().lower() + ".onion"
+
+
+def signed_peer(onion_address: str) -> OnionSigning:
+    # Keys and the signed ID are written to the app storage, use a temporary one
+    onion_signing: OnionSigning = OnionSigning(keys=KeyManager())
+    onion_signing.generate_master_keys()
+    onion_signing.sign_identity(onion_address=onion_address, expiry_days=1)
+    return onion_signing
+
+
+def bench(
+    name: str,
+    amount: int,
+    func: Callable[[], Any],
+    unit: str = "operations",
+    width: int = 34,
+    batch: bool = False,
+    quiet: bool = False,
+) -> Any:
+    """Print how many operations per second 'func' manages.
+
+    Args:
+        name(str): Label of the measurement.
+        amount(int): Number of operations.
+        func(Callable[[], Any]): One operation, or all of them if 'batch'.
+        unit(str): What an operation is (e.g. 'records').
+        width(int): Width of the label column.
+        batch(bool): Call 'func' once instead of 'amount' times.
+        quiet(bool): Hide what 'func' prints (e.g. 'id_is_valid()').
+
+    Returns:
+        Any: The result of the last call.
+    """
+    result: Any = None
+    output: contextlib.AbstractContextManager[Any] = (
+        contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    )
+
+    with output:
+        start: float = time.perf_counter()
+        for _ in range(1 if batch else amount):
+            result = func()
+        elapsed: float = time.perf_counter() - start
+
+    print(f"{name:<{width}} {amount / elapsed:>10.0f} {unit}/s")
+    return result
+
+
+def bench_per_call(
+    name: str,
+    func: Callable[[], Any],
+    number: int,
+    rounds: int,
+    unit: str = "ms",
+    width: int = 28,
+) -> None:
+    """Print the time of one call in the best of 'rounds' rounds.
+
+    Args:
+        name(str): Label of the measurement.
+        func(Callable[[], Any]): The call to measure.
+        number(int): Calls per round.
+        rounds(int): Rounds, the fastest one counts.
+        unit(str): 'ms' or 'ns'.
+        width(int): Width of the label column.
+
+    Returns:
+        None: No return value.
+    """
+    best: float = min(timeit.repeat(func, number=number, repeat=rounds)) / number
+
+    if unit == "ns":
+        print(f"{name:<{width}} {best * 1e9:>10.0f} ns/call")
+    else:
+        print(f"{name:<{width}} {best * 1e3:>10.3f} ms/call")
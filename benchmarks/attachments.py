@@ -0,0 +1,204 @@
+"""Compare encrypting a large attachment in chunks with encrypting it as one blob,
+and the disk usage of an attachment forwarded to several contacts.
+
+Run from the project root: python -m benchmarks.attachments [megabytes]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from typing import Callable, Iterator
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+# Attachments are written to the app storage, use a temporary one
+os.environ["FLET_APP_STORAGE_DATA"] = tempfile.mkdtemp(prefix="chatlex-bench-")
+
+from env.classes.attachments import AttachmentStore, BlobCollector  # noqa: E402
+from env.classes.database import SQLiteDatabase  # noqa: E402
+from env.classes.key_ring import KeyRing  # noqa: E402
+from env.classes.stream_encryption import STREAM_HEADER_SIZE  # noqa: E402
+from env.config import config  # noqa: E402
+from env.typing.dicts import AttachmentData  # noqa: E402
+
+MEGABYTES: int = 64
+PIECE_SIZE: int = 1024 * 1024
+FORWARDS: int = 10
+
+
+def _content(megabytes: int) -> Iterator[bytes]:
+    # Like reading a file, never held in memory as a whole
+    piece: bytes = os.urandom(PIECE_SIZE)
+    for _ in range(megabytes):
+        yield piece
+
+
+def _measure(name: str, size: int, func: Callable[[], object]) -> None:
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    func()
+    elapsed: float = time.perf_counter() - start
+    peak: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(
+        f"{name:<26} {size / elapsed / 1024 / 1024:>8.0f} MB/s, "
+        f"peak memory {peak / 1024 / 1024:>7.1f} MB"
+    )
+
+
+def _drain(data: Iterator[bytes]) -> int:
+    return sum(len(piece) for piece in data)
+
+
+def _folder_size(folder: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(folder, file_name))
+        for file_name in os.listdir(folder)
+    )
+
+
+def _message(database: SQLiteDatabase) -> int:
+    contact_uuid: str = str(uuid.uuid4())
+    database.insert_message(
+        contact_uuid=contact_uuid, message="See attachment", timestamp=time.time()
+    )
+    return int(
+        database.retrieve_messages(contact_uuid=contact_uuid)[0]["id"]  # type: ignore[index]
+    )
+
+
+def _forward(
+    database: SQLiteDatabase, store: AttachmentStore, key_ring: KeyRing, folder: str
+) -> None:
+    # The same photo sent to several contacts
+    photo: bytes = os.urandom(4 * PIECE_SIZE)
+    message_ids: list[int] = [_message(database=database) for _ in range(FORWARDS)]
+
+    start: float = time.perf_counter()
+    for message_id in message_ids:
+        store.store(message_id=message_id, name="photo.jpg", data=[photo])
+    elapsed: float = time.perf_counter() - start
+
+    address: str = store.attachments(message_id=message_ids[0])[0]["address"]
+    references: int = database.count_blob_references(address=address)
+    print(f"{f'store {FORWARDS} forwards':<26} {elapsed * 1000:>8.1f} ms")
+    print(f"{'references of the blob':<26} {references:>8}")
+
+    # Previously every message had its own file
+    file_size: int = _folder_size(folder=folder)
+    print(f"{'disk usage (file each)':<26} {FORWARDS * file_size:>8} bytes")
+    print(f"{'disk usage (deduplicated)':<26} {file_size:>8} bytes")
+
+    # Deleted conversations leave unreferenced blobs, collected in the background
+    for message_id in message_ids[:-1]:
+        database.delete_message(message_id=str(message_id))
+    asyncio.run(_collect(key_ring=key_ring, folder=folder, expected=0))
+    database.delete_message(message_id=str(message_ids[-1]))
+    asyncio.run(_collect(key_ring=key_ring, folder=folder, expected=1))
+    print(f"{'disk usage afterwards':<26} {_folder_size(folder=folder):>8} bytes")
+
+
+async def _collect(key_ring: KeyRing, folder: str, expected: int) -> None:
+    collector: BlobCollector = BlobCollector(key_ring=key_ring, folder=folder)
+    collector.start()
+    while collector.collections == 0:
+        await asyncio.sleep(0.01)
+    await collector.close()
+
+    if collector.files_removed != expected:
+        raise ValueError(f"Removed {collector.files_removed} files, not {expected}!")
+
+
+def main() -> None:
+    megabytes: int = int(sys.argv[1]) if len(sys.argv) > 1 else MEGABYTES
+    size: int = megabytes * PIECE_SIZE
+
+    password_key: bytes = os.urandom(32)
+    key_ring: KeyRing = KeyRing(
+        keys={0: password_key}, current_version=0, password_key=password_key
+    )
+    key_ring.add_version()
+    database: SQLiteDatabase = SQLiteDatabase(aes_encryptor=key_ring)
+    store: AttachmentStore = AttachmentStore(database=database, key_ring=key_ring)
+
+    folder: str = os.path.join(
+        os.environ["FLET_APP_STORAGE_DATA"], config.ATTACHMENTS_FOLDER
+    )
+    message_id: int = _message(database=database)
+
+    # Previously a file would have been read and encrypted as one blob
+    blob_key: bytes = AESGCM.generate_key(bit_length=256)
+    blob_nonce: bytes = os.urandom(12)
+    _measure(
+        "encrypt as one blob",
+        size,
+        lambda: AESGCM(blob_key).encrypt(
+            blob_nonce, b"".join(_content(megabytes=megabytes)), None
+        ),
+    )
+
+    attachment_ids: list[int] = []
+    _measure(
+        "store in chunks",
+        size,
+        lambda: attachment_ids.append(
+            store.store(
+                message_id=message_id,
+                name="video.mp4",
+                data=_content(megabytes=megabytes),
+            )
+        ),
+    )
+    attachment_id: int = attachment_ids[0]
+    _measure(
+        "open in chunks",
+        size,
+        lambda: _drain(store.open(attachment_id=attachment_id)),
+    )
+
+    attachment: AttachmentData = store.attachments(message_id=message_id)[0]
+    file_path: str = os.path.join(folder, attachment["file_name"])
+    print(f"{'stored size (plaintext)':<26} {attachment['size']:>8} bytes")
+    print(f"{'file size (encrypted)':<26} {os.path.getsize(file_path):>8} bytes")
+
+    # Changed and truncated files are rejected
+    with open(file_path, "r+b") as file:
+        file.seek(size // 2)
+        byte: int = file.read(1)[0]
+        file.seek(size // 2)
+        file.write(bytes([byte ^ 1]))
+    try:
+        _drain(store.open(attachment_id=attachment_id))
+        print("Changed attachment was decrypted!")
+    except InvalidTag:
+        print(f"{'changed attachment':<26} {'rejected':>8}")
+
+    truncated_id: int = store.store(
+        message_id=message_id, name="large.bin", data=_content(megabytes=2)
+    )
+    truncated: AttachmentData = store.attachments(message_id=message_id)[-1]
+    truncated_path: str = os.path.join(folder, truncated["file_name"])
+    # Cut exactly after a chunk, so only the final chunk flag can catch it
+    sealed_chunk_size: int = config.ATTACHMENT_CHUNK_SIZE + 16
+    with open(truncated_path, "r+b") as file:
+        file.truncate(STREAM_HEADER_SIZE + 4 * sealed_chunk_size)
+    try:
+        _drain(store.open(attachment_id=truncated_id))
+        print("Truncated attachment was decrypted!")
+    except InvalidTag:
+        print(f"{'truncated attachment':<26} {'rejected':>8}")
+
+    database.delete_message(message_id=str(message_id))
+    asyncio.run(_collect(key_ring=key_ring, folder=folder, expected=2))
+
+    _forward(database=database, store=store, key_ring=key_ring, folder=folder)
+
+
+if __name__ == "__main__":
+    main()
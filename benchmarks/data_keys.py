@@ -0,0 +1,89 @@
+"""Compare deriving a key per record with random data keys per purpose.
+
+Run from the project root: python -m benchmarks.data_keys [operations]
+"""
+
+import os
+import sys
+
+from cryptography.exceptions import InvalidTag
+
+from benchmarks._common import bench
+from env.classes.key_ring import Encryptor, KeyRing
+from env.config import config
+from env.typing.keys import WrappedDataKeys
+
+OPERATIONS: int = 20_000
+MESSAGE: str = "Message with a typical length, hello there! How are you doing?"
+
+
+def main() -> None:
+    amount: int = int(sys.argv[1]) if len(sys.argv) > 1 else OPERATIONS
+    password_key: bytes = os.urandom(32)
+
+    # Version 0 is the password key (as in old databases), version 1 data keys
+    key_ring: KeyRing = KeyRing(
+        keys={0: password_key}, current_version=0, password_key=password_key
+    )
+    key_ring.add_version()
+
+    derived: Encryptor = key_ring.encryptor(version=0)
+    encryptor: Encryptor = key_ring.encryptor(version=1)
+    derived_record: bytes = derived.encrypt(
+        plaintext=MESSAGE, encryption_key_info=config.HKDF_INFO_MESSAGE
+    )
+    record: bytes = encryptor.encrypt(
+        plaintext=MESSAGE, encryption_key_info=config.HKDF_INFO_MESSAGE
+    )
+
+    bench(
+        "encrypt, key derived per record",
+        amount,
+        lambda: derived.encrypt(
+            plaintext=MESSAGE, encryption_key_info=config.HKDF_INFO_MESSAGE
+        ),
+    )
+    bench(
+        "encrypt, data key per purpose",
+        amount,
+        lambda: encryptor.encrypt(
+            plaintext=MESSAGE, encryption_key_info=config.HKDF_INFO_MESSAGE
+        ),
+    )
+    bench(
+        "decrypt, key derived per record",
+        amount,
+        lambda: derived.decrypt(
+            encrypted_data=derived_record,
+            encryption_key_info=config.HKDF_INFO_MESSAGE,
+        ),
+    )
+    bench(
+        "decrypt, data key per purpose",
+        amount,
+        lambda: encryptor.decrypt(
+            encrypted_data=record, encryption_key_info=config.HKDF_INFO_MESSAGE
+        ),
+    )
+    print(f"{'record size (derived, data key)':<34} {len(derived_record)}, {len(record)} bytes")
+
+    # Logging in unwraps the data keys once
+    wrapped: WrappedDataKeys = key_ring.wrap()
+    bench(
+        "unlock (unwrap all data keys)",
+        amount // 10,
+        lambda: KeyRing.unwrap(password_key=password_key, wrapped=wrapped),
+    )
+
+    # Records can't be moved to another purpose
+    try:
+        encryptor.decrypt(
+            encrypted_data=record, encryption_key_info=config.HKDF_INFO_CONTACT
+        )
+        print("Message record was decrypted as contact record!")
+    except InvalidTag:
+        print(f"{'message record as contact record':<34} {'rejected':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Compare checking stored signed onion IDs by a full scan with the expiry index.
+
+Run from the project root: python -m benchmarks.identities [identities]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from nacl import signing
+
+# Keys and our own signed ID are written to the app storage, use a temporary one
+os.environ["FLET_APP_STORAGE_DATA"] = tempfile.mkdtemp(prefix="chatlex-bench-")
+
+from benchmarks._common import random_onion_address  # noqa: E402
+from env.classes.database import SQLiteDatabase  # noqa: E402
+from env.classes.encryption import AES_256_GCM  # noqa: E402
+from env.classes.identities import IdentityStore  # noqa: E402
+from env.classes.identity import SignedIdentity  # noqa: E402
+from env.classes.signing import OnionSigning  # noqa: E402
+
+IDENTITIES: int = 20_000
+EXPIRED: int = 200
+
+
+def _identity(key: signing.SigningKey, expires: int) -> SignedIdentity:
+    unsigned: bytes = SignedIdentity.encode_unsigned(
+        onion_address=random_onion_address(),
+        timestamp=expires - 86400,
+        expires=expires,
+        public_key=key.verify_key.encode(),
+    )
+    return SignedIdentity.parse(buffer=unsigned + key.sign(unsigned).signature)
+
+
+def _full_scan(database: SQLiteDatabase, owners: list[str], now: int) -> list[str]:
+    # What a sweep without the index has to do: read every ID
+    expired: list[str] = []
+    for owner in owners:
+        stored: Optional[tuple[bytes, bool]] = database.retrieve_identity(
+            owner=owner
+        )
+        if stored is not None and SignedIdentity.parse(stored[0]).expires <= now:
+            expired.append(owner)
+
+    return expired
+
+
+async def _sweeper(database: SQLiteDatabase) -> None:
+    onion_signing: OnionSigning = OnionSigning()
+    onion_signing.generate_master_keys()
+
+    flagged: list[str] = []
+    store: IdentityStore = IdentityStore(
+        database=database, onion_signing=onion_signing, on_expired=flagged.extend
+    )
+    store.set_own_onion_address(onion_address=random_onion_address())
+    store.start()
+
+    # A contact whose ID expires in two seconds
+    identity: SignedIdentity = _identity(
+        key=onion_signing.private_key, expires=int(time.time()) + 2
+    )
+    store.store_peer(
+        contact_uuid="short-lived", onion_address=identity.onion, identity=identity
+    )
+    start: float = time.perf_counter()
+    while "short-lived" not in flagged:
+        await asyncio.sleep(0.05)
+
+    print(f"{'expired ID flagged after':<28} {time.perf_counter() - start:>10.2f} s")
+    print(f"{'sweeps':<28} {store.sweeps:>10} (own ID signed {store.resigned}x)")
+    await store.close()
+
+
+def main() -> None:
+    amount: int = int(sys.argv[1]) if len(sys.argv) > 1 else IDENTITIES
+    folder: str = tempfile.mkdtemp(prefix="chatlex-identities-")
+
+    database: SQLiteDatabase = SQLiteDatabase(
+        aes_encryptor=AES_256_GCM(derived_key=os.urandom(32)),
+        db_path=os.path.join(folder, "identities.db"),
+    )
+    key: signing.SigningKey = signing.SigningKey.generate()
+    now: int = int(time.time())
+
+    owners: list[str] = []
+    for i in range(amount):
+        # The first ones already expired, the others expire within a year
+        expires: int = now - 60 if i < EXPIRED else now + 86400 + i * 1000
+        identity: SignedIdentity = _identity(key=key, expires=expires)
+        database.upsert_identity(
+            owner=f"contact-{i}", record=bytes(identity), expires=identity.expires
+        )
+        owners.append(f"contact-{i}")
+
+    start: float = time.perf_counter()
+    scanned: list[str] = _full_scan(database=database, owners=owners, now=now)
+    elapsed: float = time.perf_counter() - start
+    print(f"{'full scan':<28} {elapsed * 1000:>10.1f} ms ({len(scanned)} expired)")
+
+    start = time.perf_counter()
+    flagged: list[str] = database.flag_expired_identities(now=now)
+    next_expiry: Optional[int] = database.retrieve_next_identity_expiry()
+    elapsed = time.perf_counter() - start
+    print(f"{'indexed sweep':<28} {elapsed * 1000:>10.1f} ms ({len(flagged)} expired)")
+
+    start = time.perf_counter()
+    database.flag_expired_identities(now=now)
+    database.retrieve_next_identity_expiry()
+    elapsed = time.perf_counter() - start
+    print(f"{'indexed sweep, none due':<28} {elapsed * 1000:>10.2f} ms")
+    print(f"{'next expiry in':<28} {(next_expiry or now) - now:>10} s")
+
+    asyncio.run(_sweeper(database=database))
+
+
+if __name__ == "__main__":
+    main()
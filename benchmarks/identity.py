@@ -0,0 +1,121 @@
+"""Compare the JSON and the binary format of signed onion IDs.
+
+Run from the project root: python -m benchmarks.identity [records]
+"""
+
+import base64
+import json
+import sys
+import time
+
+from nacl import signing
+
+from benchmarks._common import bench, random_onion_address
+from env.classes.identity import SignedIdentity
+from env.classes.signing import OnionSigning
+from env.config import config
+from env.typing.signing import SignedOnionData
+
+RECORDS: int = 20_000
+KEYS: int = 50
+
+
+def _records(amount: int) -> tuple[list[bytes], list[bytes]]:
+    keys: list[signing.SigningKey] = [
+        signing.SigningKey.generate() for _ in range(KEYS)
+    ]
+    json_records: list[bytes] = []
+    binary_records: list[bytes] = []
+
+    for i in range(amount):
+        key: signing.SigningKey = keys[i % KEYS]
+        onion: str = random_onion_address()
+        timestamp: float = time.time()
+        expires: float = timestamp + 30 * 86400
+
+        # Same as 'OnionSigning.sign_onion()'
+        message: bytes = f"{onion}{timestamp}{expires}".encode(config.ENCODING)
+        data: SignedOnionData = {
+            "onion": onion,
+            "timestamp": timestamp,
+            "expires": expires,
+            "signed_by": base64.b64encode(key.verify_key.encode()).decode(),
+            "signature": base64.b64encode(key.sign(message).signature).decode(),
+        }
+        json_records.append(json.dumps(data, indent=2).encode(config.ENCODING))
+
+        # Same as 'OnionSigning.sign_identity()'
+        unsigned: bytes = SignedIdentity.encode_unsigned(
+            onion_address=onion,
+            timestamp=int(timestamp),
+            expires=int(expires),
+            public_key=key.verify_key.encode(),
+        )
+        binary_records.append(unsigned + key.sign(unsigned).signature)
+
+    return json_records, binary_records
+
+
+def main() -> None:
+    amount: int = int(sys.argv[1]) if len(sys.argv) > 1 else RECORDS
+    json_records, binary_records = _records(amount=amount)
+
+    json_size: float = sum(map(len, json_records)) / amount
+    binary_size: float = sum(map(len, binary_records)) / amount
+    print(f"{'size JSON (file layout)':<34} {json_size:>10.0f} bytes/record")
+    print(f"{'size binary':<34} {binary_size:>10.0f} bytes/record")
+
+    # Parsing: the fields needed to pick the key and check the expiry
+    bench(
+        "parse JSON",
+        amount,
+        lambda: [
+            (data["expires"], base64.b64decode(data["signed_by"]))
+            for data in map(json.loads, json_records)
+        ],
+        unit="records",
+        batch=True,
+    )
+    bench(
+        "parse binary",
+        amount,
+        lambda: [
+            (identity.expires, identity.public_key)
+            for identity in map(SignedIdentity.parse, binary_records)
+        ],
+        unit="records",
+        batch=True,
+    )
+
+    stream: bytes = b"".join(binary_records)
+    bench(
+        "parse binary (one buffer)",
+        amount,
+        lambda: [identity.expires for identity in SignedIdentity.parse_many(stream)],
+        unit="records",
+        batch=True,
+    )
+
+    # Full verification without the result cache
+    parsed_json: list[SignedOnionData] = [json.loads(raw) for raw in json_records]
+    parsed_binary: list[SignedIdentity] = [
+        SignedIdentity.parse(raw) for raw in binary_records
+    ]
+    bench(
+        "verify_many() JSON",
+        amount,
+        lambda: OnionSigning().verify_many(parsed_json),
+        unit="records",
+        batch=True,
+    )
+    bench(
+        "verify_many() binary",
+        amount,
+        lambda: OnionSigning().verify_many(parsed_binary),
+        unit="records",
+        batch=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
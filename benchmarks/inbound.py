@@ -0,0 +1,117 @@
+"""Compare storing received messages one by one with the inbound pipeline.
+
+Run from the project root: python -m benchmarks.inbound [messages]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+# The database is created in the app storage, use a temporary one
+os.environ["FLET_APP_STORAGE_DATA"] = tempfile.mkdtemp(prefix="chatlex-bench-")
+
+from benchmarks._common import random_onion_address, signed_peer  # noqa: E402
+from env.classes.database import SQLiteDatabase  # noqa: E402
+from env.classes.encryption import AES_256_GCM  # noqa: E402
+from env.classes.identity import SignedIdentity  # noqa: E402
+from env.classes.inbound import InboundPipeline  # noqa: E402
+from env.func.payloads import encode_messages  # noqa: E402
+from env.typing.dicts import WireMessage  # noqa: E402
+
+MESSAGES: int = 20_000
+CONTACTS: int = 50
+MESSAGES_PER_FRAME: int = 4
+
+
+def _add_contacts(database: SQLiteDatabase) -> dict[str, str]:
+    contacts: dict[str, str] = {}
+    for i in range(CONTACTS):
+        contact_uuid: str = str(uuid.uuid4())
+        onion_address: str = random_onion_address()
+        database.insert_contact(
+            {
+                "contact_uuid": contact_uuid,
+                "username": f"contact-{i}",
+                "description": None,
+                "onion_address": onion_address,
+                "last_message_timestamp": None,
+                "muted": False,
+                "blocked": False,
+            }
+        )
+        contacts[onion_address] = contact_uuid
+
+        # Frames are only accepted from contacts with a signed ID
+        identity: SignedIdentity = signed_peer(
+            onion_address=onion_address
+        ).signed_identity
+        database.upsert_identity(
+            owner=contact_uuid, record=bytes(identity), expires=identity.expires
+        )
+
+    return contacts
+
+
+async def _run_pipeline(
+    aes_encryptor: AES_256_GCM, frames: list[tuple[str, bytes]], total: int
+) -> tuple[float, int]:
+    notifications: list[dict[str, int]] = []
+    pipeline: InboundPipeline = InboundPipeline(
+        aes_encryptor=aes_encryptor, on_messages=notifications.append
+    )
+    await pipeline.start()
+
+    start: float = time.perf_counter()
+    for peer_address, payload in frames:
+        await pipeline.receive(peer_address=peer_address, payload=payload)
+    while pipeline.messages_written < total:
+        await asyncio.sleep(0.001)
+    elapsed: float = time.perf_counter() - start
+
+    # Wait for the last notification
+    await asyncio.sleep(0.5)
+    await pipeline.close()
+
+    return elapsed, len(notifications)
+
+
+def main() -> None:
+    total: int = int(sys.argv[1]) if len(sys.argv) > 1 else MESSAGES
+    aes_encryptor: AES_256_GCM = AES_256_GCM(derived_key=os.urandom(32))
+    database: SQLiteDatabase = SQLiteDatabase(aes_encryptor=aes_encryptor)
+    contacts: dict[str, str] = _add_contacts(database=database)
+    addresses: list[str] = list(contacts)
+
+    # One by one like the existing 'insert_message()'
+    start: float = time.perf_counter()
+    for i in range(total):
+        database.insert_message(
+            contact_uuid=contacts[addresses[i % CONTACTS]],
+            message=f"Message number {i}",
+            timestamp=time.time(),
+        )
+    single: float = time.perf_counter() - start
+
+    frames: list[tuple[str, bytes]] = []
+    for i in range(0, total, MESSAGES_PER_FRAME):
+        messages: list[WireMessage] = [
+            {"id": j, "message": f"Message number {j}", "timestamp": time.time()}
+            for j in range(i, min(i + MESSAGES_PER_FRAME, total))
+        ]
+        frames.append((addresses[i % CONTACTS], encode_messages(messages=messages)))
+
+    pipeline, notifications = asyncio.run(
+        _run_pipeline(aes_encryptor=aes_encryptor, frames=frames, total=total)
+    )
+
+    print(f"messages:              {total} from {CONTACTS} contacts")
+    print(f"insert_message():      {total / single:>10.0f} messages/s")
+    print(f"inbound pipeline:      {total / pipeline:>10.0f} messages/s")
+    print(f"ui notifications:      {notifications}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Compare changing the password by encrypting everything again with wrapped data keys.
+
+Run from the project root: python -m benchmarks.key_rotation [messages]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from typing import Optional
+
+from env.classes.database import SQLiteDatabase
+from env.classes.key_ring import KeyRing
+from env.classes.key_rotation import KeyRotation
+from env.typing.keys import WrappedDataKeys
+
+MESSAGES: int = 20_000
+CONTACTS: int = 20
+
+
+def _fill(database: SQLiteDatabase, messages: int) -> list[str]:
+    contact_uuids: list[str] = []
+    for i in range(CONTACTS):
+        contact_uuid: str = str(uuid.uuid4())
+        database.insert_contact(
+            {
+                "contact_uuid": contact_uuid,
+                "username": f"contact-{i}",
+                "description": "Some description",
+                "onion_address": f"{'a' * 54}{i:02d}.onion",
+                "last_message_timestamp": None,
+                "muted": False,
+                "blocked": False,
+            }
+        )
+        contact_uuids.append(contact_uuid)
+
+    batch: list[tuple[str, str, float, int, Optional[int]]] = []
+    for i in range(messages):
+        encrypted_message, key_version = database.encrypt_message(
+            message=f"Message number {i}, hello there!"
+        )
+        batch.append(
+            (contact_uuids[i % CONTACTS], encrypted_message, time.time(), key_version, None)
+        )
+    database.insert_encrypted_messages(batch)
+
+    return contact_uuids
+
+
+async def _rotate(key_ring: KeyRing, db_path: str, contact_uuid: str) -> None:
+    stored: list[WrappedDataKeys] = []
+    rotation: KeyRotation = KeyRotation(
+        key_ring=key_ring, save_keys=stored.append, db_path=db_path
+    )
+    reader: SQLiteDatabase = SQLiteDatabase(aes_encryptor=key_ring, db_path=db_path)
+
+    start: float = time.perf_counter()
+    rotation.rotate_data_key()
+
+    # The conversation stays readable while the rotation runs
+    reads: int = 0
+    while rotation.running:
+        if reader.retrieve_messages(contact_uuid=contact_uuid) is None:
+            raise ValueError("Messages couldn't be read during the rotation!")
+        reads += 1
+        await asyncio.sleep(0.01)
+    await rotation.wait()
+    elapsed: float = time.perf_counter() - start
+
+    print(
+        f"{'background rotation':<28} {elapsed * 1000:>10.1f} ms "
+        f"({rotation.rows_reencrypted} rows, {rotation.chunks} chunks, {reads} reads)"
+    )
+    print(f"{'stale rows afterwards':<28} {reader.count_stale_rows():>10}")
+    print(f"{'data keys afterwards':<28} {len(stored[-1]['keys']):>10}")
+
+    await rotation.close()
+
+
+def main() -> None:
+    messages: int = int(sys.argv[1]) if len(sys.argv) > 1 else MESSAGES
+    folder: str = tempfile.mkdtemp(prefix="chatlex-key-rotation-")
+    db_path: str = os.path.join(folder, "data.db")
+
+    password_key: bytes = os.urandom(32)
+    key_ring: KeyRing = KeyRing(
+        keys={0: password_key}, current_version=0, password_key=password_key
+    )
+    database: SQLiteDatabase = SQLiteDatabase(aes_encryptor=key_ring, db_path=db_path)
+    contact_uuids: list[str] = _fill(database=database, messages=messages)
+
+    # Previously the password key encrypted the data, so all rows had to change
+    start: float = time.perf_counter()
+    key_ring.add_version()
+    while database.reencrypt_rows(limit=messages + CONTACTS):
+        pass
+    elapsed: float = time.perf_counter() - start
+    print(f"{'encrypt everything again':<28} {elapsed * 1000:>10.1f} ms")
+
+    new_password_key: bytes = os.urandom(32)
+    start = time.perf_counter()
+    key_ring.set_password_key(password_key=new_password_key)
+    wrapped: WrappedDataKeys = key_ring.wrap()
+    elapsed = time.perf_counter() - start
+    print(f"{'wrap the data keys again':<28} {elapsed * 1000:>10.3f} ms")
+
+    # The next login unwraps the same data keys with the new password key
+    unwrapped: KeyRing = KeyRing.unwrap(password_key=new_password_key, wrapped=wrapped)
+    print(f"{'data keys after unwrap':<28} {len(unwrapped.old_versions) + 1:>10}")
+
+    asyncio.run(
+        _rotate(key_ring=key_ring, db_path=db_path, contact_uuid=contact_uuids[0])
+    )
+
+
+if __name__ == "__main__":
+    main()
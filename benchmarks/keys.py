@@ -0,0 +1,69 @@
+"""Compare reading the master key and signed IDs from disk with keeping them in memory.
+
+Run from the project root: python -m benchmarks.keys [operations]
+"""
+
+import base64
+import os
+import sys
+import tempfile
+
+from nacl import signing
+
+# Keys are stored in the app storage, use a temporary one
+os.environ["FLET_APP_STORAGE_DATA"] = tempfile.mkdtemp(prefix="chatlex-bench-")
+
+from benchmarks._common import bench, random_onion_address  # noqa: E402
+from env.classes.keys import key_manager  # noqa: E402
+from env.classes.paths import paths  # noqa: E402
+from env.classes.signing import OnionSigning, load_signed_record  # noqa: E402
+from env.config import config  # noqa: E402
+
+OPERATIONS: int = 20_000
+
+
+def _load_key_from_disk() -> signing.SigningKey:
+    # Like the previous 'OnionSigning._load_key()'
+    with open(
+        paths.join_with_app_storage(path=config.FILE_ENCRYPTION_PRIVATE_KEY), "r"
+    ) as file:
+        return signing.SigningKey(base64.b64decode(file.read()))
+
+
+def main() -> None:
+    amount: int = int(sys.argv[1]) if len(sys.argv) > 1 else OPERATIONS
+
+    onion_signing: OnionSigning = OnionSigning()
+    onion_signing.generate_master_keys()
+    onion_signing.sign_onion(
+        onion_address=random_onion_address(),
+        expiry_days=30,
+    )
+    id_path: str = paths.join_with_app_storage(
+        path=config.FILE_ENCRYPTION_SIGNED_ONION_DATA
+    )
+
+    bench("private key from disk", amount, _load_key_from_disk)
+    bench("private key from memory", amount, lambda: onion_signing.private_key)
+
+    def check_from_disk() -> bool:
+        # Like the previous 'id_is_valid()' (the verification itself is cached)
+        with open(id_path, "rb") as file:
+            return onion_signing.verify(data=load_signed_record(raw=file.read()))
+
+    # 'id_is_valid()' prints its result, only show the measurement
+    bench("id_is_valid() reading the file", amount, check_from_disk, quiet=True)
+
+    bench(
+        "id_is_valid() unchanged file",
+        amount,
+        lambda: onion_signing.id_is_valid(json_path=id_path),
+        quiet=True,
+    )
+
+    key_manager.wipe()
+    print(f"{'key loaded after wipe()':<34} {key_manager.is_loaded!s:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Measure the peer engine with many peers on the loopback transport.
+
+Every peer sends frames to one hub (throughput), then the hub echoes frames
+back to the peers (round trip latency).
+
+Run from the project root: python -m benchmarks.peers [peers] [frames per peer]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Keys and signed IDs of the peers are written to the app storage, use a temporary one
+os.environ["FLET_APP_STORAGE_DATA"] = tempfile.mkdtemp(prefix="chatlex-bench-")
+
+from benchmarks._common import random_onion_address, signed_peer  # noqa: E402
+from env.classes.handshake import PeerAuthenticator  # noqa: E402
+from env.classes.peers import PeerEngine  # noqa: E402
+from env.classes.signing import OnionSigning  # noqa: E402
+from env.classes.transport import LoopbackTransport  # noqa: E402
+from env.typing.transport import FrameHandler  # noqa: E402
+
+PEERS: int = 1000
+FRAMES_PER_PEER: int = 20
+PAYLOAD_SIZE: int = 256
+ROUND_TRIPS: int = 2000
+
+
+async def _run(peer_count: int, frames_per_peer: int) -> None:
+    transport: LoopbackTransport = LoopbackTransport()
+    payload: bytes = os.urandom(PAYLOAD_SIZE)
+
+    # Waiters of the round trips (frame -> future)
+    pending: dict[bytes, asyncio.Future[float]] = {}
+    received: int = 0
+    all_received: asyncio.Event = asyncio.Event()
+    expected: int = peer_count * frames_per_peer
+
+    async def on_hub_frame(peer_address: str, frame: bytes) -> None:
+        nonlocal received
+        if frame.startswith(b"ping"):
+            # Echo over our own connection to the peer
+            await hub.send(onion_address=peer_address, payload=frame)
+            return
+
+        received += 1
+        if received == expected:
+            all_received.set()
+
+    async def on_peer_frame(peer_address: str, frame: bytes) -> None:
+        future = pending.pop(frame, None)
+        if future is not None:
+            future.set_result(time.perf_counter())
+
+    # Everyone knows the public keys of everyone else (onion address -> key)
+    public_keys: dict[str, bytes] = {}
+
+    def engine(on_frame: FrameHandler) -> PeerEngine:
+        onion_address: str = random_onion_address()
+        onion_signing: OnionSigning = signed_peer(onion_address=onion_address)
+        public_keys[onion_address] = onion_signing.public_key.encode()
+
+        return PeerEngine(
+            onion_address=onion_address,
+            transport=transport,
+            on_frame=on_frame,
+            authenticator=PeerAuthenticator(
+                onion_signing=onion_signing, peer_key=public_keys.get
+            ),
+        )
+
+    hub: PeerEngine = engine(on_frame=on_hub_frame)
+    await hub.start()
+
+    peers: list[PeerEngine] = [
+        engine(on_frame=on_peer_frame) for _ in range(peer_count)
+    ]
+    await asyncio.gather(*(peer.start() for peer in peers))
+
+    # Throughput: all peers send to the hub at once
+    async def send_all(peer: PeerEngine) -> None:
+        await asyncio.gather(
+            *(
+                peer.send(onion_address=hub.onion_address, payload=payload)
+                for _ in range(frames_per_peer)
+            )
+        )
+
+    start: float = time.perf_counter()
+    await asyncio.gather(*(send_all(peer) for peer in peers))
+    await all_received.wait()
+    elapsed: float = time.perf_counter() - start
+
+    print(f"peers:           {peer_count}")
+    print(f"frames:          {expected} x {PAYLOAD_SIZE} bytes")
+    print(f"throughput:      {expected / elapsed:>10.0f} frames/s")
+    connects: int = sum(p.connection(hub.onion_address).connects for p in peers)
+    print(f"connects:        {connects}")
+
+    # Latency: sequential round trips through the hub
+    latencies: list[float] = []
+    for i in range(ROUND_TRIPS):
+        peer: PeerEngine = peers[i % peer_count]
+        frame: bytes = b"ping" + i.to_bytes(4, "big")
+        future: asyncio.Future[float] = asyncio.get_running_loop().create_future()
+        pending[frame] = future
+
+        sent: float = time.perf_counter()
+        await peer.send(onion_address=hub.onion_address, payload=frame)
+        latencies.append(await future - sent)
+
+    latencies.sort()
+    print(f"round trip p50:  {statistics.median(latencies) * 1e6:>10.0f} us")
+    print(f"round trip p99:  {latencies[int(len(latencies) * 0.99)] * 1e6:>10.0f} us")
+
+    await asyncio.gather(hub.close(), *(peer.close() for peer in peers))
+
+
+def main() -> None:
+    peer_count: int = int(sys.argv[1]) if len(sys.argv) > 1 else PEERS
+    frames_per_peer: int = int(sys.argv[2]) if len(sys.argv) > 2 else FRAMES_PER_PEER
+    asyncio.run(_run(peer_count=peer_count, frames_per_peer=frames_per_peer))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compare reopening conversations with and without the decrypted record cache.
+
+Run from the project root: python -m benchmarks.record_cache [messages per contact]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import uuid
+from typing import Optional
+
+from env.classes.database import SQLiteDatabase
+from env.classes.encryption import AES_256_GCM
+from env.classes.record_cache import DecryptedRecordCache
+
+CONTACTS: int = 20
+MESSAGES_PER_CONTACT: int = 500
+ROUNDS: int = 5
+
+
+def _fill(database: SQLiteDatabase, messages: int) -> list[str]:
+    contact_uuids: list[str] = []
+    for i in range(CONTACTS):
+        contact_uuid: str = str(uuid.uuid4())
+        database.insert_contact(
+            {
+                "contact_uuid": contact_uuid,
+                "username": f"contact-{i}",
+                "description": "Some description",
+                "onion_address": f"{'a' * 56}.onion",
+                "last_message_timestamp": None,
+                "muted": False,
+                "blocked": False,
+            }
+        )
+        contact_uuids.append(contact_uuid)
+
+    batch: list[tuple[str, str, float, int, Optional[int]]] = []
+    for contact_uuid in contact_uuids:
+        for i in range(messages):
+            encrypted_message, key_version = database.encrypt_message(
+                message=f"Message number {i}, hello there!"
+            )
+            batch.append((contact_uuid, encrypted_message, time.time(), key_version, None))
+    database.insert_encrypted_messages(batch)
+    return contact_uuids
+
+
+def _reopen_all(database: SQLiteDatabase, contact_uuids: list[str]) -> float:
+    # Return to the contacts page and open every conversation
+    start: float = time.perf_counter()
+    database.retrieve_contacts()
+    for contact_uuid in contact_uuids:
+        database.retrieve_messages(contact_uuid=contact_uuid)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    messages: int = int(sys.argv[1]) if len(sys.argv) > 1 else MESSAGES_PER_CONTACT
+    folder: str = tempfile.mkdtemp(prefix="chatlex-record-cache-")
+    aes_encryptor: AES_256_GCM = AES_256_GCM(derived_key=os.urandom(32))
+    db_path: str = os.path.join(folder, "data.db")
+
+    # A cache without budget behaves like no cache at all
+    uncached: SQLiteDatabase = SQLiteDatabase(
+        aes_encryptor=aes_encryptor,
+        db_path=db_path,
+        cache=DecryptedRecordCache(max_bytes=0),
+    )
+    contact_uuids: list[str] = _fill(database=uncached, messages=messages)
+
+    cache: DecryptedRecordCache = DecryptedRecordCache()
+    cached: SQLiteDatabase = SQLiteDatabase(
+        aes_encryptor=aes_encryptor, db_path=db_path, cache=cache
+    )
+
+    elapsed: float = min(
+        _reopen_all(database=uncached, contact_uuids=contact_uuids)
+        for _ in range(ROUNDS)
+    )
+    print(f"{'without cache':<24} {elapsed * 1000:>10.1f} ms per round")
+
+    elapsed = _reopen_all(database=cached, contact_uuids=contact_uuids)
+    print(f"{'cache, first round':<24} {elapsed * 1000:>10.1f} ms")
+    elapsed = min(
+        _reopen_all(database=cached, contact_uuids=contact_uuids)
+        for _ in range(ROUNDS)
+    )
+    print(f"{'cache, later rounds':<24} {elapsed * 1000:>10.1f} ms per round")
+    print(f"{'cache size':<24} {cache.size / 1024:>10.0f} KiB ({cache.hits} hits)")
+
+    # Changes and deletes aren't served from the cache
+    cached.delete_user_messages(contact_uuid=contact_uuids[0])
+    left: int = len(cached.retrieve_messages(contact_uuid=contact_uuids[0]) or [])
+    print(f"{'messages after delete':<24} {left:>10}")
+
+    cache.wipe()
+    print(f"{'cache size after wipe':<24} {cache.size:>10}")
+
+
+if __name__ == "__main__":
+    main()
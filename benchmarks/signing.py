@@ -0,0 +1,81 @@
+"""Compare verifying signed onion IDs one by one with the batch verification.
+
+Run from the project root: python -m benchmarks.signing [records]
+"""
+
+import base64
+import sys
+import time
+
+from nacl import signing
+
+from benchmarks._common import bench, random_onion_address
+from env.classes.signing import OnionSigning
+from env.config import config
+from env.typing.signing import SignedOnionData
+
+RECORDS: int = 5000
+KEYS: int = 50
+
+
+def _records(amount: int) -> list[SignedOnionData]:
+    keys: list[signing.SigningKey] = [
+        signing.SigningKey.generate() for _ in range(KEYS)
+    ]
+    records: list[SignedOnionData] = []
+
+    for i in range(amount):
+        key: signing.SigningKey = keys[i % KEYS]
+        onion: str = random_onion_address()
+        timestamp: float = time.time()
+        expires: float = timestamp + 30 * 86400
+        message: bytes = f"{onion}{timestamp}{expires}".encode(config.ENCODING)
+
+        records.append(
+            {
+                "onion": onion,
+                "timestamp": timestamp,
+                "expires": expires,
+                "signed_by": base64.b64encode(key.verify_key.encode()).decode(),
+                "signature": base64.b64encode(key.sign(message).signature).decode(),
+            }
+        )
+
+    return records
+
+
+def _verify_single(data: SignedOnionData) -> bool:
+    # Like the previous 'id_is_valid()' without the file
+    message: bytes = f"{data["onion"]}{data["timestamp"]}{data["expires"]}".encode(
+        config.ENCODING
+    )
+    try:
+        signing.VerifyKey(base64.b64decode(data["signed_by"])).verify(
+            smessage=message, signature=base64.b64decode(data["signature"])
+        )
+        return True
+    except Exception:
+        return False
+
+
+def main() -> None:
+    amount: int = int(sys.argv[1]) if len(sys.argv) > 1 else RECORDS
+    records: list[SignedOnionData] = _records(amount=amount)
+
+    onion_signing: OnionSigning = OnionSigning()
+    runs: list[tuple[str, Callable[[], list[bool]]]] = [
+        ("one by one", lambda: [_verify_single(data) for data in records]),
+        ("verify_many() cold", lambda: onion_signing.verify_many(records)),
+        ("verify_many() cached", lambda: onion_signing.verify_many(records)),
+    ]
+
+    for name, func in runs:
+        valid: int = sum(
+            bench(name, amount, func, unit="records", width=28, batch=True)
+        )
+        if valid != amount:
+            raise ValueError(f"{name}: {valid} of {amount} records valid!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Sync two devices with their own database files over the loopback transport.
+
+Device A writes contacts and messages, device B fetches them. Memory peaks
+should stay the same for growing histories since only one batch is loaded.
+
+Run from the project root: python -m benchmarks.sync [messages]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from typing import Optional
+
+# Keys and signed IDs of the devices are written to the app storage, use a temporary one
+os.environ["FLET_APP_STORAGE_DATA"] = tempfile.mkdtemp(prefix="chatlex-bench-")
+
+from benchmarks._common import random_onion_address, signed_peer  # noqa: E402
+from env.classes.database import SQLiteDatabase  # noqa: E402
+from env.classes.encryption import AES_256_GCM  # noqa: E402
+from env.classes.handshake import PeerAuthenticator  # noqa: E402
+from env.classes.peers import PeerEngine  # noqa: E402
+from env.classes.signing import OnionSigning  # noqa: E402
+from env.classes.sync import DeviceSync  # noqa: E402
+from env.classes.transport import LoopbackTransport  # noqa: E402
+from env.typing.transport import FrameHandler  # noqa: E402
+
+MESSAGES: int = 20_000
+CONTACTS: int = 20
+
+
+class _Device:
+    def __init__(self, folder: str, name: str, transport: LoopbackTransport) -> None:
+        self.uuid: str = str(uuid.uuid4())
+        self.onion_address: str = random_onion_address()
+        self.onion_signing: OnionSigning = signed_peer(onion_address=self.onion_address)
+
+        # Every device has its own password and therefore its own key
+        self.database: SQLiteDatabase = SQLiteDatabase(
+            aes_encryptor=AES_256_GCM(derived_key=os.urandom(32)),
+            db_path=os.path.join(folder, f"{name}.db"),
+        )
+
+        async def on_frame(peer_address: str, payload: bytes) -> None:
+            await self.sync.receive(peer_address=peer_address, payload=payload)
+
+        handler: FrameHandler = on_frame
+        self.engine: PeerEngine = PeerEngine(
+            onion_address=self.onion_address,
+            transport=transport,
+            on_frame=handler,
+            authenticator=PeerAuthenticator(
+                onion_signing=self.onion_signing,
+                peer_key=lambda onion_address: self.sync.device_key(
+                    onion_address=onion_address
+                ),
+            ),
+        )
+        self.sync: DeviceSync = DeviceSync(
+            database=self.database, engine=self.engine, device_uuid=self.uuid
+        )
+
+    def link(self, other: "_Device") -> None:
+        self.database.insert_device(
+            device_uuid=other.uuid,
+            onion_address=other.onion_address,
+            name="other",
+            public_key=other.onion_signing.public_key.encode(),
+        )
+        self.sync.refresh_devices()
+
+
+def _write_history(database: SQLiteDatabase, messages: int) -> list[str]:
+    contact_uuids: list[str] = []
+    for i in range(CONTACTS):
+        contact_uuid: str = str(uuid.uuid4())
+        database.insert_contact(
+            {
+                "contact_uuid": contact_uuid,
+                "username": f"contact-{i}",
+                "description": None,
+                "onion_address": random_onion_address(),
+                "last_message_timestamp": None,
+                "muted": False,
+                "blocked": False,
+            }
+        )
+        contact_uuids.append(contact_uuid)
+
+    batch: list[tuple[str, str, float, int, Optional[int]]] = []
+    for i in range(messages):
+        encrypted_message, key_version = database.encrypt_message(
+            message=f"Message number {i}, hello there!"
+        )
+        batch.append(
+            (contact_uuids[i % CONTACTS], encrypted_message, time.time(), key_version, None)
+        )
+    database.insert_encrypted_messages(batch)
+
+    return contact_uuids
+
+
+async def _run(messages: int) -> None:
+    transport: LoopbackTransport = LoopbackTransport()
+    folder: str = tempfile.mkdtemp(prefix="chatlex-sync-")
+
+    a: _Device = _Device(folder=folder, name="a", transport=transport)
+    b: _Device = _Device(folder=folder, name="b", transport=transport)
+    a.link(other=b)
+    b.link(other=a)
+    await a.engine.start()
+    await b.engine.start()
+
+    contact_uuids: list[str] = _write_history(database=a.database, messages=messages)
+
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    applied: int = await b.sync.sync(device_uuid=a.uuid)
+    elapsed: float = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stored: int = sum(
+        len(b.database.retrieve_messages(contact_uuid=contact_uuid) or [])
+        for contact_uuid in contact_uuids
+    )
+    print(f"changes:             {applied} ({stored} messages stored on B)")
+    print(f"full sync:           {elapsed * 1000:>10.0f} ms")
+    print(f"batches:             {a.sync.batches_sent}")
+    per_change: float = a.sync.bytes_sent / max(applied, 1)
+    print(f"bytes on the wire:   {a.sync.bytes_sent:>10} ({per_change:.0f} per change)")
+    print(f"peak memory:         {peak / 1024:>10.0f} KiB")
+
+    # Deltas: only new changes are sent, in both directions
+    b.database.delete_user_messages(contact_uuid=contact_uuids[0])
+    a.database.insert_message(
+        contact_uuid=contact_uuids[1], message="One more", timestamp=time.time()
+    )
+    start = time.perf_counter()
+    to_a: int = await a.sync.sync(device_uuid=b.uuid)
+    to_b: int = await b.sync.sync(device_uuid=a.uuid)
+    elapsed = time.perf_counter() - start
+    left: int = len(a.database.retrieve_messages(contact_uuid=contact_uuids[0]) or [])
+    print(f"delta sync:          {elapsed * 1000:>10.1f} ms ({to_a} + {to_b} changes)")
+    print(f"messages left on A:  {left} (deleted on B)")
+
+    await a.engine.close()
+    await b.engine.close()
+
+
+def main() -> None:
+    messages: int = int(sys.argv[1]) if len(sys.argv) > 1 else MESSAGES
+    asyncio.run(_run(messages=messages))
+
+
+if __name__ == "__main__":
+    main()
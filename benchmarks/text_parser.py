@@ -0,0 +1,182 @@
+"""Compare the custom markdown parser with the previous implementation.
+
+Also compares parsing a draft from scratch on every keystroke with the
+incremental parser.
+
+Run from the project root: python -m benchmarks.text_parser
+"""
+
+import re
+from typing import Any, Callable
+
+import flet as ft  # type: ignore[import-untyped]
+
+from benchmarks._common import bench_per_call
+from env.func.text_parser import (
+    IncrementalMarkdownParser,
+    clear_markdown_cache,
+    parse_custom_markdown,
+    parse_markdown_spans,
+)
+
+ROUNDS: int = 5
+TYPED_CHARS: int = 200
+
+# Styles cycled through while nesting
+OPEN_TAGS: list[tuple[str, str]] = [
+    ("COLOR", "{COLOR:#FF0000}"),
+    ("WEIGHT", "{WEIGHT:BOLD}"),
+    ("BG", "{BG:#00FF00}"),
+    ("UNDERLINE", "{UNDERLINE}"),
+]
+
+
+def _nested_input(depth: int, repeats: int) -> str:
+    parts: list[str] = []
+
+    for _ in range(repeats):
+        # Open 'depth' tags with text in between, then close them in reverse
+        for level in range(depth):
+            parts.append(OPEN_TAGS[level % len(OPEN_TAGS)][1])
+            parts.append(f"level {level} text\nwith a line break ")
+        for level in reversed(range(depth)):
+            parts.append(f"{{/{OPEN_TAGS[level % len(OPEN_TAGS)][0]}}}")
+            parts.append("closing text ")
+
+    return "".join(parts)
+
+
+def _legacy_parse(input_str: str) -> ft.Container:
+    # Previous implementation, kept as reference
+    supported_styles: dict[str, Callable[[str], dict[str, Any]]] = {
+        "COLOR": lambda val: {"color": val},
+        "WEIGHT": lambda val: {
+            "weight": getattr(ft.FontWeight, val.upper(), ft.FontWeight.NORMAL)
+        },
+        "UNDERLINE": lambda _: {"decoration": ft.TextDecoration.UNDERLINE},
+        "BG": lambda val: {"bgcolor": val},
+    }
+
+    active_styles: list[tuple[str, dict[str, Any]]] = []
+    text_spans: list[ft.TextSpan] = []
+    buffer: str = ""
+    tag_pattern = re.compile(r"\{(/?[A-Z]+)(?::([^}]+))?\}")
+    pos = 0
+
+    def flush() -> None:
+        combined_style: dict[str, Any] = {}
+        for _, style_dict in active_styles:
+            combined_style.update(style_dict)
+        parts = buffer.split("\n")
+        for i, part in enumerate(parts):
+            if part:
+                style: ft.TextStyle = ft.TextStyle(**combined_style)
+                text_spans.append(ft.TextSpan(part, style=style))
+            if i < len(parts) - 1:
+                text_spans.append(ft.TextSpan("\n"))
+
+    while pos < len(input_str):
+        match = tag_pattern.search(input_str, pos)
+        if not match:
+            buffer += input_str[pos:]
+            break
+
+        start, end = match.span()
+        if start > pos:
+            buffer += input_str[pos:start]
+
+        if buffer:
+            flush()
+            buffer = ""
+
+        tag_name = match.group(1)
+        if not tag_name.startswith("/"):
+            style_fn = supported_styles.get(tag_name)
+            if style_fn:
+                active_styles.append((tag_name, style_fn(match.group(2))))
+        else:
+            for i in range(len(active_styles) - 1, -1, -1):
+                if active_styles[i][0] == tag_name[1:]:
+                    del active_styles[i]
+                    break
+
+        pos = end
+
+    if buffer:
+        flush()
+
+    return ft.Container(content=ft.Text(spans=text_spans, selectable=True))
+
+
+def _uncached(input_str: str) -> Callable[[], None]:
+    def run() -> None:
+        clear_markdown_cache()
+        parse_markdown_spans(input_str=input_str)
+
+    return run
+
+
+def _typing(input_str: str, incremental: bool) -> Callable[[], None]:
+    # Only type the end of the text, the start is an existing draft
+    typed_from: int = len(input_str) - TYPED_CHARS
+
+    def run() -> None:
+        parser: IncrementalMarkdownParser = IncrementalMarkdownParser()
+        parser.update(input_str=input_str[:typed_from])
+
+        for end in range(typed_from + 1, len(input_str) + 1):
+            if incremental:
+                parser.update(input_str=input_str[:end])
+            else:
+                clear_markdown_cache()
+                parse_markdown_spans(input_str=input_str[:end])
+
+    return run
+
+
+def main() -> None:
+    for depth, repeats in [(8, 50), (64, 20), (256, 10)]:
+        input_str: str = _nested_input(depth=depth, repeats=repeats)
+        spans: int = len(parse_markdown_spans(input_str=input_str))
+        print(f"\ndepth={depth}, {len(input_str)} chars, {spans} spans")
+
+        bench_per_call(
+            name="legacy parser",
+            func=lambda: _legacy_parse(input_str),
+            number=10,
+            rounds=ROUNDS,
+        )
+        bench_per_call(
+            name="tokenize + parse (cold)",
+            func=_uncached(input_str),
+            number=10,
+            rounds=ROUNDS,
+        )
+        bench_per_call(
+            name="parse (cached)",
+            func=lambda: parse_markdown_spans(input_str=input_str),
+            number=100,
+            rounds=ROUNDS,
+        )
+        bench_per_call(
+            name="render (cached)",
+            func=lambda: parse_custom_markdown(input_str=input_str),
+            number=10,
+            rounds=ROUNDS,
+        )
+        bench_per_call(
+            name=f"type {TYPED_CHARS} chars (full)",
+            func=_typing(input_str=input_str, incremental=False),
+            number=1,
+            rounds=ROUNDS,
+        )
+        bench_per_call(
+            name=f"type {TYPED_CHARS} chars (incremental)",
+            func=_typing(input_str=input_str, incremental=True),
+            number=1,
+            rounds=ROUNDS,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare translation lookups of the precompiled catalog with python-i18n.
+
+Run from the project root: python -m benchmarks.translations
+"""
+
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from benchmarks._common import bench_per_call
+from env.classes.translate import Translator
+from env.config import config
+from env.func.locales import compile_locales, load_catalog
+
+ROUNDS: int = 5
+LOOKUPS: int = 100_000
+
+# Mix of plain texts and texts with placeholders (like the contact widget)
+KEYS: list[tuple[str, dict[str, Any]]] = [
+    ("contact_widget.muted_icon", {}),
+    ("contact_widget.blocked_icon", {}),
+    ("contact_widget.title", {"username": "Alice Example"}),
+    ("contact_widget.remove_alert.content", {"username": "Alice Example"}),
+    ("settings_page.infos.shake_detection.content", {}),
+]
+
+
+def _lookups(t: Callable[..., str]) -> Callable[[], None]:
+    def run() -> None:
+        for key, kwargs in KEYS:
+            t(key, **kwargs)
+
+    return run
+
+
+def main() -> None:
+    # Translator only needs the chosen language from the settings
+    storages: Any = SimpleNamespace(
+        settings=SimpleNamespace(
+            current=SimpleNamespace(language=config.LANGUAGE_DEFAULT),
+            subscribe=lambda callback, fields=None: lambda: None,
+        )
+    )
+    translator: Translator = Translator(storages=storages)
+
+    print(f"{len(KEYS)} keys per call, best of {ROUNDS} rounds\n")
+    bench_per_call(
+        name="compile locales (YAML)",
+        func=compile_locales,
+        number=10,
+        rounds=ROUNDS,
+        unit="ns",
+        width=32,
+    )
+    bench_per_call(
+        name="load catalog",
+        func=load_catalog,
+        number=10,
+        rounds=ROUNDS,
+        unit="ns",
+        width=32,
+    )
+    bench_per_call(
+        name="catalog lookups",
+        func=_lookups(t=translator.t),
+        number=LOOKUPS,
+        rounds=ROUNDS,
+        unit="ns",
+        width=32,
+    )
+
+    try:
+        import i18n  # type: ignore[import-untyped]
+    except ImportError:
+        print("\npython-i18n is not installed, skipping comparison.")
+        return
+
+    i18n.load_path.append(config.FOLDER_LANGUAGES)  # type: ignore
+    i18n.set(key="filename_format", value="{namespace}.{format}")  # type: ignore
+    i18n.set(key="locale", value=config.LANGUAGE_DEFAULT)  # type: ignore
+    bench_per_call(
+        name="python-i18n lookups",
+        func=_lookups(t=i18n.t),
+        number=LOOKUPS,
+        rounds=ROUNDS,
+        unit="ns",
+        width=32,
+    )
+
+
+if __name__ == "__main__":
+    main()
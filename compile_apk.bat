@@ -1,6 +1,9 @@
 @REM Clear terminal
 cls
 
+@REM Precompile translations (the generated env/locales_catalog.py is packaged with the project folder)
+python -m env.func.locales
+
 @REM Build apk
 flet build apk ^
     --description "CHATLEX - Secure. Anonymous. Decentralized." ^
@@ -1 +1,5 @@
-flet pack main.py --add-data="assets;assets"
\ No newline at end of file
+@REM Precompile translations
+python -m env.func.locales
+
+@REM The catalog is generated, name it so it is bundled for sure
+flet pack main.py --add-data="assets;assets" --hidden-import="env.locales_catalog"
\ No newline at end of file
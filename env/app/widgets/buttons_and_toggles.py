@@ -30,6 +30,13 @@ class SimpleButton:
         if self._url is None and self._on_click_action is None:
             raise ValueError("Expected url or on_click_action but none were given!")
 
+        # Button label
+        self._label: ft.Text = ft.Text(
+            self._text,
+            theme_style=ft.TextThemeStyle.BODY_LARGE,
+            max_lines=None,
+        )
+
         # Modern, stylized button
         self._text_button: ft.ElevatedButton = ft.ElevatedButton(
             content=ft.Row(
@@ -46,13 +53,7 @@ class SimpleButton:
                     ),
                     # Text
                     ft.Column(
-                        controls=[
-                            ft.Text(
-                                self._text,
-                                theme_style=ft.TextThemeStyle.BODY_LARGE,
-                                max_lines=None,
-                            ),
-                        ],
+                        controls=[self._label],
                         expand=True,
                     ),
                 ],
@@ -91,6 +92,15 @@ class SimpleButton:
             padding=ft.Padding(left=20, top=0, right=20, bottom=0),
         )
 
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @text.setter
+    def text(self, value: str) -> None:
+        self._text = value
+        self._label.value = value
+
 
 class ActionButton:
     def __init__(
@@ -119,6 +129,15 @@ class ActionButton:
     def build(self) -> ft.Container:
         return self._button.build()
 
+    @property
+    def text(self) -> str:
+        return self._button.text
+
+    @text.setter
+    def text(self, value: str) -> None:
+        self._text = value
+        self._button.text = value
+
 
 class URLButton:
     def __init__(
@@ -145,6 +164,15 @@ class URLButton:
     def build(self) -> ft.Container:
         return self._button.build()
 
+    @property
+    def text(self) -> str:
+        return self._button.text
+
+    @text.setter
+    def text(self, value: str) -> None:
+        self._text = value
+        self._button.text = value
+
 
 class InfoButtonAlert:
     def __init__(
@@ -173,6 +201,10 @@ class InfoButtonAlert:
             on_click=lambda _: self._page.open(self._help_alert),
         )
 
+    def _rebuild_help_alert(self) -> None:
+        # The alert is only shown on click, so it's cheaper to rebuild than to patch
+        self._help_alert = InfoAlert(title=self._label, content=self._content).build()
+
     def build(self) -> ft.Container:
         return ft.Container(
             content=ft.Row(
@@ -193,6 +225,25 @@ class InfoButtonAlert:
             expand=True,
         )
 
+    @property
+    def label(self) -> str:
+        return self._label
+
+    @label.setter
+    def label(self, value: str) -> None:
+        self._label = value
+        self._info_button.text = value
+        self._rebuild_help_alert()
+
+    @property
+    def content(self) -> str:
+        return self._content
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self._content = value
+        self._rebuild_help_alert()
+
 
 class SectionToggle:
     def __init__(
@@ -254,3 +305,36 @@ class SectionToggle:
             ),
             padding=ft.Padding(left=20, top=0, right=20, bottom=0),
         )
+
+    def _rebuild_help_alert(self) -> None:
+        self._help_alert = InfoAlert(
+            title=self._help_title,
+            content=self._help_content,
+        ).build()
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @text.setter
+    def text(self, value: str) -> None:
+        self._text = value
+        self._label.value = value
+
+    @property
+    def help_title(self) -> Optional[str]:
+        return self._help_title
+
+    @help_title.setter
+    def help_title(self, value: Optional[str]) -> None:
+        self._help_title = value
+        self._rebuild_help_alert()
+
+    @property
+    def help_content(self) -> Optional[str]:
+        return self._help_content
+
+    @help_content.setter
+    def help_content(self, value: Optional[str]) -> None:
+        self._help_content = value
+        self._rebuild_help_alert()
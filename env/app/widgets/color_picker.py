@@ -53,8 +53,12 @@ class ColorPicker:
         )
 
         # Create color picker alert
+        self._title_label: ft.Text = ft.Text(
+            value=self._title,
+            text_align=ft.TextAlign.CENTER,
+        )
         self._color_picker_alert: ft.AlertDialog = ft.AlertDialog(
-            title=ft.Text(value=self._title, text_align=ft.TextAlign.CENTER),
+            title=self._title_label,
             scrollable=True,
             on_dismiss=self._on_dismiss,
             content=ft.Column(
@@ -67,14 +71,15 @@ class ColorPicker:
                         ft.Row(
                             controls=[
                                 self._color_input_field,
-                                ft.IconButton(
-                                    icon=ft.Icons.CHECK_ROUNDED,
-                                    tooltip=self._translator.t(
-                                        key="color_picker.confirm_button"
-                                    ),
-                                    on_click=lambda _: self._on_color_chosen(
-                                        str(self._color_input_field.value)
+                                self._translator.bind(
+                                    target=ft.IconButton(
+                                        icon=ft.Icons.CHECK_ROUNDED,
+                                        on_click=lambda _: self._on_color_chosen(
+                                            str(self._color_input_field.value)
+                                        ),
                                     ),
+                                    key="color_picker.confirm_button",
+                                    attribute="tooltip",
                                 ),
                             ]
                         ),
@@ -84,14 +89,16 @@ class ColorPicker:
             ),
             actions=[
                 # Reset button
-                ft.TextButton(
-                    text=self._translator.t(key="color_picker.reset_button"),
-                    on_click=lambda _: self._reset_default(),
+                self._translator.bind(
+                    target=ft.TextButton(on_click=lambda _: self._reset_default()),
+                    key="color_picker.reset_button",
+                    attribute="text",
                 ),
                 # Close button
-                ft.TextButton(
-                    text=self._translator.t(key="color_picker.close_button"),
-                    on_click=self._on_dismiss,
+                self._translator.bind(
+                    target=ft.TextButton(on_click=self._on_dismiss),
+                    key="color_picker.close_button",
+                    attribute="text",
                 ),
             ],
         )
@@ -152,3 +159,12 @@ class ColorPicker:
 
     def build(self) -> ft.AlertDialog:
         return self._color_picker_alert
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @title.setter
+    def title(self, value: str) -> None:
+        self._title = value
+        self._title_label.value = value
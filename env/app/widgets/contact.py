@@ -2,7 +2,7 @@ import flet as ft  # type: ignore[import-untyped]
 
 from env.classes.contact import Contact
 from env.classes.database import SQLiteDatabase
-from env.classes.encryption import AES_256_GCM
+from env.classes.key_ring import KeyRing
 from env.classes.router import AppRouter
 from env.classes.translate import Translator
 from env.config import config
@@ -18,25 +18,31 @@ class ContactWidget:
         contact_data: ContactData,
         router: AppRouter,
         contacts_list: ft.ListView,
-        aes_encryptor: AES_256_GCM,
+        key_ring: KeyRing,
     ) -> None:
         self._page: ft.Page = page
         self._translator: Translator = translator
         self._contact: Contact = Contact(contact_data=contact_data)
         self._router: AppRouter = router
         self._contacts_list: ft.ListView = contacts_list
-        self._aes_encryptor: AES_256_GCM = aes_encryptor
+        self._key_ring: KeyRing = key_ring
 
         # Initialize status icons
-        self._muted_icon: ft.Icon = ft.Icon(
-            name=ft.Icons.VOLUME_OFF,
-            visible=self._contact.is_muted and not self._contact.is_blocked,
-            tooltip=self._translator.t(key="contact_widget.muted_icon"),
+        self._muted_icon: ft.Icon = self._translator.bind(
+            target=ft.Icon(
+                name=ft.Icons.VOLUME_OFF,
+                visible=self._contact.is_muted and not self._contact.is_blocked,
+            ),
+            key="contact_widget.muted_icon",
+            attribute="tooltip",
         )
-        self._blocked_icon: ft.Icon = ft.Icon(
-            name=ft.Icons.BLOCK,
-            visible=self._contact.is_blocked,
-            tooltip=self._translator.t(key="contact_widget.blocked_icon"),
+        self._blocked_icon: ft.Icon = self._translator.bind(
+            target=ft.Icon(
+                name=ft.Icons.BLOCK,
+                visible=self._contact.is_blocked,
+            ),
+            key="contact_widget.blocked_icon",
+            attribute="tooltip",
         )
 
         # Initialize icon
@@ -104,7 +110,7 @@ class ContactWidget:
 
     def _rm_contact(self, alert: ft.AlertDialog):
         # Initialize new database instance to avoid thread error (not in the same thread)
-        db: SQLiteDatabase = SQLiteDatabase(aes_encryptor=self._aes_encryptor)
+        db: SQLiteDatabase = SQLiteDatabase(aes_encryptor=self._key_ring)
 
         self._page.close(alert)
         self._contacts_list.controls.remove(self._contact_widget)
@@ -148,7 +154,7 @@ class ContactWidget:
         self._blocked_icon.update()
 
     def _update_database(self) -> None:
-        db: SQLiteDatabase = SQLiteDatabase(aes_encryptor=self._aes_encryptor)
+        db: SQLiteDatabase = SQLiteDatabase(aes_encryptor=self._key_ring)
 
         db.update_contact(
             contact_uuid=self._contact.contact_uuid,
@@ -385,6 +391,22 @@ class ContactWidget:
     def contact_uuid(self) -> str:
         return self._contact.contact_uuid
 
+    @property
+    def online(self) -> bool:
+        return self._contact.is_online
+
+    @online.setter
+    def online(self, value: bool) -> None:
+        # Not updated here, the contacts page pushes all changed indicators at once
+        self._contact.is_online = value
+        self._icon_online_indicator.bgcolor = (
+            config.COLOR_ONLINE if value else config.COLOR_OFFLINE
+        )
+
+    @property
+    def online_indicator(self) -> ft.CircleAvatar:
+        return self._icon_online_indicator
+
     @property
     def muted(self) -> bool:
         return self._contact.is_muted
@@ -29,3 +29,12 @@ class SectionDropDown:
             padding=ft.Padding(left=20, top=0, right=20, bottom=0),
             expand=True,
         )
+
+    @property
+    def label(self) -> str:
+        return self._label
+
+    @label.setter
+    def label(self, value: str) -> None:
+        self._label = value
+        self._drop_down.label = value
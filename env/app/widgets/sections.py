@@ -4,13 +4,14 @@ import flet as ft  # type: ignore[import-untyped]
 class Section:
     def __init__(self, title: str, content: list[ft.Control]) -> None:
         # Create section
+        self._title_label: ft.Text = ft.Text(
+            value=title,
+            expand=True,
+            text_align=ft.TextAlign.CENTER,
+            theme_style=ft.TextThemeStyle.HEADLINE_MEDIUM,
+        )
         self._title: ft.Container = ft.Container(
-            content=ft.Text(
-                value=title,
-                expand=True,
-                text_align=ft.TextAlign.CENTER,
-                theme_style=ft.TextThemeStyle.HEADLINE_MEDIUM,
-            ),
+            content=self._title_label,
             expand=True,
             padding=ft.Padding(left=20, top=20, right=20, bottom=0),
         )
@@ -66,3 +67,11 @@ class Section:
             border_radius=15,
             expand=True,
         )
+
+    @property
+    def title(self) -> str:
+        return self._title_label.value
+
+    @title.setter
+    def title(self, value: str) -> None:
+        self._title_label.value = value
@@ -66,6 +66,13 @@ class DescriptiveSlider:
             expand=True,
         )
 
+    def _rebuild_help_alert(self) -> None:
+        # The alert is only shown on click, so it's cheaper to rebuild than to patch
+        self._help_alert = InfoAlert(
+            title=self._help_title,
+            content=self._help_content,
+        ).build()
+
     def _reset_value(self) -> None:
         if self._on_change_end:
             self._slider.value = self._slider_default_value
@@ -128,3 +135,39 @@ class DescriptiveSlider:
     @slider_value.setter
     def slider_value(self, value: float | int) -> None:
         self._slider.value = value
+
+    @property
+    def description(self) -> str:
+        return self._description
+
+    @description.setter
+    def description(self, value: str) -> None:
+        self._description = value
+        self._description_label.value = value
+
+    @property
+    def slider_label(self) -> Optional[str]:
+        return self._slider_label
+
+    @slider_label.setter
+    def slider_label(self, value: Optional[str]) -> None:
+        self._slider_label = value
+        self._slider.label = value
+
+    @property
+    def help_title(self) -> Optional[str]:
+        return self._help_title
+
+    @help_title.setter
+    def help_title(self, value: Optional[str]) -> None:
+        self._help_title = value
+        self._rebuild_help_alert()
+
+    @property
+    def help_content(self) -> Optional[str]:
+        return self._help_content
+
+    @help_content.setter
+    def help_content(self, value: Optional[str]) -> None:
+        self._help_content = value
+        self._rebuild_help_alert()
@@ -9,10 +9,7 @@ from env.func.logout import logout_on_lost_focus
 
 # Define function for logging out when clicking the label of the top bar
 def top_bar_logout_action(storages: Storages, router: AppRouter) -> None:
-    if not storages.client_storage.get(
-        key=config.CS_LOGOUT_ON_TOP_BAR_LABEL_CLICK,
-        default=config.TOP_BAR_LOGOUT_ON_LABEL_CLICK_DEFAULT,
-    ):
+    if not storages.settings.current.logout_on_top_bar_label_click:
         return
 
     logout_on_lost_focus(
@@ -47,19 +44,25 @@ class TopBar:
         )
 
         # Initialize buttons
-        self._home_button: ft.IconButton = ft.IconButton(
-            icon=ft.Icons.PERSON_OUTLINE,
-            tooltip=self._translator.t(key="top_bars.profile_button"),
-            height=config.TOP_BAR_HEIGHT,
-            icon_size=config.TOP_BAR_HEIGHT - 15,
-            on_click=lambda _: self._router.go(route=config.ROUTE_PROFILE),
+        self._home_button: ft.IconButton = self._translator.bind(
+            target=ft.IconButton(
+                icon=ft.Icons.PERSON_OUTLINE,
+                height=config.TOP_BAR_HEIGHT,
+                icon_size=config.TOP_BAR_HEIGHT - 15,
+                on_click=lambda _: self._router.go(route=config.ROUTE_PROFILE),
+            ),
+            key="top_bars.profile_button",
+            attribute="tooltip",
         )
-        self._settings_button: ft.IconButton = ft.IconButton(
-            icon=ft.Icons.SETTINGS_OUTLINED,
-            tooltip=self._translator.t(key="top_bars.settings_button"),
-            height=config.TOP_BAR_HEIGHT,
-            icon_size=config.TOP_BAR_HEIGHT - 15,
-            on_click=lambda _: self._router.go(route=config.ROUTE_SETTINGS),
+        self._settings_button: ft.IconButton = self._translator.bind(
+            target=ft.IconButton(
+                icon=ft.Icons.SETTINGS_OUTLINED,
+                height=config.TOP_BAR_HEIGHT,
+                icon_size=config.TOP_BAR_HEIGHT - 15,
+                on_click=lambda _: self._router.go(route=config.ROUTE_SETTINGS),
+            ),
+            key="top_bars.settings_button",
+            attribute="tooltip",
         )
 
         # Initialize containers
@@ -101,6 +104,15 @@ class TopBar:
             ),
         )
 
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @title.setter
+    def title(self, value: str) -> None:
+        self._title = value
+        self._label.value = value
+
 
 class SubPageTopBar:
     def __init__(
@@ -128,12 +140,15 @@ class SubPageTopBar:
         )
 
         # Initialize buttons
-        self._back_button: ft.IconButton = ft.IconButton(
-            icon=ft.Icons.ARROW_BACK_IOS_ROUNDED,
-            tooltip=self._translator.t(key="top_bars.back_button"),
-            height=config.TOP_BAR_HEIGHT,
-            icon_size=config.TOP_BAR_HEIGHT - 15,
-            on_click=lambda _: self._router.pop(),
+        self._back_button: ft.IconButton = self._translator.bind(
+            target=ft.IconButton(
+                icon=ft.Icons.ARROW_BACK_IOS_ROUNDED,
+                height=config.TOP_BAR_HEIGHT,
+                icon_size=config.TOP_BAR_HEIGHT - 15,
+                on_click=lambda _: self._router.pop(),
+            ),
+            key="top_bars.back_button",
+            attribute="tooltip",
         )
 
         # Initialize containers
@@ -171,3 +186,12 @@ class SubPageTopBar:
                 ],
             ),
         )
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @title.setter
+    def title(self, value: str) -> None:
+        self._title = value
+        self._label.value = value
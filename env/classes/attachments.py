@@ -0,0 +1,330 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import sqlite3
+import time
+import uuid
+from typing import Iterable, Iterator, Optional
+
+from env.classes.database import DatabaseThread, SQLiteDatabase
+from env.classes.key_ring import KeyRing
+from env.classes.paths import paths
+from env.classes.stream_encryption import StreamEncryptor
+from env.config import config
+from env.func.generations import generate_key
+from env.typing.dicts import AttachmentData
+
+# Encrypted files are named '<uuid>.bin', unfinished ones end with '.tmp'
+_FILE_SUFFIX: str = ".bin"
+_TEMPORARY_SUFFIX: str = ".tmp"
+
+
+def _attachments_folder(folder: Optional[str]) -> str:
+    # The attachments folder in the app storage by default
+    folder = (
+        folder
+        if folder is not None
+        else paths.join_with_app_storage(path=config.ATTACHMENTS_FOLDER)
+    )
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def _remove_file(file_path: str) -> None:
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+
+def read_file(file_path: str) -> Iterator[bytes]:
+    # Content of a file (e.g. one to attach), read in chunks
+    with open(file_path, "rb") as file:
+        while piece := file.read(config.ATTACHMENT_CHUNK_SIZE):
+            yield piece
+
+
+class AttachmentStore:
+    def __init__(
+        self, database: SQLiteDatabase, key_ring: KeyRing, folder: Optional[str] = None
+    ) -> None:
+        """Store attachments once per content as encrypted files in the app storage.
+
+        The content is addressed by its keyed hash (HMAC-SHA256), so identical
+        attachments (e.g. forwarded to several contacts) share one blob. Every
+        blob is encrypted in chunks with its own random key, so files of any
+        size are written and read with a fixed amount of memory. The key is
+        stored in the blobs table, the original name per attachment, both
+        encrypted like the other columns. Blobs nothing references anymore
+        are removed by the 'BlobCollector'.
+
+        Args:
+            self(AttachmentStore): The AttachmentStore instance.
+            database(SQLiteDatabase): Database holding the attachments and blobs tables.
+            key_ring(KeyRing): The unlocked data keys (for the content addresses).
+            folder(Optional[str]): Folder of the encrypted files (app storage by default).
+
+        Returns:
+            None: No return value.
+        """
+        self._database: SQLiteDatabase = database
+        self._key_ring: KeyRing = key_ring
+        self._folder: str = _attachments_folder(folder=folder)
+
+    def _file_path(self, file_name: str) -> str:
+        return os.path.join(self._folder, file_name)
+
+    def _write(
+        self, file_path: str, file_key: bytes, data: Iterable[bytes]
+    ) -> tuple[str, int]:
+        # Returns the address and the size of the plaintext
+        address: hmac.HMAC = hmac.new(
+            self._key_ring.address_key(), digestmod=hashlib.sha256
+        )
+        size: int = 0
+
+        def hashed() -> Iterator[bytes]:
+            nonlocal size
+            for piece in data:
+                address.update(piece)
+                size += len(piece)
+                yield piece
+
+        try:
+            with open(
+                os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600),
+                "wb",
+            ) as file:
+                for piece in StreamEncryptor(key=file_key).encrypt(data=hashed()):
+                    file.write(piece)
+        except BaseException:
+            _remove_file(file_path=file_path)
+            raise
+
+        return address.hexdigest(), size
+
+    def store(self, message_id: int, name: str, data: Iterable[bytes]) -> int:
+        """Encrypt an attachment, its file is only kept if the content is new.
+
+        The content is encrypted into a temporary file while it is hashed. The
+        file is renamed before the rows are stored, so no row references a
+        missing file, and dropped if a blob with the same address exists already.
+
+        Args:
+            self(AttachmentStore): The AttachmentStore instance.
+            message_id(int): The message the attachment belongs to.
+            name(str): Original name of the file.
+            data(Iterable[bytes]): The content in pieces of any size (e.g. 'read_file()').
+
+        Returns:
+            int: The id of the attachment.
+
+        Raises:
+            OSError: If the file couldn't be written.
+            sqlite3.Error: If the attachment couldn't be stored.
+        """
+        file_name: str = f"{uuid.uuid4().hex}{_FILE_SUFFIX}"
+        file_path: str = self._file_path(file_name=file_name)
+        temporary_path: str = file_path + _TEMPORARY_SUFFIX
+        file_key: bytes = generate_key(length=config.ATTACHMENT_KEY_LENGTH)
+
+        address, size = self._write(
+            file_path=temporary_path, file_key=file_key, data=data
+        )
+
+        try:
+            os.replace(temporary_path, file_path)
+        except OSError:
+            _remove_file(file_path=temporary_path)
+            raise
+
+        try:
+            attachment_id, created = self._database.insert_attachment(
+                message_id=message_id,
+                address=address,
+                file_name=file_name,
+                name=name,
+                size=size,
+                file_key=file_key,
+            )
+        except BaseException:
+            _remove_file(file_path=file_path)
+            raise
+
+        if not created:
+            # Identical content is stored already (in the file of that blob)
+            _remove_file(file_path=file_path)
+
+        return attachment_id
+
+    def attachments(self, message_id: int) -> list[AttachmentData]:
+        return self._database.retrieve_attachments(message_id=message_id)
+
+    def open(self, attachment_id: int) -> Iterator[bytes]:
+        """Decrypt an attachment, yields one authenticated chunk at a time.
+
+        Args:
+            self(AttachmentStore): The AttachmentStore instance.
+            attachment_id(int): The id of the attachment.
+
+        Returns:
+            Iterator[bytes]: The content.
+
+        Raises:
+            ValueError: If there is no such attachment.
+            OSError: If the file couldn't be read.
+            cryptography.exceptions.InvalidTag: If the file was changed or truncated.
+        """
+        attachment: Optional[AttachmentData] = self._database.retrieve_attachment(
+            attachment_id=attachment_id
+        )
+        if attachment is None:
+            raise ValueError(f"No attachment with id={attachment_id}!")
+
+        return StreamEncryptor(key=attachment["file_key"]).decrypt(
+            data=read_file(file_path=self._file_path(file_name=attachment["file_name"]))
+        )
+
+    def delete(self, attachment_id: int) -> None:
+        # The file stays until the garbage collection finds it unreferenced
+        self._database.delete_attachment(attachment_id=attachment_id)
+
+
+class BlobCollector:
+    def __init__(
+        self,
+        key_ring: KeyRing,
+        db_path: Optional[str] = None,
+        folder: Optional[str] = None,
+        interval: float = config.ATTACHMENT_GC_INTERVAL,
+        chunk_size: int = config.ATTACHMENT_GC_CHUNK_SIZE,
+    ) -> None:
+        """Remove attachment files nothing references anymore, in the background.
+
+        Blobs without an attachment row (deleted messages and attachments) are
+        deleted in chunks of 'chunk_size', one transaction each, and their
+        files are removed afterwards. Unfinished files and files without a
+        blob row (e.g. after a crash) are removed once they are older than
+        ATTACHMENT_TEMPORARY_FILE_AGE, younger ones may be stored right now.
+
+        Args:
+            self(BlobCollector): The BlobCollector instance.
+            key_ring(KeyRing): The unlocked data keys (shared with the other databases).
+            db_path(Optional[str]): Path of the database (app storage by default).
+            folder(Optional[str]): Folder of the encrypted files (app storage by default).
+            interval(float): Seconds between collections.
+            chunk_size(int): Blobs deleted per transaction.
+
+        Returns:
+            None: No return value.
+        """
+        self._key_ring: KeyRing = key_ring
+        self._db_path: Optional[str] = db_path
+        self._folder: str = _attachments_folder(folder=folder)
+        self._interval: float = interval
+        self._chunk_size: int = chunk_size
+
+        self._db_thread: DatabaseThread = DatabaseThread(name="blob-collector-db")
+        self._database: Optional[SQLiteDatabase] = None
+
+        self._wakeup: asyncio.Event = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+
+        # Metrics
+        self._collections: int = 0
+        self._files_removed: int = 0
+
+    def _collect_chunk(self) -> int:
+        if self._database is None:
+            self._database = SQLiteDatabase(
+                aes_encryptor=self._key_ring, db_path=self._db_path
+            )
+
+        # The rows are gone first, so no attachment references a removed file
+        file_names: list[str] = self._database.delete_orphaned_blobs(
+            limit=self._chunk_size
+        )
+        for file_name in file_names:
+            _remove_file(file_path=os.path.join(self._folder, file_name))
+
+        self._files_removed += len(file_names)
+        return len(file_names)
+
+    def _remove_stray_files(self) -> None:
+        if self._database is None:
+            return
+
+        # Listed before the rows are read, so a blob stored in between is kept
+        file_names: list[str] = os.listdir(self._folder)
+        stored: set[str] = self._database.retrieve_blob_files()
+        # Files which are written or stored right now are younger
+        unused_before: float = time.time() - config.ATTACHMENT_TEMPORARY_FILE_AGE
+
+        for file_name in file_names:
+            if file_name in stored or not file_name.endswith(
+                (_FILE_SUFFIX, _TEMPORARY_SUFFIX)
+            ):
+                continue
+
+            file_path: str = os.path.join(self._folder, file_name)
+            try:
+                if os.path.getmtime(file_path) >= unused_before:
+                    continue
+            except FileNotFoundError:
+                # Dropped by 'AttachmentStore.store()' in the meantime
+                continue
+
+            _remove_file(file_path=file_path)
+            self._files_removed += 1
+
+    async def _collect(self) -> None:
+        while await self._db_thread.run(self._collect_chunk) == self._chunk_size:
+            # Give the other connections a chance between the transactions
+            await asyncio.sleep(0)
+
+        await self._db_thread.run(self._remove_stray_files)
+        self._collections += 1
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+
+            try:
+                await self._collect()
+            except (sqlite3.Error, OSError) as e:
+                # Unreferenced blobs stay in the database, the next run retries
+                print(f"Attachment garbage collection failed. Error: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def collect_now(self) -> None:
+        # E.g. after a conversation was deleted
+        self._wakeup.set()
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        if self._database is not None:
+            await self._db_thread.run(self._database.close)
+            self._database = None
+
+        self._db_thread.shutdown()
+
+    @property
+    def collections(self) -> int:
+        return self._collections
+
+    @property
+    def files_removed(self) -> int:
+        return self._files_removed
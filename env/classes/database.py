@@ -1,25 +1,103 @@
+import asyncio
 import sqlite3
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
 
 from env.classes.encryption import AES_256_GCM
+from env.classes.key_ring import KeyRing
 from env.classes.paths import paths
+from env.classes.record_cache import (DecryptedRecordCache, RecordKey,
+                                      record_cache)
 from env.config import config
 from env.func.converter import byte_to_str, str_to_byte
-from env.typing.dicts import ContactData, DeviceData, MessageData
+from env.typing.dicts import (AttachmentData, ContactData, DeviceData,
+                              MessageData, OutboxEntry)
 from env.typing.hashing import HKDFInfoKey
+from env.typing.sync import SyncChange, SyncEntity, SyncOperation
+
+# Encrypted columns per table: (primary key, ((column, HKDF info), ...))
+_ENCRYPTED_COLUMNS: dict[str, tuple[str, tuple[tuple[str, HKDFInfoKey], ...]]] = {
+    "contacts": (
+        "contact_uuid",
+        (
+            ("username", config.HKDF_INFO_CONTACT),
+            ("description", config.HKDF_INFO_CONTACT),
+            ("onion_address", config.HKDF_INFO_CONTACT),
+        ),
+    ),
+    "messages": ("id", (("message", config.HKDF_INFO_MESSAGE),)),
+    "devices": (
+        "device_uuid",
+        (
+            ("onion_address", config.HKDF_INFO_DEVICE),
+            ("name", config.HKDF_INFO_DEVICE),
+            ("public_key", config.HKDF_INFO_DEVICE),
+        ),
+    ),
+    "identities": ("owner", (("record", config.HKDF_INFO_CONTACT),)),
+    "blobs": ("address", (("file_key", config.HKDF_INFO_MESSAGE),)),
+    "attachments": ("id", (("name", config.HKDF_INFO_MESSAGE),)),
+}
+
+_Result = TypeVar("_Result")
+
+
+class DatabaseThread:
+    def __init__(self, name: str) -> None:
+        """Run the database work of an async component on its own thread.
+
+        SQLite connections only work on the thread which created them, so
+        create and use the connection only in functions passed to 'run()'.
+
+        Args:
+            self(DatabaseThread): The DatabaseThread instance.
+            name(str): Prefix of the thread name.
+
+        Returns:
+            None: No return value.
+        """
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=name
+        )
+
+    async def run(self, func: Callable[..., _Result], *args: Any) -> _Result:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    def shutdown(self) -> None:
+        # Waits for the running function
+        self._executor.shutdown(wait=True)
 
 
 # TODO: Add single functions to mute/block a user. Don't update the whole row (too much computing)!
 class SQLiteDatabase:
-    def __init__(self, aes_encryptor: AES_256_GCM) -> None:
-        self._db_path: str = paths.join_with_app_storage(path=config.DATABASE_FILE)
+    def __init__(
+        self,
+        aes_encryptor: AES_256_GCM | KeyRing,
+        db_path: Optional[str] = None,
+        cache: DecryptedRecordCache = record_cache,
+    ) -> None:
+        # Use the database in the app storage by default
+        self._db_path: str = (
+            db_path
+            if db_path is not None
+            else paths.join_with_app_storage(path=config.DATABASE_FILE)
+        )
 
         # Initialize sql connection and cursor
         self._conn: sqlite3.Connection = sqlite3.connect(database=self._db_path)
         self._cur: sqlite3.Cursor = self._conn.cursor()
 
-        # Initialize AES_256_GCM encryptor
-        self._encryptor: AES_256_GCM = aes_encryptor
+        # Data keys by version (a single encryptor is used as version 0)
+        self._key_ring: KeyRing = (
+            aes_encryptor
+            if isinstance(aes_encryptor, KeyRing)
+            else KeyRing.from_encryptor(aes_encryptor=aes_encryptor)
+        )
+        # Decrypted columns of the session (wiped on logout)
+        self._cache: DecryptedRecordCache = cache
 
         # Create tables if they don't exist
         self._crate_tables()
@@ -35,7 +113,8 @@ class SQLiteDatabase:
             onion_address TEXT NOT NULL UNIQUE,
             last_message_timestamp FLOAT DEFAULT NULL,
             muted BOOLEAN NOT NULL DEFAULT FALSE,
-            blocked BOOLEAN NOT NULL DEFAULT FALSE
+            blocked BOOLEAN NOT NULL DEFAULT FALSE,
+            key_version INTEGER NOT NULL DEFAULT 0
             )
             """
         )
@@ -47,47 +126,234 @@ class SQLiteDatabase:
             contact_uuid TEXT NOT NULL,
             message TEXT NOT NULL,
             timestamp FLOAT NOT NULL,
+            key_version INTEGER NOT NULL DEFAULT 0,
+            peer_message_id INTEGER DEFAULT NULL,
             FOREIGN KEY(contact_uuid) REFERENCES contacts(contact_uuid)
             )
         """
         )
+        # Outbox table (messages which weren't sent yet)
+        self._cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            message_id INTEGER NOT NULL UNIQUE,
+            contact_uuid TEXT NOT NULL,
+            enqueued_at FLOAT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY(message_id) REFERENCES messages(id),
+            FOREIGN KEY(contact_uuid) REFERENCES contacts(contact_uuid)
+            )
+        """
+        )
+        self._cur.execute(
+            "CREATE INDEX IF NOT EXISTS outbox_contact ON outbox (contact_uuid, id)"
+        )
+        # Change log (changes made on this device, synced to the other devices)
+        self._cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            entity TEXT NOT NULL,
+            entity_key TEXT NOT NULL,
+            operation TEXT NOT NULL
+            )
+        """
+        )
+        # Last change applied per other device
+        self._cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sync_cursors (
+            device_uuid TEXT PRIMARY KEY NOT NULL,
+            cursor INTEGER NOT NULL
+            )
+        """
+        )
+        # Messages received from other devices: local id -> '<device uuid>:<message id>'
+        self._cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS message_origins (
+            message_id INTEGER PRIMARY KEY NOT NULL,
+            origin_key TEXT NOT NULL UNIQUE,
+            FOREIGN KEY(message_id) REFERENCES messages(id)
+            )
+        """
+        )
+        # Content of the attachments, stored once as encrypted file (by keyed hash)
+        self._cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+            address TEXT PRIMARY KEY NOT NULL,
+            file_name TEXT NOT NULL UNIQUE,
+            size INTEGER NOT NULL,
+            file_key TEXT NOT NULL,
+            key_version INTEGER NOT NULL DEFAULT 0
+            )
+        """
+        )
+        # Attachments of messages, the blobs are kept as long as a row references them
+        self._cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS attachments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            message_id INTEGER NOT NULL,
+            blob TEXT NOT NULL,
+            name TEXT NOT NULL,
+            key_version INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY(message_id) REFERENCES messages(id),
+            FOREIGN KEY(blob) REFERENCES blobs(address)
+            )
+        """
+        )
+        self._cur.execute(
+            "CREATE INDEX IF NOT EXISTS attachments_message ON attachments (message_id)"
+        )
+        # Counts the references of a blob without a full scan
+        self._cur.execute(
+            "CREATE INDEX IF NOT EXISTS attachments_blob ON attachments (blob)"
+        )
+        # Signed onion IDs of the contacts and our own (owner IDENTITY_OWNER_SELF)
+        self._cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS identities (
+            owner TEXT PRIMARY KEY NOT NULL,
+            record TEXT NOT NULL,
+            expires INTEGER NOT NULL,
+            expired BOOLEAN NOT NULL DEFAULT FALSE,
+            key_version INTEGER NOT NULL DEFAULT 0
+            )
+        """
+        )
+        # Lets the sweeper find the next expiring IDs without a full scan
+        self._cur.execute(
+            "CREATE INDEX IF NOT EXISTS identities_expiry ON identities (expired, expires)"
+        )
         # Device table
         self._cur.execute(
             """
             CREATE TABLE IF NOT EXISTS devices (
                 device_uuid TEXT PRIMARY KEY NOT NULL,
                 onion_address TEXT NOT NULL,
-                name TEXT NOT NULL
+                name TEXT NOT NULL,
+                public_key TEXT NOT NULL DEFAULT '',
+                key_version INTEGER NOT NULL DEFAULT 0
             )
         """
         )
+        self._add_device_public_key_column()
+        self._add_key_version_columns()
+        # Lets the key rotation find rows of old data keys without a full scan
+        self._cur.execute(
+            "CREATE INDEX IF NOT EXISTS messages_key_version ON messages (key_version)"
+        )
+        self._add_peer_message_id_column()
+        # Messages sent again by a contact (e.g. a lost ack) are only stored once
+        self._cur.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS messages_peer_id ON messages (contact_uuid, peer_message_id)"
+        )
 
         self.commit()
 
-    def _encrypt(self, data: str, encryption_key_info: HKDFInfoKey) -> str:
+    def _add_key_version_columns(self) -> None:
+        # Databases created before the key rotation are encrypted with version 0
+        for table in _ENCRYPTED_COLUMNS:
+            columns: list[tuple[Any, ...]] = self._cur.execute(
+                f"PRAGMA table_info({table})"
+            ).fetchall()
+            if any(column[1] == "key_version" for column in columns):
+                continue
+
+            self._cur.execute(
+                f"ALTER TABLE {table} ADD COLUMN key_version INTEGER NOT NULL DEFAULT 0"
+            )
+
+    def _add_device_public_key_column(self) -> None:
+        # Devices linked before the sync authentication have none, they can't sync
+        columns: list[tuple[Any, ...]] = self._cur.execute(
+            "PRAGMA table_info(devices)"
+        ).fetchall()
+        if any(column[1] == "public_key" for column in columns):
+            return
+
+        self._cur.execute(
+            "ALTER TABLE devices ADD COLUMN public_key TEXT NOT NULL DEFAULT ''"
+        )
+
+    def _add_peer_message_id_column(self) -> None:
+        # Message id of the sending contact, NULL for our own messages
+        columns: list[tuple[Any, ...]] = self._cur.execute(
+            "PRAGMA table_info(messages)"
+        ).fetchall()
+        if any(column[1] == "peer_message_id" for column in columns):
+            return
+
+        self._cur.execute(
+            "ALTER TABLE messages ADD COLUMN peer_message_id INTEGER DEFAULT NULL"
+        )
+
+    def _encrypt(
+        self, data: str, encryption_key_info: HKDFInfoKey, key_version: int
+    ) -> str:
         if not data:
             return ""
 
         return byte_to_str(
-            data=self._encryptor.encrypt(
+            data=self._key_ring.encryptor(version=key_version).encrypt(
                 plaintext=data,
                 encryption_key_info=encryption_key_info,
             )
         )
 
-    def _decrypt(self, data: str, encryption_key_info: HKDFInfoKey) -> str:
+    def _decrypt(
+        self,
+        data: str,
+        encryption_key_info: HKDFInfoKey,
+        key_version: int,
+        cache_key: Optional[RecordKey] = None,
+    ) -> str:
         if not data:
             return ""
 
-        return self._encryptor.decrypt(
+        if cache_key is not None:
+            cached: Optional[str] = self._cache.get(key=cache_key, ciphertext=data)
+            if cached is not None:
+                return cached
+
+        plaintext: str = self._key_ring.encryptor(version=key_version).decrypt(
             encrypted_data=str_to_byte(data=data),
             encryption_key_info=encryption_key_info,
         )
 
+        # Bulk reads (e.g. sync) aren't cached, they would push out everything else
+        if cache_key is not None:
+            self._cache.put(key=cache_key, ciphertext=data, plaintext=plaintext)
+
+        return plaintext
+
+    def _log_change(
+        self, entity: SyncEntity, entity_key: str, operation: SyncOperation
+    ) -> None:
+        # Committed together with the change itself
+        self._cur.execute(
+            "INSERT INTO change_log (entity, entity_key, operation) VALUES (?, ?, ?)",
+            (entity, entity_key, operation),
+        )
+
+    def _message_key(self, message_id: int) -> str:
+        # Messages of other devices keep their original key
+        row: Optional[tuple[str]] = self._cur.execute(
+            "SELECT origin_key FROM message_origins WHERE message_id = ?",
+            (message_id,),
+        ).fetchone()
+
+        return row[0] if row is not None else str(message_id)
+
     def insert_contact(self, contact_data: ContactData) -> None:
+        key_version: int = self._key_ring.current_version
+
         # Insert data (encrypted)
         self._cur.execute(
-            "INSERT INTO contacts (contact_uuid, username, description, onion_address, last_message_timestamp, muted, blocked) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            "INSERT INTO contacts (contact_uuid, username, description, onion_address, last_message_timestamp, muted, blocked, key_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
             (
                 contact_data[
                     "contact_uuid"
@@ -95,11 +361,13 @@ class SQLiteDatabase:
                 self._encrypt(
                     data=contact_data["username"],
                     encryption_key_info=config.HKDF_INFO_CONTACT,
+                    key_version=key_version,
                 ),
                 (
                     self._encrypt(
                         data=contact_data["description"],
                         encryption_key_info=config.HKDF_INFO_CONTACT,
+                        key_version=key_version,
                     )
                     if contact_data["description"] is not None
                     else None
@@ -107,29 +375,45 @@ class SQLiteDatabase:
                 self._encrypt(
                     data=contact_data["onion_address"],
                     encryption_key_info=config.HKDF_INFO_CONTACT,
+                    key_version=key_version,
                 ),
                 contact_data["last_message_timestamp"],
                 contact_data["muted"],
                 contact_data["blocked"],
+                key_version,
             ),
         )
+        self._log_change(
+            entity="contact",
+            entity_key=contact_data["contact_uuid"],
+            operation="upsert",
+        )
 
         self.commit()
 
     def insert_message(self, contact_uuid: str, message: str, timestamp: float) -> None:
+        key_version: int = self._key_ring.current_version
+
         try:
             # Insert timestamp for message
             self._cur.execute(
-                "INSERT INTO messages (contact_uuid, message, timestamp) VALUES (?, ?, ?)",
+                "INSERT INTO messages (contact_uuid, message, timestamp, key_version) VALUES (?, ?, ?, ?)",
                 (
                     contact_uuid,  # Leave uuid decrypted to be able to find it
                     self._encrypt(
                         data=message,
                         encryption_key_info=config.HKDF_INFO_MESSAGE,
+                        key_version=key_version,
                     ),
                     timestamp,
+                    key_version,
                 ),
             )
+            self._log_change(
+                entity="message",
+                entity_key=str(self._cur.lastrowid),
+                operation="upsert",
+            )
 
             # Update timestamp for contact
             self._cur.execute(
@@ -142,20 +426,156 @@ class SQLiteDatabase:
                 f"Exception has occurred while inserting message for contact_uuid={contact_uuid}: {e}"
             )
 
-    def insert_device(self, device_uuid: str, onion_address: str, name: str) -> None:
+    def enqueue_message(self, contact_uuid: str, message: str, timestamp: float) -> int:
+        """Store an outgoing message and queue it for sending in one transaction.
+
+        Args:
+            self(SQLiteDatabase): The SQLiteDatabase instance.
+            contact_uuid(str): The uuid of the receiving contact.
+            message(str): The message text.
+            timestamp(float): Time the message was written.
+
+        Returns:
+            int: The id of the message.
+
+        Raises:
+            sqlite3.Error: If the message couldn't be stored (nothing is stored).
+        """
+        key_version: int = self._key_ring.current_version
+
         try:
             self._cur.execute(
-                "INSERT INTO devices (device_uuid, onion_address, name) VALUES (?, ?, ?)",
+                "INSERT INTO messages (contact_uuid, message, timestamp, key_version) VALUES (?, ?, ?, ?)",
+                (
+                    contact_uuid,  # Leave uuid decrypted to be able to find it
+                    self._encrypt(
+                        data=message,
+                        encryption_key_info=config.HKDF_INFO_MESSAGE,
+                        key_version=key_version,
+                    ),
+                    timestamp,
+                    key_version,
+                ),
+            )
+            message_id: int = self._cur.lastrowid  # type: ignore[assignment]
+            self._log_change(
+                entity="message", entity_key=str(message_id), operation="upsert"
+            )
+
+            self._cur.execute(
+                "INSERT INTO outbox (message_id, contact_uuid, enqueued_at) VALUES (?, ?, ?)",
+                (message_id, contact_uuid, time.time()),
+            )
+            self._cur.execute(
+                "UPDATE contacts SET last_message_timestamp = ? WHERE contact_uuid = ?",
+                (timestamp, contact_uuid),
+            )
+            self.commit()
+        except sqlite3.Error:
+            self._conn.rollback()
+            raise
+
+        return message_id
+
+    def encrypt_message(self, message: str) -> tuple[str, int]:
+        # Doesn't touch the connection, so other threads can encrypt in advance
+        key_version: int = self._key_ring.current_version
+        return (
+            self._encrypt(
+                data=message,
+                encryption_key_info=config.HKDF_INFO_MESSAGE,
+                key_version=key_version,
+            ),
+            key_version,
+        )
+
+    def insert_encrypted_messages(
+        self, messages: list[tuple[str, str, float, int, Optional[int]]]
+    ) -> dict[str, int]:
+        """Insert many messages encrypted by 'encrypt_message()' with one commit.
+
+        Messages of a contact whose message id is stored already are skipped,
+        the contact sent them again.
+
+        Args:
+            self(SQLiteDatabase): The SQLiteDatabase instance.
+            messages(list[tuple[str, str, float, int, Optional[int]]]): Contact uuid, encrypted message, timestamp, key version and message id of the contact (None for own messages) per message.
+
+        Returns:
+            dict[str, int]: Amount of new messages per contact uuid.
+
+        Raises:
+            sqlite3.Error: If the messages couldn't be stored (nothing is stored).
+        """
+        inserted: dict[str, int] = {}
+        # Newest timestamp per contact
+        last_timestamps: dict[str, float] = {}
+
+        try:
+            for message in messages:
+                self._cur.execute(
+                    "INSERT OR IGNORE INTO messages (contact_uuid, message, timestamp, key_version, peer_message_id) VALUES (?, ?, ?, ?, ?)",
+                    message,
+                )
+                if self._cur.rowcount == 0:
+                    continue
+
+                contact_uuid, _, timestamp, _, _ = message
+                inserted[contact_uuid] = inserted.get(contact_uuid, 0) + 1
+                last_timestamps[contact_uuid] = max(
+                    timestamp, last_timestamps.get(contact_uuid, timestamp)
+                )
+                self._log_change(
+                    entity="message",
+                    entity_key=str(self._cur.lastrowid),
+                    operation="upsert",
+                )
+            self._cur.executemany(
+                """
+                UPDATE contacts
+                SET last_message_timestamp = MAX(COALESCE(last_message_timestamp, 0), ?)
+                WHERE contact_uuid = ?
+                """,
+                (
+                    (timestamp, contact_uuid)
+                    for contact_uuid, timestamp in last_timestamps.items()
+                ),
+            )
+            self.commit()
+        except Exception:
+            # Nothing of a dropped batch may be committed with the next one
+            self._conn.rollback()
+            raise
+
+        return inserted
+
+    def insert_device(
+        self, device_uuid: str, onion_address: str, name: str, public_key: bytes
+    ) -> None:
+        key_version: int = self._key_ring.current_version
+
+        try:
+            self._cur.execute(
+                "INSERT INTO devices (device_uuid, onion_address, name, public_key, key_version) VALUES (?, ?, ?, ?, ?)",
                 (
                     device_uuid,  # Leave uuid decrypted to be able to find it
                     self._encrypt(
                         data=onion_address,
                         encryption_key_info=config.HKDF_INFO_DEVICE,
+                        key_version=key_version,
                     ),
                     self._encrypt(
                         data=name,
                         encryption_key_info=config.HKDF_INFO_DEVICE,
+                        key_version=key_version,
+                    ),
+                    # Signing key of the device, it has to prove it before syncing
+                    self._encrypt(
+                        data=byte_to_str(data=public_key),
+                        encryption_key_info=config.HKDF_INFO_DEVICE,
+                        key_version=key_version,
                     ),
+                    key_version,
                 ),
             )
 
@@ -167,9 +587,9 @@ class SQLiteDatabase:
 
     def retrieve_contacts(self) -> Optional[list[ContactData]]:
         # Select contacts
-        rows: list[tuple[str, str, str, str, float, int, int]] = self._cur.execute(
+        rows: list[tuple[str, str, str, str, float, int, int, int]] = self._cur.execute(
             """
-            SELECT contact_uuid, username, description, onion_address, last_message_timestamp, muted, blocked
+            SELECT contact_uuid, username, description, onion_address, last_message_timestamp, muted, blocked, key_version
             FROM contacts
             ORDER BY last_message_timestamp ASC
             """
@@ -185,6 +605,7 @@ class SQLiteDatabase:
             last_message_timestamp,
             is_muted,
             is_blocked,
+            key_version,
         ) in rows:
             contacts.append(
                 {
@@ -192,14 +613,20 @@ class SQLiteDatabase:
                     "username": self._decrypt(
                         data=encrypted_username,
                         encryption_key_info=config.HKDF_INFO_CONTACT,
+                        key_version=key_version,
+                        cache_key=("contacts", uuid, "username"),
                     ),
                     "description": self._decrypt(
                         data=encrypted_description,
                         encryption_key_info=config.HKDF_INFO_CONTACT,
+                        key_version=key_version,
+                        cache_key=("contacts", uuid, "description"),
                     ),
                     "onion_address": self._decrypt(
                         data=encrypted_onion_address,
                         encryption_key_info=config.HKDF_INFO_CONTACT,
+                        key_version=key_version,
+                        cache_key=("contacts", uuid, "onion_address"),
                     ),
                     "last_message_timestamp": last_message_timestamp,
                     "muted": bool(is_muted),
@@ -212,13 +639,13 @@ class SQLiteDatabase:
     def retrieve_messages(self, contact_uuid: str) -> Optional[list[MessageData]]:
         try:
             # Select messages
-            rows: list[tuple[str, str, float]] = self._cur.execute(
-                "SELECT id, message, timestamp FROM messages WHERE contact_uuid = ? ORDER BY timestamp ASC",
+            rows: list[tuple[str, str, float, int]] = self._cur.execute(
+                "SELECT id, message, timestamp, key_version FROM messages WHERE contact_uuid = ? ORDER BY timestamp ASC",
                 (contact_uuid,),
             ).fetchall()
 
             messages: list[MessageData] = []
-            for message_id, encrypted_message, timestamp in rows:
+            for message_id, encrypted_message, timestamp, key_version in rows:
                 messages.append(
                     {
                         "id": message_id,
@@ -226,6 +653,8 @@ class SQLiteDatabase:
                         "message": self._decrypt(
                             data=encrypted_message,
                             encryption_key_info=config.HKDF_INFO_MESSAGE,
+                            key_version=key_version,
+                            cache_key=("messages", message_id, "message"),
                         ),
                         "timestamp": timestamp,
                     }
@@ -238,23 +667,39 @@ class SQLiteDatabase:
 
     def retrieve_devices(self) -> Optional[list[DeviceData]]:
         try:
-            rows: list[tuple[str, str, str]] = self._cur.execute(
-                "SELECT device_uuid, onion_address, name FROM devices"
+            rows: list[tuple[str, str, str, str, int]] = self._cur.execute(
+                "SELECT device_uuid, onion_address, name, public_key, key_version FROM devices"
             ).fetchall()
 
             devices: list[DeviceData] = []
 
-            for device_uuid, encrypted_onion_address, encrypted_name in rows:
+            for (
+                device_uuid,
+                encrypted_onion_address,
+                encrypted_name,
+                encrypted_public_key,
+                key_version,
+            ) in rows:
                 devices.append(
                     {
                         "uuid": device_uuid,
                         "onion_address": self._decrypt(
                             data=encrypted_onion_address,
                             encryption_key_info=config.HKDF_INFO_DEVICE,
+                            key_version=key_version,
+                            cache_key=("devices", device_uuid, "onion_address"),
                         ),
                         "name": self._decrypt(
                             data=encrypted_name,
                             encryption_key_info=config.HKDF_INFO_DEVICE,
+                            key_version=key_version,
+                            cache_key=("devices", device_uuid, "name"),
+                        ),
+                        "public_key": self._decrypt(
+                            data=encrypted_public_key,
+                            encryption_key_info=config.HKDF_INFO_DEVICE,
+                            key_version=key_version,
+                            cache_key=("devices", device_uuid, "public_key"),
                         ),
                     },
                 )
@@ -264,25 +709,704 @@ class SQLiteDatabase:
             print(f"Could not retrieve devices. Error: {e}")
             return None
 
+    def retrieve_onion_address(self, contact_uuid: str) -> Optional[str]:
+        row: Optional[tuple[str, int]] = self._cur.execute(
+            "SELECT onion_address, key_version FROM contacts WHERE contact_uuid = ?",
+            (contact_uuid,),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return self._decrypt(
+            data=row[0],
+            encryption_key_info=config.HKDF_INFO_CONTACT,
+            key_version=row[1],
+            cache_key=("contacts", contact_uuid, "onion_address"),
+        )
+
+    def retrieve_outbox(
+        self, contact_uuid: str, limit: int, after_id: int = 0
+    ) -> list[OutboxEntry]:
+        """Get the oldest queued messages of a contact.
+
+        Args:
+            self(SQLiteDatabase): The SQLiteDatabase instance.
+            contact_uuid(str): The uuid of the contact.
+            limit(int): Max amount of messages.
+            after_id(int): Only messages queued after this outbox id (already sent ones).
+
+        Returns:
+            list[OutboxEntry]: The queued messages in the order they were queued.
+        """
+        rows: list[tuple[int, int, str, float, float, int, int]] = self._cur.execute(
+            """
+            SELECT outbox.id, outbox.message_id, messages.message, messages.timestamp, outbox.enqueued_at, outbox.attempts, messages.key_version
+            FROM outbox
+            JOIN messages ON messages.id = outbox.message_id
+            WHERE outbox.contact_uuid = ? AND outbox.id > ?
+            ORDER BY outbox.id ASC
+            LIMIT ?
+            """,
+            (contact_uuid, after_id, limit),
+        ).fetchall()
+
+        return [
+            {
+                "id": outbox_id,
+                "message_id": message_id,
+                "contact_uuid": contact_uuid,
+                "message": self._decrypt(
+                    data=encrypted_message,
+                    encryption_key_info=config.HKDF_INFO_MESSAGE,
+                    key_version=key_version,
+                    cache_key=("messages", message_id, "message"),
+                ),
+                "timestamp": timestamp,
+                "enqueued_at": enqueued_at,
+                "attempts": attempts,
+            }
+            for (
+                outbox_id,
+                message_id,
+                encrypted_message,
+                timestamp,
+                enqueued_at,
+                attempts,
+                key_version,
+            ) in rows
+        ]
+
+    def retrieve_outbox_contacts(self) -> dict[str, int]:
+        """Get the contacts with queued messages.
+
+        Args:
+            self(SQLiteDatabase): The SQLiteDatabase instance.
+
+        Returns:
+            dict[str, int]: Failed attempts per contact uuid.
+        """
+        rows: list[tuple[str, int]] = self._cur.execute(
+            "SELECT contact_uuid, MAX(attempts) FROM outbox GROUP BY contact_uuid"
+        ).fetchall()
+
+        return dict(rows)
+
+    def retrieve_outbox_stats(self) -> tuple[int, Optional[float], int]:
+        """Get the queue depth, the oldest enqueue time and the most failed attempts.
+
+        Args:
+            self(SQLiteDatabase): The SQLiteDatabase instance.
+
+        Returns:
+            tuple[int, Optional[float], int]: Depth, oldest enqueue time (None if empty) and max attempts.
+        """
+        depth, oldest, max_attempts = self._cur.execute(
+            "SELECT COUNT(*), MIN(enqueued_at), MAX(attempts) FROM outbox"
+        ).fetchone()
+
+        return depth, oldest, max_attempts or 0
+
+    def increment_outbox_attempts(self, contact_uuid: str) -> None:
+        self._cur.execute(
+            "UPDATE outbox SET attempts = attempts + 1 WHERE contact_uuid = ?",
+            (contact_uuid,),
+        )
+        self.commit()
+
+    def delete_outbox_entries(self, contact_uuid: str, message_ids: list[int]) -> None:
+        # Only for messages the contact confirmed to have stored
+        self._cur.executemany(
+            "DELETE FROM outbox WHERE contact_uuid = ? AND message_id = ?",
+            ((contact_uuid, message_id) for message_id in message_ids),
+        )
+        self.commit()
+
+    def upsert_identity(self, owner: str, record: bytes, expires: int) -> None:
+        """Store a signed onion ID (binary format), replacing the previous one.
+
+        Args:
+            self(SQLiteDatabase): The SQLiteDatabase instance.
+            owner(str): Contact uuid or IDENTITY_OWNER_SELF.
+            record(bytes): The binary record.
+            expires(int): Time the ID expires (seconds).
+        """
+        key_version: int = self._key_ring.current_version
+
+        self._cur.execute(
+            """
+            INSERT INTO identities (owner, record, expires, expired, key_version)
+            VALUES (?, ?, ?, FALSE, ?)
+            ON CONFLICT(owner) DO UPDATE SET
+            record = excluded.record, expires = excluded.expires, expired = FALSE,
+            key_version = excluded.key_version
+            """,
+            (
+                owner,
+                self._encrypt(
+                    data=byte_to_str(data=record),
+                    encryption_key_info=config.HKDF_INFO_CONTACT,
+                    key_version=key_version,
+                ),
+                expires,
+                key_version,
+            ),
+        )
+        self.commit()
+
+    def retrieve_identity(self, owner: str) -> Optional[tuple[bytes, bool]]:
+        """Get a stored signed onion ID.
+
+        Args:
+            self(SQLiteDatabase): The SQLiteDatabase instance.
+            owner(str): Contact uuid or IDENTITY_OWNER_SELF.
+
+        Returns:
+            Optional[tuple[bytes, bool]]: The binary record and if it was flagged as expired.
+        """
+        row: Optional[tuple[str, int, int]] = self._cur.execute(
+            "SELECT record, expired, key_version FROM identities WHERE owner = ?",
+            (owner,),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        record: str = self._decrypt(
+            data=row[0],
+            encryption_key_info=config.HKDF_INFO_CONTACT,
+            key_version=row[2],
+        )
+        return str_to_byte(data=record), bool(row[1])
+
+    def retrieve_next_identity_expiry(self) -> Optional[int]:
+        # Earliest expiry of the contacts' IDs which aren't flagged yet (uses the index)
+        row: Optional[tuple[int]] = self._cur.execute(
+            """
+            SELECT expires FROM identities
+            WHERE expired = FALSE AND owner != ?
+            ORDER BY expires ASC
+            LIMIT 1
+            """,
+            (config.IDENTITY_OWNER_SELF,),
+        ).fetchone()
+
+        return row[0] if row is not None else None
+
+    def flag_expired_identities(self, now: int) -> list[str]:
+        """Flag all contacts' IDs which expired until now with one statement.
+
+        Args:
+            self(SQLiteDatabase): The SQLiteDatabase instance.
+            now(int): The current time (seconds).
+
+        Returns:
+            list[str]: Contact uuids of the newly flagged IDs.
+        """
+        rows: list[tuple[str]] = self._cur.execute(
+            """
+            UPDATE identities SET expired = TRUE
+            WHERE expired = FALSE AND expires <= ? AND owner != ?
+            RETURNING owner
+            """,
+            (now, config.IDENTITY_OWNER_SELF),
+        ).fetchall()
+        self.commit()
+
+        return [owner for (owner,) in rows]
+
+    def insert_attachment(
+        self,
+        message_id: int,
+        address: str,
+        file_name: str,
+        name: str,
+        size: int,
+        file_key: bytes,
+    ) -> tuple[int, bool]:
+        """Store an attachment and its blob, unless a blob with this address exists.
+
+        Both rows are stored in one transaction, so the garbage collection
+        can't remove the blob in between.
+
+        Args:
+            self(SQLiteDatabase): The SQLiteDatabase instance.
+            message_id(int): The message the attachment belongs to.
+            address(str): Keyed hash of the content.
+            file_name(str): Name of the encrypted file in the attachments folder.
+            name(str): Original name of the file.
+            size(int): Size of the plaintext in bytes.
+            file_key(bytes): Key the file is encrypted with.
+
+        Returns:
+            tuple[int, bool]: The id of the attachment and if the blob is new (store its file).
+        """
+        key_version: int = self._key_ring.current_version
+
+        try:
+            self._cur.execute(
+                "INSERT OR IGNORE INTO blobs (address, file_name, size, file_key, key_version) VALUES (?, ?, ?, ?, ?)",
+                (
+                    address,
+                    file_name,
+                    size,
+                    self._encrypt(
+                        data=byte_to_str(data=file_key),
+                        encryption_key_info=config.HKDF_INFO_MESSAGE,
+                        key_version=key_version,
+                    ),
+                    key_version,
+                ),
+            )
+            created: bool = self._cur.rowcount == 1
+
+            self._cur.execute(
+                "INSERT INTO attachments (message_id, blob, name, key_version) VALUES (?, ?, ?, ?)",
+                (
+                    message_id,
+                    address,
+                    self._encrypt(
+                        data=name,
+                        encryption_key_info=config.HKDF_INFO_MESSAGE,
+                        key_version=key_version,
+                    ),
+                    key_version,
+                ),
+            )
+            attachment_id: int = self._cur.lastrowid  # type: ignore[assignment]
+            self.commit()
+        except sqlite3.Error:
+            self._conn.rollback()
+            raise
+
+        return attachment_id, created
+
+    def _attachment_from_row(
+        self, row: tuple[int, int, str, str, str, int, int, str, int]
+    ) -> AttachmentData:
+        (
+            attachment_id,
+            message_id,
+            address,
+            name,
+            file_name,
+            size,
+            key_version,
+            file_key,
+            blob_key_version,
+        ) = row
+        return {
+            "id": attachment_id,
+            "message_id": message_id,
+            "address": address,
+            "file_name": file_name,
+            "name": self._decrypt(
+                data=name,
+                encryption_key_info=config.HKDF_INFO_MESSAGE,
+                key_version=key_version,
+            ),
+            "size": size,
+            "file_key": str_to_byte(
+                data=self._decrypt(
+                    data=file_key,
+                    encryption_key_info=config.HKDF_INFO_MESSAGE,
+                    key_version=blob_key_version,
+                )
+            ),
+        }
+
+    def retrieve_attachment(self, attachment_id: int) -> Optional[AttachmentData]:
+        row: Optional[tuple[int, int, str, str, str, int, int, str, int]] = (
+            self._cur.execute(
+                """
+                SELECT a.id, a.message_id, a.blob, a.name, b.file_name, b.size, a.key_version, b.file_key, b.key_version
+                FROM attachments a JOIN blobs b ON b.address = a.blob
+                WHERE a.id = ?
+                """,
+                (attachment_id,),
+            ).fetchone()
+        )
+
+        return self._attachment_from_row(row=row) if row is not None else None
+
+    def retrieve_attachments(self, message_id: int) -> list[AttachmentData]:
+        rows: list[tuple[int, int, str, str, str, int, int, str, int]] = (
+            self._cur.execute(
+                """
+                SELECT a.id, a.message_id, a.blob, a.name, b.file_name, b.size, a.key_version, b.file_key, b.key_version
+                FROM attachments a JOIN blobs b ON b.address = a.blob
+                WHERE a.message_id = ?
+                ORDER BY a.id ASC
+                """,
+                (message_id,),
+            ).fetchall()
+        )
+
+        return [self._attachment_from_row(row=row) for row in rows]
+
+    def count_blob_references(self, address: str) -> int:
+        return self._cur.execute(
+            "SELECT COUNT(*) FROM attachments WHERE blob = ?", (address,)
+        ).fetchone()[0]
+
+    def retrieve_blob_files(self) -> set[str]:
+        # File names of all blobs (to find files without a row)
+        return {
+            file_name
+            for (file_name,) in self._cur.execute(
+                "SELECT file_name FROM blobs"
+            ).fetchall()
+        }
+
+    def delete_attachment(self, attachment_id: int) -> None:
+        # The blob is removed by the garbage collection once nothing references it
+        self._cur.execute("DELETE FROM attachments WHERE id = ?", (attachment_id,))
+        self.commit()
+
+    def delete_orphaned_blobs(self, limit: int) -> list[str]:
+        """Delete blobs which no attachment references anymore.
+
+        Args:
+            self(SQLiteDatabase): The SQLiteDatabase instance.
+            limit(int): Max amount of blobs.
+
+        Returns:
+            list[str]: File names of the deleted blobs (remove the files afterwards).
+        """
+        rows: list[tuple[str]] = self._cur.execute(
+            """
+            DELETE FROM blobs
+            WHERE address IN (
+                SELECT address FROM blobs
+                WHERE NOT EXISTS (SELECT 1 FROM attachments WHERE blob = blobs.address)
+                LIMIT ?
+            )
+            RETURNING file_name
+            """,
+            (limit,),
+        ).fetchall()
+        self.commit()
+
+        return [file_name for (file_name,) in rows]
+
+    def _retrieve_sync_data(
+        self, entity: SyncEntity, entity_key: str
+    ) -> Optional[dict[str, Any]]:
+        if entity == "contact":
+            contact_row: Optional[
+                tuple[str, Optional[str], str, float, int, int, int]
+            ] = self._cur.execute(
+                """
+                SELECT username, description, onion_address, last_message_timestamp, muted, blocked, key_version
+                FROM contacts
+                WHERE contact_uuid = ?
+                """,
+                (entity_key,),
+            ).fetchone()
+            if contact_row is None:
+                return None
+
+            (
+                username,
+                description,
+                onion_address,
+                last_timestamp,
+                muted,
+                blocked,
+                key_version,
+            ) = contact_row
+            return {
+                "contact_uuid": entity_key,
+                "username": self._decrypt(
+                    data=username,
+                    encryption_key_info=config.HKDF_INFO_CONTACT,
+                    key_version=key_version,
+                ),
+                "description": (
+                    self._decrypt(
+                        data=description,
+                        encryption_key_info=config.HKDF_INFO_CONTACT,
+                        key_version=key_version,
+                    )
+                    if description is not None
+                    else None
+                ),
+                "onion_address": self._decrypt(
+                    data=onion_address,
+                    encryption_key_info=config.HKDF_INFO_CONTACT,
+                    key_version=key_version,
+                ),
+                "last_message_timestamp": last_timestamp,
+                "muted": bool(muted),
+                "blocked": bool(blocked),
+            }
+
+        message_row: Optional[tuple[str, str, float, int]] = self._cur.execute(
+            "SELECT contact_uuid, message, timestamp, key_version FROM messages WHERE id = ?",
+            (int(entity_key),),
+        ).fetchone()
+        if message_row is None:
+            return None
+
+        contact_uuid, message, timestamp, key_version = message_row
+        return {
+            "contact_uuid": contact_uuid,
+            "message": self._decrypt(
+                data=message,
+                encryption_key_info=config.HKDF_INFO_MESSAGE,
+                key_version=key_version,
+            ),
+            "timestamp": timestamp,
+        }
+
+    def retrieve_changes(
+        self, device_uuid: str, after_seq: int, limit: int
+    ) -> tuple[list[SyncChange], int]:
+        """Get the changes made on this device after the given sequence number.
+
+        Upserts contain the current row, so rows changed several times are
+        sent once per batch. Rows which were deleted later are left out.
+
+        Args:
+            self(SQLiteDatabase): The SQLiteDatabase instance.
+            device_uuid(str): The uuid of this device (part of the message keys).
+            after_seq(int): Last sequence number the other device applied.
+            limit(int): Max amount of change log entries to read.
+
+        Returns:
+            tuple[list[SyncChange], int]: The changes and the sequence number of the last read entry.
+        """
+        rows: list[tuple[int, SyncEntity, str, SyncOperation]] = self._cur.execute(
+            """
+            SELECT seq, entity, entity_key, operation
+            FROM change_log
+            WHERE seq > ?
+            ORDER BY seq ASC
+            LIMIT ?
+            """,
+            (after_seq, limit),
+        ).fetchall()
+
+        changes: list[SyncChange] = []
+        # Upserts already part of this batch
+        sent_upserts: set[tuple[SyncEntity, str]] = set()
+
+        for _, entity, entity_key, operation in rows:
+            data: Optional[dict[str, Any]] = None
+
+            if operation == "upsert":
+                if (entity, entity_key) in sent_upserts:
+                    continue
+
+                data = self._retrieve_sync_data(entity=entity, entity_key=entity_key)
+                if data is None:
+                    # Row was deleted, the delete follows later in the log
+                    continue
+                sent_upserts.add((entity, entity_key))
+            else:
+                sent_upserts.discard((entity, entity_key))
+
+            # Local message ids are only unique on this device
+            if entity == "message" and ":" not in entity_key:
+                entity_key = f"{device_uuid}:{entity_key}"
+
+            changes.append(
+                {
+                    "entity": entity,
+                    "key": entity_key,
+                    "operation": operation,
+                    "data": data,
+                }
+            )
+
+        return changes, rows[-1][0] if rows else after_seq
+
+    def retrieve_last_change(self) -> int:
+        row: tuple[Optional[int]] = self._cur.execute(
+            "SELECT MAX(seq) FROM change_log"
+        ).fetchone()
+
+        return row[0] or 0
+
+    def retrieve_sync_cursor(self, device_uuid: str) -> int:
+        row: Optional[tuple[int]] = self._cur.execute(
+            "SELECT cursor FROM sync_cursors WHERE device_uuid = ?", (device_uuid,)
+        ).fetchone()
+
+        return row[0] if row is not None else 0
+
+    def _local_message_id(self, device_uuid: str, key: str) -> Optional[int]:
+        # Own messages which come back (e.g. deleted on another device)
+        device_prefix: str = f"{device_uuid}:"
+        if key.startswith(device_prefix):
+            return int(key.removeprefix(device_prefix))
+
+        row: Optional[tuple[int]] = self._cur.execute(
+            "SELECT message_id FROM message_origins WHERE origin_key = ?", (key,)
+        ).fetchone()
+
+        return row[0] if row is not None else None
+
+    def _apply_change(self, device_uuid: str, change: SyncChange) -> None:
+        key: str = change["key"]
+        data: Optional[dict[str, Any]] = change["data"]
+        key_version: int = self._key_ring.current_version
+
+        if change["entity"] == "contact":
+            if change["operation"] == "delete" or data is None:
+                self._delete_contact(contact_uuid=key)
+                return
+
+            self._cache.invalidate(table="contacts", row_ids=[key])
+            self._cur.execute(
+                """
+                INSERT INTO contacts (contact_uuid, username, description, onion_address, last_message_timestamp, muted, blocked, key_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(contact_uuid) DO UPDATE SET
+                username = excluded.username,
+                description = excluded.description,
+                onion_address = excluded.onion_address,
+                last_message_timestamp = MAX(COALESCE(last_message_timestamp, 0), COALESCE(excluded.last_message_timestamp, 0)),
+                muted = excluded.muted,
+                blocked = excluded.blocked,
+                key_version = excluded.key_version
+                """,
+                (
+                    key,
+                    self._encrypt(
+                        data=data["username"],
+                        encryption_key_info=config.HKDF_INFO_CONTACT,
+                        key_version=key_version,
+                    ),
+                    (
+                        self._encrypt(
+                            data=data["description"],
+                            encryption_key_info=config.HKDF_INFO_CONTACT,
+                            key_version=key_version,
+                        )
+                        if data["description"] is not None
+                        else None
+                    ),
+                    self._encrypt(
+                        data=data["onion_address"],
+                        encryption_key_info=config.HKDF_INFO_CONTACT,
+                        key_version=key_version,
+                    ),
+                    data["last_message_timestamp"],
+                    bool(data["muted"]),
+                    bool(data["blocked"]),
+                    key_version,
+                ),
+            )
+            return
+
+        if change["entity"] == "messages":
+            self._delete_user_messages(contact_uuid=key)
+            return
+
+        message_id: Optional[int] = self._local_message_id(
+            device_uuid=device_uuid, key=key
+        )
+
+        if change["operation"] == "delete" or data is None:
+            if message_id is not None:
+                self._delete_message(message_id=message_id)
+            return
+
+        # Already stored
+        if message_id is not None:
+            return
+
+        self._cur.execute(
+            "INSERT INTO messages (contact_uuid, message, timestamp, key_version) VALUES (?, ?, ?, ?)",
+            (
+                data["contact_uuid"],
+                self._encrypt(
+                    data=data["message"],
+                    encryption_key_info=config.HKDF_INFO_MESSAGE,
+                    key_version=key_version,
+                ),
+                data["timestamp"],
+                key_version,
+            ),
+        )
+        self._cur.execute(
+            "INSERT INTO message_origins (message_id, origin_key) VALUES (?, ?)",
+            (self._cur.lastrowid, key),
+        )
+        self._cur.execute(
+            """
+            UPDATE contacts
+            SET last_message_timestamp = MAX(COALESCE(last_message_timestamp, 0), ?)
+            WHERE contact_uuid = ?
+            """,
+            (data["timestamp"], data["contact_uuid"]),
+        )
+
+    def apply_changes(
+        self,
+        device_uuid: str,
+        origin_device_uuid: str,
+        changes: list[SyncChange],
+        cursor: int,
+    ) -> None:
+        """Apply the changes of another device and move its cursor in one transaction.
+
+        Applied changes aren't logged, every device only sends its own changes.
+
+        Args:
+            self(SQLiteDatabase): The SQLiteDatabase instance.
+            device_uuid(str): The uuid of this device.
+            origin_device_uuid(str): The uuid of the device which made the changes.
+            changes(list[SyncChange]): The changes to apply (in order).
+            cursor(int): Sequence number of the last change.
+
+        Raises:
+            ValueError: If a change is malformed (nothing is applied).
+            sqlite3.Error: If the changes couldn't be stored (nothing is applied).
+        """
+        try:
+            for change in changes:
+                self._apply_change(device_uuid=device_uuid, change=change)
+
+            self._cur.execute(
+                """
+                INSERT INTO sync_cursors (device_uuid, cursor) VALUES (?, ?)
+                ON CONFLICT(device_uuid) DO UPDATE SET cursor = excluded.cursor
+                """,
+                (origin_device_uuid, cursor),
+            )
+            self.commit()
+        except (KeyError, TypeError, ValueError) as e:
+            self._conn.rollback()
+            raise ValueError(f"Malformed change from '{origin_device_uuid}'!") from e
+        except sqlite3.Error:
+            self._conn.rollback()
+            raise
+
     def update_contact(self, contact_uuid: str, contact_data: ContactData) -> None:
         """
         Update an existing contact's information.
         """
+        key_version: int = self._key_ring.current_version
+
         self._cur.execute(
             """
             UPDATE contacts
-            SET username = ?, description = ?, onion_address = ?, muted = ?, blocked = ?
+            SET username = ?, description = ?, onion_address = ?, muted = ?, blocked = ?, key_version = ?
             WHERE contact_uuid = ?
             """,
             (
                 self._encrypt(
                     data=contact_data["username"],
                     encryption_key_info=config.HKDF_INFO_CONTACT,
+                    key_version=key_version,
                 ),
                 (
                     self._encrypt(
                         data=contact_data["description"],
                         encryption_key_info=config.HKDF_INFO_CONTACT,
+                        key_version=key_version,
                     )
                     if contact_data["description"] is not None
                     else None
@@ -290,65 +1414,204 @@ class SQLiteDatabase:
                 self._encrypt(
                     data=contact_data["onion_address"],
                     encryption_key_info=config.HKDF_INFO_CONTACT,
+                    key_version=key_version,
                 ),
                 contact_data["muted"],
                 contact_data["blocked"],
+                key_version,
                 contact_uuid,
             ),
         )
+        self._log_change(entity="contact", entity_key=contact_uuid, operation="upsert")
+        self._cache.invalidate(table="contacts", row_ids=[contact_uuid])
         self.commit()
 
     def update_device(self, device_uuid: str, device_data: DeviceData) -> None:
         """
-        Update an existing contact's information.
+        Update an existing device's information.
         """
+        key_version: int = self._key_ring.current_version
+
         self._cur.execute(
             """
             UPDATE devices
-            SET name = ?, onion_address = ?
+            SET name = ?, onion_address = ?, public_key = ?, key_version = ?
             WHERE device_uuid = ?
             """,
             (
                 self._encrypt(
                     data=device_data["name"],
-                    encryption_key_info=config.HKDF_INFO_CONTACT,
+                    encryption_key_info=config.HKDF_INFO_DEVICE,
+                    key_version=key_version,
                 ),
                 self._encrypt(
                     data=device_data["onion_address"],
-                    encryption_key_info=config.HKDF_INFO_CONTACT,
+                    encryption_key_info=config.HKDF_INFO_DEVICE,
+                    key_version=key_version,
                 ),
+                self._encrypt(
+                    data=device_data["public_key"],
+                    encryption_key_info=config.HKDF_INFO_DEVICE,
+                    key_version=key_version,
+                ),
+                key_version,
                 device_uuid,
             ),
         )
+        self._cache.invalidate(table="devices", row_ids=[device_uuid])
         self.commit()
 
     def delete_contact(self, contact_uuid: str) -> None:
         """
         Delete a contact and all associated messages from the database.
         """
-        # Delete messages associated with the contact
-        self._cur.execute(
-            "DELETE FROM messages WHERE contact_uuid = ?", (contact_uuid,)
-        )
+        self._delete_contact(contact_uuid=contact_uuid)
+        self._log_change(entity="contact", entity_key=contact_uuid, operation="delete")
+        self.commit()
+
+    def _delete_contact(self, contact_uuid: str) -> None:
+        # Delete queued and stored messages associated with the contact
+        self._delete_user_messages(contact_uuid=contact_uuid)
+        self._cur.execute("DELETE FROM identities WHERE owner = ?", (contact_uuid,))
         # Delete the contact itself
         self._cur.execute(
             "DELETE FROM contacts WHERE contact_uuid = ?", (contact_uuid,)
         )
-        self.commit()
+        self._cache.invalidate(table="contacts", row_ids=[contact_uuid])
 
     def delete_message(self, message_id: str) -> None:
-        self._cur.execute("DELETE FROM messages WHERE id = ?", (message_id,))
+        self._log_change(
+            entity="message",
+            entity_key=self._message_key(message_id=int(message_id)),
+            operation="delete",
+        )
+        self._delete_message(message_id=int(message_id))
         self.commit()
 
+    def _delete_message(self, message_id: int) -> None:
+        # Blobs which aren't referenced anymore are removed by the BlobCollector
+        self._cur.execute("DELETE FROM attachments WHERE message_id = ?", (message_id,))
+        self._cur.execute("DELETE FROM outbox WHERE message_id = ?", (message_id,))
+        self._cur.execute(
+            "DELETE FROM message_origins WHERE message_id = ?", (message_id,)
+        )
+        self._cur.execute("DELETE FROM messages WHERE id = ?", (message_id,))
+        self._cache.invalidate(table="messages", row_ids=[message_id])
+
     def delete_user_messages(self, contact_uuid: str) -> None:
+        self._delete_user_messages(contact_uuid=contact_uuid)
+        self._log_change(entity="messages", entity_key=contact_uuid, operation="delete")
+        self.commit()
+
+    def _delete_user_messages(self, contact_uuid: str) -> None:
+        message_ids: list[int] = [
+            message_id
+            for (message_id,) in self._cur.execute(
+                "SELECT id FROM messages WHERE contact_uuid = ?", (contact_uuid,)
+            ).fetchall()
+        ]
+        self._cache.invalidate(table="messages", row_ids=message_ids)
+
+        self._cur.execute("DELETE FROM outbox WHERE contact_uuid = ?", (contact_uuid,))
+        self._cur.execute(
+            """
+            DELETE FROM attachments
+            WHERE message_id IN (SELECT id FROM messages WHERE contact_uuid = ?)
+            """,
+            (contact_uuid,),
+        )
+        self._cur.execute(
+            """
+            DELETE FROM message_origins
+            WHERE message_id IN (SELECT id FROM messages WHERE contact_uuid = ?)
+            """,
+            (contact_uuid,),
+        )
         self._cur.execute(
             "DELETE FROM messages WHERE contact_uuid = ?", (contact_uuid,)
         )
-        self.commit()
 
     def delete_device(self, device_uuid: str) -> None:
         self._cur.execute("DELETE FROM devices WHERE device_uuid = ?", (device_uuid,))
+        self._cache.invalidate(table="devices", row_ids=[device_uuid])
         self.commit()
 
+    def count_stale_rows(self) -> int:
+        # Rows which are still encrypted with an older data key
+        key_version: int = self._key_ring.current_version
+
+        return sum(
+            self._cur.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE key_version != ?", (key_version,)
+            ).fetchone()[0]
+            for table in _ENCRYPTED_COLUMNS
+        )
+
+    def reencrypt_rows(self, limit: int) -> int:
+        """Encrypt rows of older data keys with the current one, in one transaction.
+
+        Rows changed in the meantime (by another connection) are skipped, they
+        are already encrypted with the current key. Run it until it returns 0.
+
+        Args:
+            self(SQLiteDatabase): The SQLiteDatabase instance.
+            limit(int): Max amount of rows.
+
+        Returns:
+            int: The amount of rows encrypted again.
+
+        Raises:
+            sqlite3.Error: If the rows couldn't be stored (nothing is stored).
+        """
+        key_version: int = self._key_ring.current_version
+        done: int = 0
+
+        try:
+            for table, (primary_key, columns) in _ENCRYPTED_COLUMNS.items():
+                if done >= limit:
+                    break
+
+                names: str = ", ".join(column for column, _ in columns)
+                assignments: str = ", ".join(f"{column} = ?" for column, _ in columns)
+                rows: list[tuple[Any, ...]] = self._cur.execute(
+                    f"SELECT {primary_key}, key_version, {names} FROM {table} WHERE key_version != ? LIMIT ?",
+                    (key_version, limit - done),
+                ).fetchall()
+
+                for row_id, old_version, *values in rows:
+                    ciphertexts: list[Optional[str]] = [
+                        (
+                            self._encrypt(
+                                data=self._decrypt(
+                                    data=value,
+                                    encryption_key_info=encryption_key_info,
+                                    key_version=old_version,
+                                ),
+                                encryption_key_info=encryption_key_info,
+                                key_version=key_version,
+                            )
+                            if value is not None
+                            else None
+                        )
+                        for value, (_, encryption_key_info) in zip(values, columns)
+                    ]
+                    self._cur.execute(
+                        f"UPDATE {table} SET {assignments}, key_version = ? WHERE {primary_key} = ? AND key_version = ?",
+                        (*ciphertexts, key_version, row_id, old_version),
+                    )
+
+                self._cache.invalidate(table=table, row_ids=[row[0] for row in rows])
+                done += len(rows)
+
+            self.commit()
+        except sqlite3.Error:
+            self._conn.rollback()
+            raise
+
+        return done
+
+    def close(self) -> None:
+        self._conn.close()
+
     def commit(self) -> None:
         self._conn.commit()
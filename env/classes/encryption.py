@@ -1,7 +1,10 @@
+from typing import Optional
+
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.ciphers import (AEADDecryptionContext,
                                                     AEADEncryptionContext,
                                                     Cipher, algorithms, modes)
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 from env.classes.hashing import HKDFHasher
 from env.config import config
@@ -60,3 +63,48 @@ class AES_256_GCM:
         decryptor: AEADDecryptionContext = cipher.decryptor()
         plaintext_bytes: bytes = decryptor.update(ciphertext) + decryptor.finalize()
         return plaintext_bytes.decode(config.ENCODING)
+
+
+class DataKeyEncryptor:
+    def __init__(self, keys: dict[HKDFInfoKey, bytes]) -> None:
+        """Encrypt with one random data key per purpose (messages, contacts, ...).
+
+        Unlike 'AES_256_GCM' no key is derived per record, the data keys are
+        used directly with a random IV. The purpose is authenticated as
+        associated data, so a record can't be moved to another purpose.
+
+        Args:
+            self(DataKeyEncryptor): The DataKeyEncryptor instance.
+            keys(dict[HKDFInfoKey, bytes]): Data key per purpose.
+
+        Returns:
+            None: No return value.
+        """
+        self._ciphers: dict[HKDFInfoKey, AESGCM] = {
+            purpose: AESGCM(key) for purpose, key in keys.items()
+        }
+
+    def _cipher(self, encryption_key_info: HKDFInfoKey) -> AESGCM:
+        cipher: Optional[AESGCM] = self._ciphers.get(encryption_key_info)
+        if cipher is None:
+            raise ValueError(f"No data key for '{encryption_key_info!r}'!")
+
+        return cipher
+
+    def encrypt(self, plaintext: str, encryption_key_info: HKDFInfoKey) -> bytes:
+        iv: bytes = generate_iv(length=config.AES_256_GCM_IV_LENGTH)
+
+        return iv + self._cipher(encryption_key_info=encryption_key_info).encrypt(
+            iv, plaintext.encode(config.ENCODING), encryption_key_info
+        )
+
+    def decrypt(self, encrypted_data: bytes, encryption_key_info: HKDFInfoKey) -> str:
+        iv: bytes = encrypted_data[: config.AES_256_GCM_IV_LENGTH]
+
+        return (
+            self._cipher(encryption_key_info=encryption_key_info)
+            .decrypt(
+                iv, encrypted_data[config.AES_256_GCM_IV_LENGTH :], encryption_key_info
+            )
+            .decode(config.ENCODING)
+        )
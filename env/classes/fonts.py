@@ -0,0 +1,97 @@
+import os
+from typing import Optional
+
+import flet as ft  # type: ignore[import-untyped]
+
+from env.classes.paths import paths
+from env.config import config
+from env.typing.dicts import FontInfo
+
+
+class FontRegistry:
+    def __init__(self, page: ft.Page, folder: str = config.FOLDER_FONTS) -> None:
+        """Index the local fonts and add them to the page only when they are used.
+
+        Every font in 'page.fonts' is sent to the client, so only the fonts
+        which are actually shown get registered.
+
+        Args:
+            self(FontRegistry): The FontRegistry instance.
+            page(ft.Page): The page to register the fonts on.
+            folder(str): Folder containing the font files (relative to the base path).
+
+        Returns:
+            None: No return value.
+        """
+        self._page: ft.Page = page
+        self._folder: str = folder
+
+        # Font family name -> font info (scanned on first access)
+        self._index: Optional[dict[str, FontInfo]] = None
+
+    def _scan(self) -> dict[str, FontInfo]:
+        folder_path: str = paths.join_with_base_path(path=self._folder)
+
+        try:
+            entries: list[os.DirEntry[str]] = sorted(
+                os.scandir(folder_path), key=lambda entry: entry.name
+            )
+        except FileNotFoundError:
+            print(f"Font folder '{folder_path}' not found!")
+            return {}
+
+        index: dict[str, FontInfo] = {}
+        for entry in entries:
+            stem, extension = os.path.splitext(entry.name)
+            if extension.lower() not in config.FONT_FILE_EXTENSIONS:
+                continue
+            if not entry.is_file():
+                continue
+
+            name: str = stem.removesuffix(config.FONT_REGULAR_SUFFIX).replace("_", "-")
+            index[name] = {
+                "name": name,
+                "path": f"{self._folder}/{entry.name}",
+                "size": entry.stat().st_size,
+            }
+
+        return index
+
+    def register(self, font_family: str) -> bool:
+        """Add the font to the page if it isn't registered yet.
+
+        The page isn't updated, the font is sent with the next page update.
+
+        Args:
+            self(FontRegistry): The FontRegistry instance.
+            font_family(str): Name of the font family.
+
+        Returns:
+            bool: True if the font was added to the page.
+
+        Raises:
+            ValueError: If the font doesn't exist.
+        """
+        font: Optional[FontInfo] = self.index.get(font_family)
+        if font is None:
+            raise ValueError(
+                f"Font '{font_family}' not found! Use one of these instead: [{", ".join(self.index)}]"
+            )
+
+        fonts: dict[str, str] = self._page.fonts or {}
+        if font_family in fonts:
+            return False
+
+        # Assign a new dict to let the page notice the change
+        self._page.fonts = {**fonts, font_family: font["path"]}
+        return True
+
+    @property
+    def index(self) -> dict[str, FontInfo]:
+        if self._index is None:
+            self._index = self._scan()
+        return self._index
+
+    @property
+    def font_families(self) -> list[str]:
+        return list(self.index)
@@ -0,0 +1,128 @@
+import os
+
+from env.classes.identity import IDENTITY_HEADER_SIZE, SignedIdentity
+from env.classes.signing import OnionSigning
+from env.config import config
+from env.typing.transport import PeerKeyLookup
+
+# Ed25519 signatures have a fixed length
+_SIGNATURE_SIZE: int = 64
+
+# Signed ID (onion addresses are at most 255 bytes) and the signed challenge
+PROOF_MAX_SIZE: int = IDENTITY_HEADER_SIZE + 255 + 2 * _SIGNATURE_SIZE
+
+
+def _challenge_message(
+    challenge: bytes, listener_address: str, connector_address: str
+) -> bytes:
+    # Both addresses are signed, so a proof can't be replayed to another peer
+    return b"\x00".join(
+        (
+            config.PEER_AUTH_CONTEXT,
+            challenge,
+            listener_address.encode(config.ENCODING),
+            connector_address.encode(config.ENCODING),
+        )
+    )
+
+
+class PeerAuthenticator:
+    def __init__(self, onion_signing: OnionSigning, peer_key: PeerKeyLookup) -> None:
+        """Check that an incoming peer owns the address it introduced itself with.
+
+        The peer sends its address, we answer with a random challenge and the
+        peer sends its signed ID and a signature over the challenge and both
+        addresses. The ID has to be valid, belong to the introduced address
+        and be signed with the key we know for that address ('peer_key', e.g.
+        the stored ID of a contact or the key recorded when a device was
+        linked). Peers without a known key are rejected.
+
+        Args:
+            self(PeerAuthenticator): The PeerAuthenticator instance.
+            onion_signing(OnionSigning): Signs our own proofs and verifies the others.
+            peer_key(PeerKeyLookup): Known public key of an onion address, e.g.
+                'lambda address: sync.device_key(address) or inbound.peer_key(address)'.
+
+        Returns:
+            None: No return value.
+        """
+        self._onion_signing: OnionSigning = onion_signing
+        self._peer_key: PeerKeyLookup = peer_key
+
+    def knows(self, peer_address: str) -> bool:
+        # Checked before the challenge, unknown peers aren't worth a signature
+        return self._peer_key(peer_address) is not None
+
+    def challenge(self) -> bytes:
+        return os.urandom(config.PEER_CHALLENGE_SIZE)
+
+    def proof(self, challenge: bytes, local_address: str, peer_address: str) -> bytes:
+        """Answer the challenge of a peer we connected to.
+
+        Args:
+            self(PeerAuthenticator): The PeerAuthenticator instance.
+            challenge(bytes): The challenge sent by the peer.
+            local_address(str): Our own onion address.
+            peer_address(str): The onion address of the peer.
+
+        Returns:
+            bytes: Our signed ID followed by the signature of the challenge.
+
+        Raises:
+            TypeError: If no private key or signed ID exists.
+            ValueError: If the challenge has the wrong size.
+        """
+        if len(challenge) != config.PEER_CHALLENGE_SIZE:
+            raise ValueError(f"Challenge of '{peer_address}' has the wrong size!")
+
+        signature: bytes = self._onion_signing.private_key.sign(
+            message=_challenge_message(
+                challenge=challenge,
+                listener_address=peer_address,
+                connector_address=local_address,
+            )
+        ).signature
+
+        return bytes(self._onion_signing.signed_identity) + signature
+
+    def verify(
+        self, challenge: bytes, local_address: str, peer_address: str, proof: bytes
+    ) -> None:
+        """Check the answer of an incoming peer to our challenge.
+
+        Args:
+            self(PeerAuthenticator): The PeerAuthenticator instance.
+            challenge(bytes): The challenge we sent.
+            local_address(str): Our own onion address.
+            peer_address(str): The address the peer introduced itself with.
+            proof(bytes): The answer of the peer.
+
+        Raises:
+            ValueError: If the peer couldn't prove that it owns the address.
+        """
+        if len(proof) <= _SIGNATURE_SIZE:
+            raise ValueError(f"Proof of '{peer_address}' is truncated!")
+
+        identity: SignedIdentity = SignedIdentity.parse(
+            buffer=proof[:-_SIGNATURE_SIZE]
+        )
+        if identity.onion != peer_address:
+            raise ValueError(f"Peer '{peer_address}' sent the ID of another address!")
+
+        public_key: bytes = identity.public_key.tobytes()
+        if public_key != self._peer_key(peer_address):
+            raise ValueError(f"Peer '{peer_address}' isn't signed with the known key!")
+
+        if not self._onion_signing.verify(data=identity):
+            raise ValueError(f"ID of peer '{peer_address}' is invalid or expired!")
+
+        if not self._onion_signing.verify_message(
+            public_key=public_key,
+            message=_challenge_message(
+                challenge=challenge,
+                listener_address=local_address,
+                connector_address=peer_address,
+            ),
+            signature=proof[-_SIGNATURE_SIZE:],
+        ):
+            raise ValueError(f"Peer '{peer_address}' failed the challenge!")
@@ -1,16 +1,21 @@
 import re
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from argon2 import PasswordHasher
-from argon2.low_level import Type, hash_secret_raw
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
 from env.classes.storages import Storages
 from env.config import config
 from env.func.generations import generate_salt
+from env.func.lazy_imports import lazy_import
 from env.typing.hashing import HKDFInfoKey
 
+if TYPE_CHECKING:
+    import argon2
+else:
+    # Argon2 is only needed when hashing, don't load it on startup
+    argon2 = lazy_import("argon2")
+
 
 class ArgonHasher:
     def __init__(self, storages: Storages) -> None:
@@ -42,7 +47,7 @@ class ArgonHasher:
             raise ValueError("No password provided!")
 
         # Initialize hasher
-        ph: PasswordHasher = PasswordHasher(
+        ph: argon2.PasswordHasher = argon2.PasswordHasher(
             time_cost=self._time_cost,
             memory_cost=config.ARGON2_MEMORY_COST,
             parallelism=config.ARGON2_PARALLELISM,
@@ -57,7 +62,7 @@ class ArgonHasher:
             return False
 
         # Initialize hasher
-        ph: PasswordHasher = PasswordHasher(
+        ph: argon2.PasswordHasher = argon2.PasswordHasher(
             time_cost=self._time_cost,
             memory_cost=config.ARGON2_MEMORY_COST,
             parallelism=config.ARGON2_PARALLELISM,
@@ -70,14 +75,14 @@ class ArgonHasher:
             return False
 
     def derive_key(self, password: str, salt: bytes) -> bytes:
-        return hash_secret_raw(
+        return argon2.low_level.hash_secret_raw(
             secret=password.encode(config.ENCODING),
             salt=salt,
             time_cost=self._time_cost,
             memory_cost=config.ARGON2_MEMORY_COST,
             parallelism=config.ARGON2_PARALLELISM,
             hash_len=config.ARGON2_HASH_LEN,
-            type=Type.ID,
+            type=argon2.low_level.Type.ID,
         )
 
 
@@ -0,0 +1,240 @@
+import asyncio
+import sqlite3
+import time
+from typing import Optional
+
+from env.classes.database import SQLiteDatabase
+from env.classes.identity import SignedIdentity
+from env.classes.signing import OnionSigning
+from env.config import config
+from env.typing.signing import ExpiredIdentitiesNotifier
+
+
+class IdentityStore:
+    def __init__(
+        self,
+        database: SQLiteDatabase,
+        onion_signing: OnionSigning,
+        on_expired: ExpiredIdentitiesNotifier,
+    ) -> None:
+        """Keep the signed onion IDs of the contacts and our own one up to date.
+
+        IDs are stored in the identities table, indexed by expiry. The sweeper
+        sleeps until the next ID expires, then flags all expired IDs of the
+        contacts with one statement and reports them to 'on_expired'. Our own
+        ID is signed again IDENTITY_RESIGN_BEFORE seconds before it expires.
+
+        Args:
+            self(IdentityStore): The IdentityStore instance.
+            database(SQLiteDatabase): Database holding the identities table.
+            onion_signing(OnionSigning): Signs our own ID and verifies the others.
+            on_expired(ExpiredIdentitiesNotifier): Called with the contact uuids of expired IDs.
+
+        Returns:
+            None: No return value.
+        """
+        self._database: SQLiteDatabase = database
+        self._onion_signing: OnionSigning = onion_signing
+        self._on_expired: ExpiredIdentitiesNotifier = on_expired
+
+        self._own_onion_address: Optional[str] = None
+        self._own_identity: Optional[SignedIdentity] = None
+
+        self._wakeup: asyncio.Event = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+
+        # Metrics
+        self._sweeps: int = 0
+        self._resigned: int = 0
+        self._flagged: int = 0
+
+    def _load_identity(self, owner: str) -> Optional[tuple[SignedIdentity, bool]]:
+        stored: Optional[tuple[bytes, bool]] = self._database.retrieve_identity(
+            owner=owner
+        )
+        if stored is None:
+            return None
+
+        try:
+            return SignedIdentity.parse(buffer=stored[0]), stored[1]
+        except ValueError as e:
+            print(f"Stored identity of '{owner}' is invalid. Error: {e}")
+            return None
+
+    def _resign_at(self) -> Optional[int]:
+        if self._own_identity is None:
+            return None
+
+        return self._own_identity.expires - config.IDENTITY_RESIGN_BEFORE
+
+    def _resign(self) -> None:
+        if self._own_onion_address is None:
+            return
+
+        self._own_identity = self._onion_signing.sign_identity(
+            onion_address=self._own_onion_address,
+            expiry_days=config.IDENTITY_EXPIRY_DAYS,
+        )
+        self._database.upsert_identity(
+            owner=config.IDENTITY_OWNER_SELF,
+            record=bytes(self._own_identity),
+            expires=self._own_identity.expires,
+        )
+        self._resigned += 1
+
+    def _sweep(self) -> Optional[float]:
+        # Returns the seconds until the next sweep is due (None if nothing is stored)
+        now: int = int(time.time())
+        self._sweeps += 1
+
+        resign_at: Optional[int] = self._resign_at()
+        if self._own_onion_address is not None and (
+            resign_at is None or resign_at <= now
+        ):
+            self._resign()
+            resign_at = self._resign_at()
+
+        expired: list[str] = self._database.flag_expired_identities(now=now)
+        if expired:
+            self._flagged += len(expired)
+            try:
+                self._on_expired(expired)
+            except Exception as e:
+                print(f"Could not handle expired identities. Error: {e}")
+
+        deadlines: list[int] = [
+            deadline
+            for deadline in (resign_at, self._database.retrieve_next_identity_expiry())
+            if deadline is not None
+        ]
+        if not deadlines:
+            return None
+
+        return max(min(deadlines) - time.time(), 0.0)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+
+            timeout: Optional[float] = None
+            try:
+                timeout = self._sweep()
+            except (sqlite3.Error, TypeError, OSError) as e:
+                print(f"Identity sweep failed. Error: {e}")
+
+            # Wake up regularly since the wall clock may change while sleeping
+            timeout = min(
+                config.IDENTITY_SWEEP_MAX_SLEEP,
+                timeout if timeout is not None else config.IDENTITY_SWEEP_MAX_SLEEP,
+            )
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def set_own_onion_address(self, onion_address: str) -> None:
+        """Set our own onion address, its ID is signed if there is no valid one.
+
+        Args:
+            self(IdentityStore): The IdentityStore instance.
+            onion_address(str): Our own onion address.
+        """
+        self._own_onion_address = onion_address
+
+        stored: Optional[tuple[SignedIdentity, bool]] = self._load_identity(
+            owner=config.IDENTITY_OWNER_SELF
+        )
+        # Sign again on the next sweep if the address changed
+        self._own_identity = (
+            stored[0]
+            if stored is not None and stored[0].onion == onion_address
+            else None
+        )
+        self._wakeup.set()
+
+    def store_peer(
+        self, contact_uuid: str, onion_address: str, identity: SignedIdentity
+    ) -> bool:
+        """Verify and store the signed ID of a contact.
+
+        Args:
+            self(IdentityStore): The IdentityStore instance.
+            contact_uuid(str): The uuid of the contact.
+            onion_address(str): The onion address of the contact.
+            identity(SignedIdentity): The ID sent by the contact.
+
+        Returns:
+            bool: True if the ID is valid and was stored.
+        """
+        if identity.onion != onion_address:
+            print(f"Identity of '{contact_uuid}' was signed for another address.")
+            return False
+
+        if not self._onion_signing.verify(data=identity):
+            print(f"Identity of '{contact_uuid}' is invalid or expired.")
+            return False
+
+        # Copy the record, the buffer might belong to a frame
+        self._database.upsert_identity(
+            owner=contact_uuid, record=bytes(identity), expires=identity.expires
+        )
+
+        # The sweeper might sleep past the expiry of this ID
+        self._wakeup.set()
+        return True
+
+    def peer_identity(self, contact_uuid: str) -> Optional[SignedIdentity]:
+        """Get the signed ID of a contact unless it is missing or expired.
+
+        Args:
+            self(IdentityStore): The IdentityStore instance.
+            contact_uuid(str): The uuid of the contact.
+
+        Returns:
+            Optional[SignedIdentity]: The ID.
+        """
+        stored: Optional[tuple[SignedIdentity, bool]] = self._load_identity(
+            owner=contact_uuid
+        )
+        if stored is None or stored[1]:
+            return None
+
+        # Might have expired since the last sweep
+        if time.time() > stored[0].expires:
+            return None
+
+        return stored[0]
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    @property
+    def own_identity(self) -> SignedIdentity:
+        if self._own_identity is None:
+            raise TypeError(
+                "No own identity signed yet. Run 'set_own_onion_address()' and 'start()' first!"
+            )
+
+        return self._own_identity
+
+    @property
+    def sweeps(self) -> int:
+        return self._sweeps
+
+    @property
+    def resigned(self) -> int:
+        return self._resigned
+
+    @property
+    def flagged(self) -> int:
+        return self._flagged
@@ -0,0 +1,254 @@
+import base64
+import binascii
+import struct
+from typing import Iterator, Self
+
+from env.config import config
+from env.typing.signing import SignedIdentityJSON
+
+# Magic, version, onion length, timestamp, expires, public key (big endian).
+# The onion bytes and the 64 byte signature follow, the signature covers
+# everything before it.
+_HEADER: struct.Struct = struct.Struct("!4sBBQQ32s")
+_TIMESTAMPS: struct.Struct = struct.Struct("!QQ")
+_TIMESTAMPS_OFFSET: int = 6
+_PUBLIC_KEY_OFFSET: int = 22
+_PUBLIC_KEY_SIZE: int = 32
+_SIGNATURE_SIZE: int = 64
+
+IDENTITY_HEADER_SIZE: int = _HEADER.size
+
+
+def _onion_to_bytes(onion_address: str) -> bytes:
+    # 'abc...xyz.onion' -> base32 decoded label (35 bytes for v3 addresses)
+    label: str = onion_address.removesuffix(".onion")
+    try:
+        return base64.b32decode(label.upper())
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Invalid onion address '{onion_address}'!") from e
+
+
+def _onion_from_bytes(data: bytes) -> str:
+    return base64.b32encode(data).decode(config.ENCODING).lower() + ".onion"
+
+
+class SignedIdentity:
+    __slots__ = ("_buffer",)
+
+    def __init__(self, buffer: memoryview) -> None:
+        """A signed onion ID in the compact binary format.
+
+        The fields are read from the buffer when accessed, nothing is copied.
+        Use 'parse()' to create an instance from received or stored bytes.
+
+        Args:
+            self(SignedIdentity): The SignedIdentity instance.
+            buffer(memoryview): Exactly one validated record.
+
+        Returns:
+            None: No return value.
+        """
+        self._buffer: memoryview = buffer
+
+    @staticmethod
+    def _record_size(buffer: memoryview, offset: int) -> int:
+        if len(buffer) - offset < IDENTITY_HEADER_SIZE:
+            raise ValueError("Signed identity is truncated!")
+
+        magic, version, onion_size, timestamp, expires, _ = _HEADER.unpack_from(
+            buffer, offset
+        )
+        if magic != config.IDENTITY_MAGIC:
+            raise ValueError("Data isn't a signed identity!")
+        if version != config.IDENTITY_FORMAT_VERSION:
+            raise ValueError(f"Unsupported signed identity version {version}!")
+        if expires < timestamp:
+            raise ValueError("Signed identity expires before it was signed!")
+
+        size: int = IDENTITY_HEADER_SIZE + onion_size + _SIGNATURE_SIZE
+        if len(buffer) - offset < size:
+            raise ValueError("Signed identity is truncated!")
+
+        return size
+
+    @classmethod
+    def parse(cls, buffer: bytes | bytearray | memoryview) -> Self:
+        """Read a single record without copying it.
+
+        The buffer must not be changed as long as the instance is used.
+
+        Args:
+            buffer(bytes | bytearray | memoryview): The record.
+
+        Returns:
+            SignedIdentity: The parsed record.
+
+        Raises:
+            ValueError: If the buffer isn't exactly one valid record.
+        """
+        view: memoryview = memoryview(buffer).cast("B")
+        if cls._record_size(buffer=view, offset=0) != len(view):
+            raise ValueError("Signed identity has trailing data!")
+
+        return cls(buffer=view)
+
+    @classmethod
+    def parse_many(cls, buffer: bytes | bytearray | memoryview) -> Iterator[Self]:
+        """Read records which were written one after another.
+
+        Args:
+            buffer(bytes | bytearray | memoryview): The records.
+
+        Yields:
+            SignedIdentity: The parsed records, sharing the buffer.
+
+        Raises:
+            ValueError: If a record is invalid or truncated.
+        """
+        view: memoryview = memoryview(buffer).cast("B")
+        offset: int = 0
+
+        while offset < len(view):
+            size: int = cls._record_size(buffer=view, offset=offset)
+            yield cls(buffer=view[offset : offset + size])
+            offset += size
+
+    @staticmethod
+    def encode_unsigned(
+        onion_address: str, timestamp: int, expires: int, public_key: bytes
+    ) -> bytes:
+        """Build the part of a record which is signed.
+
+        Append the 64 byte signature of the returned bytes to get the record.
+
+        Args:
+            onion_address(str): The signed onion address.
+            timestamp(int): Time of signing (seconds).
+            expires(int): Time the ID expires (seconds).
+            public_key(bytes): The raw 32 byte public key of the signer.
+
+        Returns:
+            bytes: The signed part of the record.
+
+        Raises:
+            ValueError: If a field doesn't fit into the format.
+        """
+        onion: bytes = _onion_to_bytes(onion_address=onion_address)
+
+        if len(public_key) != _PUBLIC_KEY_SIZE:
+            raise ValueError(f"Public key must be {_PUBLIC_KEY_SIZE} bytes long!")
+        if len(onion) > 255:
+            raise ValueError(f"Onion address '{onion_address}' is too long!")
+
+        try:
+            header: bytes = _HEADER.pack(
+                config.IDENTITY_MAGIC,
+                config.IDENTITY_FORMAT_VERSION,
+                len(onion),
+                timestamp,
+                expires,
+                public_key,
+            )
+        except struct.error as e:
+            raise ValueError(f"Invalid signed identity field. Error: {e}") from e
+
+        return header + onion
+
+    @classmethod
+    def from_json(cls, data: SignedIdentityJSON) -> Self:
+        """Convert the JSON form of a record (see 'to_json()') back.
+
+        Args:
+            data(SignedIdentityJSON): The JSON form.
+
+        Returns:
+            SignedIdentity: The record.
+
+        Raises:
+            ValueError: If the data is invalid or in the old 'SignedOnionData' format.
+        """
+        if "version" not in data:
+            raise ValueError(
+                "Signed onion data of the old format can't be converted. Sign the onion again!"
+            )
+
+        try:
+            record: bytes = cls.encode_unsigned(
+                onion_address=data["onion"],
+                timestamp=data["timestamp"],
+                expires=data["expires"],
+                public_key=base64.b64decode(data["signed_by"], validate=True),
+            ) + base64.b64decode(data["signature"], validate=True)
+        except (binascii.Error, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid signed identity. Error: {e}") from e
+
+        return cls.parse(buffer=record)
+
+    def to_json(self) -> SignedIdentityJSON:
+        """Get the record with base64 fields for JSON files and frames.
+
+        Args:
+            self(SignedIdentity): The SignedIdentity instance.
+
+        Returns:
+            SignedIdentityJSON: The JSON form.
+        """
+        return {
+            "version": self.version,
+            "onion": self.onion,
+            "timestamp": self.timestamp,
+            "expires": self.expires,
+            "signed_by": base64.b64encode(self.public_key).decode(config.ENCODING),
+            "signature": base64.b64encode(self.signature).decode(config.ENCODING),
+        }
+
+    def __bytes__(self) -> bytes:
+        return self._buffer.tobytes()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SignedIdentity):
+            return NotImplemented
+
+        return self._buffer == other._buffer
+
+    def __hash__(self) -> int:
+        return hash(self._buffer.tobytes())
+
+    @property
+    def version(self) -> int:
+        return self._buffer[4]
+
+    @property
+    def timestamp(self) -> int:
+        return _TIMESTAMPS.unpack_from(self._buffer, _TIMESTAMPS_OFFSET)[0]
+
+    @property
+    def expires(self) -> int:
+        return _TIMESTAMPS.unpack_from(self._buffer, _TIMESTAMPS_OFFSET)[1]
+
+    @property
+    def public_key(self) -> memoryview:
+        return self._buffer[_PUBLIC_KEY_OFFSET : _PUBLIC_KEY_OFFSET + _PUBLIC_KEY_SIZE]
+
+    @property
+    def onion_bytes(self) -> memoryview:
+        return self._buffer[IDENTITY_HEADER_SIZE:-_SIGNATURE_SIZE]
+
+    @property
+    def onion(self) -> str:
+        return _onion_from_bytes(data=self.onion_bytes.tobytes())
+
+    @property
+    def signed_part(self) -> memoryview:
+        return self._buffer[:-_SIGNATURE_SIZE]
+
+    @property
+    def signature(self) -> memoryview:
+        return self._buffer[-_SIGNATURE_SIZE:]
+
+    @property
+    def buffer(self) -> memoryview:
+        return self._buffer
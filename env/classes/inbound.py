@@ -0,0 +1,387 @@
+import asyncio
+from typing import Any, Optional, TypeVar
+
+from env.classes.database import DatabaseThread, SQLiteDatabase
+from env.classes.encryption import AES_256_GCM
+from env.classes.identity import SignedIdentity
+from env.classes.key_ring import KeyRing
+from env.config import config
+from env.func.payloads import (decode_ack, decode_frame, decode_messages,
+                               encode_ack)
+from env.typing.dicts import ContactData, WireMessage
+from env.typing.transport import AcksNotifier, FrameSender, MessagesNotifier
+
+# Messages of one frame: (peer address, message id of the peer, contact uuid, message, timestamp)
+_PlainBatch = list[tuple[str, int, str, str, float]]
+# Same as above with encrypted messages and their key version
+_EncryptedBatch = list[tuple[str, int, str, str, float, int]]
+
+_Entry = TypeVar("_Entry")
+
+
+class InboundPipeline:
+    def __init__(
+        self,
+        aes_encryptor: AES_256_GCM | KeyRing,
+        on_messages: MessagesNotifier,
+        send_frame: Optional[FrameSender] = None,
+        on_acks: Optional[AcksNotifier] = None,
+        queue_size: int = config.INBOUND_QUEUE_SIZE,
+        batch_size: int = config.INBOUND_BATCH_SIZE,
+    ) -> None:
+        """Store received messages in stages connected by bounded queues.
+
+        1. Decode and identity check (event loop): drops invalid frames and
+           frames of unknown or blocked contacts and of contacts without a
+           stored signed ID.
+        2. Encryption (thread pool): encrypts a batch of messages.
+        3. Database write (own thread): inserts a batch with one commit.
+
+        If a stage falls behind, its queue fills up and 'receive()' blocks,
+        which stops reading from the peers. New messages are reported to
+        'on_messages' at most every INBOUND_NOTIFY_INTERVAL seconds, one
+        entry per contact. Stored messages are confirmed to the sender with
+        an ack frame, received acks are passed to 'on_acks' (the Outbox).
+        Use 'peer_key()' as key lookup of the PeerAuthenticator, so frames only
+        arrive from peers which proved that they own the stored ID.
+
+        Args:
+            self(InboundPipeline): The InboundPipeline instance.
+            aes_encryptor(AES_256_GCM | KeyRing): Encryptor or data keys of the database.
+            on_messages(MessagesNotifier): Called with the new messages per contact uuid.
+            send_frame(Optional[FrameSender]): Sends the acks (e.g. 'PeerEngine.send').
+            on_acks(Optional[AcksNotifier]): Called with the messages a contact confirmed.
+            queue_size(int): Max frames waiting in each queue.
+            batch_size(int): Max messages encrypted and written together.
+
+        Returns:
+            None: No return value.
+        """
+        self._aes_encryptor: AES_256_GCM | KeyRing = aes_encryptor
+        self._on_messages: MessagesNotifier = on_messages
+        self._send_frame: Optional[FrameSender] = send_frame
+        self._on_acks: Optional[AcksNotifier] = on_acks
+        self._batch_size: int = batch_size
+
+        self._db_thread: DatabaseThread = DatabaseThread(name="inbound-db")
+        self._database: Optional[SQLiteDatabase] = None
+
+        # Onion address -> (contact uuid, blocked, public key of the stored signed ID)
+        self._contacts: dict[str, tuple[str, bool, Optional[bytes]]] = {}
+
+        # Queues between the stages
+        self._frames: asyncio.Queue[tuple[str, bytes]] = asyncio.Queue(
+            maxsize=queue_size
+        )
+        self._plain: asyncio.Queue[_PlainBatch] = asyncio.Queue(maxsize=queue_size)
+        self._encrypted: asyncio.Queue[_EncryptedBatch] = asyncio.Queue(
+            maxsize=queue_size
+        )
+
+        # Contact uuid -> new messages since the last notification
+        self._pending_notifications: dict[str, int] = {}
+        self._notify_event: asyncio.Event = asyncio.Event()
+
+        self._tasks: list[asyncio.Task[None]] = []
+        # Acks being sent (a slow peer doesn't hold up the database writes)
+        self._ack_tasks: set[asyncio.Task[None]] = set()
+
+        # Metrics
+        self._frames_dropped: int = 0
+        self._messages_written: int = 0
+        self._duplicates_dropped: int = 0
+        self._batches_written: int = 0
+        self._batches_dropped: int = 0
+
+    def _public_key(self, contact: ContactData) -> Optional[bytes]:
+        if self._database is None:
+            raise TypeError("Database isn't loaded. Run 'start()' first!")
+
+        stored: Optional[tuple[bytes, bool]] = self._database.retrieve_identity(
+            owner=contact["contact_uuid"]
+        )
+        if stored is None:
+            return None
+
+        try:
+            identity: SignedIdentity = SignedIdentity.parse(buffer=stored[0])
+        except ValueError as e:
+            print(
+                f"Stored identity of '{contact["contact_uuid"]}' is invalid. Error: {e}"
+            )
+            return None
+
+        # The ID of an old address doesn't prove the current one. An expired ID
+        # is fine, the peer sends a current one when it connects.
+        if identity.onion != contact["onion_address"]:
+            return None
+
+        return identity.public_key.tobytes()
+
+    def _load_contacts(self) -> dict[str, tuple[str, bool, Optional[bytes]]]:
+        if self._database is None:
+            self._database = SQLiteDatabase(aes_encryptor=self._aes_encryptor)
+
+        contacts: list[ContactData] = self._database.retrieve_contacts() or []
+        return {
+            contact["onion_address"]: (
+                contact["contact_uuid"],
+                contact["blocked"],
+                self._public_key(contact=contact),
+            )
+            for contact in contacts
+        }
+
+    def _verify(self, peer_address: str, payload: bytes) -> Optional[_PlainBatch]:
+        # Only accept frames of known contacts which aren't blocked and have a signed ID
+        if self.peer_key(onion_address=peer_address) is None:
+            print(
+                f"Dropped frame from unknown, blocked or unverified peer '{peer_address}'."
+            )
+            return None
+        contact: tuple[str, bool, Optional[bytes]] = self._contacts[peer_address]
+
+        try:
+            frame: dict[str, Any] = decode_frame(payload=payload)
+
+            if frame["type"] == config.FRAME_TYPE_ACK:
+                message_ids: list[int] = decode_ack(frame=frame)
+                if self._on_acks is not None:
+                    self._on_acks(contact[0], message_ids)
+                return []
+
+            messages: list[WireMessage] = decode_messages(frame=frame)
+        except ValueError as e:
+            print(f"Dropped frame from '{peer_address}'. Error: {e}")
+            return None
+
+        return [
+            (
+                peer_address,
+                message["id"],
+                contact[0],
+                message["message"],
+                float(message["timestamp"]),
+            )
+            for message in messages
+        ]
+
+    async def _take_batch(self, queue: asyncio.Queue[list[_Entry]]) -> list[_Entry]:
+        # Wait for the first entry and take everything else which is already waiting
+        batch: list[_Entry] = list(await queue.get())
+        while len(batch) < self._batch_size and not queue.empty():
+            batch.extend(queue.get_nowait())
+
+        return batch
+
+    def _encrypt_batch(self, batch: _PlainBatch) -> _EncryptedBatch:
+        if self._database is None:
+            raise TypeError("Database isn't loaded. Run 'start()' first!")
+
+        batch_encrypted: _EncryptedBatch = []
+        for peer_address, message_id, contact_uuid, message, timestamp in batch:
+            encrypted_message, key_version = self._database.encrypt_message(
+                message=message
+            )
+            batch_encrypted.append(
+                (
+                    peer_address,
+                    message_id,
+                    contact_uuid,
+                    encrypted_message,
+                    timestamp,
+                    key_version,
+                )
+            )
+
+        return batch_encrypted
+
+    async def _verify_stage(self) -> None:
+        while True:
+            peer_address, payload = await self._frames.get()
+
+            batch: Optional[_PlainBatch] = self._verify(
+                peer_address=peer_address, payload=payload
+            )
+            if batch is None:
+                self._frames_dropped += 1
+                continue
+            if not batch:
+                continue
+
+            await self._plain.put(batch)
+
+    async def _encrypt_stage(self) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+        while True:
+            batch: _PlainBatch = await self._take_batch(queue=self._plain)
+
+            try:
+                batch_encrypted: _EncryptedBatch = await loop.run_in_executor(
+                    None, self._encrypt_batch, batch
+                )
+            except Exception as e:
+                # Not confirmed, so the senders send them again
+                print(f"Could not encrypt {len(batch)} received messages. Error: {e}")
+                self._batches_dropped += 1
+                continue
+
+            await self._encrypted.put(batch_encrypted)
+
+    async def _write_stage(self) -> None:
+        while True:
+            batch: _EncryptedBatch = await self._take_batch(queue=self._encrypted)
+
+            try:
+                # Messages which were stored already are skipped (sent again)
+                inserted: dict[str, int] = await self._db_thread.run(
+                    self._database.insert_encrypted_messages,  # type: ignore[union-attr]
+                    [
+                        (contact_uuid, message, timestamp, key_version, message_id)
+                        for (
+                            _,
+                            message_id,
+                            contact_uuid,
+                            message,
+                            timestamp,
+                            key_version,
+                        ) in batch
+                    ],
+                )
+            except Exception as e:
+                # Not confirmed, so the senders send them again
+                print(f"Could not store {len(batch)} received messages. Error: {e}")
+                self._batches_dropped += 1
+                continue
+
+            new_messages: int = sum(inserted.values())
+            self._messages_written += new_messages
+            self._duplicates_dropped += len(batch) - new_messages
+            self._batches_written += 1
+
+            for contact_uuid, amount in inserted.items():
+                self._pending_notifications[contact_uuid] = (
+                    self._pending_notifications.get(contact_uuid, 0) + amount
+                )
+            if inserted:
+                self._notify_event.set()
+
+            # Duplicates are confirmed again, their first ack may have been lost
+            acks: dict[str, list[int]] = {}
+            for peer_address, message_id, *_ in batch:
+                acks.setdefault(peer_address, []).append(message_id)
+
+            for peer_address, message_ids in acks.items():
+                self._send_ack(peer_address=peer_address, message_ids=message_ids)
+
+    def _send_ack(self, peer_address: str, message_ids: list[int]) -> None:
+        send_frame: Optional[FrameSender] = self._send_frame
+        if send_frame is None:
+            return
+
+        async def send() -> None:
+            try:
+                await send_frame(peer_address, encode_ack(message_ids=message_ids))
+            except (ConnectionError, ValueError) as e:
+                # The peer sends the messages again and they are confirmed again
+                print(f"Could not confirm messages to '{peer_address}'. Error: {e}")
+
+        task: asyncio.Task[None] = asyncio.create_task(send())
+        self._ack_tasks.add(task)
+        task.add_done_callback(self._ack_tasks.discard)
+
+    async def _notify_stage(self) -> None:
+        while True:
+            await self._notify_event.wait()
+
+            # Collect the messages of the next batches as well
+            await asyncio.sleep(config.INBOUND_NOTIFY_INTERVAL)
+            self._notify_event.clear()
+
+            notifications: dict[str, int] = self._pending_notifications
+            self._pending_notifications = {}
+
+            try:
+                self._on_messages(notifications)
+            except Exception as e:
+                print(f"Could not notify about new messages. Error: {e}")
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+
+        await self.refresh_contacts()
+
+        self._tasks = [
+            asyncio.create_task(self._verify_stage()),
+            asyncio.create_task(self._encrypt_stage()),
+            asyncio.create_task(self._write_stage()),
+            asyncio.create_task(self._notify_stage()),
+        ]
+
+    async def refresh_contacts(self) -> None:
+        # Run after contacts were added, changed or removed
+        self._contacts = await self._db_thread.run(self._load_contacts)
+
+    def peer_key(self, onion_address: str) -> Optional[bytes]:
+        """Get the public key a contact has to prove when it connects.
+
+        Args:
+            self(InboundPipeline): The InboundPipeline instance.
+            onion_address(str): Onion address of the peer.
+
+        Returns:
+            Optional[bytes]: Key of the stored signed ID, None for unknown or blocked contacts.
+        """
+        contact: Optional[tuple[str, bool, Optional[bytes]]] = self._contacts.get(
+            onion_address
+        )
+        if contact is None or contact[1]:
+            return None
+
+        return contact[2]
+
+    async def receive(self, peer_address: str, payload: bytes) -> None:
+        """Queue a received frame (use as the frame handler of the PeerEngine).
+
+        Args:
+            self(InboundPipeline): The InboundPipeline instance.
+            peer_address(str): Onion address of the sending peer.
+            payload(bytes): The frame content.
+        """
+        # Blocks while the queue is full, so the peer isn't read any further
+        await self._frames.put((peer_address, payload))
+
+    async def close(self) -> None:
+        tasks: list[asyncio.Task[None]] = self._tasks + list(self._ack_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+
+        self._db_thread.shutdown()
+
+    @property
+    def queue_sizes(self) -> tuple[int, int, int]:
+        return self._frames.qsize(), self._plain.qsize(), self._encrypted.qsize()
+
+    @property
+    def frames_dropped(self) -> int:
+        return self._frames_dropped
+
+    @property
+    def messages_written(self) -> int:
+        return self._messages_written
+
+    @property
+    def duplicates_dropped(self) -> int:
+        return self._duplicates_dropped
+
+    @property
+    def batches_written(self) -> int:
+        return self._batches_written
+
+    @property
+    def batches_dropped(self) -> int:
+        return self._batches_dropped
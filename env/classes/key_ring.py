@@ -0,0 +1,347 @@
+from typing import Optional
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDFExpand
+
+from env.classes.encryption import AES_256_GCM, DataKeyEncryptor
+from env.config import config
+from env.func.converter import byte_to_str, str_to_byte
+from env.func.generations import generate_iv
+from env.func.memory import wipe_bytes
+from env.typing.hashing import HKDFInfoKey
+from env.typing.keys import WrappedDataKeys
+
+# Every purpose gets its own data key
+_PURPOSES: tuple[HKDFInfoKey, ...] = (
+    config.HKDF_INFO_MESSAGE,
+    config.HKDF_INFO_CONTACT,
+    config.HKDF_INFO_DEVICE,
+)
+
+# A single key (records use keys derived from it) or one data key per purpose
+DataKey = bytes | dict[HKDFInfoKey, bytes]
+Encryptor = AES_256_GCM | DataKeyEncryptor
+
+_StoredKey = bytearray | dict[HKDFInfoKey, bytearray]
+
+
+def _associated_data(version: int, purpose: Optional[HKDFInfoKey] = None) -> bytes:
+    # Binds a wrapped key to its version (and purpose), so keys can't be swapped
+    if purpose is None:
+        return f"data-key-{version}".encode(config.ENCODING)
+
+    return f"data-key-{version}-".encode(config.ENCODING) + purpose
+
+
+def _wipe_key(key: _StoredKey) -> None:
+    for data in [key] if isinstance(key, bytearray) else key.values():
+        wipe_bytes(data=data)
+
+
+def _wrap_key(aes_gcm: AESGCM, key: bytearray, associated_data: bytes) -> str:
+    nonce: bytes = generate_iv(length=config.AES_256_GCM_IV_LENGTH)
+    return byte_to_str(data=nonce + aes_gcm.encrypt(nonce, bytes(key), associated_data))
+
+
+def _unwrap_key(aes_gcm: AESGCM, wrapped_key: str, associated_data: bytes) -> bytes:
+    data: bytes = str_to_byte(data=wrapped_key)
+    return aes_gcm.decrypt(
+        data[: config.AES_256_GCM_IV_LENGTH],
+        data[config.AES_256_GCM_IV_LENGTH :],
+        associated_data,
+    )
+
+
+class KeyRing:
+    def __init__(
+        self,
+        keys: dict[int, DataKey],
+        current_version: int,
+        password_key: Optional[bytes] = None,
+    ) -> None:
+        """Data keys by version, wrapped (encrypted) with the password key.
+
+        Every version holds a random data key per purpose (messages, contacts,
+        devices). Older versions have a single key which records derive their
+        keys from, like the password key of old databases (version 0). Rows
+        are encrypted with the current version and store it. Changing the
+        password only wraps the data keys again, the data is untouched. Older
+        versions stay available until all rows were encrypted again (see
+        'KeyRotation').
+
+        Args:
+            self(KeyRing): The KeyRing instance.
+            keys(dict[int, DataKey]): Raw data keys per version.
+            current_version(int): Version used for new data.
+            password_key(Optional[bytes]): Key derived from the password, needed to wrap the keys.
+
+        Returns:
+            None: No return value.
+
+        Raises:
+            ValueError: If the current version has no key.
+        """
+        if current_version not in keys:
+            raise ValueError(f"No data key for the current version {current_version}!")
+
+        self._keys: dict[int, _StoredKey] = {
+            version: (
+                bytearray(key)
+                if isinstance(key, bytes)
+                else {purpose: bytearray(value) for purpose, value in key.items()}
+            )
+            for version, key in keys.items()
+        }
+        self._current_version: int = current_version
+        self._password_key: Optional[bytearray] = (
+            bytearray(password_key) if password_key is not None else None
+        )
+
+        # Encryptors are created on first use per version
+        self._encryptors: dict[int, Encryptor] = {}
+
+    @classmethod
+    def from_encryptor(cls, aes_encryptor: AES_256_GCM) -> "KeyRing":
+        # A single key which can't be rotated (e.g. for benchmarks and tools)
+        key_ring: KeyRing = cls(keys={0: bytes(config.HKDF_LENGTH)}, current_version=0)
+        key_ring._encryptors[0] = aes_encryptor
+        return key_ring
+
+    @classmethod
+    def unwrap(cls, password_key: bytes, wrapped: WrappedDataKeys) -> "KeyRing":
+        """Decrypt the stored data keys with the password key.
+
+        Args:
+            password_key(bytes): Key derived from the password.
+            wrapped(WrappedDataKeys): The stored data keys.
+
+        Returns:
+            KeyRing: The unlocked key ring.
+
+        Raises:
+            ValueError: If the password key is wrong or the data keys are damaged.
+        """
+        aes_gcm: AESGCM = AESGCM(password_key)
+        keys: dict[int, DataKey] = {}
+
+        for version_str, wrapped_key in wrapped["keys"].items():
+            version: int = int(version_str)
+
+            try:
+                if isinstance(wrapped_key, str):
+                    keys[version] = _unwrap_key(
+                        aes_gcm=aes_gcm,
+                        wrapped_key=wrapped_key,
+                        associated_data=_associated_data(version=version),
+                    )
+                    continue
+
+                keys[version] = {
+                    purpose: _unwrap_key(
+                        aes_gcm=aes_gcm,
+                        wrapped_key=wrapped_key[purpose.decode(config.ENCODING)],
+                        associated_data=_associated_data(
+                            version=version, purpose=purpose
+                        ),
+                    )
+                    for purpose in _PURPOSES
+                }
+            except (InvalidTag, KeyError) as e:
+                raise ValueError(f"Could not unwrap data key {version}!") from e
+
+        return cls(
+            keys=keys,
+            current_version=wrapped["current_version"],
+            password_key=password_key,
+        )
+
+    def wrap(self) -> WrappedDataKeys:
+        """Encrypt all data keys with the password key for storing them.
+
+        Args:
+            self(KeyRing): The KeyRing instance.
+
+        Returns:
+            WrappedDataKeys: The wrapped data keys.
+
+        Raises:
+            TypeError: If the key ring has no password key.
+        """
+        if self._password_key is None:
+            raise TypeError("Key ring has no password key. Unlock it first!")
+
+        aes_gcm: AESGCM = AESGCM(bytes(self._password_key))
+        keys: dict[str, str | dict[str, str]] = {}
+
+        for version, key in self._keys.items():
+            if isinstance(key, bytearray):
+                keys[str(version)] = _wrap_key(
+                    aes_gcm=aes_gcm,
+                    key=key,
+                    associated_data=_associated_data(version=version),
+                )
+                continue
+
+            keys[str(version)] = {
+                purpose.decode(config.ENCODING): _wrap_key(
+                    aes_gcm=aes_gcm,
+                    key=value,
+                    associated_data=_associated_data(version=version, purpose=purpose),
+                )
+                for purpose, value in key.items()
+            }
+
+        return {"current_version": self._current_version, "keys": keys}
+
+    def set_password_key(self, password_key: bytes) -> None:
+        # Wrap the keys again afterwards ('wrap()'), the data stays as it is
+        if self._password_key is not None:
+            _wipe_key(key=self._password_key)
+
+        self._password_key = bytearray(password_key)
+
+    def add_version(self) -> int:
+        """Create new data keys which are used for new data from now on.
+
+        Args:
+            self(KeyRing): The KeyRing instance.
+
+        Returns:
+            int: The new version.
+        """
+        version: int = max(self._keys) + 1
+        self._keys[version] = {
+            purpose: bytearray(AESGCM.generate_key(bit_length=256))
+            for purpose in _PURPOSES
+        }
+        self._current_version = version
+        return version
+
+    def retire(self, version: int) -> None:
+        """Remove data keys which no row uses anymore.
+
+        Args:
+            self(KeyRing): The KeyRing instance.
+            version(int): The version to remove.
+
+        Raises:
+            ValueError: If the version is the current one.
+        """
+        if version == self._current_version:
+            raise ValueError("The current data key can't be retired!")
+
+        key: Optional[_StoredKey] = self._keys.pop(version, None)
+        if key is not None:
+            _wipe_key(key=key)
+        self._encryptors.pop(version, None)
+
+    def encryptor(self, version: int) -> Encryptor:
+        encryptor: Optional[Encryptor] = self._encryptors.get(version)
+        if encryptor is not None:
+            return encryptor
+
+        key: Optional[_StoredKey] = self._keys.get(version)
+        if key is None:
+            raise ValueError(f"No data key for version {version}!")
+
+        encryptor = (
+            AES_256_GCM(derived_key=bytes(key))
+            if isinstance(key, bytearray)
+            else DataKeyEncryptor(
+                keys={purpose: bytes(value) for purpose, value in key.items()}
+            )
+        )
+        self._encryptors[version] = encryptor
+        return encryptor
+
+    def address_key(self) -> bytes:
+        """Key of the content addresses of attachments (keyed hashes).
+
+        Derived from the current message data key, so the addresses don't
+        reveal the content to anyone without the data keys. Attachments
+        stored after a rotation get new addresses.
+
+        Args:
+            self(KeyRing): The KeyRing instance.
+
+        Returns:
+            bytes: The key.
+        """
+        key: _StoredKey = self._keys[self._current_version]
+        data_key: bytearray = (
+            key if isinstance(key, bytearray) else key[config.HKDF_INFO_MESSAGE]
+        )
+
+        return HKDFExpand(
+            algorithm=hashes.SHA256(),
+            length=config.HKDF_LENGTH,
+            info=config.ATTACHMENT_ADDRESS_INFO,
+        ).derive(bytes(data_key))
+
+    def wipe(self) -> None:
+        # Run on logout
+        for key in self._keys.values():
+            _wipe_key(key=key)
+        if self._password_key is not None:
+            _wipe_key(key=self._password_key)
+
+        self._keys.clear()
+        self._encryptors.clear()
+        self._password_key = None
+
+    @property
+    def current_version(self) -> int:
+        return self._current_version
+
+    @property
+    def has_purpose_keys(self) -> bool:
+        # False if new data is still encrypted with keys derived per record
+        return not isinstance(self._keys[self._current_version], bytearray)
+
+    @property
+    def old_versions(self) -> list[int]:
+        return sorted(
+            version for version in self._keys if version != self._current_version
+        )
+
+
+class SessionKeys:
+    def __init__(self) -> None:
+        """Hold the key ring of the logged in user.
+
+        The data keys are unwrapped once on login and shared by every database
+        of the session, so encrypting never touches the password key.
+
+        Args:
+            self(SessionKeys): The SessionKeys instance.
+
+        Returns:
+            None: No return value.
+        """
+        self._key_ring: Optional[KeyRing] = None
+
+    def unlock(self, key_ring: KeyRing) -> None:
+        self.wipe()
+        self._key_ring = key_ring
+
+    def wipe(self) -> None:
+        # Run on logout
+        if self._key_ring is not None:
+            self._key_ring.wipe()
+        self._key_ring = None
+
+    @property
+    def is_unlocked(self) -> bool:
+        return self._key_ring is not None
+
+    @property
+    def key_ring(self) -> KeyRing:
+        if self._key_ring is None:
+            raise TypeError("No key ring unlocked. Log in first!")
+
+        return self._key_ring
+
+
+session_keys = SessionKeys()
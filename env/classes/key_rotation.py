@@ -0,0 +1,140 @@
+import asyncio
+import sqlite3
+from typing import Optional
+
+from env.classes.database import DatabaseThread, SQLiteDatabase
+from env.classes.key_ring import KeyRing
+from env.config import config
+from env.typing.keys import DataKeysSaver
+
+
+class KeyRotation:
+    def __init__(
+        self,
+        key_ring: KeyRing,
+        save_keys: DataKeysSaver,
+        db_path: Optional[str] = None,
+        chunk_size: int = config.KEY_ROTATION_CHUNK_SIZE,
+        pause: float = config.KEY_ROTATION_PAUSE,
+    ) -> None:
+        """Encrypt the database with a new data key in the background.
+
+        A new data key is used for new rows right away. Older rows are
+        encrypted again in chunks of 'chunk_size' rows, one transaction each,
+        so the rotation can be stopped at any time and resumes with 'start()'
+        (rows store their key version). Old data keys are removed once no row
+        uses them anymore.
+
+        Args:
+            self(KeyRotation): The KeyRotation instance.
+            key_ring(KeyRing): The unlocked data keys (shared with the other databases).
+            save_keys(DataKeysSaver): Stores the wrapped data keys after they changed.
+            db_path(Optional[str]): Path of the database (app storage by default).
+            chunk_size(int): Rows encrypted again per transaction.
+            pause(float): Seconds between chunks.
+
+        Returns:
+            None: No return value.
+        """
+        self._key_ring: KeyRing = key_ring
+        self._save_keys: DataKeysSaver = save_keys
+        self._db_path: Optional[str] = db_path
+        self._chunk_size: int = chunk_size
+        self._pause: float = pause
+
+        self._db_thread: DatabaseThread = DatabaseThread(name="key-rotation-db")
+        self._database: Optional[SQLiteDatabase] = None
+        self._task: Optional[asyncio.Task[None]] = None
+
+        # Metrics
+        self._rows_reencrypted: int = 0
+        self._chunks: int = 0
+
+    def _reencrypt_chunk(self) -> int:
+        if self._database is None:
+            self._database = SQLiteDatabase(
+                aes_encryptor=self._key_ring, db_path=self._db_path
+            )
+
+        return self._database.reencrypt_rows(limit=self._chunk_size)
+
+    def _retire_old_keys(self) -> None:
+        # Only if nothing was written with an old key in the meantime
+        if self._database is None or self._database.count_stale_rows():
+            return
+
+        for version in self._key_ring.old_versions:
+            self._key_ring.retire(version=version)
+        self._save_keys(self._key_ring.wrap())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                rows: int = await self._db_thread.run(self._reencrypt_chunk)
+            except (sqlite3.Error, ValueError) as e:
+                # Nothing of the chunk is stored, 'start()' resumes from here
+                print(f"Key rotation stopped. Error: {e}")
+                return
+
+            if rows == 0:
+                break
+            self._rows_reencrypted += rows
+            self._chunks += 1
+
+            await asyncio.sleep(self._pause)
+
+        await self._db_thread.run(self._retire_old_keys)
+
+    def start(self) -> None:
+        # Resumes an interrupted rotation
+        if self.running or not self._key_ring.old_versions:
+            return
+
+        self._task = asyncio.create_task(self._run())
+
+    def rotate_data_key(self) -> int:
+        """Use a new data key and encrypt the stored data with it.
+
+        Args:
+            self(KeyRotation): The KeyRotation instance.
+
+        Returns:
+            int: The version of the new data key.
+        """
+        version: int = self._key_ring.add_version()
+
+        # Store the new key before any row is encrypted with it
+        self._save_keys(self._key_ring.wrap())
+
+        self.start()
+        return version
+
+    async def wait(self) -> None:
+        # Wait until the running rotation is done
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        if self._database is not None:
+            await self._db_thread.run(self._database.close)
+            self._database = None
+
+        self._db_thread.shutdown()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def rows_reencrypted(self) -> int:
+        return self._rows_reencrypted
+
+    @property
+    def chunks(self) -> int:
+        return self._chunks
@@ -0,0 +1,168 @@
+import base64
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from env.classes.paths import paths
+from env.config import config
+from env.func.lazy_imports import lazy_import
+from env.func.memory import wipe_bytes
+from env.typing.signing import MasterKeys
+
+if TYPE_CHECKING:
+    from nacl import signing
+else:
+    # PyNaCl is only needed when signing, don't load it on startup
+    signing = lazy_import("nacl.signing")
+
+
+class KeyManager:
+    def __init__(self) -> None:
+        """Hold the master signing keys in memory for the session.
+
+        The keys are read once from the app storage and only written back if
+        they change. The raw private key is kept in a bytearray, so 'wipe()'
+        can overwrite it on logout.
+
+        Args:
+            self(KeyManager): The KeyManager instance.
+
+        Returns:
+            None: No return value.
+        """
+        # Raw private key (seed), the only copy owned by this class
+        self._seed: Optional[bytearray] = None
+        # Key objects built from the seed on first use
+        self._keys: MasterKeys = {
+            "private_key": None,
+            "public_key": None,
+        }
+
+    @staticmethod
+    def _file_path(file_name: str) -> str:
+        return paths.join_with_app_storage(path=file_name)
+
+    def _migrate_legacy_file(self, file_name: str) -> None:
+        # Keys were stored in the working directory before
+        file_path: str = self._file_path(file_name=file_name)
+        if Path(file_path).exists() or not Path(file_name).exists():
+            return
+
+        os.replace(file_name, file_path)
+        print(f"Moved '{file_name}' to the app storage.")
+
+    @staticmethod
+    def _write(file_path: str, data: bytes) -> None:
+        # Write a temporary file first, so a crash can't leave half a key behind
+        temporary_path: str = f"{file_path}.tmp"
+        with open(
+            os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600),
+            "w",
+        ) as file:
+            file.write(base64.b64encode(data).decode(config.ENCODING))
+
+        os.replace(temporary_path, file_path)
+
+    def _set_seed(self, seed: bytes) -> None:
+        if self._seed is not None:
+            wipe_bytes(data=self._seed)
+
+        self._seed = bytearray(seed)
+        self._keys = {"private_key": None, "public_key": None}
+
+    def load(self) -> None:
+        """Read the private key from the app storage (only once per session).
+
+        Args:
+            self(KeyManager): The KeyManager instance.
+
+        Raises:
+            FileNotFoundError: If no key was generated yet.
+            ValueError: If the key file is invalid.
+        """
+        if self._seed is not None:
+            return
+
+        for file_name in (
+            config.FILE_ENCRYPTION_PRIVATE_KEY,
+            config.FILE_ENCRYPTION_PUBLIC_KEY,
+        ):
+            self._migrate_legacy_file(file_name=file_name)
+
+        file_path: str = self._file_path(file_name=config.FILE_ENCRYPTION_PRIVATE_KEY)
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"File '{file_path}' does not exist!")
+
+        with open(file_path, "r") as file:
+            seed: bytearray = bytearray(base64.b64decode(file.read()))
+
+        if len(seed) != config.SIGNING_KEY_LENGTH:
+            wipe_bytes(data=seed)
+            raise ValueError(f"Key file '{file_path}' is invalid!")
+
+        self._seed = seed
+
+    def generate(self) -> None:
+        """Create new master keys and save them.
+
+        Args:
+            self(KeyManager): The KeyManager instance.
+        """
+        self.set_private_key(key=signing.SigningKey.generate())
+
+    def set_private_key(self, key: "signing.SigningKey") -> None:
+        """Replace the master keys, the files are only written if they changed.
+
+        Args:
+            self(KeyManager): The KeyManager instance.
+            key(signing.SigningKey): The new private key.
+        """
+        seed: bytes = key.encode()
+        if self._seed is not None and self._seed == seed:
+            return
+
+        self._set_seed(seed=seed)
+        self._keys["private_key"] = key
+
+        self._write(
+            file_path=self._file_path(file_name=config.FILE_ENCRYPTION_PRIVATE_KEY),
+            data=seed,
+        )
+        self._write(
+            file_path=self._file_path(file_name=config.FILE_ENCRYPTION_PUBLIC_KEY),
+            data=key.verify_key.encode(),
+        )
+
+    def wipe(self) -> None:
+        # Run on logout, 'load()' reads the key again on the next login
+        if self._seed is not None:
+            wipe_bytes(data=self._seed)
+
+        self._seed = None
+        self._keys = {"private_key": None, "public_key": None}
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._seed is not None
+
+    @property
+    def private_key(self) -> "signing.SigningKey":
+        if self._keys["private_key"] is None:
+            if self._seed is None:
+                raise TypeError(
+                    "Private key is of type 'None'. Run 'load()' or 'generate()' first!"
+                )
+
+            self._keys["private_key"] = signing.SigningKey(bytes(self._seed))
+
+        return self._keys["private_key"]
+
+    @property
+    def public_key(self) -> "signing.VerifyKey":
+        if self._keys["public_key"] is None:
+            self._keys["public_key"] = self.private_key.verify_key
+
+        return self._keys["public_key"]
+
+
+key_manager = KeyManager()
@@ -0,0 +1,352 @@
+import asyncio
+import random
+import sqlite3
+import time
+from typing import Optional
+
+from env.classes.database import SQLiteDatabase
+from env.classes.peers import PeerEngine
+from env.config import config
+from env.func.payloads import encode_messages
+from env.typing.dicts import OutboxEntry, OutboxMetrics
+
+
+def _retry_delay(attempts: int) -> float:
+    # Double the delay per failed attempt (the exponent is capped to avoid overflows)
+    delay: float = min(
+        config.OUTBOX_RETRY_MAX_DELAY,
+        config.OUTBOX_RETRY_BASE_DELAY * 2 ** min(attempts - 1, 32),
+    )
+
+    # Jitter keeps contacts which failed together from retrying together
+    return delay * random.uniform(0.5, 1.0)
+
+
+class Outbox:
+    def __init__(
+        self,
+        database: SQLiteDatabase,
+        engine: PeerEngine,
+        max_concurrent_sends: int = config.OUTBOX_MAX_CONCURRENT_SENDS,
+    ) -> None:
+        """Send queued messages to contacts and retry them if contacts are offline.
+
+        Messages are stored in the outbox table before they are sent, so they
+        survive restarts. Every contact has its own retry schedule and all
+        messages queued for a contact are sent together in one frame. Messages
+        stay queued until the contact confirms that it stored them (see
+        'acknowledge()'), they are sent again if that takes longer than
+        OUTBOX_ACK_TIMEOUT seconds.
+
+        Args:
+            self(Outbox): The Outbox instance.
+            database(SQLiteDatabase): Database holding the outbox table.
+            engine(PeerEngine): Engine used to reach contacts.
+            max_concurrent_sends(int): Max contacts flushed at the same time.
+
+        Returns:
+            None: No return value.
+        """
+        self._database: SQLiteDatabase = database
+        self._engine: PeerEngine = engine
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(max_concurrent_sends)
+
+        # Contact uuid -> time of the next attempt (monotonic clock)
+        self._next_attempts: dict[str, float] = {}
+        # Contact uuid -> failed attempts in a row
+        self._attempts: dict[str, int] = {}
+        # Contacts which are being sent to right now
+        self._flushing: set[str] = set()
+        # Contact uuid -> sent messages which weren't confirmed yet
+        self._unacknowledged: dict[str, set[int]] = {}
+
+        self._wakeup: asyncio.Event = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._flush_tasks: set[asyncio.Task[None]] = set()
+
+        # Metrics
+        self._failed_attempts: int = 0
+        self._frames_sent: int = 0
+        self._messages_sent: int = 0
+        self._messages_acknowledged: int = 0
+
+    def _back_off(self, contact_uuid: str) -> None:
+        attempts: int = self._attempts.get(contact_uuid, 0) + 1
+        self._attempts[contact_uuid] = attempts
+        self._next_attempts[contact_uuid] = time.monotonic() + _retry_delay(
+            attempts=attempts
+        )
+        self._failed_attempts += 1
+
+    async def _flush(self, contact_uuid: str) -> None:
+        try:
+            # Sent messages weren't confirmed in time, send them again later
+            if self._unacknowledged.pop(contact_uuid, None):
+                print(f"Messages to '{contact_uuid}' weren't confirmed in time.")
+                self._database.increment_outbox_attempts(contact_uuid=contact_uuid)
+                self._back_off(contact_uuid=contact_uuid)
+                return
+
+            async with self._semaphore:
+                # Confirmations may arrive while the next frames are sent
+                sent: set[int] = set()
+                self._unacknowledged[contact_uuid] = sent
+                frames: int = 0
+                after_id: int = 0
+
+                while True:
+                    entries: list[OutboxEntry] = self._database.retrieve_outbox(
+                        contact_uuid=contact_uuid,
+                        limit=config.OUTBOX_BATCH_SIZE,
+                        after_id=after_id,
+                    )
+                    if not entries:
+                        break
+
+                    onion_address: Optional[str] = (
+                        self._database.retrieve_onion_address(contact_uuid=contact_uuid)
+                    )
+                    if onion_address is None:
+                        # Contact was deleted together with its queued messages
+                        self._unacknowledged.pop(contact_uuid, None)
+                        self._next_attempts.pop(contact_uuid, None)
+                        self._attempts.pop(contact_uuid, None)
+                        return
+
+                    payload: bytes = self._encode(entries=entries)
+
+                    # Send fewer messages if they don't fit into one frame
+                    while (
+                        len(payload) > config.PEER_MAX_FRAME_SIZE and len(entries) > 1
+                    ):
+                        entries = entries[: len(entries) // 2]
+                        payload = self._encode(entries=entries)
+                    after_id = entries[-1]["id"]
+
+                    if len(payload) > config.PEER_MAX_FRAME_SIZE:
+                        # Can never be sent (queued before 'enqueue()' checked the size)
+                        print(
+                            f"Dropped message {entries[0]['message_id']} to '{contact_uuid}', it exceeds the max frame size."
+                        )
+                        self._database.delete_outbox_entries(
+                            contact_uuid=contact_uuid,
+                            message_ids=[entries[0]["message_id"]],
+                        )
+                        continue
+
+                    try:
+                        await self._engine.send(
+                            onion_address=onion_address, payload=payload
+                        )
+                    except (ConnectionError, ValueError) as e:
+                        print(
+                            f"Could not send messages to '{contact_uuid}'. Error: {e}"
+                        )
+                        self._unacknowledged.pop(contact_uuid, None)
+                        self._database.increment_outbox_attempts(
+                            contact_uuid=contact_uuid
+                        )
+                        self._back_off(contact_uuid=contact_uuid)
+                        return
+
+                    sent.update(entry["message_id"] for entry in entries)
+                    frames += 1
+                    self._frames_sent += 1
+                    self._messages_sent += len(entries)
+
+                if sent:
+                    # Wait for the confirmation, 'acknowledge()' schedules the next flush
+                    self._next_attempts[contact_uuid] = (
+                        time.monotonic() + config.OUTBOX_ACK_TIMEOUT
+                    )
+                    return
+
+                self._unacknowledged.pop(contact_uuid, None)
+                if frames:
+                    # Everything was confirmed already, send what was queued since
+                    self._attempts.pop(contact_uuid, None)
+                    self._next_attempts[contact_uuid] = time.monotonic()
+                    return
+
+                # Nothing is queued anymore
+                self._next_attempts.pop(contact_uuid, None)
+                self._attempts.pop(contact_uuid, None)
+        except sqlite3.Error as e:
+            print(f"Could not access outbox of '{contact_uuid}'. Error: {e}")
+            self._unacknowledged.pop(contact_uuid, None)
+            self._back_off(contact_uuid=contact_uuid)
+        finally:
+            self._flushing.discard(contact_uuid)
+            self._wakeup.set()
+
+    def _encode(self, entries: list[OutboxEntry]) -> bytes:
+        return encode_messages(
+            messages=[
+                {
+                    "id": entry["message_id"],
+                    "message": entry["message"],
+                    "timestamp": entry["timestamp"],
+                }
+                for entry in entries
+            ]
+        )
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+
+            now: float = time.monotonic()
+            timeout: Optional[float] = None
+
+            for contact_uuid, next_attempt in list(self._next_attempts.items()):
+                if contact_uuid in self._flushing:
+                    continue
+
+                if next_attempt > now:
+                    # Sleep until the next contact is due
+                    delay: float = next_attempt - now
+                    timeout = delay if timeout is None else min(timeout, delay)
+                    continue
+
+                self._flushing.add(contact_uuid)
+                task: asyncio.Task[None] = asyncio.create_task(
+                    self._flush(contact_uuid=contact_uuid)
+                )
+                self._flush_tasks.add(task)
+                task.add_done_callback(self._flush_tasks.discard)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+
+        # Retry everything which was left over from the last run
+        now: float = time.monotonic()
+        for contact_uuid, attempts in self._database.retrieve_outbox_contacts().items():
+            self._attempts[contact_uuid] = attempts
+            self._next_attempts[contact_uuid] = now
+
+        self._task = asyncio.create_task(self._run())
+
+    def enqueue(self, contact_uuid: str, message: str, timestamp: float) -> int:
+        """Store a message and send it as soon as the contact is reachable.
+
+        Args:
+            self(Outbox): The Outbox instance.
+            contact_uuid(str): The uuid of the receiving contact.
+            message(str): The message text.
+            timestamp(float): Time the message was written.
+
+        Returns:
+            int: The id of the message.
+
+        Raises:
+            ValueError: If the message doesn't fit into one frame.
+        """
+        # Would be retried forever and block every later message to the contact
+        size: int = len(
+            encode_messages(
+                messages=[{"id": 0, "message": message, "timestamp": timestamp}]
+            )
+        )
+        if size > config.PEER_MAX_FRAME_SIZE:
+            raise ValueError(
+                f"Message with {size} bytes exceeds the max frame size of {config.PEER_MAX_FRAME_SIZE} bytes!"
+            )
+
+        message_id: int = self._database.enqueue_message(
+            contact_uuid=contact_uuid, message=message, timestamp=timestamp
+        )
+
+        # Contacts which are backing off get the message with their next attempt
+        if contact_uuid not in self._next_attempts:
+            self._next_attempts[contact_uuid] = time.monotonic()
+            self._wakeup.set()
+
+        return message_id
+
+    def acknowledge(self, contact_uuid: str, message_ids: list[int]) -> None:
+        """Remove messages from the outbox which the contact confirmed to have stored.
+
+        Use it as the 'on_acks' callback of the InboundPipeline.
+
+        Args:
+            self(Outbox): The Outbox instance.
+            contact_uuid(str): The uuid of the contact.
+            message_ids(list[int]): The confirmed message ids.
+        """
+        try:
+            self._database.delete_outbox_entries(
+                contact_uuid=contact_uuid, message_ids=message_ids
+            )
+        except sqlite3.Error as e:
+            # The messages are sent again and confirmed again
+            print(f"Could not remove confirmed messages. Error: {e}")
+            return
+        self._messages_acknowledged += len(message_ids)
+
+        unacknowledged: Optional[set[int]] = self._unacknowledged.get(contact_uuid)
+        if unacknowledged is None:
+            return
+
+        unacknowledged.difference_update(message_ids)
+        if unacknowledged or contact_uuid in self._flushing:
+            return
+
+        # Everything sent arrived, send what was queued in the meantime
+        del self._unacknowledged[contact_uuid]
+        self._attempts.pop(contact_uuid, None)
+        self._next_attempts[contact_uuid] = time.monotonic()
+        self._wakeup.set()
+
+    def retry_now(self, contact_uuid: str) -> None:
+        """Skip the backoff of a contact (e.g. if it just came online).
+
+        Args:
+            self(Outbox): The Outbox instance.
+            contact_uuid(str): The uuid of the contact.
+        """
+        if contact_uuid not in self._next_attempts:
+            return
+
+        self._next_attempts[contact_uuid] = time.monotonic()
+        self._wakeup.set()
+
+    def metrics(self) -> OutboxMetrics:
+        depth, oldest_enqueued_at, max_attempts = self._database.retrieve_outbox_stats()
+        now: float = time.monotonic()
+
+        return {
+            "depth": depth,
+            "oldest_age": (
+                time.time() - oldest_enqueued_at
+                if oldest_enqueued_at is not None
+                else None
+            ),
+            "waiting_contacts": len(self._next_attempts),
+            "backing_off_contacts": sum(
+                1
+                for contact_uuid, next_attempt in self._next_attempts.items()
+                if next_attempt > now and contact_uuid not in self._unacknowledged
+            ),
+            "unacknowledged_contacts": len(self._unacknowledged),
+            "max_attempts": max_attempts,
+            "failed_attempts": self._failed_attempts,
+            "frames_sent": self._frames_sent,
+            "messages_sent": self._messages_sent,
+            "messages_acknowledged": self._messages_acknowledged,
+        }
+
+    async def close(self) -> None:
+        tasks: list[asyncio.Task[None]] = list(self._flush_tasks)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
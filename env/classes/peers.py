@@ -0,0 +1,415 @@
+import asyncio
+from typing import Optional
+
+from env.classes.handshake import PROOF_MAX_SIZE, PeerAuthenticator
+from env.classes.transport import Transport
+from env.config import config
+from env.func.framing import read_frame, write_frame
+from env.func.validations import is_valid_onion_address
+from env.typing.transport import FrameHandler
+
+# Onion addresses are short, don't accept large introductions
+_HELLO_MAX_SIZE: int = 255
+
+
+class PeerConnection:
+    def __init__(
+        self,
+        onion_address: str,
+        local_address: str,
+        transport: Transport,
+        authenticator: PeerAuthenticator,
+        queue_size: int = config.PEER_SEND_QUEUE_SIZE,
+    ) -> None:
+        """Manage the outgoing stream to one peer.
+
+        The stream is opened on the first send and opened again after errors.
+        Frames of concurrent senders are written in batches with one drain.
+
+        Args:
+            self(PeerConnection): The PeerConnection instance.
+            onion_address(str): Address of the peer.
+            local_address(str): Our own address, sent to the peer on connect.
+            transport(Transport): Transport used to reach the peer.
+            authenticator(PeerAuthenticator): Answers the challenge of the peer.
+            queue_size(int): Max frames waiting to be written.
+
+        Returns:
+            None: No return value.
+        """
+        self._onion_address: str = onion_address
+        self._local_address: str = local_address
+        self._transport: Transport = transport
+        self._authenticator: PeerAuthenticator = authenticator
+
+        # Frames waiting to be written and the futures of their senders
+        self._queue: asyncio.Queue[tuple[bytes, asyncio.Future[None]]] = asyncio.Queue(
+            maxsize=queue_size
+        )
+
+        # Stream state
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._writer_task: Optional[asyncio.Task[None]] = None
+
+        # Metrics
+        self._frames_sent: int = 0
+        self._bytes_sent: int = 0
+        self._connects: int = 0
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        self._reader, writer = await asyncio.wait_for(
+            self._transport.connect(onion_address=self._onion_address),
+            timeout=config.PEER_CONNECT_TIMEOUT,
+        )
+
+        try:
+            # Introduce ourselves, the peer can't see who is connecting
+            write_frame(
+                writer=writer, payload=self._local_address.encode(config.ENCODING)
+            )
+            await writer.drain()
+
+            # The peer only reads our frames after we proved that we own the address
+            challenge: bytes = await asyncio.wait_for(
+                read_frame(reader=self._reader, max_size=config.PEER_CHALLENGE_SIZE),
+                timeout=config.PEER_HELLO_TIMEOUT,
+            )
+            write_frame(
+                writer=writer,
+                payload=self._authenticator.proof(
+                    challenge=challenge,
+                    local_address=self._local_address,
+                    peer_address=self._onion_address,
+                ),
+                max_size=PROOF_MAX_SIZE,
+            )
+            await writer.drain()
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.TimeoutError,
+            ValueError,
+            TypeError,
+            OSError,
+        ) as e:
+            # TypeError: we have no keys or signed ID yet
+            writer.close()
+            raise ConnectionError(
+                f"Could not authenticate to '{self._onion_address}'!"
+            ) from e
+
+        self._connects += 1
+        return writer
+
+    def _close_writer(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+
+    def _fail(
+        self,
+        batch: list[tuple[bytes, asyncio.Future[None]]],
+        error: BaseException,
+    ) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def _fail_queued(self, error: BaseException) -> None:
+        while not self._queue.empty():
+            self._fail(batch=[self._queue.get_nowait()], error=error)
+
+    async def _write_loop(self) -> None:
+        batch: list[tuple[bytes, asyncio.Future[None]]] = []
+
+        try:
+            while True:
+                batch = [await self._queue.get()]
+
+                # Take everything else which is already waiting
+                while (
+                    len(batch) < config.PEER_WRITE_BATCH_SIZE
+                    and not self._queue.empty()
+                ):
+                    batch.append(self._queue.get_nowait())
+
+                try:
+                    # Open the stream if it isn't open (anymore)
+                    if not self.is_connected or self._writer is None:
+                        self._close_writer()
+                        self._writer = await self._connect()
+
+                    for payload, _ in batch:
+                        write_frame(writer=self._writer, payload=payload)
+                    await self._writer.drain()
+                except (ConnectionError, OSError, asyncio.TimeoutError) as e:
+                    self._close_writer()
+
+                    error: ConnectionError = ConnectionError(
+                        f"Could not send to '{self._onion_address}'!"
+                    )
+                    error.__cause__ = e
+
+                    # Don't try to reconnect for every waiting frame
+                    self._fail(batch=batch, error=error)
+                    self._fail_queued(error=error)
+                    batch = []
+                    continue
+
+                for payload, future in batch:
+                    self._frames_sent += 1
+                    self._bytes_sent += len(payload)
+                    if not future.done():
+                        future.set_result(None)
+                batch = []
+        except asyncio.CancelledError:
+            self._fail(batch=batch, error=ConnectionError("Connection was closed!"))
+            raise
+
+    async def send(self, payload: bytes) -> None:
+        """Send one frame and wait until it was written to the stream.
+
+        Args:
+            self(PeerConnection): The PeerConnection instance.
+            payload(bytes): The frame content.
+
+        Raises:
+            ConnectionError: If the peer can't be reached or the stream breaks.
+            ValueError: If the payload is too large.
+        """
+        if len(payload) > config.PEER_MAX_FRAME_SIZE:
+            raise ValueError(
+                f"Frame with {len(payload)} bytes exceeds the max size of {config.PEER_MAX_FRAME_SIZE} bytes!"
+            )
+
+        # Start writing on the first send
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._write_loop())
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, future))
+        await future
+
+    async def close(self) -> None:
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+
+        self._fail_queued(error=ConnectionError("Connection was closed!"))
+        self._close_writer()
+
+    @property
+    def onion_address(self) -> str:
+        return self._onion_address
+
+    @property
+    def is_connected(self) -> bool:
+        # The peer only writes the challenge to this stream, so EOF means it was closed
+        return (
+            self._writer is not None
+            and not self._writer.is_closing()
+            and self._reader is not None
+            and not self._reader.at_eof()
+        )
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def frames_sent(self) -> int:
+        return self._frames_sent
+
+    @property
+    def bytes_sent(self) -> int:
+        return self._bytes_sent
+
+    @property
+    def connects(self) -> int:
+        return self._connects
+
+
+class PeerEngine:
+    def __init__(
+        self,
+        onion_address: str,
+        transport: Transport,
+        on_frame: FrameHandler,
+        authenticator: PeerAuthenticator,
+    ) -> None:
+        """Send and receive frames of many peers on one event loop.
+
+        Every peer gets its own PeerConnection for sending. Incoming streams
+        only carry frames from the peer to us, so both sides send over the
+        stream they opened themselves. Frames are only read from peers which
+        proved that they own the address they introduced themselves with.
+
+        Args:
+            self(PeerEngine): The PeerEngine instance.
+            onion_address(str): Our own onion address.
+            transport(Transport): Transport to reach peers (Tor or a local stand-in).
+            on_frame(FrameHandler): Coroutine run for every received frame. Frames
+                of a peer aren't read while it runs, which slows down fast senders.
+            authenticator(PeerAuthenticator): Checks incoming peers and answers
+                their challenges.
+
+        Returns:
+            None: No return value.
+        """
+        self._onion_address: str = onion_address
+        self._transport: Transport = transport
+        self._on_frame: FrameHandler = on_frame
+        self._authenticator: PeerAuthenticator = authenticator
+
+        # Outgoing connections per onion address
+        self._connections: dict[str, PeerConnection] = {}
+
+        # Incoming streams
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._incoming_writers: set[asyncio.StreamWriter] = set()
+
+        # Metrics
+        self._frames_received: int = 0
+        self._bytes_received: int = 0
+
+    async def _authenticate(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> str:
+        # The first frame is the address of the peer
+        hello: bytes = await read_frame(reader=reader, max_size=_HELLO_MAX_SIZE)
+        peer_address: str = hello.decode(config.ENCODING)
+        if not is_valid_onion_address(addr=peer_address):
+            raise ValueError(
+                f"Peer introduced itself with invalid address '{peer_address}'!"
+            )
+        if not self._authenticator.knows(peer_address=peer_address):
+            raise ValueError(f"Peer '{peer_address}' is no contact or linked device!")
+
+        # Anyone can claim an address, the peer has to sign a fresh challenge
+        challenge: bytes = self._authenticator.challenge()
+        write_frame(writer=writer, payload=challenge)
+        await writer.drain()
+
+        proof: bytes = await read_frame(reader=reader, max_size=PROOF_MAX_SIZE)
+        self._authenticator.verify(
+            challenge=challenge,
+            local_address=self._onion_address,
+            peer_address=peer_address,
+            proof=proof,
+        )
+
+        return peer_address
+
+    async def _handle_incoming(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self._incoming_writers.add(writer)
+
+        try:
+            peer_address: str = await asyncio.wait_for(
+                self._authenticate(reader=reader, writer=writer),
+                timeout=config.PEER_HELLO_TIMEOUT,
+            )
+
+            while True:
+                payload: bytes = await read_frame(reader=reader)
+                self._frames_received += 1
+                self._bytes_received += len(payload)
+
+                await self._on_frame(peer_address, payload)
+        except asyncio.IncompleteReadError:
+            # Peer closed the stream
+            pass
+        except (
+            ValueError,
+            UnicodeDecodeError,
+            asyncio.TimeoutError,
+            ConnectionError,
+        ) as e:
+            print(f"Dropped incoming stream. Error: {e}")
+        finally:
+            self._incoming_writers.discard(writer)
+            writer.close()
+
+    async def start(self) -> None:
+        if self._server is not None:
+            return
+
+        self._server = await self._transport.serve(
+            onion_address=self._onion_address,
+            handler=self._handle_incoming,
+        )
+
+    def connection(self, onion_address: str) -> PeerConnection:
+        """Get the connection manager of a peer (created on first use).
+
+        Args:
+            self(PeerEngine): The PeerEngine instance.
+            onion_address(str): Address of the peer.
+
+        Returns:
+            PeerConnection: The connection manager of the peer.
+
+        Raises:
+            ValueError: If the onion address is invalid.
+        """
+        connection: Optional[PeerConnection] = self._connections.get(onion_address)
+        if connection is not None:
+            return connection
+
+        if not is_valid_onion_address(addr=onion_address):
+            raise ValueError(f"Invalid onion address '{onion_address}'!")
+
+        connection = PeerConnection(
+            onion_address=onion_address,
+            local_address=self._onion_address,
+            transport=self._transport,
+            authenticator=self._authenticator,
+        )
+        self._connections[onion_address] = connection
+        return connection
+
+    async def send(self, onion_address: str, payload: bytes) -> None:
+        await self.connection(onion_address=onion_address).send(payload=payload)
+
+    async def close(self) -> None:
+        # Stop accepting new streams
+        if self._server is not None:
+            self._server.close()
+
+        for writer in list(self._incoming_writers):
+            writer.close()
+
+        await asyncio.gather(
+            *(connection.close() for connection in self._connections.values())
+        )
+        self._connections.clear()
+
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+    @property
+    def onion_address(self) -> str:
+        return self._onion_address
+
+    @property
+    def connections(self) -> dict[str, PeerConnection]:
+        return self._connections
+
+    @property
+    def frames_received(self) -> int:
+        return self._frames_received
+
+    @property
+    def bytes_received(self) -> int:
+        return self._bytes_received
@@ -0,0 +1,259 @@
+import asyncio
+import random
+import time
+from typing import Optional
+
+from env.classes.transport import Transport
+from env.config import config
+from env.typing.transport import PresenceNotifier
+
+
+class PresenceScheduler:
+    def __init__(
+        self,
+        transport: Transport,
+        on_changes: PresenceNotifier,
+        max_concurrent_probes: int = config.PRESENCE_MAX_CONCURRENT_PROBES,
+    ) -> None:
+        """Check which contacts are online by connecting to their onion services.
+
+        Contacts which were active recently are probed often, dormant contacts
+        rarely (see PRESENCE_INTERVALS). Only changed states are reported to
+        'on_changes', collected for PRESENCE_NOTIFY_INTERVAL seconds.
+
+        Args:
+            self(PresenceScheduler): The PresenceScheduler instance.
+            transport(Transport): Transport to reach the contacts.
+            on_changes(PresenceNotifier): Called with the changed states per contact uuid.
+            max_concurrent_probes(int): Max probes running at the same time.
+
+        Returns:
+            None: No return value.
+        """
+        self._transport: Transport = transport
+        self._on_changes: PresenceNotifier = on_changes
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(max_concurrent_probes)
+
+        # Tracked contacts: contact uuid -> onion address
+        self._addresses: dict[str, str] = {}
+        # Contact uuid -> time of the last message (wall clock)
+        self._last_active: dict[str, float] = {}
+        # Contact uuid -> time of the next probe (monotonic clock)
+        self._next_probes: dict[str, float] = {}
+        # Contact uuid -> (online, time of the check)
+        self._results: dict[str, tuple[bool, float]] = {}
+        # Contacts which are being probed right now
+        self._probing: set[str] = set()
+
+        # Changes which weren't reported yet
+        self._changes: dict[str, bool] = {}
+        self._notify_event: asyncio.Event = asyncio.Event()
+
+        self._wakeup: asyncio.Event = asyncio.Event()
+        self._tasks: list[asyncio.Task[None]] = []
+        self._probe_tasks: set[asyncio.Task[None]] = set()
+
+        # Metrics
+        self._probes: int = 0
+        self._cache_hits: int = 0
+
+    def _interval(self, contact_uuid: str) -> float:
+        last_active: Optional[float] = self._last_active.get(contact_uuid)
+        idle: float = float("inf") if last_active is None else time.time() - last_active
+
+        interval: float = config.PRESENCE_INTERVAL_DORMANT
+        for max_idle, tier_interval in config.PRESENCE_INTERVALS:
+            if idle < max_idle:
+                interval = tier_interval
+                break
+
+        # Jitter spreads the probes of contacts which were added together
+        return interval * random.uniform(0.9, 1.1)
+
+    def _is_fresh(self, contact_uuid: str) -> bool:
+        result: Optional[tuple[bool, float]] = self._results.get(contact_uuid)
+        return (
+            result is not None
+            and time.monotonic() - result[1] < config.PRESENCE_CACHE_TTL
+        )
+
+    def _record(self, contact_uuid: str, online: bool) -> None:
+        previous: Optional[tuple[bool, float]] = self._results.get(contact_uuid)
+        self._results[contact_uuid] = (online, time.monotonic())
+
+        # Contacts are shown as offline until the first result
+        if online != (previous[0] if previous is not None else False):
+            self._changes[contact_uuid] = online
+            self._notify_event.set()
+
+    async def _probe(self, contact_uuid: str) -> None:
+        online: bool = False
+
+        try:
+            async with self._semaphore:
+                # Contact might have been removed while waiting
+                onion_address: Optional[str] = self._addresses.get(contact_uuid)
+                if onion_address is None:
+                    return
+
+                self._probes += 1
+                try:
+                    _, writer = await asyncio.wait_for(
+                        self._transport.connect(onion_address=onion_address),
+                        timeout=config.PRESENCE_PROBE_TIMEOUT,
+                    )
+                    writer.close()
+                    online = True
+                except (ConnectionError, OSError, asyncio.TimeoutError):
+                    online = False
+        finally:
+            self._probing.discard(contact_uuid)
+
+        # Contact might have been removed during the probe
+        if contact_uuid in self._addresses:
+            self._record(contact_uuid=contact_uuid, online=online)
+            self._next_probes[contact_uuid] = time.monotonic() + self._interval(
+                contact_uuid=contact_uuid
+            )
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+
+            now: float = time.monotonic()
+            timeout: Optional[float] = None
+
+            for contact_uuid, next_probe in list(self._next_probes.items()):
+                if contact_uuid in self._probing:
+                    continue
+
+                if next_probe > now:
+                    # Sleep until the next contact is due
+                    delay: float = next_probe - now
+                    timeout = delay if timeout is None else min(timeout, delay)
+                    continue
+
+                self._probing.add(contact_uuid)
+                task: asyncio.Task[None] = asyncio.create_task(
+                    self._probe(contact_uuid=contact_uuid)
+                )
+                self._probe_tasks.add(task)
+                task.add_done_callback(self._probe_tasks.discard)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _notify_loop(self) -> None:
+        while True:
+            await self._notify_event.wait()
+
+            # Collect the results of the other running probes as well
+            await asyncio.sleep(config.PRESENCE_NOTIFY_INTERVAL)
+            self._notify_event.clear()
+
+            changes: dict[str, bool] = self._changes
+            self._changes = {}
+
+            try:
+                self._on_changes(changes)
+            except Exception as e:
+                print(f"Could not apply presence changes. Error: {e}")
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+
+        self._tasks = [
+            asyncio.create_task(self._run()),
+            asyncio.create_task(self._notify_loop()),
+        ]
+
+    def track(
+        self,
+        contact_uuid: str,
+        onion_address: str,
+        last_active: Optional[float] = None,
+    ) -> None:
+        """Start probing a contact.
+
+        Args:
+            self(PresenceScheduler): The PresenceScheduler instance.
+            contact_uuid(str): The uuid of the contact.
+            onion_address(str): The onion address of the contact.
+            last_active(Optional[float]): Timestamp of the last message (e.g. 'last_message_timestamp').
+        """
+        self._addresses[contact_uuid] = onion_address
+        if last_active is not None:
+            self._last_active[contact_uuid] = last_active
+
+        # Probe new contacts soon
+        self._next_probes.setdefault(contact_uuid, time.monotonic())
+        self._wakeup.set()
+
+    def untrack(self, contact_uuid: str) -> None:
+        self._addresses.pop(contact_uuid, None)
+        self._last_active.pop(contact_uuid, None)
+        self._next_probes.pop(contact_uuid, None)
+        self._results.pop(contact_uuid, None)
+        self._changes.pop(contact_uuid, None)
+
+    def mark_active(self, contact_uuid: str) -> None:
+        """Note that a contact just sent a message (so it is online).
+
+        Args:
+            self(PresenceScheduler): The PresenceScheduler instance.
+            contact_uuid(str): The uuid of the contact.
+        """
+        if contact_uuid not in self._addresses:
+            return
+
+        self._last_active[contact_uuid] = time.time()
+        self._record(contact_uuid=contact_uuid, online=True)
+
+        # No need to probe until the interval of active contacts passed
+        self._next_probes[contact_uuid] = time.monotonic() + self._interval(
+            contact_uuid=contact_uuid
+        )
+
+    def refresh(self, contact_uuid: str) -> None:
+        """Probe a contact now unless its last result is still fresh.
+
+        Args:
+            self(PresenceScheduler): The PresenceScheduler instance.
+            contact_uuid(str): The uuid of the contact.
+        """
+        if contact_uuid not in self._addresses:
+            return
+
+        if self._is_fresh(contact_uuid=contact_uuid):
+            self._cache_hits += 1
+            return
+
+        self._next_probes[contact_uuid] = time.monotonic()
+        self._wakeup.set()
+
+    def is_online(self, contact_uuid: str) -> Optional[bool]:
+        # Unknown if the last result is too old
+        if not self._is_fresh(contact_uuid=contact_uuid):
+            return None
+
+        return self._results[contact_uuid][0]
+
+    async def close(self) -> None:
+        tasks: list[asyncio.Task[None]] = [*self._tasks, *self._probe_tasks]
+        self._tasks = []
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @property
+    def probes(self) -> int:
+        return self._probes
+
+    @property
+    def cache_hits(self) -> int:
+        return self._cache_hits
@@ -0,0 +1,150 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from env.config import config
+from env.func.memory import wipe_bytes
+
+# (table, row id, column)
+RecordKey = tuple[str, str | int, str]
+
+# Rough memory of a cache entry besides the plaintext (key, tag and containers)
+_ENTRY_OVERHEAD: int = 200
+
+
+class DecryptedRecordCache:
+    def __init__(self, max_bytes: int = config.DECRYPT_CACHE_MAX_BYTES) -> None:
+        """Keep decrypted columns of the database in memory for the session.
+
+        Entries are keyed by (table, row id, column) and checked against the
+        start of the ciphertext (its random salt or IV). A changed row is never
+        served from the cache, even if an invalidation was missed. Plaintexts
+        are stored as UTF-8 bytearrays, so 'wipe()' can overwrite them.
+
+        Args:
+            self(DecryptedRecordCache): The DecryptedRecordCache instance.
+            max_bytes(int): Max memory used by the cached plaintexts.
+
+        Returns:
+            None: No return value.
+        """
+        self._max_bytes: int = max_bytes
+        self._size: int = 0
+
+        # Key -> (start of the ciphertext, plaintext), least recently used first
+        self._entries: OrderedDict[RecordKey, tuple[str, bytearray]] = OrderedDict()
+        # (table, row id) -> cached columns, to invalidate whole rows
+        self._rows: dict[tuple[str, str | int], set[str]] = {}
+
+        # Shared with the inbound database thread
+        self._lock: threading.Lock = threading.Lock()
+
+        # Metrics
+        self._hits: int = 0
+        self._misses: int = 0
+
+    def _remove(self, key: RecordKey) -> None:
+        entry: Optional[tuple[str, bytearray]] = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        self._size -= len(entry[1]) + _ENTRY_OVERHEAD
+        wipe_bytes(data=entry[1])
+
+        columns: Optional[set[str]] = self._rows.get((key[0], key[1]))
+        if columns is not None:
+            columns.discard(key[2])
+            if not columns:
+                del self._rows[(key[0], key[1])]
+
+    def get(self, key: RecordKey, ciphertext: str) -> Optional[str]:
+        """Get the plaintext of a column if it is cached.
+
+        Args:
+            self(DecryptedRecordCache): The DecryptedRecordCache instance.
+            key(RecordKey): (table, row id, column).
+            ciphertext(str): The stored (encrypted) value.
+
+        Returns:
+            Optional[str]: The plaintext or None if it isn't cached.
+        """
+        with self._lock:
+            entry: Optional[tuple[str, bytearray]] = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            if entry[0] != ciphertext[: config.DECRYPT_CACHE_TAG_LENGTH]:
+                # Row was changed without invalidating it
+                self._remove(key=key)
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1].decode(config.ENCODING)
+
+    def put(self, key: RecordKey, ciphertext: str, plaintext: str) -> None:
+        """Cache the plaintext of a column.
+
+        Args:
+            self(DecryptedRecordCache): The DecryptedRecordCache instance.
+            key(RecordKey): (table, row id, column).
+            ciphertext(str): The stored (encrypted) value.
+            plaintext(str): The decrypted value.
+        """
+        data: bytearray = bytearray(plaintext.encode(config.ENCODING))
+        size: int = len(data) + _ENTRY_OVERHEAD
+
+        # Huge values would push out everything else
+        if size > self._max_bytes // 8:
+            wipe_bytes(data=data)
+            return
+
+        with self._lock:
+            self._remove(key=key)
+
+            self._entries[key] = (ciphertext[: config.DECRYPT_CACHE_TAG_LENGTH], data)
+            self._rows.setdefault((key[0], key[1]), set()).add(key[2])
+            self._size += size
+
+            while self._size > self._max_bytes:
+                self._remove(key=next(iter(self._entries)))
+
+    def invalidate(self, table: str, row_ids: list[str] | list[int]) -> None:
+        """Drop all cached columns of the given rows.
+
+        Args:
+            self(DecryptedRecordCache): The DecryptedRecordCache instance.
+            table(str): The table of the rows.
+            row_ids(list[str] | list[int]): The changed or deleted rows.
+        """
+        with self._lock:
+            for row_id in row_ids:
+                for column in list(self._rows.get((table, row_id), ())):
+                    self._remove(key=(table, row_id, column))
+
+    def wipe(self) -> None:
+        # Run on logout, the plaintexts must not outlive the session
+        with self._lock:
+            for _, data in self._entries.values():
+                wipe_bytes(data=data)
+
+            self._entries.clear()
+            self._rows.clear()
+            self._size = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+
+record_cache = DecryptedRecordCache()
@@ -1,42 +1,102 @@
+from collections import OrderedDict
 from typing import Any, Optional
 
 import flet as ft  # type: ignore[import-untyped]
 
 from env.config import config
 from env.err.exceptions import ProgrammingError
-from env.typing.dicts import PageContent, PageRoute
+from env.typing.dicts import PageContent, PageFactory, PageRoute
 
 
 class AppRouter:
-    def __init__(self, page: ft.Page) -> None:
+    def __init__(
+        self,
+        page: ft.Page,
+        keep_alive: bool = config.ROUTER_KEEP_ALIVE,
+        max_kept_alive: int = config.ROUTER_KEEP_ALIVE_MAX,
+    ) -> None:
         """Initialize a new PageRouter instance.
 
         Args:
             self(PageRouter): The PageRouter instance.
             page(ft.Page): The page object to associate with the router.
+            keep_alive(bool): Keep visited pages mounted and only toggle their visibility.
+            max_kept_alive(int): Max amount of hidden pages which are kept mounted.
 
         Returns:
             None: No return value.
 
         Raises:
             TypeError: Raised if the provided page is not a valid ft.Page object.
+            ValueError: Raised if max_kept_alive is negative.
         """
+        if max_kept_alive < 0:
+            raise ValueError("Max amount of kept alive pages must not be negative!")
+
         # Page variables
         self._page: ft.Page = page
 
         # Define routes
         self._routes: PageRoute = {}
 
+        # Routes which are built on their first visit
+        self._route_factories: dict[str, PageFactory] = {}
+
         # Define last routes
         self._last_routes: list[str] = []
 
-    def add_route(self, route: str, content: PageContent) -> None:
+        # Keep alive settings
+        self._keep_alive: bool = keep_alive
+        self._max_kept_alive: int = max_kept_alive
+
+        # Routes which are mounted to the page (least recently used first)
+        self._mounted_routes: OrderedDict[str, list[ft.Control]] = OrderedDict()
+        self._current_route: Optional[str] = None
+
+    def _route_keeps_alive(self, route: str) -> bool:
+        return self._keep_alive and self._routes[route].get("keep_alive", True)
+
+    def _set_visible(self, route: str, visible: bool) -> None:
+        for control in self._mounted_routes[route]:
+            control.visible = visible
+
+    def _mount(self, route: str) -> None:
+        controls: list[ft.Control] = list(self._routes[route]["page_content"] or [])
+
+        self._page.controls.extend(controls)
+        self._mounted_routes[route] = controls
+
+    def _unmount(self, route: str) -> None:
+        controls: Optional[list[ft.Control]] = self._mounted_routes.pop(route, None)
+
+        if not controls:
+            return
+
+        for control in controls:
+            if control in self._page.controls:
+                self._page.controls.remove(control)
+
+    def _evict_kept_alive(self) -> None:
+        # Remove least recently used hidden pages if there are too many
+        hidden_routes: list[str] = [
+            route for route in self._mounted_routes if route != self._current_route
+        ]
+
+        for route in hidden_routes[: max(0, len(hidden_routes) - self._max_kept_alive)]:
+            self._unmount(route=route)
+
+    def _resolve_route(self, route: str) -> None:
+        # Build the page on its first visit
+        if factory := self._route_factories.pop(route, None):
+            self._routes[route] = factory()
+
+    def add_route(self, route: str, content: PageContent | PageFactory) -> None:
         """Add a new route to the router.
 
         Args:
             self(Router): The router instance.
             route(str): The route path (e.g., '/home').
-            content(PageContent): The content to associate with the route.
+            content(PageContent | PageFactory): The content to associate with the route or a function building it on the first visit.
 
         Returns:
             None: No return value.
@@ -44,18 +104,51 @@ class AppRouter:
         Raises:
             ValueError: Raised if a route with the same name already exists.
         """
-        if route in self._routes:
+        if self.has_route(route=route):
             raise ValueError(f"Route '{route}' already exists. Delete first!")
 
         # Add new route
-        self._routes[route] = content
+        if callable(content):
+            self._route_factories[route] = content
+        else:
+            self._routes[route] = content
+
+    def has_route(self, route: str) -> bool:
+        return route in self._routes or route in self._route_factories
 
     def remove_route(self, route: str) -> None:
+        if route in self._route_factories:
+            del self._route_factories[route]
+            return
+
         if route not in self._routes:
             return
 
+        # Remove the old controls from the page as well
+        self._unmount(route=route)
+
         del self._routes[route]
 
+    def clear_kept_alive(self) -> None:
+        """Unmount all hidden pages, e.g. to drop decrypted data on logout.
+
+        Args:
+            self(AppRouter): The AppRouter instance.
+
+        Returns:
+            None: No return value.
+        """
+        hidden_routes: list[str] = [
+            route for route in self._mounted_routes if route != self._current_route
+        ]
+
+        for route in hidden_routes:
+            self._unmount(route=route)
+
+        # Apply removal on the client
+        if hidden_routes:
+            self._page.update()  # type: ignore[union-attr]
+
     def go(self, route: str) -> None:
         """Navigate to a specific route and execute associated actions.
 
@@ -72,23 +165,42 @@ class AppRouter:
         if not route.startswith("/"):
             raise ValueError(f"Route '{route}' does not start with a '/'!")
 
-        if route not in self._routes:
+        if not self.has_route(route=route):
             raise ValueError(f"Route '{route}' does not exist.")
 
+        # Build page if not done yet
+        self._resolve_route(route=route)
+
         # Append current route to last routes if not the same route
         if len(self._last_routes) < 1 or self._last_routes[-1] != route:
             self._last_routes.append(route)
 
-        self._page.clean()
+        # Hide or remove the page which is currently shown
+        previous_route: Optional[str] = self._current_route
+        if previous_route is not None and previous_route != route:
+            if previous_route in self._routes and self._route_keeps_alive(
+                route=previous_route
+            ):
+                self._set_visible(route=previous_route, visible=False)
+            else:
+                self._unmount(route=previous_route)
+
+        # Show the page, mount it only if it isn't mounted yet
+        if route not in self._mounted_routes:
+            self._mount(route=route)
+        self._mounted_routes.move_to_end(route)
+        self._set_visible(route=route, visible=True)
+        self._current_route = route
+
+        self._evict_kept_alive()
 
         content: PageContent = self._routes[route]
 
         self._page.title = (
             f"{config.APP_TITLE}{config.APP_TITLE_SEPARATOR}{content['title']}"
         )
-        self._page.add(*content["page_content"] if content["page_content"] else [])
 
-        # Update the page
+        # Update the page (only changed controls are sent to the client)
         self._page.update()  # type: ignore[union-attr]
 
         # Run the function if it exists
@@ -0,0 +1,252 @@
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+import flet as ft  # type: ignore[import-untyped]
+
+from env.config import config
+from env.func.validations import is_valid_color_code
+from env.typing.settings import SettingSchema
+
+if TYPE_CHECKING:
+    from env.classes.storages import StorageManager
+
+# Maps every snapshot attribute to its storage key, type and default value
+SETTINGS_SCHEMA: dict[str, SettingSchema] = {
+    "color_seed": {
+        "key": config.CS_COLOR_SEED,
+        "type": str,
+        "default": config.APPEARANCE_COLOR_SEED_DEFAULT,
+        "validator": lambda value: is_valid_color_code(color=value),
+    },
+    "font_family": {
+        "key": config.CS_FONT_FAMILY,
+        "type": str,
+        "default": config.APPEARANCE_FONT_FAMILY_DEFAULT,
+        "validator": lambda value: bool(value),
+    },
+    "font_size": {
+        "key": config.CS_FONT_SIZE,
+        "type": int,
+        "default": config.APPEARANCE_FONT_SIZE_DEFAULT,
+        "validator": lambda value: config.FONT_SIZE_MIN
+        <= value
+        <= config.FONT_SIZE_MAX,
+    },
+    "language": {
+        "key": config.CS_LANGUAGE,
+        "type": str,
+        "default": config.LANGUAGE_DEFAULT,
+        "validator": lambda value: value in config.LANGUAGE_AVAILABLE_LOCALES,
+    },
+    "logout_on_lost_focus": {
+        "key": config.CS_LOGOUT_ON_LOST_FOCUS,
+        "type": bool,
+        "default": config.LOGOUT_ON_LOST_FOCUS_DEFAULT,
+        "validator": None,
+    },
+    "logout_on_top_bar_label_click": {
+        "key": config.CS_LOGOUT_ON_TOP_BAR_LABEL_CLICK,
+        "type": bool,
+        "default": config.TOP_BAR_LOGOUT_ON_LABEL_CLICK_DEFAULT,
+        "validator": None,
+    },
+    "shake_detection_enabled": {
+        "key": config.CS_SHAKE_DETECTION_ENABLED,
+        "type": bool,
+        "default": config.SHAKE_DETECTION_ENABLED_DEFAULT,
+        "validator": None,
+    },
+    "shake_detection_threshold_gravity": {
+        "key": config.CS_SHAKE_DETECTION_THRESHOLD_GRAVITY,
+        "type": float,
+        "default": config.SHAKE_DETECTION_THRESHOLD_GRAVITY_DEFAULT,
+        "validator": lambda value: config.SHAKE_DETECTION_THRESHOLD_GRAVITY_MIN
+        <= value
+        <= config.SHAKE_DETECTION_THRESHOLD_GRAVITY_MAX,
+    },
+}
+
+
+def _coerce(name: str, value: Any) -> Any:
+    schema: SettingSchema = SETTINGS_SCHEMA[name]
+    expected_type: type = schema["type"]
+
+    # Allow ints for float settings but never bools for numbers
+    if isinstance(value, bool) and expected_type is not bool:
+        raise TypeError(f"Setting '{name}' expects {expected_type.__name__}!")
+    if expected_type is float and isinstance(value, int):
+        value = float(value)
+    elif expected_type is int and isinstance(value, float) and value.is_integer():
+        value = int(value)
+
+    if not isinstance(value, expected_type):
+        raise TypeError(
+            f"Setting '{name}' expects {expected_type.__name__}; got '{type(value).__name__}' instead!"
+        )
+
+    validator: Optional[Callable[[Any], bool]] = schema["validator"]
+    if validator is not None and not validator(value):
+        raise ValueError(f"Value '{value}' is not valid for setting '{name}'!")
+
+    return value
+
+
+class SettingsSnapshot:
+    """Immutable view of all user settings at one point in time."""
+
+    __slots__ = tuple(SETTINGS_SCHEMA)
+
+    color_seed: ft.ColorValue
+    font_family: str
+    font_size: int
+    language: str
+    logout_on_lost_focus: bool
+    logout_on_top_bar_label_click: bool
+    shake_detection_enabled: bool
+    shake_detection_threshold_gravity: float
+
+    def __init__(self, **values: Any) -> None:
+        for name in SETTINGS_SCHEMA:
+            object.__setattr__(self, name, _coerce(name=name, value=values[name]))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Settings snapshots are immutable. Use 'Settings.update()'!")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Settings snapshots are immutable. Use 'Settings.update()'!")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SettingsSnapshot):
+            return NotImplemented
+
+        return self.as_dict() == other.as_dict()
+
+    def __repr__(self) -> str:
+        return f"SettingsSnapshot({", ".join(f"{k}={v!r}" for k, v in self.as_dict().items())})"
+
+    def as_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in SETTINGS_SCHEMA}
+
+    def replace(self, **changes: Any) -> "SettingsSnapshot":
+        return SettingsSnapshot(**{**self.as_dict(), **changes})
+
+
+SettingsCallback = Callable[[SettingsSnapshot, SettingsSnapshot], Any]
+
+
+class Settings:
+    def __init__(self, storage: "StorageManager") -> None:
+        """Load all settings once from the given storage manager.
+
+        Args:
+            storage(StorageManager): The client storage manager holding the settings.
+
+        Returns:
+            None: No return value.
+        """
+        self._storage: "StorageManager" = storage
+        self._lock: threading.Lock = threading.Lock()
+        self._subscribers: list[tuple[Optional[frozenset[str]], SettingsCallback]] = []
+
+        # Load snapshot
+        self._snapshot: SettingsSnapshot = self._load()
+
+    def _load(self) -> SettingsSnapshot:
+        values: dict[str, Any] = {}
+
+        for name, schema in SETTINGS_SCHEMA.items():
+            stored_value: Any = self._storage.get(
+                key=schema["key"], default=schema["default"]
+            )
+
+            # Fall back to the default if the stored value is broken
+            try:
+                values[name] = _coerce(name=name, value=stored_value)
+            except (TypeError, ValueError) as e:
+                print(f"Invalid stored setting '{name}', using default. Error: {e}")
+                values[name] = schema["default"]
+
+        return SettingsSnapshot(**values)
+
+    def update(self, **changes: Any) -> SettingsSnapshot:
+        """Validate, persist and apply the given setting changes.
+
+        Args:
+            **changes(Any): Snapshot attributes and their new values.
+
+        Returns:
+            SettingsSnapshot: The new snapshot.
+
+        Raises:
+            AttributeError: If an unknown setting is given.
+            TypeError: If a value has the wrong type.
+            ValueError: If a value is out of range.
+        """
+        for name in changes:
+            if name not in SETTINGS_SCHEMA:
+                raise AttributeError(f"Unknown setting '{name}'!")
+
+        with self._lock:
+            old_snapshot: SettingsSnapshot = self._snapshot
+            new_snapshot: SettingsSnapshot = old_snapshot.replace(**changes)
+
+            # Only write values which actually changed
+            changed: set[str] = {
+                name
+                for name in changes
+                if getattr(old_snapshot, name) != getattr(new_snapshot, name)
+            }
+            for name in changed:
+                self._storage.set(
+                    key=SETTINGS_SCHEMA[name]["key"],
+                    value=getattr(new_snapshot, name),
+                )
+
+            # Swap snapshot in one step so readers never see a half updated state
+            self._snapshot = new_snapshot
+            subscribers = list(self._subscribers)
+
+        if changed:
+            for fields, callback in subscribers:
+                if fields is None or fields & changed:
+                    callback(old_snapshot, new_snapshot)
+
+        return new_snapshot
+
+    def subscribe(
+        self,
+        callback: SettingsCallback,
+        fields: Optional[list[str]] = None,
+    ) -> Callable[[], None]:
+        """Register a callback which is run with (old, new) snapshots on changes.
+
+        Args:
+            callback(SettingsCallback): Function to run after a change.
+            fields(Optional[list[str]]): Only run the callback if one of these settings changed.
+
+        Returns:
+            Callable[[], None]: Function to remove the subscription again.
+        """
+        if fields is not None:
+            for name in fields:
+                if name not in SETTINGS_SCHEMA:
+                    raise AttributeError(f"Unknown setting '{name}'!")
+
+        entry: tuple[Optional[frozenset[str]], SettingsCallback] = (
+            frozenset(fields) if fields is not None else None,
+            callback,
+        )
+
+        with self._lock:
+            self._subscribers.append(entry)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+
+        return unsubscribe
+
+    @property
+    def current(self) -> SettingsSnapshot:
+        return self._snapshot
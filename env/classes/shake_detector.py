@@ -1,8 +1,8 @@
 import flet as ft  # type: ignore[import-untyped]
 
 from env.classes.router import AppRouter
+from env.classes.settings import Settings, SettingsSnapshot
 from env.classes.storages import Storages
-from env.config import config
 from env.func.logout import logout
 
 
@@ -11,37 +11,44 @@ class ShakeDetector:
         self._page: ft.Page = page
         self._router: AppRouter = router
         self._storages: Storages = storages
+        self._settings: Settings = self._storages.settings
 
         # Whether the shake detector is enabled
         self._enabled: bool = True
 
         # Initialize shake detector instance
         self._shake_detector: ft.ShakeDetector = ft.ShakeDetector(
-            shake_threshold_gravity=config.SHAKE_DETECTION_THRESHOLD_GRAVITY_DEFAULT,
+            shake_threshold_gravity=self._settings.current.shake_detection_threshold_gravity,
             on_shake=self._logout,
         )
 
+        # Follow threshold changes from the settings
+        self._settings.subscribe(
+            callback=self._on_threshold_change,
+            fields=["shake_detection_threshold_gravity"],
+        )
+
         # Add event to page overlay
         self._page.overlay.append(self._shake_detector)
         self._page.update()  # type: ignore
 
+    def _on_threshold_change(self, old: SettingsSnapshot, new: SettingsSnapshot) -> None:
+        self.gravity_threshold = new.shake_detection_threshold_gravity
+
     def _logout(self, e: ft.ControlEvent) -> None:
         # Skip if disabled
         if not self._enabled:
             return
 
         # Skip if setting is set to 'False'
-        if not self._storages.client_storage.get(
-            key=config.CS_SHAKE_DETECTION_ENABLED,
-            default=config.SHAKE_DETECTION_ENABLED_DEFAULT,
-        ):
+        if not self._settings.current.shake_detection_enabled:
             return
 
         logout(router=self._router, storages=self._storages)
 
     @property
     def gravity_threshold(self) -> float:
-        return self.gravity_threshold
+        return self._shake_detector.shake_threshold_gravity
 
     @gravity_threshold.setter
     def gravity_threshold(self, value: float) -> None:
@@ -1,21 +1,109 @@
 import base64
+import binascii
 import json
+import os
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Literal, Optional
-
-from nacl.signing import SigningKey, VerifyKey
+from typing import TYPE_CHECKING, Any, Optional
 
+from env.classes.identity import SignedIdentity
+from env.classes.keys import KeyManager, key_manager
+from env.classes.paths import paths
 from env.config import config
-from env.typing.signing import MasterKeys, SignedOnionData
+from env.func.lazy_imports import lazy_import
+from env.typing.signing import SignedIdentityJSON, SignedOnionData
+
+if TYPE_CHECKING:
+    from nacl import exceptions, signing
+else:
+    # PyNaCl is only needed when signing, don't load it on startup
+    signing = lazy_import("nacl.signing")
+    exceptions = lazy_import("nacl.exceptions")
+
+# Signed onion IDs in the JSON or the binary format
+SignedRecord = SignedOnionData | SignedIdentity
+# Everything a signature covers: (signature, public key, onion, timestamp, expires)
+# or the whole record for the binary format
+_ResultKey = tuple[str, str, str, float, float] | bytes
+_ONION_DATA_STRINGS: tuple[str, ...] = ("onion", "signed_by", "signature")
+_ONION_DATA_NUMBERS: tuple[str, ...] = ("timestamp", "expires")
+
+
+def _result_key(data: SignedRecord) -> _ResultKey:
+    if isinstance(data, SignedIdentity):
+        return bytes(data)
+
+    return (
+        data["signature"],
+        data["signed_by"],
+        data["onion"],
+        data["timestamp"],
+        data["expires"],
+    )
+
+
+def _expires(data: SignedRecord) -> float:
+    return data.expires if isinstance(data, SignedIdentity) else data["expires"]
+
+
+def _is_onion_data(data: Any) -> bool:
+    # Types of the fields of 'SignedOnionData', JSON numbers may be integers
+    return (
+        isinstance(data, dict)
+        and all(isinstance(data.get(field), str) for field in _ONION_DATA_STRINGS)
+        and all(
+            isinstance(data.get(field), (int, float))
+            and not isinstance(data.get(field), bool)
+            for field in _ONION_DATA_NUMBERS
+        )
+    )
+
+
+def load_signed_record(raw: bytes) -> SignedRecord:
+    """Read a signed onion ID in any of the supported formats.
+
+    Binary records and the JSON form of binary records (with 'version') are
+    returned as SignedIdentity, JSON of the old format as SignedOnionData.
+
+    Args:
+        raw(bytes): Content of a file or frame.
+
+    Returns:
+        SignedRecord: The signed onion ID.
+
+    Raises:
+        ValueError: If the data is no signed onion ID.
+    """
+    if raw.startswith(config.IDENTITY_MAGIC):
+        return SignedIdentity.parse(buffer=raw)
+
+    try:
+        data: SignedIdentityJSON | SignedOnionData = json.loads(raw)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Signed onion ID isn't valid JSON!") from e
+
+    if not isinstance(data, dict):
+        raise ValueError("Signed onion ID isn't a JSON object!")
+
+    if "version" in data:
+        return SignedIdentity.from_json(data=data)
+
+    if not _is_onion_data(data=data):
+        raise ValueError("Signed onion ID is missing fields or has invalid ones!")
+
+    return data
 
 
 class OnionSigning:
-    def __init__(self) -> None:
+    def __init__(self, keys: KeyManager = key_manager) -> None:
         """Initializes an instance of the class.
 
         Args:
             self(Self): The instance of the class.
+            keys(KeyManager): Holds the master keys (the session wide one by default).
 
         Returns:
             None: No value is returned.
@@ -23,97 +111,84 @@ class OnionSigning:
         Raises:
             Exception: Any exception during initialization.
         """
-        self._keys: MasterKeys = {
-            "private_key": None,
-            "public_key": None,
-        }
+        self._key_manager: KeyManager = keys
         self._signed_onion_data: Optional[SignedOnionData] = None
+        self._signed_identity: Optional[SignedIdentity] = None
 
-    def _load_key(self, key: Literal["private_key", "public_key"]) -> None:
-        file_path: str = (
-            config.FILE_ENCRYPTION_PRIVATE_KEY
-            if key == "private_key"
-            else config.FILE_ENCRYPTION_PUBLIC_KEY
-        )
+        # Public key (base64 or raw) -> parsed key
+        self._verify_keys: OrderedDict[str | bytes, signing.VerifyKey] = OrderedDict()
+        # Valid signatures -> time they expire
+        self._valid_results: OrderedDict[_ResultKey, float] = OrderedDict()
+        # Caches are shared by the verification threads
+        self._cache_lock: threading.Lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
 
-        # Check if the file exists
+        # Files checked by 'id_is_valid()': path -> ((mtime, size), record)
+        self._id_files: dict[str, tuple[tuple[int, int], SignedRecord]] = {}
+
+    def _load_signed_data(self) -> Optional[SignedOnionData]:
+        file_path: str = paths.join_with_app_storage(
+            path=config.FILE_ENCRYPTION_SIGNED_ONION_DATA
+        )
         if not Path(file_path).exists():
-            raise FileNotFoundError(f"File '{file_path}' does not exist!")
+            return None
 
-        # Load the data
         with open(file_path, "r") as file:
-            # Load key
-            data = base64.b64decode(file.read())
-            if key == "private_key":
-                self._keys[key] = SigningKey(data)
-            else:
-                self._keys[key] = VerifyKey(data)
-
-    def _save_key(self, key: Literal["private_key", "public_key"]) -> None:
-        # Create a local variable to ensure mypy isn't yelling at me
-        actual_key: Optional[SigningKey | VerifyKey] = self._keys[key]
-
-        # Check if key exists
-        if actual_key is None:
-            raise TypeError(
-                f"Key '{key}' does not contain a value. Expected a value; got '{key}' instead. Generate the key first!"
-            )
+            return json.load(file)
 
-        # Write to file
+    def _save_signed_data(self) -> None:
         with open(
-            (
-                config.FILE_ENCRYPTION_PRIVATE_KEY
-                if key == "private_key"
-                else config.FILE_ENCRYPTION_PUBLIC_KEY
-            ),
+            paths.join_with_app_storage(path=config.FILE_ENCRYPTION_SIGNED_ONION_DATA),
             "w",
         ) as file:
-            file.write(base64.b64encode(actual_key.encode()).decode(config.ENCODING))
+            json.dump(self._signed_onion_data, file, indent=2)
 
-    def _load_signed_data(self) -> Optional[SignedOnionData]:
-        if not Path(config.FILE_ENCRYPTION_SIGNED_ONION_DATA).exists():
+    def _load_signed_identity(self) -> Optional[SignedIdentity]:
+        file_path: str = paths.join_with_app_storage(
+            path=config.FILE_ENCRYPTION_SIGNED_IDENTITY
+        )
+        if not Path(file_path).exists():
             return None
 
-        with open(config.FILE_ENCRYPTION_SIGNED_ONION_DATA, "r") as file:
-            return json.load(file)
+        with open(file_path, "rb") as file:
+            return SignedIdentity.parse(buffer=file.read())
 
-    def _save_signed_data(self) -> None:
-        with open(config.FILE_ENCRYPTION_SIGNED_ONION_DATA, "w") as file:
-            json.dump(self._signed_onion_data, file, indent=2)
+    def _save_signed_identity(self) -> None:
+        if self._signed_identity is None:
+            raise TypeError("No signed identity exists. Run 'sign_identity()' first!")
 
-    def _save_master_keys(self) -> None:
-        # Check if keys exist
-        if self._keys["private_key"] is None:
-            raise TypeError("Private key is of type 'None'. Create key first!")
-        if self._keys["public_key"] is None:
-            raise TypeError("Private key is of type 'None'. Create key first!")
+        with open(
+            paths.join_with_app_storage(path=config.FILE_ENCRYPTION_SIGNED_IDENTITY),
+            "wb",
+        ) as file:
+            file.write(self._signed_identity.buffer)
 
-        # Save keys
-        self._save_key(key="private_key")
-        self._save_key(key="public_key")
+    def _read_id_file(self, file_path: str) -> SignedRecord:
+        # Only read and parse the file again if it changed
+        stat: os.stat_result = os.stat(file_path)
+        version: tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
 
-    def generate_master_keys(self) -> None:
-        # Create a new key
-        key: SigningKey = SigningKey.generate()
+        cached: Optional[tuple[tuple[int, int], SignedRecord]] = self._id_files.get(
+            file_path
+        )
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        with open(file_path, "rb") as file:
+            data: SignedRecord = load_signed_record(raw=file.read())
 
-        # Derive private and public key
-        self._keys["private_key"] = key
-        self._keys["public_key"] = key.verify_key
+        self._id_files[file_path] = (version, data)
+        return data
 
-        # Save keys
-        self._save_master_keys()
+    def generate_master_keys(self) -> None:
+        self._key_manager.generate()
 
     def load_master_keys(self) -> None:
-        self._load_key(key="private_key")
-        self._load_key(key="public_key")
+        # Only reads the files once per session
+        self._key_manager.load()
 
     def sign_onion(self, onion_address: str, expiry_days: int) -> None:
-        # Check if key exists
-        actual_key: Optional[SigningKey] = self._keys["private_key"]
-        if actual_key is None:
-            raise TypeError(
-                "No private key exists. Run 'generate_master_keys()' to generate it!"
-            )
+        actual_key: signing.SigningKey = self.private_key
 
         # Define data
         timestamp: float = time.time()
@@ -125,55 +200,257 @@ class OnionSigning:
             "onion": onion_address,
             "timestamp": timestamp,
             "expires": expires,
-            "signed_by": base64.b64encode(actual_key.encode()).decode(config.ENCODING),
+            "signed_by": base64.b64encode(actual_key.verify_key.encode()).decode(
+                config.ENCODING
+            ),
             "signature": base64.b64encode(sig).decode(config.ENCODING),
         }
 
         # Save signed data
         self._save_signed_data()
 
+    def sign_identity(self, onion_address: str, expiry_days: int) -> SignedIdentity:
+        """Sign the onion address in the compact binary format.
+
+        Args:
+            self(OnionSigning): The OnionSigning instance.
+            onion_address(str): Our own onion address.
+            expiry_days(int): Days until the ID expires.
+
+        Returns:
+            SignedIdentity: The signed ID (also saved to FILE_ENCRYPTION_SIGNED_IDENTITY).
+
+        Raises:
+            TypeError: If no private key exists.
+            ValueError: If the onion address is invalid.
+        """
+        actual_key: signing.SigningKey = self.private_key
+
+        timestamp: int = int(time.time())
+        unsigned: bytes = SignedIdentity.encode_unsigned(
+            onion_address=onion_address,
+            timestamp=timestamp,
+            expires=timestamp + expiry_days * 86400,
+            public_key=actual_key.verify_key.encode(),
+        )
+        self._signed_identity = SignedIdentity.parse(
+            buffer=unsigned + actual_key.sign(message=unsigned).signature
+        )
+
+        self._save_signed_identity()
+        return self._signed_identity
+
+    def _get_verify_key(self, public_key: str | bytes) -> "signing.VerifyKey":
+        with self._cache_lock:
+            verify_key: Optional[signing.VerifyKey] = self._verify_keys.get(public_key)
+            if verify_key is not None:
+                self._verify_keys.move_to_end(public_key)
+                return verify_key
+
+        verify_key = signing.VerifyKey(
+            public_key
+            if isinstance(public_key, bytes)
+            else base64.b64decode(public_key, validate=True)
+        )
+
+        with self._cache_lock:
+            self._verify_keys[public_key] = verify_key
+            if len(self._verify_keys) > config.SIGNING_VERIFY_KEY_CACHE_SIZE:
+                self._verify_keys.popitem(last=False)
+
+        return verify_key
+
+    def _is_cached_valid(self, key: _ResultKey, now: float) -> bool:
+        with self._cache_lock:
+            expires: Optional[float] = self._valid_results.get(key)
+            if expires is None:
+                return False
+
+            if now > expires:
+                del self._valid_results[key]
+                return False
+
+            self._valid_results.move_to_end(key)
+            return True
+
+    def _verify_signature(self, data: SignedRecord) -> bool:
+        try:
+            if isinstance(data, SignedIdentity):
+                self._get_verify_key(public_key=data.public_key.tobytes()).verify(
+                    smessage=data.signed_part.tobytes(),
+                    signature=data.signature.tobytes(),
+                )
+            else:
+                message: bytes = (
+                    f"{data["onion"]}{data["timestamp"]}{data["expires"]}".encode(
+                        config.ENCODING
+                    )
+                )
+                self._get_verify_key(public_key=data["signed_by"]).verify(
+                    smessage=message,
+                    signature=base64.b64decode(data["signature"], validate=True),
+                )
+        except (
+            exceptions.CryptoError,
+            binascii.Error,
+            ValueError,
+            TypeError,
+            KeyError,
+        ):
+            return False
+
+        # Only valid results are cached, invalid records aren't worth the memory
+        with self._cache_lock:
+            self._valid_results[_result_key(data=data)] = _expires(data=data)
+            if len(self._valid_results) > config.SIGNING_RESULT_CACHE_SIZE:
+                self._valid_results.popitem(last=False)
+
+        return True
+
+    def _verify_chunk(self, chunk: list[SignedRecord]) -> list[bool]:
+        return [self._verify_signature(data=data) for data in chunk]
+
+    def verify(self, data: SignedRecord) -> bool:
+        """Check if a signed onion ID is valid and not expired.
+
+        Args:
+            self(OnionSigning): The OnionSigning instance.
+            data(SignedRecord): The signed onion ID (JSON or binary format).
+
+        Returns:
+            bool: True if the ID is valid.
+        """
+        return self.verify_many(records=[data])[0]
+
+    def verify_many(self, records: list[SignedRecord]) -> list[bool]:
+        """Check many signed onion IDs at once.
+
+        Public keys and valid results are cached, the remaining signatures
+        are verified in a thread pool if there are enough of them. Records
+        with missing or mistyped fields are invalid.
+
+        Args:
+            self(OnionSigning): The OnionSigning instance.
+            records(list[SignedRecord]): The signed onion IDs (JSON or binary format).
+
+        Returns:
+            list[bool]: True for every valid and not expired ID (same order as the records).
+        """
+        now: float = time.time()
+        results: list[bool] = [False] * len(records)
+        pending: list[int] = []
+
+        for i, data in enumerate(records):
+            # Records from contacts may not have passed 'load_signed_record()'
+            if not isinstance(data, SignedIdentity) and not _is_onion_data(data=data):
+                continue
+
+            if now > _expires(data=data):
+                continue
+
+            if self._is_cached_valid(key=_result_key(data=data), now=now):
+                results[i] = True
+            else:
+                pending.append(i)
+
+        if len(pending) < config.SIGNING_PARALLEL_MIN_BATCH:
+            for i in pending:
+                results[i] = self._verify_signature(data=records[i])
+            return results
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=config.SIGNING_VERIFY_WORKERS,
+                thread_name_prefix="signature-verify",
+            )
+
+        # One task per chunk, single signatures are too fast to be worth a task
+        chunk_size: int = -(-len(pending) // config.SIGNING_VERIFY_WORKERS)
+        chunks: list[list[int]] = [
+            pending[start : start + chunk_size]
+            for start in range(0, len(pending), chunk_size)
+        ]
+
+        for chunk, valid in zip(
+            chunks,
+            self._executor.map(
+                self._verify_chunk, ([records[i] for i in chunk] for chunk in chunks)
+            ),
+        ):
+            for i, is_valid in zip(chunk, valid):
+                results[i] = is_valid
+
+        return results
+
+    def verify_message(
+        self, public_key: bytes, message: bytes, signature: bytes
+    ) -> bool:
+        """Check a signature over arbitrary data (e.g. the challenge of a peer).
+
+        Args:
+            self(OnionSigning): The OnionSigning instance.
+            public_key(bytes): The raw public key of the signer.
+            message(bytes): The signed data.
+            signature(bytes): The signature.
+
+        Returns:
+            bool: True if the signature is valid.
+        """
+        try:
+            self._get_verify_key(public_key=public_key).verify(
+                smessage=message, signature=signature
+            )
+        except (exceptions.CryptoError, ValueError, TypeError):
+            return False
+
+        return True
+
     def id_is_valid(self, json_path: str) -> bool:
-        with open(json_path, "r") as file:
-            data: SignedOnionData = json.load(file)
+        # Binary and JSON files are accepted, JSON in the old or the binary layout
+        try:
+            data: SignedRecord = self._read_id_file(file_path=json_path)
+        except ValueError as e:
+            print(f"❌ ID file is invalid! Error: {e}")
+            return False
 
         # Check if time expired
-        if time.time() > data["expires"]:
+        if time.time() > _expires(data=data):
             print("❌ ID has expired!")
             return False
 
-        # Get data
-        message: bytes = f"{data["onion"]}{data["timestamp"]}{data["expires"]}".encode(config.ENCODING)
-        signature: bytes = base64.b64decode(data["signature"])
-        pubkey: bytes = base64.b64decode(data["signed_by"])
-
         # Check if valid
-        try:
-            verify_key: VerifyKey = VerifyKey(pubkey)
-            verify_key.verify(smessage=message, signature=signature)
+        if self.verify(data=data):
             print("✅ Signature is valid!")
             return True
-        except Exception as _:
-            print("❌ Signature is invalid!")
-            return False
+
+        print("❌ Signature is invalid!")
+        return False
 
     @property
-    def private_key(self) -> SigningKey:
-        # Check if private key exists
-        if self._keys["private_key"] is None:
-            raise TypeError("Private key is of type 'None'. Create key first!")
+    def private_key(self) -> "signing.SigningKey":
+        return self._key_manager.private_key
 
-        return self._keys["private_key"]
+    @property
+    def public_key(self) -> "signing.VerifyKey":
+        return self._key_manager.public_key
 
     @property
-    def public_key(self) -> VerifyKey:
-        # Check if public key
-        if self._keys["public_key"] is None:
-            raise TypeError("Public key is of type 'None'. Create key first!")
+    def signed_identity(self) -> SignedIdentity:
+        if self._signed_identity is None:
+            self._signed_identity = self._load_signed_identity()
 
-        return self._keys["public_key"]
+        if self._signed_identity is None:
+            raise TypeError(
+                "No signed identity found. Run the 'sign_identity()' function to sign!"
+            )
+
+        return self._signed_identity
 
     @property
     def signed_onion_data(self) -> SignedOnionData:
+        if self._signed_onion_data is None:
+            self._signed_onion_data = self._load_signed_data()
+
         if self._signed_onion_data is None:
             raise TypeError(
                 "No signed onion data found. Run the 'sign_onion()' function to sign!"
@@ -0,0 +1,223 @@
+import importlib.abc
+import importlib.machinery
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Callable, Iterator, Optional, Sequence, TypeVar
+
+# Only the standard library may be imported here. The profiler has to be
+# loaded before everything else to be able to measure the other imports,
+# that's why the environment variable isn't defined in the config.
+STARTUP_PROFILE_ENV_VAR: str = "CHATLEX_PROFILE_STARTUP"
+
+T = TypeVar("T")
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    def __init__(self) -> None:
+        # Import times in seconds: name -> (inclusive, self)
+        self.imports: dict[str, tuple[float, float]] = {}
+
+        # Time spent in nested imports of the modules currently executing
+        self._child_time_stack: list[float] = []
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Optional[Sequence[str]],
+        target: Optional[ModuleType] = None,
+    ) -> Optional[importlib.machinery.ModuleSpec]:
+        # Let the other finders do the work
+        spec: Optional[importlib.machinery.ModuleSpec] = None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+
+        # Builtin and frozen importers are shared classes, don't patch them
+        if spec is None or spec.loader is None or isinstance(spec.loader, type):
+            return spec
+
+        self._patch_loader(name=fullname, loader=spec.loader)
+        return spec
+
+    def _patch_loader(self, name: str, loader: Any) -> None:
+        exec_module: Optional[Callable[[ModuleType], None]] = getattr(
+            loader, "exec_module", None
+        )
+        if exec_module is None:
+            return
+
+        def timed_exec_module(module: ModuleType) -> None:
+            self._child_time_stack.append(0.0)
+            start: float = time.perf_counter()
+
+            try:
+                exec_module(module)
+            finally:
+                duration: float = time.perf_counter() - start
+                child_time: float = self._child_time_stack.pop()
+
+                # Add own duration to the parent import
+                if self._child_time_stack:
+                    self._child_time_stack[-1] += duration
+
+                self.imports[name] = (duration, duration - child_time)
+
+        try:
+            loader.exec_module = timed_exec_module
+        except AttributeError:
+            # Loader doesn't allow patching (e.g. uses __slots__)
+            pass
+
+
+class StartupProfiler:
+    def __init__(self, enabled: bool) -> None:
+        self._enabled: bool = enabled
+        self._start: float = time.perf_counter()
+
+        # Recorded data
+        self._phases: list[dict[str, Any]] = []
+        self._marks: dict[str, float] = {}
+        self._report_path: Optional[str] = None
+        self._import_budget_ms: Optional[float] = None
+
+        # Start measuring imports right away
+        self._import_timer: Optional[_ImportTimer] = None
+        if self._enabled:
+            self._import_timer = _ImportTimer()
+            sys.meta_path.insert(0, self._import_timer)
+
+    def _elapsed_ms(self, timestamp: Optional[float] = None) -> float:
+        return ((timestamp or time.perf_counter()) - self._start) * 1000
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure the duration of the code inside the with block.
+
+        Args:
+            name(str): Name of the phase in the report.
+
+        Returns:
+            Iterator[None]: Context manager measuring the phase.
+        """
+        if not self._enabled:
+            yield
+            return
+
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phases.append(
+                {
+                    "name": name,
+                    "start_ms": self._elapsed_ms(timestamp=start),
+                    "duration_ms": (time.perf_counter() - start) * 1000,
+                }
+            )
+
+            # Keep the report up to date for phases after startup (e.g. lazy pages)
+            self._write()
+
+    def wrap(self, name: str, func: Callable[[], T]) -> Callable[[], T]:
+        """Wrap a function to measure it as a phase every time it is called.
+
+        Args:
+            name(str): Name of the phase in the report.
+            func(Callable[[], T]): Function to measure.
+
+        Returns:
+            Callable[[], T]: The wrapped function (or the function itself if disabled).
+        """
+        if not self._enabled:
+            return func
+
+        def wrapper() -> T:
+            with self.phase(name=name):
+                return func()
+
+        return wrapper
+
+    def mark(self, name: str) -> None:
+        """Record the time since process start for a named point.
+
+        Args:
+            name(str): Name of the mark in the report.
+        """
+        if not self._enabled or name in self._marks:
+            return
+
+        self._marks[name] = self._elapsed_ms()
+
+    def report(self) -> dict[str, Any]:
+        imports: dict[str, tuple[float, float]] = (
+            self._import_timer.imports if self._import_timer is not None else {}
+        )
+
+        # Nested imports are part of their parents, so only sum up the own times
+        imports_total_ms: float = sum(own for _, own in imports.values()) * 1000
+
+        return {
+            "platform": sys.platform,
+            "python": sys.version.split()[0],
+            "elapsed_ms": self._elapsed_ms(),
+            "marks": self._marks,
+            "phases": self._phases,
+            "imports_total_ms": imports_total_ms,
+            "import_budget_ms": self._import_budget_ms,
+            "import_budget_exceeded": (
+                self._import_budget_ms is not None
+                and imports_total_ms > self._import_budget_ms
+            ),
+            "imports": [
+                {
+                    "module": name,
+                    "inclusive_ms": inclusive * 1000,
+                    "self_ms": own * 1000,
+                }
+                for name, (inclusive, own) in sorted(
+                    imports.items(), key=lambda item: item[1][0], reverse=True
+                )
+            ],
+        }
+
+    def _write(self) -> None:
+        if self._report_path is None:
+            return
+
+        with open(self._report_path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+
+    def write_report(self, path: str, import_budget_ms: Optional[float] = None) -> None:
+        """Write the report as JSON and keep it updated on later phases.
+
+        Args:
+            path(str): File to write the report to.
+            import_budget_ms(Optional[float]): Max time all imports may take.
+        """
+        if not self._enabled:
+            return
+
+        self._report_path = path
+        self._import_budget_ms = import_budget_ms
+        self._write()
+
+        report: dict[str, Any] = self.report()
+        if report["import_budget_exceeded"]:
+            print(
+                f"[Startup] Imports took {report["imports_total_ms"]:.0f}ms (budget: {import_budget_ms}ms)"
+            )
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+
+profiler = StartupProfiler(enabled=bool(os.getenv(STARTUP_PROFILE_ENV_VAR)))
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Optional
 
 import flet as ft  # type: ignore[import-untyped]
 from flet.core.client_storage import \
@@ -6,14 +6,21 @@ from flet.core.client_storage import \
 from flet.core.session_storage import \
     SessionStorage  # type: ignore[import-untyped]
 
+from env.classes.settings import Settings
+
 
 class StorageManager:
-    def __init__(self, storage: SessionStorage | ClientStorage) -> None:
+    def __init__(
+        self,
+        storage: SessionStorage | ClientStorage,
+        prefetch_prefix: Optional[str] = None,
+    ) -> None:
         """Initialize a new SessionManager instance.
 
         Args:
             self(SessionManager): The SessionManager instance.
             storage(SessionStorage | ClientStorage): The storage backend to use.
+            prefetch_prefix(Optional[str]): Key prefix to load into the cache right away. Nothing is loaded if not provided.
 
         Returns:
             None: No return value.
@@ -26,18 +33,61 @@ class StorageManager:
         # Create storage cache for faster access
         self._storage_cache: dict[str, Any] = {}
 
-        # Load saved storage into cache for faster access
-        self._load_all()
+        # Remember keys which are known to be missing to avoid asking the storage again
+        self._missing_keys: set[str] = set()
+
+        # Prefixes whose keys are completely loaded into the cache
+        self._loaded_prefixes: set[str] = set()
+
+        # Only load the requested part of the storage, everything else is loaded on access
+        if prefetch_prefix is not None:
+            self.prefetch(key_prefix=prefetch_prefix)
 
-    def _load_all(self) -> None:
-        """Loads all key-value pairs from storage into the cache."""
+    def _is_loaded(self, key: str) -> bool:
+        return any(key.startswith(prefix) for prefix in self._loaded_prefixes)
+
+    def _get_keys(self, key_prefix: str) -> list[str]:
         if isinstance(self._storage, ClientStorage):
-            for key in self._storage.get_keys(key_prefix=""):
-                self._storage_cache[key] = self._storage.get(key)
+            # Let the client filter the keys to keep the transferred list small
+            return self._storage.get_keys(key_prefix=key_prefix)
+
+        return [key for key in self._storage.get_keys() if key.startswith(key_prefix)]
 
+    def prefetch(self, key_prefix: str = "") -> None:
+        """Loads all key-value pairs starting with the given prefix into the cache.
+
+        Args:
+            self(StorageManager): The StorageManager instance.
+            key_prefix(str): Prefix of the keys to load. Loads every key if empty.
+
+        Returns:
+            None: No return value.
+
+        Raises:
+            Exception: If the underlying storage mechanism encounters an error.
+        """
+        # Skip if the prefix is already covered by a loaded prefix
+        if self._is_loaded(key=key_prefix):
+            return
+
+        keys: list[str] = self._get_keys(key_prefix=key_prefix)
+
+        if isinstance(self._storage, SessionStorage):
+            # Session storage lives in memory on the server, take a snapshot in one pass
+            self._storage_cache.update(
+                {key: self._storage.get(key=key) for key in keys}
+            )
         else:
-            for key in self._storage.get_keys():
-                self._storage_cache[key] = self._storage.get(key=key)
+            # Client storage has no bulk read, only fetch keys which are not cached yet
+            for key in keys:
+                if key not in self._storage_cache:
+                    self._storage_cache[key] = self._storage.get(key=key)
+
+        # Every key with this prefix is known now, so missing ones don't exist
+        self._missing_keys = {
+            key for key in self._missing_keys if not key.startswith(key_prefix)
+        }
+        self._loaded_prefixes.add(key_prefix)
 
     def get(self, key: str, default: Any = None) -> Any:
         """Retrieves a value from the internal storage using the given key.
@@ -55,12 +105,20 @@ class StorageManager:
         if key in self._storage_cache:
             return self._storage_cache[key]
 
-        # Try to return value from storage
+        # Return default if the key is known to be missing
+        if key in self._missing_keys or self._is_loaded(key=key):
+            return default
+
+        # Remember missing key and return default
         if not self._storage.contains_key(key=key):
+            self._missing_keys.add(key)
             return default
 
-        # Return default
-        return self._storage.get(key=key)
+        # Load value from storage into cache
+        value: Any = self._storage.get(key=key)
+        self._storage_cache[key] = value
+
+        return value
 
     def set(self, key: str, value: Any) -> None:
         """Sets a key-value pair in the internal storage.
@@ -78,10 +136,21 @@ class StorageManager:
         # Set storage and storage cache
         self._storage.set(key=key, value=value)
         self._storage_cache[key] = value
+        self._missing_keys.discard(key)
+
+    def remove(self, key: str) -> None:
+        self._storage.remove(key=key)
+        self._storage_cache.pop(key, None)
+        self._missing_keys.add(key)
 
     def clear(self) -> None:
         self._storage.clear()
 
+        # Everything is gone now, no need to ask the storage again
+        self._storage_cache.clear()
+        self._missing_keys.clear()
+        self._loaded_prefixes = {""}
+
 
 class Storages:
     def __init__(self, page: ft.Page) -> None:
@@ -101,10 +170,16 @@ class Storages:
         self._session_storage: StorageManager = StorageManager(
             storage=self._page.session
         )
+        # Settings keys share no prefix and are read nearly all on startup, so
+        # load the whole (small) client storage with one key listing instead
+        # of asking the client for every key and value separately
         self._client_storage: StorageManager = StorageManager(
-            storage=self._page.client_storage
+            storage=self._page.client_storage, prefetch_prefix=""
         )
 
+        # Settings snapshot is loaded on first access
+        self._settings: Optional[Settings] = None
+
     @property
     def session_storage(self) -> StorageManager:
         """Retrieves the current session storage manager.
@@ -134,3 +209,21 @@ class Storages:
             Exception: If the client storage manager is not available.
         """
         return self._client_storage
+
+    @property
+    def settings(self) -> Settings:
+        """Returns the typed settings snapshot holder.
+
+        Args:
+            self(Storages): The storages object.
+
+        Returns:
+            Settings: The settings loaded from the client storage.
+
+        Raises:
+            Exception: If the client storage is not available.
+        """
+        if self._settings is None:
+            self._settings = Settings(storage=self._client_storage)
+
+        return self._settings
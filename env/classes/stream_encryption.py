@@ -0,0 +1,166 @@
+import struct
+from typing import Iterable, Iterator
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from env.config import config
+from env.func.generations import generate_iv
+
+# Magic, version, chunk size and nonce prefix (big endian), authenticated with
+# every chunk
+_HEADER: struct.Struct = struct.Struct(
+    f"!4sBI{config.ATTACHMENT_NONCE_PREFIX_LENGTH}s"
+)
+# Chunk counter and final chunk flag, appended to the nonce prefix
+_NONCE_SUFFIX: struct.Struct = struct.Struct("!IB")
+_TAG_SIZE: int = 16
+# The header is only authenticated with the first chunk, limit what is read
+_MAX_CHUNK_SIZE: int = 16 * 1024 * 1024
+
+STREAM_HEADER_SIZE: int = _HEADER.size
+
+
+def _rechunk(data: Iterable[bytes], size: int) -> Iterator[bytes]:
+    # Pieces of any size -> pieces of exactly 'size' bytes (the last one may be shorter)
+    buffer: bytearray = bytearray()
+
+    for piece in data:
+        buffer += piece
+        while len(buffer) >= size:
+            yield bytes(buffer[:size])
+            del buffer[:size]
+
+    yield bytes(buffer)
+
+
+class StreamEncryptor:
+    def __init__(
+        self, key: bytes, chunk_size: int = config.ATTACHMENT_CHUNK_SIZE
+    ) -> None:
+        """Encrypt data of any size in chunks with AES-256-GCM (STREAM construction).
+
+        Every chunk is sealed on its own with the nonce prefix of the stream,
+        the chunk counter and a flag which marks the final chunk. Chunks can't
+        be reordered, dropped or appended, and a truncated stream fails on the
+        last chunk. Only one chunk is held in memory at a time. Use a new key
+        per stream.
+
+        Args:
+            self(StreamEncryptor): The StreamEncryptor instance.
+            key(bytes): 32 byte key of this stream.
+            chunk_size(int): Plaintext bytes per chunk (used when encrypting).
+
+        Returns:
+            None: No return value.
+        """
+        self._aes_gcm: AESGCM = AESGCM(key)
+        self._chunk_size: int = chunk_size
+
+    @staticmethod
+    def _nonce(prefix: bytes, counter: int, final: bool) -> bytes:
+        if counter > 0xFFFFFFFF:
+            raise ValueError("Stream has too many chunks!")
+
+        return prefix + _NONCE_SUFFIX.pack(counter, final)
+
+    def encrypt(self, data: Iterable[bytes]) -> Iterator[bytes]:
+        """Encrypt a stream, yields the header and then one encrypted chunk at a time.
+
+        Args:
+            self(StreamEncryptor): The StreamEncryptor instance.
+            data(Iterable[bytes]): The plaintext in pieces of any size.
+
+        Returns:
+            Iterator[bytes]: The ciphertext.
+        """
+        prefix: bytes = generate_iv(length=config.ATTACHMENT_NONCE_PREFIX_LENGTH)
+        header: bytes = _HEADER.pack(
+            config.ATTACHMENT_MAGIC,
+            config.ATTACHMENT_FORMAT_VERSION,
+            self._chunk_size,
+            prefix,
+        )
+        yield header
+
+        chunks: Iterator[bytes] = _rechunk(data=data, size=self._chunk_size)
+        chunk: bytes = next(chunks)
+        counter: int = 0
+
+        # Look one chunk ahead to know which one is the last
+        for next_chunk in chunks:
+            yield self._aes_gcm.encrypt(
+                self._nonce(prefix=prefix, counter=counter, final=False), chunk, header
+            )
+            chunk = next_chunk
+            counter += 1
+
+        yield self._aes_gcm.encrypt(
+            self._nonce(prefix=prefix, counter=counter, final=True), chunk, header
+        )
+
+    def decrypt(self, data: Iterable[bytes]) -> Iterator[bytes]:
+        """Decrypt a stream created by 'encrypt()', yields one chunk at a time.
+
+        Chunks are only yielded after they were authenticated. Stop using the
+        plaintext if an error is raised, the stream was changed.
+
+        Args:
+            self(StreamEncryptor): The StreamEncryptor instance.
+            data(Iterable[bytes]): The ciphertext in pieces of any size.
+
+        Returns:
+            Iterator[bytes]: The plaintext.
+
+        Raises:
+            ValueError: If the header is invalid.
+            cryptography.exceptions.InvalidTag: If the stream was changed or truncated.
+        """
+        pieces: Iterator[bytes] = iter(data)
+
+        header: bytearray = bytearray()
+        for piece in pieces:
+            header += piece
+            if len(header) >= STREAM_HEADER_SIZE:
+                break
+        if len(header) < STREAM_HEADER_SIZE:
+            raise ValueError("Encrypted stream is truncated!")
+
+        magic, version, chunk_size, prefix = _HEADER.unpack_from(header)
+        if magic != config.ATTACHMENT_MAGIC:
+            raise ValueError("Not an encrypted stream!")
+        if version != config.ATTACHMENT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported stream version {version}!")
+        if not 0 < chunk_size <= _MAX_CHUNK_SIZE:
+            raise ValueError(f"Invalid chunk size {chunk_size}!")
+
+        rest: bytes = bytes(header[STREAM_HEADER_SIZE:])
+        header_bytes: bytes = bytes(header[:STREAM_HEADER_SIZE])
+
+        def remaining() -> Iterator[bytes]:
+            yield rest
+            yield from pieces
+
+        chunks: Iterator[bytes] = _rechunk(
+            data=remaining(), size=chunk_size + _TAG_SIZE
+        )
+        chunk: bytes = next(chunks)
+        counter: int = 0
+
+        for next_chunk in chunks:
+            # Nothing follows, so this chunk has to be the final one
+            if not next_chunk:
+                break
+
+            yield self._aes_gcm.decrypt(
+                self._nonce(prefix=prefix, counter=counter, final=False),
+                chunk,
+                header_bytes,
+            )
+            chunk = next_chunk
+            counter += 1
+
+        yield self._aes_gcm.decrypt(
+            self._nonce(prefix=prefix, counter=counter, final=True),
+            chunk,
+            header_bytes,
+        )
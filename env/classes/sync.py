@@ -0,0 +1,258 @@
+import asyncio
+import sqlite3
+from typing import Any, Optional
+
+from env.classes.database import SQLiteDatabase
+from env.classes.peers import PeerEngine
+from env.config import config
+from env.func.converter import str_to_byte
+from env.func.payloads import (decode_frame, decode_sync_changes,
+                               encode_sync_batch, encode_sync_request)
+from env.typing.dicts import DeviceData
+from env.typing.sync import SyncChange
+
+
+class DeviceSync:
+    def __init__(
+        self,
+        database: SQLiteDatabase,
+        engine: PeerEngine,
+        device_uuid: str,
+        batch_size: int = config.SYNC_BATCH_SIZE,
+    ) -> None:
+        """Exchange changes of contacts and messages with the linked devices.
+
+        Every device numbers its own changes in the change log. A device asks
+        another one for the changes after its cursor, applies the received
+        batch together with the new cursor and asks for the next batch. Only
+        one batch per device is in memory, no matter how long the history is.
+
+        Only devices with a public key recorded on linking are synced. Use
+        'device_key()' as key lookup of the PeerAuthenticator, so frames only
+        arrive from devices which proved that they own that key.
+
+        Args:
+            self(DeviceSync): The DeviceSync instance.
+            database(SQLiteDatabase): Database of this device.
+            engine(PeerEngine): Engine used to reach the devices.
+            device_uuid(str): The uuid of this device.
+            batch_size(int): Max change log entries per frame.
+
+        Returns:
+            None: No return value.
+        """
+        self._database: SQLiteDatabase = database
+        self._engine: PeerEngine = engine
+        self._device_uuid: str = device_uuid
+        self._batch_size: int = batch_size
+
+        # Onion address -> device uuid (from the devices table)
+        self._devices: dict[str, str] = {}
+        # Onion address -> public key recorded when the device was linked
+        self._keys: dict[str, bytes] = {}
+
+        # Running syncs: device uuid -> future of the applied changes
+        self._waiters: dict[str, asyncio.Future[int]] = {}
+        # Applied changes and received batches of running syncs per device uuid
+        self._applied: dict[str, int] = {}
+        self._batches: dict[str, int] = {}
+
+        # Metrics
+        self._batches_sent: int = 0
+        self._changes_sent: int = 0
+        self._bytes_sent: int = 0
+        self._changes_applied: int = 0
+
+    def _onion_address(self, device_uuid: str) -> str:
+        for onion_address, uuid in self._devices.items():
+            if uuid == device_uuid:
+                return onion_address
+
+        raise ValueError(f"Device '{device_uuid}' isn't linked!")
+
+    def _fail(self, device_uuid: str, error: Exception) -> None:
+        waiter: Optional[asyncio.Future[int]] = self._waiters.pop(device_uuid, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_exception(error)
+
+    async def _request(self, onion_address: str, device_uuid: str) -> None:
+        await self._engine.send(
+            onion_address=onion_address,
+            payload=encode_sync_request(
+                cursor=self._database.retrieve_sync_cursor(device_uuid=device_uuid)
+            ),
+        )
+
+    async def _send_batch(self, onion_address: str, after_seq: int) -> None:
+        limit: int = self._batch_size
+
+        while True:
+            changes, cursor = self._database.retrieve_changes(
+                device_uuid=self._device_uuid, after_seq=after_seq, limit=limit
+            )
+            payload: bytes = encode_sync_batch(
+                changes=changes,
+                cursor=cursor,
+                more=cursor < self._database.retrieve_last_change(),
+            )
+
+            # Read fewer entries if they don't fit into one frame
+            if len(payload) <= config.PEER_MAX_FRAME_SIZE or limit == 1:
+                break
+            limit //= 2
+
+        await self._engine.send(onion_address=onion_address, payload=payload)
+
+        self._batches_sent += 1
+        self._changes_sent += len(changes)
+        self._bytes_sent += len(payload)
+
+    async def _apply_batch(
+        self, onion_address: str, device_uuid: str, frame: dict[str, Any]
+    ) -> None:
+        changes: list[SyncChange] = decode_sync_changes(frame=frame)
+
+        self._database.apply_changes(
+            device_uuid=self._device_uuid,
+            origin_device_uuid=device_uuid,
+            changes=changes,
+            cursor=frame["cursor"],
+        )
+        self._changes_applied += len(changes)
+        self._applied[device_uuid] = self._applied.get(device_uuid, 0) + len(changes)
+        self._batches[device_uuid] = self._batches.get(device_uuid, 0) + 1
+
+        # The next request acknowledges this batch
+        if frame.get("more"):
+            await self._request(onion_address=onion_address, device_uuid=device_uuid)
+            return
+
+        waiter: Optional[asyncio.Future[int]] = self._waiters.pop(device_uuid, None)
+        applied: int = self._applied.pop(device_uuid, 0)
+        self._batches.pop(device_uuid, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(applied)
+
+    def refresh_devices(self) -> None:
+        # Run after devices were linked, changed or removed
+        devices: list[DeviceData] = self._database.retrieve_devices() or []
+        self._devices = {device["onion_address"]: device["uuid"] for device in devices}
+        # Devices linked without a key can't prove who they are
+        self._keys = {
+            device["onion_address"]: str_to_byte(data=device["public_key"])
+            for device in devices
+            if device["public_key"]
+        }
+
+    def device_key(self, onion_address: str) -> Optional[bytes]:
+        """Get the public key a linked device has to prove when it connects.
+
+        Args:
+            self(DeviceSync): The DeviceSync instance.
+            onion_address(str): Onion address of the peer.
+
+        Returns:
+            Optional[bytes]: The key recorded on linking, None for other peers.
+        """
+        return self._keys.get(onion_address)
+
+    def handles(self, peer_address: str) -> bool:
+        # Frames of linked devices go here, frames of contacts to the inbound pipeline
+        return peer_address in self._devices
+
+    async def receive(self, peer_address: str, payload: bytes) -> None:
+        """Handle a sync frame of a linked device.
+
+        Args:
+            self(DeviceSync): The DeviceSync instance.
+            peer_address(str): Onion address of the sending device.
+            payload(bytes): The frame content.
+        """
+        device_uuid: Optional[str] = self._devices.get(peer_address)
+        if device_uuid is None or self.device_key(onion_address=peer_address) is None:
+            print(
+                f"Dropped sync frame from unknown or unverified device '{peer_address}'."
+            )
+            return
+
+        try:
+            frame: dict[str, Any] = decode_frame(payload=payload)
+
+            if frame["type"] == config.FRAME_TYPE_SYNC_REQUEST:
+                if not isinstance(frame.get("cursor"), int):
+                    raise ValueError("Sync request has no cursor!")
+
+                await self._send_batch(
+                    onion_address=peer_address, after_seq=frame["cursor"]
+                )
+            elif frame["type"] == config.FRAME_TYPE_SYNC_BATCH:
+                await self._apply_batch(
+                    onion_address=peer_address, device_uuid=device_uuid, frame=frame
+                )
+            else:
+                raise ValueError(f"Unknown frame type '{frame["type"]}'!")
+        except (ValueError, ConnectionError, sqlite3.Error) as e:
+            print(f"Sync with device '{device_uuid}' failed. Error: {e}")
+            self._fail(device_uuid=device_uuid, error=e)
+
+    async def sync(self, device_uuid: str) -> int:
+        """Fetch all changes of a device which weren't applied yet.
+
+        Args:
+            self(DeviceSync): The DeviceSync instance.
+            device_uuid(str): The uuid of the linked device.
+
+        Returns:
+            int: Amount of applied changes.
+
+        Raises:
+            ValueError: If the device isn't linked (with a key) or sent invalid changes.
+            ConnectionError: If the device can't be reached or stops answering.
+        """
+        onion_address: str = self._onion_address(device_uuid=device_uuid)
+        if self.device_key(onion_address=onion_address) is None:
+            raise ValueError(f"Device '{device_uuid}' was linked without a key!")
+
+        waiter: Optional[asyncio.Future[int]] = self._waiters.get(device_uuid)
+        if waiter is None:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[device_uuid] = waiter
+
+            try:
+                await self._request(
+                    onion_address=onion_address, device_uuid=device_uuid
+                )
+            except ConnectionError as e:
+                self._fail(device_uuid=device_uuid, error=e)
+
+        # Keep waiting as long as batches arrive
+        while True:
+            batches: int = self._batches.get(device_uuid, 0)
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(waiter), timeout=config.SYNC_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                if self._batches.get(device_uuid, 0) == batches:
+                    self._fail(
+                        device_uuid=device_uuid,
+                        error=ConnectionError(
+                            f"Device '{device_uuid}' stopped answering!"
+                        ),
+                    )
+
+    @property
+    def batches_sent(self) -> int:
+        return self._batches_sent
+
+    @property
+    def changes_sent(self) -> int:
+        return self._changes_sent
+
+    @property
+    def bytes_sent(self) -> int:
+        return self._bytes_sent
+
+    @property
+    def changes_applied(self) -> int:
+        return self._changes_applied
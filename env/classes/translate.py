@@ -1,35 +1,125 @@
-from typing import Any
-
-import i18n  # type: ignore[import-untyped]
+import weakref
+from typing import Any, Optional, TypeVar
 
+from env.classes.settings import SettingsSnapshot
 from env.classes.storages import Storages
 from env.config import config
+from env.func.locales import load_catalog
+from env.typing.translations import TranslationBinding, TranslationCatalog
+
+T = TypeVar("T")
+
+
+class _Placeholders(dict[str, Any]):
+    # Keep unknown placeholders in the text like python-i18n does
+    def __missing__(self, key: str) -> str:
+        return f"%{{{key}}}"
 
 
 class Translator:
     def __init__(self, storages: Storages) -> None:
         self._storages: Storages = storages
 
-        # Set up i18n
-        i18n.load_path.append(config.FOLDER_LANGUAGES)  # type: ignore
-        i18n.set(key="filename_format", value="{namespace}.{format}")  # type: ignore
-        i18n.set(  # type: ignore
-            key="locale",
-            value=self._storages.client_storage.get(
-                key=config.CS_LANGUAGE, default=config.LANGUAGE_DEFAULT
-            ),
+        # Load all translations once
+        self._catalog: TranslationCatalog = load_catalog()
+
+        # Set up lookup tables for the chosen language
+        self._locale: str
+        self._texts: dict[str, str]
+        self._templates: dict[str, str]
+        self._set_locale(locale=self._storages.settings.current.language)
+
+        # Controls showing translated texts: (id, attribute) -> binding
+        self._bindings: dict[tuple[int, str], TranslationBinding] = {}
+
+        # Follow language changes
+        self._storages.settings.subscribe(
+            callback=self._on_language_change,
+            fields=["language"],
         )
-        i18n.set(key="available_locales", value=config.LANGUAGE_AVAILABLE_LOCALES)  # type: ignore
+
+    def _set_locale(self, locale: str) -> None:
+        self._locale = locale
+        self._texts = self._catalog["texts"].get(locale, {})
+        self._templates = self._catalog["templates"].get(locale, {})
+
+    def _on_language_change(self, old: SettingsSnapshot, new: SettingsSnapshot) -> None:
+        self._set_locale(locale=new.language)
+        self._apply_bindings()
+
+    def _apply_bindings(self) -> None:
+        for binding_id, binding in list(self._bindings.items()):
+            target: Optional[Any] = binding["target"]()
+
+            # Forget controls which don't exist anymore
+            if target is None:
+                del self._bindings[binding_id]
+                continue
+
+            setattr(
+                target,
+                binding_id[1],
+                self.t(key=binding["key"], **binding["kwargs"]),
+            )
 
     def change_language(self, new_language: str) -> None:
-        self._storages.client_storage.set(
-            key=config.CS_LANGUAGE,
-            value=new_language,
-        )
+        """Switch the language and update all bound controls.
+
+        The controls are only changed, call 'page.update()' once afterwards
+        to send all changed texts to the client in one batch.
+
+        Args:
+            new_language(str): The locale to switch to.
+        """
+        self._storages.settings.update(language=new_language)
 
     def t(self, key: str, **kwargs: Any) -> str:
-        return i18n.t(key, **kwargs)  # type: ignore
+        # Plain texts don't need any formatting
+        text: Optional[str] = self._texts.get(key)
+        if text is not None:
+            return text
+
+        template: Optional[str] = self._templates.get(key)
+        if template is None:
+            # Return the key itself if there is no translation
+            return key
+
+        return template.format_map(_Placeholders(kwargs))
+
+    def bind(self, target: T, key: str, attribute: str = "value", **kwargs: Any) -> T:
+        """Set a translated text and keep it updated on language changes.
+
+        Args:
+            target(T): Control (or widget) to set the text on.
+            key(str): Translation key.
+            attribute(str): Attribute of the target holding the text.
+            **kwargs(Any): Placeholder values for the translation.
+
+        Returns:
+            T: The given target to allow inline use.
+        """
+        setattr(target, attribute, self.t(key=key, **kwargs))
+
+        binding_id: tuple[int, str] = (id(target), attribute)
+
+        def forget(reference: weakref.ref[Any]) -> None:
+            # The control is gone, unless its id was reused for a newer binding
+            binding: Optional[TranslationBinding] = self._bindings.get(binding_id)
+            if binding is not None and binding["target"] is reference:
+                del self._bindings[binding_id]
+
+        self._bindings[binding_id] = {
+            "target": weakref.ref(target, forget),
+            "key": key,
+            "kwargs": kwargs,
+        }
+
+        return target
 
     @property
     def available_locales(self) -> list[str]:
-        return i18n.get(key="available_locales")  # type: ignore
+        return config.LANGUAGE_AVAILABLE_LOCALES
+
+    @property
+    def locale(self) -> str:
+        return self._locale
@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from env.config import config
+from env.typing.transport import ConnectionHandler
+
+
+class Transport(ABC):
+    """Opens streams to onion addresses and accepts streams for our own address."""
+
+    @abstractmethod
+    async def connect(
+        self, onion_address: str
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Open a stream to the given onion address.
+
+        Args:
+            onion_address(str): The address of the peer.
+
+        Returns:
+            tuple[asyncio.StreamReader, asyncio.StreamWriter]: The opened stream.
+
+        Raises:
+            ConnectionError: If the peer can't be reached.
+        """
+
+    @abstractmethod
+    async def serve(
+        self, onion_address: str, handler: ConnectionHandler
+    ) -> asyncio.AbstractServer:
+        """Accept streams sent to our own onion address.
+
+        Args:
+            onion_address(str): Our own address.
+            handler(ConnectionHandler): Coroutine run for every incoming stream.
+
+        Returns:
+            asyncio.AbstractServer: The running server.
+        """
+
+
+class TorTransport(Transport):
+    def __init__(
+        self,
+        socks_host: str = config.TOR_SOCKS_HOST,
+        socks_port: int = config.TOR_SOCKS_PORT,
+        onion_port: int = config.PEER_ONION_PORT,
+        local_port: int = config.PEER_LOCAL_PORT,
+    ) -> None:
+        """Reach peers through the SOCKS5 proxy of a running Tor client.
+
+        The onion service of our own address has to forward 'onion_port' to
+        '127.0.0.1:local_port' (configured in the torrc).
+
+        Args:
+            self(TorTransport): The TorTransport instance.
+            socks_host(str): Host of the Tor SOCKS proxy.
+            socks_port(int): Port of the Tor SOCKS proxy.
+            onion_port(int): Port of the onion services of peers.
+            local_port(int): Local port our onion service forwards to.
+
+        Returns:
+            None: No return value.
+        """
+        self._socks_host: str = socks_host
+        self._socks_port: int = socks_port
+        self._onion_port: int = onion_port
+        self._local_port: int = local_port
+
+    async def _socks_connect(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        onion_address: str,
+    ) -> None:
+        # Greeting: SOCKS5, one method, no authentication
+        writer.write(b"\x05\x01\x00")
+        await writer.drain()
+        if await reader.readexactly(2) != b"\x05\x00":
+            raise ConnectionError("Tor SOCKS proxy refused the connection!")
+
+        # Connect by domain name, Tor resolves the onion address itself
+        host: bytes = onion_address.encode(config.ENCODING)
+        writer.write(
+            b"\x05\x01\x00\x03"
+            + bytes((len(host),))
+            + host
+            + self._onion_port.to_bytes(2, "big")
+        )
+        await writer.drain()
+
+        version, status, _, address_type = await reader.readexactly(4)
+        if version != 5 or status != 0:
+            raise ConnectionError(
+                f"Tor couldn't connect to '{onion_address}' (SOCKS status {status})!"
+            )
+
+        # Skip bound address and port
+        if address_type == 1:
+            await reader.readexactly(4 + 2)
+        elif address_type == 4:
+            await reader.readexactly(16 + 2)
+        else:
+            await reader.readexactly((await reader.readexactly(1))[0] + 2)
+
+    async def connect(
+        self, onion_address: str
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(
+            host=self._socks_host, port=self._socks_port
+        )
+
+        try:
+            await self._socks_connect(
+                reader=reader, writer=writer, onion_address=onion_address
+            )
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            writer.close()
+            raise ConnectionError(f"Could not reach '{onion_address}'!") from e
+
+        return reader, writer
+
+    async def serve(
+        self, onion_address: str, handler: ConnectionHandler
+    ) -> asyncio.AbstractServer:
+        # Tor forwards the onion service to this local port
+        return await asyncio.start_server(
+            client_connected_cb=handler,
+            host="127.0.0.1",
+            port=self._local_port,
+            backlog=config.PEER_LISTEN_BACKLOG,
+        )
+
+
+class LoopbackTransport(Transport):
+    def __init__(self, host: str = "127.0.0.1") -> None:
+        """Stand-in for Tor which connects peers over local TCP ports.
+
+        All peers have to share one instance to find each other.
+
+        Args:
+            self(LoopbackTransport): The LoopbackTransport instance.
+            host(str): Host to listen on.
+
+        Returns:
+            None: No return value.
+        """
+        self._host: str = host
+
+        # Onion address -> local port
+        self._ports: dict[str, int] = {}
+
+    async def connect(
+        self, onion_address: str
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        port: Optional[int] = self._ports.get(onion_address)
+        if port is None:
+            raise ConnectionError(f"No peer is serving '{onion_address}'!")
+
+        return await asyncio.open_connection(host=self._host, port=port)
+
+    async def serve(
+        self, onion_address: str, handler: ConnectionHandler
+    ) -> asyncio.AbstractServer:
+        # Let the system choose a free port
+        server: asyncio.AbstractServer = await asyncio.start_server(
+            client_connected_cb=handler,
+            host=self._host,
+            port=0,
+            backlog=config.PEER_LISTEN_BACKLOG,
+        )
+        self._ports[onion_address] = server.sockets[0].getsockname()[1]
+
+        return server
+
+
+class UnixSocketTransport(Transport):
+    def __init__(self, folder: str) -> None:
+        """Stand-in for Tor which connects peers over Unix sockets in a folder.
+
+        Args:
+            self(UnixSocketTransport): The UnixSocketTransport instance.
+            folder(str): Folder holding one socket file per onion address.
+
+        Returns:
+            None: No return value.
+        """
+        self._folder: str = folder
+
+    def _socket_path(self, onion_address: str) -> str:
+        # Onion addresses are too long for the socket path limit, use a hash instead
+        name: str = hashlib.sha256(onion_address.encode(config.ENCODING)).hexdigest()
+        return os.path.join(self._folder, f"{name[:16]}.sock")
+
+    async def connect(
+        self, onion_address: str
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        try:
+            return await asyncio.open_unix_connection(
+                path=self._socket_path(onion_address=onion_address)
+            )
+        except FileNotFoundError as e:
+            raise ConnectionError(f"No peer is serving '{onion_address}'!") from e
+
+    async def serve(
+        self, onion_address: str, handler: ConnectionHandler
+    ) -> asyncio.AbstractServer:
+        path: str = self._socket_path(onion_address=onion_address)
+
+        # Remove socket file of a previous run
+        if os.path.exists(path):
+            os.remove(path)
+
+        return await asyncio.start_unix_server(
+            client_connected_cb=handler,
+            path=path,
+            backlog=config.PEER_LISTEN_BACKLOG,
+        )
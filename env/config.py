@@ -34,7 +34,9 @@ class Config:
     CS_SHAKE_DETECTION_THRESHOLD_GRAVITY: str = "shake-detection-threshold-gravity"
     CS_LOGOUT_ON_TOP_BAR_LABEL_CLICK: str = "logout-on-top-bar-label-click"
     CS_LANGUAGE: str = "language"
-    SS_USER_SESSION_KEY: str = "session-key"
+    CS_DEVICE_UUID: str = "device-uuid"
+    CS_DATA_KEYS: str = "data-keys"
+    CS_PASSWORD_CHANGE: str = "password-change"  # New salt, hash and data keys until all of them are stored
 
     # Settings for Argon2
     ARGON2_MEMORY_COST: int = 65536  # 64 MB
@@ -63,11 +65,31 @@ class Config:
     ROUTE_SETTINGS: str = "/settings"
     ROUTE_CALIBRATIONS: str = "/calibrations"
 
+    # Router settings
+    ROUTER_KEEP_ALIVE: bool = True  # Keep visited pages mounted instead of rebuilding them
+    ROUTER_KEEP_ALIVE_MAX: int = 3  # Max amount of hidden pages kept mounted
+
     # Encoding settings
     ENCODING: str = "UTF-8"
 
     # Database settings
     DATABASE_FILE: str = "data.db"
+    DECRYPT_CACHE_MAX_BYTES: int = 8 * 1024 * 1024  # Decrypted columns kept in memory per session
+    DECRYPT_CACHE_TAG_LENGTH: int = 44  # Start of the ciphertext (base64 of the salt or IV) checked on hits
+    KEY_ROTATION_CHUNK_SIZE: int = 500  # Rows encrypted again per transaction
+    KEY_ROTATION_PAUSE: float = 0.05  # Seconds between chunks, keeps the database free for the UI
+
+    # Attachment settings (stored once per content as encrypted files in the app storage)
+    ATTACHMENTS_FOLDER: str = "attachments"
+    ATTACHMENT_MAGIC: bytes = b"CXAT"  # First bytes of every encrypted file
+    ATTACHMENT_FORMAT_VERSION: int = 1  # Increase when the layout changes
+    ATTACHMENT_CHUNK_SIZE: int = 64 * 1024  # Plaintext bytes per encrypted chunk
+    ATTACHMENT_NONCE_PREFIX_LENGTH: int = 7  # Random part of the chunk nonces (per file)
+    ATTACHMENT_KEY_LENGTH: int = 32  # Random key per file, stored encrypted in the database
+    ATTACHMENT_ADDRESS_INFO: bytes = b"attachment-address-key"  # Derives the key of the content addresses (HMAC) from the data key
+    ATTACHMENT_GC_INTERVAL: float = 10 * 60  # Seconds between removing files no attachment uses anymore
+    ATTACHMENT_GC_CHUNK_SIZE: int = 200  # Unused files removed per transaction
+    ATTACHMENT_TEMPORARY_FILE_AGE: float = 60 * 60  # Unfinished and unreferenced files older than this (seconds) are removed
 
     # Advanced security settings
     LOGOUT_ON_LOST_FOCUS_DEFAULT: bool = False
@@ -81,6 +103,71 @@ class Config:
     COLOR_ONLINE: ft.ColorValue = ft.Colors.GREEN
     COLOR_OFFLINE: ft.ColorValue = ft.Colors.RED_400
 
+    # Peer transport settings
+    PEER_MAX_FRAME_SIZE: int = 16 * 1024 * 1024  # Max size of one frame in bytes
+    PEER_SEND_QUEUE_SIZE: int = 1024  # Frames waiting per peer before 'send()' blocks
+    PEER_WRITE_BATCH_SIZE: int = 64  # Frames written before waiting for the socket
+    PEER_CONNECT_TIMEOUT: float = 60.0  # Tor needs a while to build circuits
+    PEER_HELLO_TIMEOUT: float = 30.0  # Time for an incoming peer to introduce itself and answer the challenge
+    PEER_CHALLENGE_SIZE: int = 32  # Random bytes an incoming peer has to sign
+    PEER_AUTH_CONTEXT: bytes = b"chatlex-peer-auth-v1"  # Signed with the challenge, so the signature isn't valid anywhere else
+    PEER_LISTEN_BACKLOG: int = 1024  # Incoming streams waiting to be accepted
+    PEER_ONION_PORT: int = 7777  # Port of the onion service
+    PEER_LOCAL_PORT: int = 7777  # Local port the onion service forwards to
+    TOR_SOCKS_HOST: str = "127.0.0.1"
+    TOR_SOCKS_PORT: int = 9050
+
+    # Outbox settings (messages waiting to be sent to contacts)
+    OUTBOX_BATCH_SIZE: int = 100  # Queued messages coalesced into one frame
+    OUTBOX_MAX_CONCURRENT_SENDS: int = 32  # Contacts flushed at the same time
+    OUTBOX_RETRY_BASE_DELAY: float = 5.0  # Delay after the first failed attempt
+    OUTBOX_RETRY_MAX_DELAY: float = 15 * 60.0  # Upper limit of the retry delay
+    OUTBOX_ACK_TIMEOUT: float = 120.0  # Sent messages are sent again if the contact doesn't confirm them in time
+
+    # Inbound settings (received messages on their way to the database)
+    INBOUND_QUEUE_SIZE: int = 256  # Frames waiting per stage before peers are slowed down
+    INBOUND_BATCH_SIZE: int = 512  # Messages encrypted and written together
+    INBOUND_NOTIFY_INTERVAL: float = 0.25  # Min seconds between UI notifications
+
+    # Presence settings (online indicator of contacts)
+    PRESENCE_PROBE_TIMEOUT: float = 30.0  # Time to reach the onion service of a contact
+    PRESENCE_MAX_CONCURRENT_PROBES: int = 8  # Every probe builds a Tor circuit
+    PRESENCE_CACHE_TTL: float = 20.0  # Probe results are reused for this many seconds
+    PRESENCE_NOTIFY_INTERVAL: float = 1.0  # Min seconds between UI updates
+    # (Seconds since the last activity, probe interval) from recent to dormant contacts
+    PRESENCE_INTERVALS: tuple[tuple[float, float], ...] = (
+        (15 * 60.0, 30.0),
+        (24 * 3600.0, 5 * 60.0),
+    )
+    PRESENCE_INTERVAL_DORMANT: float = 30 * 60.0
+
+    # Device sync settings
+    SYNC_BATCH_SIZE: int = 500  # Change log entries read per frame
+    SYNC_COMPRESSION_LEVEL: int = 6  # zlib level of the changes in a frame
+    SYNC_MAX_BATCH_SIZE: int = 64 * 1024 * 1024  # Max decompressed size of a batch
+    SYNC_TIMEOUT: float = 120.0  # Max seconds to wait for the next batch
+
+    # Signature verification settings
+    SIGNING_VERIFY_KEY_CACHE_SIZE: int = 1024  # Parsed public keys kept in memory
+    SIGNING_RESULT_CACHE_SIZE: int = 4096  # Valid signatures kept until they expire
+    SIGNING_VERIFY_WORKERS: int = 4  # Threads verifying signatures (libsodium releases the GIL)
+    SIGNING_PARALLEL_MIN_BATCH: int = 64  # Smaller batches are verified on the calling thread
+    SIGNING_KEY_LENGTH: int = 32  # Length of the raw Ed25519 private key (seed)
+
+    # Signed identity (binary format of signed onion IDs)
+    IDENTITY_MAGIC: bytes = b"CXID"  # First bytes of every record
+    IDENTITY_FORMAT_VERSION: int = 1  # Increase when the layout changes
+    IDENTITY_OWNER_SELF: str = "self"  # Owner of our own ID in the identities table
+    IDENTITY_EXPIRY_DAYS: int = 30  # Days our own ID is valid after signing
+    IDENTITY_RESIGN_BEFORE: int = 3 * 86400  # Sign our own ID again this many seconds before it expires
+    IDENTITY_SWEEP_MAX_SLEEP: float = 3600.0  # Max seconds between sweeps (the wall clock may jump)
+
+    # Frame types (value of the 'type' field of a frame)
+    FRAME_TYPE_MESSAGES: str = "messages"
+    FRAME_TYPE_ACK: str = "ack"  # Confirms stored messages (by the message ids of the sender)
+    FRAME_TYPE_SYNC_REQUEST: str = "sync_request"
+    FRAME_TYPE_SYNC_BATCH: str = "sync_batch"
+
     # Shake settings (for logout)
     SHAKE_DETECTION_THRESHOLD_GRAVITY_DEFAULT: float = (
         2.0  # How strong the phone has to be shaken to trigger logout function
@@ -96,6 +183,7 @@ class Config:
     APPEARANCE_COLOR_SEED_DEFAULT: ft.ColorValue = "#800080"  # Purple
     APPEARANCE_FONT_FAMILY_DEFAULT: str = "varela-round"
     APPEARANCE_FONT_SIZE_DEFAULT: int = 20
+    THEME_CACHE_SIZE: int = 16  # Themes per (color seed, font, size, brightness) kept in memory
 
     # Color picker settings
     COLOR_PICKER_AMOUNT_COLORS: int = (
@@ -104,31 +192,40 @@ class Config:
     COLOR_PICKER_BUTTON_SIZE: int = 20
     COLOR_PICKER_BUTTON_SPACING: int = 10
 
-    # Fonts
-    # TODO: Only define folder and dynamically load fonts
-    FONT_FAMILIES_LOCAL: dict[str, str] = {
-        "varela-round": "fonts/varela_round.ttf",
-        "baloo-bhaijaan-semibold": "fonts/baloo_bhaijaan_semibold.ttf",
-        "baloo-bhaijaan": "fonts/baloo_bhaijaan_regular.ttf",
-        "dosis-semibold": "fonts/dosis_semibold.ttf",
-    }
+    # Fonts ('fonts/<name>.ttf' becomes the font family '<name>' with '_' replaced by '-')
+    FONT_FILE_EXTENSIONS: tuple[str, ...] = (".ttf", ".otf")
+    FONT_REGULAR_SUFFIX: str = "_regular"  # Left out of the font family name
 
     # Font settings
     FONT_SIZE_MIN: int = 10
     FONT_SIZE_MAX: int = 30
 
+    # Custom markdown settings
+    MARKDOWN_PARSE_CACHE_SIZE: int = 256  # Parsed texts kept in memory
+    MARKDOWN_STYLE_CACHE_SIZE: int = 128  # Distinct text styles kept in memory
+
     # Files
     FILE_ENCRYPTION_PRIVATE_KEY: str = "master_key_priv.txt"
     FILE_ENCRYPTION_PUBLIC_KEY: str = "master_key_publ.txt"
     FILE_ENCRYPTION_SIGNED_ONION_DATA: str = "singed_onion_data.json"
+    FILE_ENCRYPTION_SIGNED_IDENTITY: str = "signed_identity.bin"
+    FILE_STARTUP_PROFILE: str = "startup_profile.json"
+
+    # Startup profiling (enable with the 'CHATLEX_PROFILE_STARTUP' environment variable)
+    STARTUP_IMPORT_BUDGET_MS: float = 1500.0  # Max time all imports may take on startup
 
     # Folder settings
     FOLDER_LANGUAGES: str = "locales"
+    FOLDER_FONTS: str = "fonts"
+
+    # Precompiled translations (generate with 'python -m env.func.locales')
+    FILE_LANGUAGE_CATALOG: str = "env/locales_catalog.py"
 
     # Language settings
     LANGUAGE_NOT_PROVIDED: str = "LANG_NOT_PROVIDED"
     LANGUAGE_NO_STATES_PROVIDED: str = "LANG_STATES_NOT_PROVIDED"
     LANGUAGE_DEFAULT: str = "de"
+    LANGUAGE_FALLBACK: str = "en"  # Used for keys missing in the chosen language
     LANGUAGE_AVAILABLE_LOCALES: list[str] = ["de", "en"]
 
 
@@ -1,8 +1,14 @@
 import time
-
-from argon2 import PasswordHasher
+from typing import TYPE_CHECKING
 
 from env.config import config
+from env.func.lazy_imports import lazy_import
+
+if TYPE_CHECKING:
+    import argon2
+else:
+    # Argon2 is only needed when hashing, don't load it on startup
+    argon2 = lazy_import("argon2")
 
 
 # trunk-ignore(bandit/B107)
@@ -35,7 +41,7 @@ def calibrate_argon2_time_cost(
     """
     for time_cost in range(1, max_time_cost + 1):
         # Initialize password hasher
-        ph = PasswordHasher(
+        ph = argon2.PasswordHasher(
             time_cost=time_cost,
             memory_cost=memory_cost,
             parallelism=parallelism,
@@ -0,0 +1,119 @@
+from typing import Optional
+
+from env.classes.hashing import ArgonHasher
+from env.classes.key_ring import KeyRing
+from env.classes.storages import Storages
+from env.config import config
+from env.func.converter import byte_to_str
+from env.func.generations import generate_salt
+from env.typing.keys import PasswordChange, WrappedDataKeys
+
+
+def save_key_ring(storages: Storages, key_ring: KeyRing) -> None:
+    storages.client_storage.set(key=config.CS_DATA_KEYS, value=key_ring.wrap())
+
+
+def load_key_ring(storages: Storages, password_key: bytes) -> KeyRing:
+    """Unwrap the data keys with the key derived from the password (once per login).
+
+    Data stored before the data keys existed is encrypted with the password
+    key itself, so it becomes data key version 0. New data keys (one per
+    purpose) are created if the current version still is a single key, the
+    older rows stay readable until a 'KeyRotation' encrypted them again.
+
+    Args:
+        storages(Storages): Storages holding the wrapped data keys.
+        password_key(bytes): Key derived from the password.
+
+    Returns:
+        KeyRing: The unlocked data keys.
+
+    Raises:
+        ValueError: If the data keys can't be unwrapped with this key.
+    """
+    wrapped: Optional[WrappedDataKeys] = storages.client_storage.get(
+        key=config.CS_DATA_KEYS, default=None
+    )
+
+    key_ring: KeyRing = (
+        KeyRing.unwrap(password_key=password_key, wrapped=wrapped)
+        if wrapped is not None
+        else KeyRing(
+            keys={0: password_key}, current_version=0, password_key=password_key
+        )
+    )
+
+    if not key_ring.has_purpose_keys:
+        key_ring.add_version()
+        save_key_ring(storages=storages, key_ring=key_ring)
+
+    return key_ring
+
+
+def finish_password_change(storages: Storages) -> None:
+    """Store the values of a password change which was interrupted (e.g. by a crash).
+
+    Run before the password hash, salt or data keys are read.
+
+    Args:
+        storages(Storages): Storages holding the password hash and data keys.
+    """
+    change: Optional[PasswordChange] = storages.client_storage.get(
+        key=config.CS_PASSWORD_CHANGE, default=None
+    )
+    if change is None:
+        return
+
+    storages.client_storage.set(key=config.CS_DATA_KEYS, value=change["data_keys"])
+    storages.client_storage.set(key=config.CS_USER_SALT, value=change["salt"])
+    storages.client_storage.set(
+        key=config.CS_USER_PASSWORD_HASH, value=change["password_hash"]
+    )
+
+    # Only now, an interruption above just repeats the same writes
+    storages.client_storage.remove(key=config.CS_PASSWORD_CHANGE)
+
+
+def change_password(
+    storages: Storages, key_ring: KeyRing, old_password: str, new_password: str
+) -> bool:
+    """Change the password without encrypting the data again.
+
+    Only the data keys are wrapped with the new password key. Start a key
+    rotation afterwards to stop using the data keys known to the old password.
+    The new values are stored together first, so an interrupted change is
+    finished by 'finish_password_change()' instead of leaving a mix of both.
+
+    Args:
+        storages(Storages): Storages holding the password hash and data keys.
+        key_ring(KeyRing): The unlocked data keys.
+        old_password(str): The current password.
+        new_password(str): The new password.
+
+    Returns:
+        bool: True if the password was changed, False if the old password is wrong.
+    """
+    argon_hasher: ArgonHasher = ArgonHasher(storages=storages)
+    password_hash: Optional[str] = storages.client_storage.get(
+        key=config.CS_USER_PASSWORD_HASH
+    )
+
+    if not password_hash or not argon_hasher.verify_password(
+        hash=password_hash, password=old_password
+    ):
+        return False
+
+    # Hash and derive first (slow), nothing is stored until everything is ready
+    salt: bytes = generate_salt(length=config.SALT_LENGTH)
+    new_password_hash: str = argon_hasher.hash_password(password=new_password)
+    password_key: bytes = argon_hasher.derive_key(password=new_password, salt=salt)
+    key_ring.set_password_key(password_key=password_key)
+
+    change: PasswordChange = {
+        "salt": byte_to_str(salt),
+        "password_hash": new_password_hash,
+        "data_keys": key_ring.wrap(),
+    }
+    storages.client_storage.set(key=config.CS_PASSWORD_CHANGE, value=change)
+    finish_password_change(storages=storages)
+    return True
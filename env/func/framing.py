@@ -0,0 +1,61 @@
+import asyncio
+import struct
+
+from env.config import config
+
+# Every frame starts with the payload length as unsigned 32 bit big endian int
+_LENGTH_PREFIX: struct.Struct = struct.Struct("!I")
+FRAME_HEADER_SIZE: int = _LENGTH_PREFIX.size
+
+
+def write_frame(
+    writer: asyncio.StreamWriter,
+    payload: bytes,
+    max_size: int = config.PEER_MAX_FRAME_SIZE,
+) -> None:
+    """Buffer a length prefixed frame without copying the payload.
+
+    The frame is only buffered, await 'writer.drain()' to send it.
+
+    Args:
+        writer(asyncio.StreamWriter): The stream to write to.
+        payload(bytes): The frame content.
+        max_size(int): Max allowed payload size.
+
+    Raises:
+        ValueError: If the payload is too large.
+    """
+    if len(payload) > max_size:
+        raise ValueError(
+            f"Frame with {len(payload)} bytes exceeds the max size of {max_size} bytes!"
+        )
+
+    writer.writelines((_LENGTH_PREFIX.pack(len(payload)), payload))
+
+
+async def read_frame(
+    reader: asyncio.StreamReader,
+    max_size: int = config.PEER_MAX_FRAME_SIZE,
+) -> bytes:
+    """Read the next length prefixed frame.
+
+    Args:
+        reader(asyncio.StreamReader): The stream to read from.
+        max_size(int): Max allowed payload size.
+
+    Returns:
+        bytes: The frame content.
+
+    Raises:
+        asyncio.IncompleteReadError: If the stream ends (inside a frame).
+        ValueError: If the peer announces a frame which is too large.
+    """
+    (length,) = _LENGTH_PREFIX.unpack(await reader.readexactly(FRAME_HEADER_SIZE))
+
+    # Don't let a peer make us allocate huge buffers
+    if length > max_size:
+        raise ValueError(
+            f"Peer announced a frame with {length} bytes (max: {max_size} bytes)!"
+        )
+
+    return await reader.readexactly(length)
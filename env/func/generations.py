@@ -7,3 +7,7 @@ def generate_iv(length: int) -> bytes:
 
 def generate_salt(length: int) -> bytes:
     return token_bytes(length)
+
+
+def generate_key(length: int) -> bytes:
+    return token_bytes(length)
@@ -0,0 +1,33 @@
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return a module which is only executed on first attribute access.
+
+    Args:
+        name(str): Full name of the module to import (e.g. 'nacl.signing').
+
+    Returns:
+        ModuleType: The (not yet executed) module.
+
+    Raises:
+        ModuleNotFoundError: If the module can not be found.
+    """
+    # Return the module if it has already been imported
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    # Defer executing the module until it is actually used
+    loader: importlib.util.LazyLoader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module: ModuleType = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    return module
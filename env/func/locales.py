@@ -0,0 +1,195 @@
+import hashlib
+import os
+import re
+import sys
+from typing import TYPE_CHECKING, Any, Optional
+
+from env.classes.paths import paths
+from env.config import config
+from env.func.lazy_imports import lazy_import
+from env.typing.translations import TranslationCatalog
+
+if TYPE_CHECKING:
+    import yaml
+else:
+    # YAML is only needed if the catalog has to be compiled at runtime
+    yaml = lazy_import("yaml")
+
+# Matches '%{name}' placeholders and '%%' escapes (same syntax as python-i18n)
+_PLACEHOLDER_PATTERN: re.Pattern[str] = re.compile(r"%(?:\{(\w+)\}|%)")
+
+
+def _locale_files(folder: str) -> list[str]:
+    return sorted(
+        os.path.join(folder, file_name)
+        for file_name in os.listdir(folder)
+        if file_name.endswith((".yml", ".yaml"))
+    )
+
+
+def _flatten(prefix: str, data: Any, result: dict[str, str]) -> None:
+    if isinstance(data, dict):
+        for key, value in data.items():
+            _flatten(prefix=f"{prefix}.{key}", data=value, result=result)
+    elif isinstance(data, str):
+        result[prefix] = data
+
+
+def _to_template(text: str) -> Optional[str]:
+    """Convert '%{name}' placeholders into a 'str.format_map()' template.
+
+    Args:
+        text(str): The translated text.
+
+    Returns:
+        Optional[str]: The template or None if the text has no placeholders.
+    """
+    if "%" not in text or not _PLACEHOLDER_PATTERN.search(text):
+        return None
+
+    parts: list[str] = []
+    pos: int = 0
+    for match in _PLACEHOLDER_PATTERN.finditer(text):
+        # Escape braces in the literal text
+        parts.append(text[pos : match.start()].replace("{", "{{").replace("}", "}}"))
+        parts.append("%" if match.group(1) is None else f"{{{match.group(1)}}}")
+        pos = match.end()
+    parts.append(text[pos:].replace("{", "{{").replace("}", "}}"))
+
+    return "".join(parts)
+
+
+def locales_hash(folder: str = config.FOLDER_LANGUAGES) -> str:
+    """Hash the content of all locale files to detect outdated catalogs.
+
+    Args:
+        folder(str): Folder containing the locale files.
+
+    Returns:
+        str: The hex digest of all locale files.
+    """
+    sha256 = hashlib.sha256()
+
+    for file_path in _locale_files(folder=folder):
+        sha256.update(os.path.basename(file_path).encode(config.ENCODING))
+        with open(file_path, "rb") as file:
+            sha256.update(file.read())
+
+    return sha256.hexdigest()
+
+
+def compile_locales(folder: str = config.FOLDER_LANGUAGES) -> TranslationCatalog:
+    """Compile all locale files into flat per-locale lookup tables.
+
+    Args:
+        folder(str): Folder containing the locale files ('<namespace>.yml').
+
+    Returns:
+        TranslationCatalog: Plain texts and format templates per locale.
+    """
+    flat: dict[str, dict[str, str]] = {
+        locale: {} for locale in config.LANGUAGE_AVAILABLE_LOCALES
+    }
+
+    for file_path in _locale_files(folder=folder):
+        namespace: str = os.path.splitext(os.path.basename(file_path))[0]
+
+        with open(file_path, "r", encoding=config.ENCODING) as file:
+            data: Any = yaml.safe_load(file) or {}
+
+        for locale, translations in data.items():
+            _flatten(
+                prefix=namespace,
+                data=translations,
+                result=flat.setdefault(locale, {}),
+            )
+
+    # Fill missing keys from the fallback locale to make lookups a single dict hit
+    fallback: dict[str, str] = flat.get(config.LANGUAGE_FALLBACK, {})
+    for locale, translations in flat.items():
+        for key, text in fallback.items():
+            translations.setdefault(key, text)
+
+    catalog: TranslationCatalog = {
+        "source_hash": locales_hash(folder=folder),
+        "texts": {},
+        "templates": {},
+    }
+    for locale, translations in flat.items():
+        texts: dict[str, str] = {}
+        templates: dict[str, str] = {}
+
+        for key, text in translations.items():
+            template: Optional[str] = _to_template(text=text)
+            if template is None:
+                texts[sys.intern(key)] = text
+            else:
+                templates[sys.intern(key)] = template
+
+        catalog["texts"][locale] = texts
+        catalog["templates"][locale] = templates
+
+    return catalog
+
+
+def write_catalog_module(
+    catalog: TranslationCatalog,
+    module_path: str = config.FILE_LANGUAGE_CATALOG,
+) -> None:
+    """Write the compiled catalog as Python module to be loaded without parsing YAML.
+
+    Args:
+        catalog(TranslationCatalog): The compiled catalog.
+        module_path(str): File to write the module to.
+    """
+    with open(module_path, "w", encoding=config.ENCODING) as file:
+        file.write("# Generated by 'python -m env.func.locales'. Do not edit!\n")
+        file.write(f"CATALOG = {catalog!r}\n")
+
+
+def load_catalog(folder: Optional[str] = None) -> TranslationCatalog:
+    """Load the precompiled catalog or compile the locale files if it is outdated.
+
+    Args:
+        folder(Optional[str]): Folder of the locale files (next to the app by default).
+
+    Returns:
+        TranslationCatalog: The catalog matching the current locale files, an
+            empty one (the keys are shown) if neither the catalog nor the files exist.
+    """
+    if folder is None:
+        folder = paths.join_with_base_path(path=config.FOLDER_LANGUAGES)
+
+    source_hash: Optional[str] = (
+        locales_hash(folder=folder) if os.path.isdir(folder) else None
+    )
+
+    try:
+        # Imported by name, so PyInstaller ('flet pack') bundles the generated module
+        from env.locales_catalog import CATALOG  # type: ignore[import-not-found]
+
+        catalog: TranslationCatalog = CATALOG
+
+        # Use precompiled catalog if it matches the locale files (or no files are shipped)
+        if source_hash is None or catalog["source_hash"] == source_hash:
+            return catalog
+
+        print("Translation catalog is outdated. Compiling locale files...")
+    except ImportError:
+        if source_hash is None:
+            print("No translation catalog and no locale files found!")
+            return {"source_hash": "", "texts": {}, "templates": {}}
+
+        print("No translation catalog found. Compiling locale files...")
+
+    return compile_locales(folder=folder)
+
+
+if __name__ == "__main__":
+    write_catalog_module(
+        catalog=compile_locales(
+            folder=paths.join_with_base_path(path=config.FOLDER_LANGUAGES)
+        ),
+        module_path=paths.join_with_base_path(path=config.FILE_LANGUAGE_CATALOG),
+    )
+    print(f"Translation catalog written to '{config.FILE_LANGUAGE_CATALOG}'.")
@@ -1,17 +1,40 @@
-from typing import Optional
+from typing import Callable, Optional
 
 import flet as ft  # type: ignore[import-untyped]
 
+from env.classes.key_ring import session_keys
+from env.classes.keys import key_manager
+from env.classes.record_cache import record_cache
 from env.classes.router import AppRouter
 from env.classes.storages import Storages
 from env.config import config
 
+# Called on logout, e.g. to stop the background work of a page
+_logout_callbacks: list[Callable[[], None]] = []
+
+
+def on_logout(callback: Callable[[], None]) -> None:
+    _logout_callbacks.append(callback)
+
 
 def logout(router: AppRouter, storages: Storages) -> None:
     # Clear session data and redirect to login
     storages.session_storage.clear()
+    key_manager.wipe()
+    session_keys.wipe()
+    record_cache.wipe()
+
+    for callback in _logout_callbacks:
+        try:
+            callback()
+        except Exception as e:
+            print(f"Could not run logout callback. Error: {e}")
+
     router.go(route=config.ROUTE_LOGIN)
 
+    # Don't keep pages with decrypted data mounted in the background
+    router.clear_kept_alive()
+
 
 def logout_on_lost_focus(
     e: Optional[ft.AppLifecycleStateChangeEvent],
@@ -20,13 +43,7 @@ def logout_on_lost_focus(
     force: bool = False,
 ) -> None:
     # Skip logout if setting is not explicitly set to 'True'
-    if (
-        not storages.client_storage.get(
-            key=config.CS_LOGOUT_ON_LOST_FOCUS,
-            default=config.LOGOUT_ON_LOST_FOCUS_DEFAULT,
-        )
-        and not force
-    ):
+    if not storages.settings.current.logout_on_lost_focus and not force:
         return
 
     # Check if focus lost
@@ -0,0 +1,3 @@
+def wipe_bytes(data: bytearray) -> None:
+    # Overwrite keys and plaintexts in place, the memory isn't freed right away
+    data[:] = bytes(len(data))
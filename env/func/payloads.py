@@ -0,0 +1,198 @@
+import base64
+import json
+import zlib
+from typing import Any
+
+from env.config import config
+from env.typing.dicts import WireMessage
+from env.typing.sync import SyncChange
+
+
+def _encode_json(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode(
+        config.ENCODING
+    )
+
+
+def encode_messages(messages: list[WireMessage]) -> bytes:
+    """Encode messages as the payload of a single frame.
+
+    Args:
+        messages(list[WireMessage]): The messages to send.
+
+    Returns:
+        bytes: The frame payload.
+    """
+    return _encode_json({"type": config.FRAME_TYPE_MESSAGES, "messages": messages})
+
+
+def encode_ack(message_ids: list[int]) -> bytes:
+    """Confirm received messages after they were stored.
+
+    Args:
+        message_ids(list[int]): The message ids of the sender.
+
+    Returns:
+        bytes: The frame payload.
+    """
+    return _encode_json({"type": config.FRAME_TYPE_ACK, "ids": message_ids})
+
+
+def decode_frame(payload: bytes) -> dict[str, Any]:
+    """Decode a frame payload.
+
+    Args:
+        payload(bytes): The frame payload.
+
+    Returns:
+        dict[str, Any]: The frame with at least the 'type' field.
+
+    Raises:
+        ValueError: If the payload isn't a valid frame.
+    """
+    try:
+        frame: Any = json.loads(payload)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Frame isn't valid JSON!") from e
+
+    if not isinstance(frame, dict) or not isinstance(frame.get("type"), str):
+        raise ValueError("Frame has no type!")
+
+    return frame
+
+
+def decode_messages(frame: dict[str, Any]) -> list[WireMessage]:
+    """Get the messages of a decoded 'messages' frame.
+
+    Args:
+        frame(dict[str, Any]): The frame returned by 'decode_frame()'.
+
+    Returns:
+        list[WireMessage]: The messages of the frame.
+
+    Raises:
+        ValueError: If the frame contains invalid messages.
+    """
+    messages: Any = frame.get("messages")
+    if frame["type"] != config.FRAME_TYPE_MESSAGES or not isinstance(messages, list):
+        raise ValueError("Frame doesn't contain messages!")
+
+    for message in messages:
+        if (
+            not isinstance(message, dict)
+            or not isinstance(message.get("id"), int)
+            or not isinstance(message.get("message"), str)
+            or not isinstance(message.get("timestamp"), (int, float))
+        ):
+            raise ValueError("Frame contains an invalid message!")
+
+    return messages
+
+
+def decode_ack(frame: dict[str, Any]) -> list[int]:
+    """Get the confirmed message ids of a decoded 'ack' frame.
+
+    Args:
+        frame(dict[str, Any]): The frame returned by 'decode_frame()'.
+
+    Returns:
+        list[int]: The confirmed message ids.
+
+    Raises:
+        ValueError: If the frame contains invalid ids.
+    """
+    message_ids: Any = frame.get("ids")
+    if (
+        frame["type"] != config.FRAME_TYPE_ACK
+        or not isinstance(message_ids, list)
+        or not all(isinstance(message_id, int) for message_id in message_ids)
+    ):
+        raise ValueError("Frame doesn't contain message ids!")
+
+    return message_ids
+
+
+def encode_sync_request(cursor: int) -> bytes:
+    """Ask another device for its changes after the given sequence number.
+
+    The cursor also acknowledges all changes up to it.
+
+    Args:
+        cursor(int): Last sequence number applied from the device.
+
+    Returns:
+        bytes: The frame payload.
+    """
+    return _encode_json({"type": config.FRAME_TYPE_SYNC_REQUEST, "cursor": cursor})
+
+
+def encode_sync_batch(changes: list[SyncChange], cursor: int, more: bool) -> bytes:
+    """Encode a batch of changes with the changes compressed.
+
+    Args:
+        changes(list[SyncChange]): The changes.
+        cursor(int): Sequence number of the last change in the batch.
+        more(bool): If more changes follow.
+
+    Returns:
+        bytes: The frame payload.
+    """
+    compressed: bytes = zlib.compress(
+        _encode_json(changes), level=config.SYNC_COMPRESSION_LEVEL
+    )
+
+    return _encode_json(
+        {
+            "type": config.FRAME_TYPE_SYNC_BATCH,
+            "cursor": cursor,
+            "more": more,
+            "changes": base64.b64encode(compressed).decode(config.ENCODING),
+        }
+    )
+
+
+def decode_sync_changes(frame: dict[str, Any]) -> list[SyncChange]:
+    """Get the changes of a decoded 'sync_batch' frame.
+
+    Args:
+        frame(dict[str, Any]): The frame returned by 'decode_frame()'.
+
+    Returns:
+        list[SyncChange]: The changes of the frame.
+
+    Raises:
+        ValueError: If the frame contains invalid changes.
+    """
+    if frame["type"] != config.FRAME_TYPE_SYNC_BATCH or not isinstance(
+        frame.get("cursor"), int
+    ):
+        raise ValueError("Frame doesn't contain changes!")
+
+    try:
+        # Limit the decompressed size, small frames could expand to huge buffers
+        decompressor: zlib._Decompress = zlib.decompressobj()
+        data: bytes = decompressor.decompress(
+            base64.b64decode(frame["changes"], validate=True),
+            config.SYNC_MAX_BATCH_SIZE,
+        )
+        if decompressor.unconsumed_tail:
+            raise ValueError("Changes exceed the max size!")
+
+        changes: Any = json.loads(data)
+    except (KeyError, TypeError, ValueError, zlib.error) as e:
+        raise ValueError("Frame contains invalid changes!") from e
+
+    if not isinstance(changes, list):
+        raise ValueError("Frame contains invalid changes!")
+
+    for change in changes:
+        if (
+            not isinstance(change, dict)
+            or change.get("entity") not in ("contact", "message", "messages")
+            or change.get("operation") not in ("upsert", "delete")
+            or not isinstance(change.get("key"), str)
+            or not isinstance(change.get("data"), (dict, type(None)))
+        ):
+            raise ValueError("Frame contains an invalid change!")
+
+    return changes
@@ -1,85 +1,381 @@
+import bisect
+import functools
+import hashlib
 import re
-from typing import Any, Callable
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, Optional
 
 import flet as ft  # type: ignore[import-untyped]
 
+from env.config import config
+from env.typing.markdown import ParsedSpan, SpanBuilderState, StyleKey
+
+# Matches '{TAG}', '{TAG:value}' and '{/TAG}'
+_TAG_PATTERN: re.Pattern[str] = re.compile(r"\{(/?)([A-Z]+)(?::([^}]+))?\}")
+
+# Matches the start of a tag which may still be completed by appended text
+_PARTIAL_TAG_PATTERN: re.Pattern[str] = re.compile(r"\{/?[A-Z]*(?::[^}]*)?")
+
+# Tag name -> style of the tag (None if the tag is missing its value)
+_SUPPORTED_STYLES: dict[str, Callable[[Optional[str]], Optional[dict[str, Any]]]] = {
+    "COLOR": lambda val: {"color": val} if val else None,
+    "WEIGHT": lambda val: (
+        {"weight": getattr(ft.FontWeight, val.upper(), ft.FontWeight.NORMAL)}
+        if val
+        else None
+    ),
+    "UNDERLINE": lambda _: {"decoration": ft.TextDecoration.UNDERLINE},
+    "BG": lambda val: {"bgcolor": val} if val else None,
+}
+
+# Token kinds
+_TOKEN_TEXT: str = "text"
+_TOKEN_OPEN: str = "open"
+_TOKEN_CLOSE: str = "close"
+
+# Parsed texts (least recently used first)
+_parse_cache: OrderedDict[bytes, tuple[ParsedSpan, ...]] = OrderedDict()
+_parse_cache_lock: threading.Lock = threading.Lock()
 
-# TODO: Rewrite parser! (--> this thing is messed up as fuck)  --> Blame ChatGPT ;)
-def parse_custom_markdown(input_str: str) -> ft.Container:
-    supported_styles: dict[str, Callable[[str], dict[str, Any]]] = {
-        "COLOR": lambda val: {"color": val},
-        "WEIGHT": lambda val: {
-            "weight": getattr(ft.FontWeight, val.upper(), ft.FontWeight.NORMAL)
-        },
-        "UNDERLINE": lambda _: {"decoration": ft.TextDecoration.UNDERLINE},
-        "BG": lambda val: {"bgcolor": val},
-    }
-
-    active_styles: list[tuple[str, dict[str, Any]]] = []
-    text_spans: list[ft.TextSpan] = []
-    buffer: str = ""
-    tag_pattern = re.compile(r"\{(/?[A-Z]+)(?::([^}]+))?\}")
-    pos = 0
-
-    while pos < len(input_str):
-        match = tag_pattern.search(input_str, pos)
-        if not match:
-            buffer += input_str[pos:]
-            break
 
+def _tokenize(input_str: str) -> Iterator[tuple[str, str, Optional[str]]]:
+    """Split the input into text and tag tokens in a single pass.
+
+    Args:
+        input_str(str): The text to split.
+
+    Returns:
+        Iterator[tuple[str, str, Optional[str]]]: (kind, text or tag name, tag value) tokens.
+    """
+    pos: int = 0
+
+    for match in _TAG_PATTERN.finditer(input_str):
         start, end = match.span()
         if start > pos:
-            buffer += input_str[pos:start]
-
-        # Flush buffer into spans with correct styling
-        if buffer:
-            combined_style: dict[str, Any] = {}
-            for _, style_dict in active_styles:
-                combined_style.update(style_dict)
-            parts = buffer.split("\n")
-            for i, part in enumerate(parts):
-                if part:
-                    text_spans.append(
-                        ft.TextSpan(part, style=ft.TextStyle(**combined_style))
-                    )
-                if i < len(parts) - 1:
-                    text_spans.append(ft.TextSpan("\n"))
-            buffer = ""
-
-        tag_name = match.group(1)
-        tag_value = match.group(2)
-
-        if not tag_name.startswith("/"):
-            style_fn = supported_styles.get(tag_name)
-            if style_fn:
-                resolved = style_fn(tag_value)
-                active_styles.append((tag_name, resolved))
-        else:
-            key_to_close = tag_name[1:]
-            for i in range(len(active_styles) - 1, -1, -1):
-                style_key, _ = active_styles[i]
-                if style_key == key_to_close:
-                    del active_styles[i]
-                    break
+            yield _TOKEN_TEXT, input_str[pos:start], None
 
+        yield (
+            _TOKEN_CLOSE if match.group(1) else _TOKEN_OPEN,
+            match.group(2),
+            match.group(3),
+        )
         pos = end
 
-    # Final buffer flush
-    if buffer:
-        combined_style = {}
-        for _, style_dict in active_styles:
-            combined_style.update(style_dict)
-        parts = buffer.split("\n")
-        for i, part in enumerate(parts):
-            if part:
-                text_spans.append(
-                    ft.TextSpan(part, style=ft.TextStyle(**combined_style))
-                )
-            if i < len(parts) - 1:
-                text_spans.append(ft.TextSpan("\n"))
+    if pos < len(input_str):
+        yield _TOKEN_TEXT, input_str[pos:], None
+
+
+class _SpanBuilder:
+    def __init__(self) -> None:
+        self.spans: list[ParsedSpan] = []
+
+        # Open styles: (tag name, style of the tag, combined style up to the tag)
+        self._stack: list[tuple[str, dict[str, Any], dict[str, Any]]] = []
+
+        # Combined style of all open tags, only rebuilt if the stack changes
+        self._style_key: StyleKey = ()
+
+    def _push(self, name: str, style: dict[str, Any]) -> None:
+        parent: dict[str, Any] = self._stack[-1][2] if self._stack else {}
+        combined: dict[str, Any] = {**parent, **style}
+        self._stack.append((name, style, combined))
+
+    def save(self) -> SpanBuilderState:
+        # Stack entries are never changed, so copying the list is enough
+        return tuple(self._stack), self._style_key, len(self.spans)
+
+    def restore(self, state: SpanBuilderState) -> None:
+        stack, self._style_key, span_count = state
+        self._stack = list(stack)
+        del self.spans[span_count:]
+
+    def _update_style_key(self) -> None:
+        combined: dict[str, Any] = self._stack[-1][2] if self._stack else {}
+        self._style_key = tuple(sorted(combined.items(), key=lambda item: item[0]))
+
+    def open_tag(self, name: str, value: Optional[str]) -> None:
+        # Ignore unknown tags
+        style_fn: Optional[Callable[[Optional[str]], Optional[dict[str, Any]]]] = (
+            _SUPPORTED_STYLES.get(name)
+        )
+        if style_fn is None:
+            return
+
+        style: Optional[dict[str, Any]] = style_fn(value)
+        if style is None:
+            return
+
+        self._push(name=name, style=style)
+        self._update_style_key()
+
+    def close_tag(self, name: str) -> None:
+        # Close the most recently opened tag with this name
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] != name:
+                continue
+
+            # Tags opened after the closed one have to be combined again
+            reopened: list[tuple[str, dict[str, Any], dict[str, Any]]] = self._stack[
+                i + 1 :
+            ]
+            del self._stack[i:]
+            for tag_name, style, _ in reopened:
+                self._push(name=tag_name, style=style)
+
+            self._update_style_key()
+            return
+
+    def add_text(self, text: str) -> None:
+        # Line breaks are separate unstyled spans
+        lines: list[str] = text.split("\n")
+        for i, line in enumerate(lines):
+            if line:
+                self.spans.append((line, self._style_key))
+            if i < len(lines) - 1:
+                self.spans.append(("\n", None))
+
+    def feed(self, tokens: Iterator[tuple[str, str, Optional[str]]]) -> None:
+        for kind, text, value in tokens:
+            if kind == _TOKEN_TEXT:
+                self.add_text(text=text)
+            elif kind == _TOKEN_OPEN:
+                self.open_tag(name=text, value=value)
+            else:
+                self.close_tag(name=text)
+
+
+@functools.lru_cache(maxsize=config.MARKDOWN_STYLE_CACHE_SIZE)
+def _text_style(style_key: StyleKey) -> ft.TextStyle:
+    # Spans with the same combined style share one style object
+    return ft.TextStyle(**dict(style_key))
+
+
+def _content_hash(input_str: str) -> bytes:
+    return hashlib.blake2b(
+        input_str.encode(config.ENCODING, errors="surrogatepass"),
+        digest_size=16,
+    ).digest()
+
+
+def _build_text_spans(
+    spans: tuple[ParsedSpan, ...] | list[ParsedSpan],
+) -> list[ft.TextSpan]:
+    return [
+        (
+            ft.TextSpan(text)
+            if style_key is None
+            else ft.TextSpan(text, style=_text_style(style_key))
+        )
+        for text, style_key in spans
+    ]
+
+
+def parse_markdown_spans(input_str: str) -> tuple[ParsedSpan, ...]:
+    """Parse the custom markdown into spans of text and their style.
+
+    Results are cached by the hash of the input, so rendering the same text
+    again doesn't parse it again.
+
+    Args:
+        input_str(str): Text using '{TAG:value}...{/TAG}' markup.
+
+    Returns:
+        tuple[ParsedSpan, ...]: The text spans in order.
+    """
+    content_hash: bytes = _content_hash(input_str=input_str)
+
+    with _parse_cache_lock:
+        cached_spans: Optional[tuple[ParsedSpan, ...]] = _parse_cache.get(content_hash)
+        if cached_spans is not None:
+            _parse_cache.move_to_end(content_hash)
+            return cached_spans
+
+    builder: _SpanBuilder = _SpanBuilder()
+    builder.feed(tokens=_tokenize(input_str=input_str))
+    spans: tuple[ParsedSpan, ...] = tuple(builder.spans)
+
+    with _parse_cache_lock:
+        _parse_cache[content_hash] = spans
+        _parse_cache.move_to_end(content_hash)
+
+        # Remove least recently used texts
+        while len(_parse_cache) > config.MARKDOWN_PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+
+    return spans
+
+
+def clear_markdown_cache() -> None:
+    with _parse_cache_lock:
+        _parse_cache.clear()
+    _text_style.cache_clear()
 
+
+def parse_custom_markdown(input_str: str) -> ft.Container:
     return ft.Container(
-        content=ft.Text(spans=text_spans, selectable=True),
+        content=ft.Text(
+            spans=_build_text_spans(spans=parse_markdown_spans(input_str=input_str)),
+            selectable=True,
+        ),
         padding=10,
         border_radius=5,
     )
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    if b.startswith(a):
+        return len(a)
+
+    # Binary search to compare slices in C instead of chars in Python
+    low: int = 0
+    high: int = min(len(a), len(b))
+    while low < high:
+        middle: int = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+
+    return low
+
+
+class IncrementalMarkdownParser:
+    def __init__(self) -> None:
+        """Parse custom markdown which is typed or streamed piece by piece.
+
+        The parser remembers where it can resume (after each tag and line
+        break) together with the open styles at that point. Changed input is
+        only parsed from the last resume point before the change, so typing
+        at the end of a draft costs the same no matter how long it is.
+
+        Args:
+            self(IncrementalMarkdownParser): The IncrementalMarkdownParser instance.
+
+        Returns:
+            None: No return value.
+        """
+        self._text: str = ""
+        self._builder: _SpanBuilder = _SpanBuilder()
+
+        # Offsets where parsing can be resumed and the parser state there
+        self._checkpoint_offsets: list[int] = [0]
+        self._checkpoint_states: list[SpanBuilderState] = [self._builder.save()]
+
+    def _add_checkpoint(self, offset: int) -> None:
+        self._checkpoint_offsets.append(offset)
+        self._checkpoint_states.append(self._builder.save())
+
+    def _may_become_tag(self, start: int, end: int) -> bool:
+        # A '{' without '}' may still turn into a tag spanning over line breaks
+        brace: int = self._text.find("{", start, end)
+        while brace != -1:
+            if _PARTIAL_TAG_PATTERN.fullmatch(self._text, brace, end):
+                return True
+            brace = self._text.find("{", brace + 1, end)
+
+        return False
+
+    def _add_text(self, start: int, end: int) -> None:
+        # Line breaks are resume points unless an unfinished tag is before them
+        line_end: int = self._text.find("\n", start, end)
+        while line_end != -1:
+            self._builder.add_text(text=self._text[start : line_end + 1])
+            start = line_end + 1
+
+            if not self._may_become_tag(start=self._checkpoint_offsets[-1], end=start):
+                self._add_checkpoint(offset=start)
+
+            line_end = self._text.find("\n", start, end)
+
+        if start < end:
+            self._builder.add_text(text=self._text[start:end])
+
+    def _parse_from(self, offset: int) -> None:
+        pos: int = offset
+
+        for match in _TAG_PATTERN.finditer(self._text, offset):
+            start, end = match.span()
+            if start > pos:
+                self._add_text(start=pos, end=start)
+
+            if match.group(1):
+                self._builder.close_tag(name=match.group(2))
+            else:
+                self._builder.open_tag(name=match.group(2), value=match.group(3))
+
+            self._add_checkpoint(offset=end)
+            pos = end
+
+        if pos < len(self._text):
+            self._add_text(start=pos, end=len(self._text))
+
+    def update(self, input_str: str) -> tuple[int, list[ParsedSpan]]:
+        """Parse the new version of the text, reusing everything before the change.
+
+        Args:
+            self(IncrementalMarkdownParser): The IncrementalMarkdownParser instance.
+            input_str(str): The complete current text.
+
+        Returns:
+            tuple[int, list[ParsedSpan]]: Index of the first changed span and all spans from there on.
+        """
+        prefix_length: int = _common_prefix_length(a=self._text, b=input_str)
+
+        # Resume at the last point before the change
+        index: int = bisect.bisect_right(self._checkpoint_offsets, prefix_length) - 1
+        offset: int = self._checkpoint_offsets[index]
+        self._builder.restore(state=self._checkpoint_states[index])
+        del self._checkpoint_offsets[index + 1 :]
+        del self._checkpoint_states[index + 1 :]
+
+        first_changed: int = len(self._builder.spans)
+        self._text = input_str
+        self._parse_from(offset=offset)
+
+        return first_changed, self._builder.spans[first_changed:]
+
+    def append(self, input_str: str) -> tuple[int, list[ParsedSpan]]:
+        """Parse text added to the end (e.g. a streamed message).
+
+        Args:
+            self(IncrementalMarkdownParser): The IncrementalMarkdownParser instance.
+            input_str(str): The text to append.
+
+        Returns:
+            tuple[int, list[ParsedSpan]]: Index of the first changed span and all spans from there on.
+        """
+        return self.update(input_str=self._text + input_str)
+
+    def update_control(self, control: ft.Text, input_str: str) -> None:
+        """Replace only the changed spans of a text control.
+
+        The control isn't updated, call 'update()' afterwards.
+
+        Args:
+            self(IncrementalMarkdownParser): The IncrementalMarkdownParser instance.
+            control(ft.Text): Text control showing the parsed text.
+            input_str(str): The complete current text.
+
+        Returns:
+            None: No return value.
+        """
+        first_changed, spans = self.update(input_str=input_str)
+
+        if control.spans is None:
+            control.spans = []
+
+        # Keep the unchanged span controls, so only new ones are sent to the client
+        del control.spans[first_changed:]
+        control.spans.extend(_build_text_spans(spans=spans))
+
+    def reset(self) -> None:
+        self.update(input_str="")
+
+    @property
+    def spans(self) -> tuple[ParsedSpan, ...]:
+        return tuple(self._builder.spans)
+
+    @property
+    def text(self) -> str:
+        return self._text
@@ -22,10 +22,12 @@ class CalibrationsPage:
         self._storages: Storages = storages
 
         # Setup calibration UI elements
-        self._info_text: ft.Text = ft.Text(
-            value=self._translator.t(key="calibration_page.info_text.waiting"),
-            theme_style=ft.TextThemeStyle.HEADLINE_MEDIUM,
-            text_align=ft.TextAlign.CENTER,
+        self._info_text: ft.Text = self._translator.bind(
+            target=ft.Text(
+                theme_style=ft.TextThemeStyle.HEADLINE_MEDIUM,
+                text_align=ft.TextAlign.CENTER,
+            ),
+            key="calibration_page.info_text.waiting",
         )
         self._loading_indicator: ft.ProgressRing = ft.ProgressRing(
             width=80,
@@ -33,15 +35,17 @@ class CalibrationsPage:
             stroke_width=6,
             color=ft.Colors.PRIMARY,
         )
-        self._calibration_notice: ft.Text = ft.Text(
-            value=self._translator.t(key="calibration_page.calibration_notice"),
-            theme_style=ft.TextThemeStyle.BODY_LARGE,
-            text_align=ft.TextAlign.CENTER,
-            opacity=0.7,
+        self._calibration_notice: ft.Text = self._translator.bind(
+            target=ft.Text(
+                theme_style=ft.TextThemeStyle.BODY_LARGE,
+                text_align=ft.TextAlign.CENTER,
+                opacity=0.7,
+            ),
+            key="calibration_page.calibration_notice",
         )
 
     def _update_info(self, key: str) -> None:
-        self._info_text.value = self._translator.t(key=key)
+        self._translator.bind(target=self._info_text, key=key)
         self._info_text.update()
 
     def calibrate(self) -> None:
@@ -7,12 +7,14 @@ from env.app.widgets.contact import ContactWidget
 from env.app.widgets.container import MasterContainer
 from env.app.widgets.top_bars import TopBar
 from env.classes.database import SQLiteDatabase
-from env.classes.encryption import AES_256_GCM
+from env.classes.key_ring import KeyRing, session_keys
+from env.classes.presence import PresenceScheduler
 from env.classes.router import AppRouter
 from env.classes.storages import Storages
 from env.classes.translate import Translator
+from env.classes.transport import TorTransport
 from env.config import config
-from env.func.converter import str_to_byte
+from env.func.logout import on_logout
 from env.func.validations import is_valid_onion_address
 from env.typing.dicts import ContactData
 
@@ -40,16 +42,27 @@ class ContactsPage:
         # Contacts list
         # Use ReorderableListView to allow manual arrangement of contacts
         self._contacts_list: ft.ListView = ft.ListView(controls=[], expand=True)
+        self._contact_widgets: dict[str, ContactWidget] = {}
 
         # Buttons
-        self._add_user_button: ft.FloatingActionButton = ft.FloatingActionButton(
-            icon=ft.Icons.PERSON_ADD_ALT_1_ROUNDED,
-            tooltip=self._translator.t(key="contacts_page.add_user_button.tooltip"),
-            on_click=lambda _: self._open_contact_alert(),
+        self._add_user_button: ft.FloatingActionButton = self._translator.bind(
+            target=ft.FloatingActionButton(
+                icon=ft.Icons.PERSON_ADD_ALT_1_ROUNDED,
+                on_click=lambda _: self._open_contact_alert(),
+            ),
+            key="contacts_page.add_user_button.tooltip",
+            attribute="tooltip",
         )
 
-        # Define types for encryptor and database
-        self._aes_encryptor: AES_256_GCM
+        # Define types for data keys and database
+        self._key_ring: KeyRing
+
+        # Online state of the contacts, probed in the background after login
+        self._transport: TorTransport = TorTransport()
+        self._presence: PresenceScheduler = PresenceScheduler(
+            transport=self._transport, on_changes=self.apply_presence
+        )
+        on_logout(callback=self._stop_presence)
 
     def _on_add_contact_submit(
         self,
@@ -74,7 +87,7 @@ class ContactsPage:
             return
 
         # Initialize new database instance to avoid thread error
-        db: SQLiteDatabase = SQLiteDatabase(aes_encryptor=self._aes_encryptor)
+        db: SQLiteDatabase = SQLiteDatabase(aes_encryptor=self._key_ring)
 
         # Generate new random uuid
         contact_uuid: str = str(uuid.uuid4())
@@ -118,6 +131,9 @@ class ContactsPage:
         # Update page to apply changes
         self._page.update()  # type: ignore
 
+        # Probe the new contact as well
+        self._page.run_task(self._track_presence, [contact_data], set())
+
     def _open_contact_alert(self) -> None:
         # Create entries
         # TODO: Make description entry scrollable!
@@ -189,36 +205,37 @@ class ContactsPage:
             contact_data=contact_data,
             router=self._router,
             contacts_list=self._contacts_list,
-            aes_encryptor=self._aes_encryptor,
+            key_ring=self._key_ring,
         )
 
         # Add contact widget
         self._contacts_list.controls.append(contact_widget.build())
+        self._contact_widgets[contact_widget.contact_uuid] = contact_widget
 
-    def _initialize_aes_encryptor(self) -> None:
-        # Initialize AES_256_GCM encryptor
-        self._aes_encryptor = AES_256_GCM(
-            derived_key=str_to_byte(
-                data=self._storages.session_storage.get(key=config.SS_USER_SESSION_KEY)
-            ),
-        )
+    def _initialize_key_ring(self) -> None:
+        # Data keys were unwrapped on login
+        self._key_ring = session_keys.key_ring
 
     def _load_contacts(self) -> None:
         print("Loading contacts...")
 
         # Initialize a new database instance to avoid thread error
-        db: SQLiteDatabase = SQLiteDatabase(aes_encryptor=self._aes_encryptor)
+        db: SQLiteDatabase = SQLiteDatabase(aes_encryptor=self._key_ring)
+
+        # Contacts which were shown before (to stop probing deleted ones)
+        removed_uuids: set[str] = set(self._contact_widgets)
 
         # Empty contacts list to avoid duplicates
         self._contacts_list.controls.clear()
+        self._contact_widgets.clear()
 
         # Retrieve contacts
         contacts: Optional[list[ContactData]] = db.retrieve_contacts()
 
-        # Skip if no contacts
+        # Nothing to add, the emptied list still has to be sent to the client
         if contacts is None:
             print("No contacts found!")
-            return
+            contacts = []
 
         # Add contacts
         for contact_data in contacts:
@@ -227,8 +244,84 @@ class ContactsPage:
         # Update list view to apply changes
         self._contacts_list.update()
 
+        # Probe the contacts on the event loop of the page
+        removed_uuids.difference_update(self._contact_widgets)
+        self._page.run_task(self._track_presence, contacts, removed_uuids)
+
+    async def _track_presence(
+        self, contacts: list[ContactData], removed_uuids: set[str]
+    ) -> None:
+        """Start probing the given contacts and stop probing removed ones.
+
+        Args:
+            self(ContactsPage): The ContactsPage instance.
+            contacts(list[ContactData]): Contacts to probe.
+            removed_uuids(set[str]): Uuids of contacts which were deleted.
+
+        Returns:
+            None: No return value.
+        """
+        # Tasks of the scheduler need a running event loop
+        self._presence.start()
+
+        for contact_uuid in removed_uuids:
+            self._presence.untrack(contact_uuid=contact_uuid)
+
+        for contact_data in contacts:
+            self._presence.track(
+                contact_uuid=contact_data["contact_uuid"],
+                onion_address=contact_data["onion_address"],
+                last_active=contact_data["last_message_timestamp"],
+            )
+
+        # Rebuilt widgets start offline, show the results which are still fresh
+        self.apply_presence(
+            changes={
+                contact_data["contact_uuid"]: True
+                for contact_data in contacts
+                if self._presence.is_online(contact_uuid=contact_data["contact_uuid"])
+            }
+        )
+
+    def _stop_presence(self) -> None:
+        # Results of this session must not show up after the next login
+        presence: PresenceScheduler = self._presence
+        self._presence = PresenceScheduler(
+            transport=self._transport, on_changes=self.apply_presence
+        )
+
+        self._page.run_task(presence.close)
+
+    def apply_presence(self, changes: dict[str, bool]) -> None:
+        """Show the online state of contacts (use as the presence notifier).
+
+        Only the indicators which actually changed are sent to the client,
+        all of them in one update.
+
+        Args:
+            self(ContactsPage): The ContactsPage instance.
+            changes(dict[str, bool]): Online state per contact uuid.
+        """
+        indicators: list[ft.CircleAvatar] = []
+
+        for contact_uuid, online in changes.items():
+            contact_widget: Optional[ContactWidget] = self._contact_widgets.get(
+                contact_uuid
+            )
+            if contact_widget is None or contact_widget.online == online:
+                continue
+
+            contact_widget.online = online
+
+            # Removed contacts aren't on the page anymore
+            if contact_widget.online_indicator.page is not None:
+                indicators.append(contact_widget.online_indicator)
+
+        if indicators:
+            self._page.update(*indicators)  # type: ignore
+
     def initialize(self) -> None:
-        self._initialize_aes_encryptor()
+        self._initialize_key_ring()
         self._load_contacts()
 
     def build(self) -> ft.Container:
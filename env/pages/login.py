@@ -5,6 +5,7 @@ import flet as ft  # type: ignore[import-untyped]
 from env.app.widgets.container import MasterContainer
 from env.classes.focus_detection import FocusDetector
 from env.classes.hashing import ArgonHasher
+from env.classes.key_ring import session_keys
 from env.classes.paths import paths
 from env.classes.router import AppRouter
 from env.classes.shake_detector import ShakeDetector
@@ -12,6 +13,7 @@ from env.classes.storages import Storages
 from env.classes.translate import Translator
 from env.config import config
 from env.func.converter import byte_to_str, str_to_byte
+from env.func.data_keys import finish_password_change, load_key_ring
 from env.func.generations import generate_iv, generate_salt
 
 
@@ -33,6 +35,9 @@ class LoginPage:
         self._focus_detector: FocusDetector = focus_detector
         self._shake_detector: ShakeDetector = shake_detector
 
+        # Complete a password change which was interrupted
+        finish_password_change(storages=self._storages)
+
         # User stuff
         self._user_already_exists: bool = bool(
             self._storages.client_storage.get(key=config.CS_USER_PASSWORD_HASH)
@@ -74,32 +79,43 @@ class LoginPage:
             )
 
         # Entries
-        self._entry_password: ft.TextField = ft.TextField(
-            label=self._translator.t(key="login_page.entry_password"),
-            password=True,
-            on_change=self._validate,
-            autofocus=True,
-            autocorrect=False,
-            can_reveal_password=True,
-        )
-        if not self._user_already_exists:
-            self._entry_password_confirmation: ft.TextField = ft.TextField(
-                label=self._translator.t(key="login_page.entry_password_confirmation"),
+        self._entry_password: ft.TextField = self._translator.bind(
+            target=ft.TextField(
                 password=True,
                 on_change=self._validate,
+                autofocus=True,
                 autocorrect=False,
                 can_reveal_password=True,
+            ),
+            key="login_page.entry_password",
+            attribute="label",
+        )
+        if not self._user_already_exists:
+            self._entry_password_confirmation: ft.TextField = self._translator.bind(
+                target=ft.TextField(
+                    password=True,
+                    on_change=self._validate,
+                    autocorrect=False,
+                    can_reveal_password=True,
+                ),
+                key="login_page.entry_password_confirmation",
+                attribute="label",
             )
 
         # Buttons
-        self._button_submit: ft.ElevatedButton = ft.ElevatedButton(
-            text=(
-                self._translator.t(key="login_page.button_login")
+        self._button_submit: ft.ElevatedButton = self._translator.bind(
+            target=ft.ElevatedButton(
+                on_click=(
+                    self._login if self._user_already_exists else self._create_account
+                ),
+                disabled=True,
+            ),
+            key=(
+                "login_page.button_login"
                 if self._user_already_exists
-                else self._translator.t(key="login_page.button_create_account")
+                else "login_page.button_create_account"
             ),
-            on_click=self._login if self._user_already_exists else self._create_account,
-            disabled=True,
+            attribute="text",
         )
 
         # Progress bar
@@ -258,7 +274,7 @@ class LoginPage:
         self._router.remove_route(route=config.ROUTE_LOGIN)
         self._router.add_route(
             route=config.ROUTE_LOGIN,
-            content={
+            content=lambda: {
                 "title": "Login",
                 "page_content": [
                     LoginPage(
@@ -325,15 +341,15 @@ class LoginPage:
                 f"No salt existing. Salt='{self._salt}' Try to reinstall app!"
             )
 
-        # Store derived session storage key to encrypt and decrypt data
-        self._storages.session_storage.set(
-            key=config.SS_USER_SESSION_KEY,
-            value=byte_to_str(
-                data=argon_hasher.derive_key(
+        # Unwrap the data keys once, the pages of this session share them
+        session_keys.unlock(
+            key_ring=load_key_ring(
+                storages=self._storages,
+                password_key=argon_hasher.derive_key(
                     password=str(self._entry_password.value),
                     salt=self._salt,
-                )
-            ),
+                ),
+            )
         )
 
         # Hide progress bar on success
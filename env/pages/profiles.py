@@ -20,6 +20,19 @@ class UserProfilePage:
         self._router: AppRouter = router
         self._storages: Storages = storages
 
+        # Top bar
+        self._top_bar: SubPageTopBar = self._translator.bind(
+            target=SubPageTopBar(
+                page=self._page,
+                translator=self._translator,
+                router=self._router,
+                storages=self._storages,
+                title="",
+            ),
+            key="user_profile_page.top_bar",
+            attribute="title",
+        )
+
         # TODO: Add statistics section!
 
     def build(self) -> ft.Container:
@@ -28,15 +41,7 @@ class UserProfilePage:
                 controls=[
                     ft.Column(
                         controls=[
-                            SubPageTopBar(
-                                page=self._page,
-                                translator=self._translator,
-                                router=self._router,
-                                storages=self._storages,
-                                title=self._translator.t(
-                                    key="user_profile_page.top_bar"
-                                ),
-                            ).build(),
+                            self._top_bar.build(),
                             ft.Text("<TEST>"),
                         ],
                         expand=True,
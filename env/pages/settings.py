@@ -1,3 +1,5 @@
+from typing import Optional
+
 import flet as ft  # type: ignore[import-untyped]
 
 from env.app.widgets.buttons_and_toggles import (
@@ -12,12 +14,17 @@ from env.app.widgets.dropdown import SectionDropDown
 from env.app.widgets.sections import Section
 from env.app.widgets.sliders import DescriptiveSlider
 from env.app.widgets.top_bars import SubPageTopBar
+from env.classes.key_ring import session_keys
+from env.classes.key_rotation import KeyRotation
 from env.classes.router import AppRouter
+from env.classes.settings import SettingsSnapshot
 from env.classes.shake_detector import ShakeDetector
 from env.classes.storages import Storages
 from env.classes.translate import Translator
 from env.config import config
+from env.func.data_keys import change_password
 from env.themes.themes import Themes
+from env.typing.keys import WrappedDataKeys
 
 
 class SettingsPage:
@@ -42,15 +49,15 @@ class SettingsPage:
         self._theme_color_picker: ColorPicker = ColorPicker(
             page=self._page,
             translator=self._translator,
-            title=self._translator.t(key="settings_page.color_picker"),
+            title="",
             default_color=self._themes.color_seed,
             on_color_click=lambda col: self._change_theme_color(new_color=col),
         )
         # Create font family chooser
-        if self._page.fonts:
+        if self._themes.font_families:
             font_options = [
                 ft.dropdown.Option(key=font_family, text=font_family)
-                for font_family in self._page.fonts.keys()
+                for font_family in self._themes.font_families
             ]
         else:
             font_options = [
@@ -61,32 +68,25 @@ class SettingsPage:
             ]
         self._font_family_chooser: SectionDropDown = SectionDropDown(
             value=self._themes.font_family,
-            label=self._translator.t(key="settings_page.font_family_chooser"),
+            label="",
             options=font_options,
             on_change=self._change_font_family,
         )
         # Create font size slider
         self._font_size_slider: DescriptiveSlider = DescriptiveSlider(
             page=self._page,
-            description=self._translator.t(
-                key="settings_page.font_size_slider.description"
-            ),
+            description="",
             slider_value=self._themes.font_size,
             slider_min=config.FONT_SIZE_MIN,
             slider_max=config.FONT_SIZE_MAX,
             on_change_end=self._change_font_size,
-            slider_label=self._translator.t(
-                key="settings_page.font_size_slider.slider_label"
-            ),
             slider_divisions=abs(config.FONT_SIZE_MAX - config.FONT_SIZE_MIN),
             slider_default_value=config.APPEARANCE_FONT_SIZE_DEFAULT,
         )
         # Create language chooser
         self._language_chooser: SectionDropDown = SectionDropDown(
-            value=self._storages.client_storage.get(
-                key=config.CS_LANGUAGE, default=config.LANGUAGE_DEFAULT
-            ),
-            label=self._translator.t(key="settings_page.language_chooser"),
+            value=self._storages.settings.current.language,
+            label="",
             options=[
                 ft.dropdown.Option(key=lang, text=lang.upper())
                 for lang in self._translator.available_locales
@@ -99,54 +99,28 @@ class SettingsPage:
         # Logout on lost focus
         self._toggle_lolf: SectionToggle = SectionToggle(
             page=self._page,
-            text=self._translator.t(key="settings_page.toggle_lolf"),
-            toggle_value=self._storages.client_storage.get(
-                key=config.CS_LOGOUT_ON_LOST_FOCUS,
-                default=config.LOGOUT_ON_LOST_FOCUS_DEFAULT,
-            ),
+            text="",
+            toggle_value=self._storages.settings.current.logout_on_lost_focus,
             on_click=self._toggle_logout_lost_focus,
-            help_title=self._translator.t(
-                key="settings_page.infos.focus_detection.title"
-            ),
-            help_content=self._translator.t(
-                key="settings_page.infos.focus_detection.content"
-            ),
         )
         # Logout on on shake detection
         self._toggle_shake_detection: SectionToggle = SectionToggle(
             page=self._page,
-            text=self._translator.t(key="settings_page.toggle_shake_detection"),
-            toggle_value=self._storages.client_storage.get(
-                key=config.CS_SHAKE_DETECTION_ENABLED,
-                default=config.SHAKE_DETECTION_ENABLED_DEFAULT,
-            ),
+            text="",
+            toggle_value=self._storages.settings.current.shake_detection_enabled,
             on_click=self._toggle_logout_shake_detection,
-            help_title=self._translator.t(
-                key="settings_page.infos.shake_detection.title"
-            ),
-            help_content=self._translator.t(
-                key="settings_page.infos.shake_detection.content"
-            ),
         )
         # Gravity threshold slider for shake detection
         self._slider_gravity_threshold: DescriptiveSlider = DescriptiveSlider(
             page=self._page,
-            description=self._translator.t(
-                key="settings_page.shake_gravity_threshold_slider.description"
-            ),
-            slider_value=self._storages.client_storage.get(
-                key=config.CS_SHAKE_DETECTION_THRESHOLD_GRAVITY,
-                default=config.SHAKE_DETECTION_THRESHOLD_GRAVITY_DEFAULT,
-            )
+            description="",
+            slider_value=self._storages.settings.current.shake_detection_threshold_gravity
             * config.SHAKE_DETECTION_THRESHOLD_GRAVITY_MULTIPLIER,
             slider_min=config.SHAKE_DETECTION_THRESHOLD_GRAVITY_MIN
             * config.SHAKE_DETECTION_THRESHOLD_GRAVITY_MULTIPLIER,
             slider_max=config.SHAKE_DETECTION_THRESHOLD_GRAVITY_MAX
             * config.SHAKE_DETECTION_THRESHOLD_GRAVITY_MULTIPLIER,
             on_change_end=self._change_shake_detection_gravity_threshold,
-            slider_label=self._translator.t(
-                key="settings_page.shake_gravity_threshold_slider.slider_label"
-            ),
             slider_divisions=int(
                 abs(
                     config.SHAKE_DETECTION_THRESHOLD_GRAVITY_MAX
@@ -156,46 +130,39 @@ class SettingsPage:
             ),
             slider_default_value=config.SHAKE_DETECTION_THRESHOLD_GRAVITY_DEFAULT
             * config.SHAKE_DETECTION_THRESHOLD_GRAVITY_MULTIPLIER,
-            help_title=self._translator.t(
-                key="settings_page.infos.shake_gravity_threshold.title"
-            ),
-            help_content=self._translator.t(
-                key="settings_page.infos.shake_gravity_threshold.content"
-            ),
         )
         # Logout on top bar label click
         self._toggle_tblc: SectionToggle = SectionToggle(
             page=self._page,
-            text=self._translator.t(key="settings_page.toggle_tblc"),
-            toggle_value=self._storages.client_storage.get(
-                key=config.CS_LOGOUT_ON_TOP_BAR_LABEL_CLICK,
-                default=config.TOP_BAR_LOGOUT_ON_LABEL_CLICK_DEFAULT,
-            ),
+            text="",
+            toggle_value=self._storages.settings.current.logout_on_top_bar_label_click,
             on_click=self._toggle_logout_on_top_bar_label_click,
-            help_title=self._translator.t(
-                key="settings_page.infos.top_bar_logout_action.title"
-            ),
-            help_content=self._translator.t(
-                key="settings_page.infos.top_bar_logout_action.content"
-            ),
+        )
+        # Change password button
+        self._change_password_button: ActionButton = ActionButton(
+            page=self._page,
+            text="",
+            icon=ft.Icons.PASSWORD,
+            on_click=lambda _: self._open_change_password_alert(),
+        )
+        # Encrypts the stored data with a new data key after a password change
+        self._key_rotation: Optional[KeyRotation] = None
+
+        # Change theme color button
+        self._theme_color_button: ActionButton = ActionButton(
+            page=self._page,
+            text="",
+            icon=ft.Icons.COLOR_LENS_OUTLINED,
+            on_click=lambda _: self._page.open(self._theme_color_picker.build()),
         )
 
         " === LOAD SECTIONS === "
         # Create sections
         self._appearance_section: Section = Section(
-            title=self._translator.t(key="settings_page.appearance_section"),
+            title="",
             content=[
                 # Change theme color button
-                ActionButton(
-                    page=self._page,
-                    text=self._translator.t(
-                        key="settings_page.change_theme_color_button"
-                    ),
-                    icon=ft.Icons.COLOR_LENS_OUTLINED,
-                    on_click=lambda _: self._page.open(
-                        self._theme_color_picker.build()
-                    ),
-                ).build(),
+                self._theme_color_button.build(),
                 # Font family chooser
                 ft.Row(
                     controls=[self._font_family_chooser.build()],
@@ -208,38 +175,117 @@ class SettingsPage:
             ],
         )
         self._security_section: Section = Section(
-            title=self._translator.t(key="settings_page.security_section"),
+            title="",
             content=[
                 self._toggle_lolf.build(),
                 self._toggle_tblc.build(),
                 self._toggle_shake_detection.build(),
                 self._slider_gravity_threshold.build(),
+                self._change_password_button.build(),
             ],
         )
 
         " === SUPPORT & ABOUT === "
         self._support_button: URLButton = URLButton(
             page=self._page,
-            text=self._translator.t(key="settings_page.support_button"),
+            text="",
             url="https://ajservers.site/faqs",
             icon=ft.CupertinoIcons.HEART,
         )
+        self._about_button: InfoButtonAlert = InfoButtonAlert(
+            page=self._page,
+            label="",
+            content="",
+            icon=ft.Icons.INFO_OUTLINE,
+        )
         self._about_buttons: ft.Column = ft.Column(
-            controls=[
-                # About button
-                InfoButtonAlert(
-                    page=self._page,
-                    label=self._translator.t(key="settings_page.about.title"),
-                    content=self._translator.t(key="settings_page.about.content"),
-                    icon=ft.Icons.INFO_OUTLINE,
-                ).build()
-            ]
+            controls=[self._about_button.build()]
+        )
+
+        " === TOP BAR === "
+        self._top_bar: SubPageTopBar = SubPageTopBar(
+            page=self._page,
+            translator=self._translator,
+            router=self._router,
+            storages=self._storages,
+            title="",
         )
 
+        # Set all texts and keep them updated on language changes
+        self._bind_texts()
+
         # TODO: Add 'Support' section (--> donation, about)
         # TODO: Add delete data button
         # TODO: Add update button
-        # TODO: Add change password button
+
+    def _bind_texts(self) -> None:
+        texts: list[tuple[object, str, str]] = [
+            # Appearance
+            (self._appearance_section, "title", "appearance_section"),
+            (self._theme_color_picker, "title", "color_picker"),
+            (self._theme_color_button, "text", "change_theme_color_button"),
+            (self._font_family_chooser, "label", "font_family_chooser"),
+            (self._font_size_slider, "description", "font_size_slider.description"),
+            (self._font_size_slider, "slider_label", "font_size_slider.slider_label"),
+            (self._language_chooser, "label", "language_chooser"),
+            # Security
+            (self._security_section, "title", "security_section"),
+            (self._toggle_lolf, "text", "toggle_lolf"),
+            (self._toggle_lolf, "help_title", "infos.focus_detection.title"),
+            (self._toggle_lolf, "help_content", "infos.focus_detection.content"),
+            (self._toggle_tblc, "text", "toggle_tblc"),
+            (self._toggle_tblc, "help_title", "infos.top_bar_logout_action.title"),
+            (
+                self._toggle_tblc,
+                "help_content",
+                "infos.top_bar_logout_action.content",
+            ),
+            (self._toggle_shake_detection, "text", "toggle_shake_detection"),
+            (
+                self._toggle_shake_detection,
+                "help_title",
+                "infos.shake_detection.title",
+            ),
+            (
+                self._toggle_shake_detection,
+                "help_content",
+                "infos.shake_detection.content",
+            ),
+            (
+                self._slider_gravity_threshold,
+                "description",
+                "shake_gravity_threshold_slider.description",
+            ),
+            (
+                self._slider_gravity_threshold,
+                "slider_label",
+                "shake_gravity_threshold_slider.slider_label",
+            ),
+            (
+                self._slider_gravity_threshold,
+                "help_title",
+                "infos.shake_gravity_threshold.title",
+            ),
+            (
+                self._slider_gravity_threshold,
+                "help_content",
+                "infos.shake_gravity_threshold.content",
+            ),
+            (self._change_password_button, "text", "change_password_button"),
+            # Support & about
+            (self._support_button, "text", "support_button"),
+            (self._about_button, "label", "about.title"),
+            (self._about_button, "content", "about.content"),
+            # Top bar
+            (self._top_bar, "title", "top_bar"),
+        ]
+
+        for target, attribute, key in texts:
+            self._translator.bind(
+                target=target,
+                key=f"settings_page.{key}",
+                attribute=attribute,
+            )
 
     def _change_font_family(self, e: ft.ControlEvent) -> None:
         if not e.data:
@@ -263,43 +309,26 @@ class SettingsPage:
             )
         self._translator.change_language(new_language=e.data)
 
-        # Show restart hint
-        self._page.open(
-            ft.SnackBar(
-                content=ft.Text(
-                    self._translator.t(key="settings_page.restart_hint"),
-                    text_align=ft.TextAlign.CENTER,
-                    expand=True,
-                ),
-            )
-        )
+        # Send all changed texts to the client in one batch
+        self._page.update()
 
     def _toggle_logout_lost_focus(self, e: ft.ControlEvent) -> None:
         value: bool = True if e.data == "true" else False
 
-        self._storages.client_storage.set(
-            key=config.CS_LOGOUT_ON_LOST_FOCUS,
-            value=value,
-        )
+        self._storages.settings.update(logout_on_lost_focus=value)
 
     def _toggle_logout_shake_detection(self, e: ft.ControlEvent) -> None:
         value: bool = True if e.data == "true" else False
 
         # Update storage and set enabled state
-        self._storages.client_storage.set(
-            key=config.CS_SHAKE_DETECTION_ENABLED,
-            value=value,
-        )
+        self._storages.settings.update(shake_detection_enabled=value)
         self._shake_detector.enabled = value
 
     def _toggle_logout_on_top_bar_label_click(self, e: ft.ControlEvent) -> None:
         value: bool = True if e.data == "true" else False
 
         # Update storage and set enabled state
-        self._storages.client_storage.set(
-            key=config.CS_LOGOUT_ON_TOP_BAR_LABEL_CLICK,
-            value=value,
-        )
+        self._storages.settings.update(logout_on_top_bar_label_click=value)
         # TODO: Set enabled state of top bar
 
     def _change_shake_detection_gravity_threshold(self, e: ft.ControlEvent) -> None:
@@ -311,27 +340,170 @@ class SettingsPage:
             float(e.data) / config.SHAKE_DETECTION_THRESHOLD_GRAVITY_MULTIPLIER
         )
 
-        # Update client storage
-        self._storages.client_storage.set(
-            key=config.CS_SHAKE_DETECTION_THRESHOLD_GRAVITY,
-            value=new_threshold,
+        # Update settings (the shake detector follows the change)
+        self._storages.settings.update(shake_detection_threshold_gravity=new_threshold)
+
+    def _show_snack_bar(self, key: str) -> None:
+        self._page.open(
+            ft.SnackBar(
+                content=ft.Text(value=self._translator.t(key=f"settings_page.{key}")),
+                dismiss_direction=ft.DismissDirection.HORIZONTAL,
+            )
+        )
+
+    def _password_entry(self, key: str, autofocus: bool = False) -> ft.TextField:
+        return ft.TextField(
+            label=self._translator.t(key=f"settings_page.change_password_alert.{key}"),
+            password=True,
+            autofocus=autofocus,
+            autocorrect=False,
+            can_reveal_password=True,
+        )
+
+    def _open_change_password_alert(self) -> None:
+        # Create entries
+        old_password_entry: ft.TextField = self._password_entry(
+            key="old_password_entry", autofocus=True
+        )
+        new_password_entry: ft.TextField = self._password_entry(
+            key="new_password_entry"
+        )
+        confirmation_entry: ft.TextField = self._password_entry(
+            key="new_password_confirmation_entry"
+        )
+
+        # Open the alert
+        alert: ft.AlertDialog = ft.AlertDialog(
+            title=ft.Text(
+                value=self._translator.t(
+                    key="settings_page.change_password_alert.title"
+                )
+            ),
+            content=ft.Column(
+                controls=[old_password_entry, new_password_entry, confirmation_entry],
+                tight=True,
+            ),
+            actions=[
+                ft.TextButton(
+                    text=self._translator.t(
+                        key="settings_page.change_password_alert.cancel_button"
+                    ),
+                    on_click=lambda e: self._page.close(alert),
+                ),
+                ft.TextButton(
+                    text=self._translator.t(
+                        key="settings_page.change_password_alert.change_button"
+                    ),
+                    on_click=lambda _: self._on_change_password_submit(
+                        old_password=str(old_password_entry.value or ""),
+                        new_password=str(new_password_entry.value or ""),
+                        confirmation=str(confirmation_entry.value or ""),
+                        alert=alert,
+                    ),
+                ),
+            ],
+        )
+        self._page.open(alert)
+
+    def _on_change_password_submit(
+        self,
+        old_password: str,
+        new_password: str,
+        confirmation: str,
+        alert: ft.AlertDialog,
+    ) -> None:
+        if not all([old_password, new_password]):
+            return
+
+        if new_password != confirmation:
+            self._show_snack_bar(key="change_password_alert.not_equal")
+            return
+
+        # Saves the data keys wrapped with the new password
+        if not change_password(
+            storages=self._storages,
+            key_ring=session_keys.key_ring,
+            old_password=old_password,
+            new_password=new_password,
+        ):
+            self._show_snack_bar(key="change_password_alert.wrong_password")
+            return
+
+        self._page.close(alert)
+        self._open_key_rotation_alert()
+
+    def _open_key_rotation_alert(self) -> None:
+        # The data keys are unchanged, someone knowing the old password knows them
+        alert: ft.AlertDialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text(
+                value=self._translator.t(key="settings_page.key_rotation_alert.title"),
+                text_align=ft.TextAlign.CENTER,
+            ),
+            content=ft.Text(
+                value=self._translator.t(key="settings_page.key_rotation_alert.content")
+            ),
+            actions=[
+                ft.TextButton(
+                    text=self._translator.t(
+                        key="settings_page.key_rotation_alert.later_button"
+                    ),
+                    on_click=lambda e: self._page.close(alert),
+                ),
+                ft.TextButton(
+                    text=self._translator.t(
+                        key="settings_page.key_rotation_alert.rotate_button"
+                    ),
+                    on_click=lambda e: self._on_key_rotation_submit(alert=alert),
+                ),
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
         )
+        self._page.open(alert)
+
+    def _on_key_rotation_submit(self, alert: ft.AlertDialog) -> None:
+        self._page.close(alert)
+
+        # Handlers run in threads, the rotation needs the event loop of the page
+        self._page.run_task(self._rotate_data_key)
+
+    def _save_data_keys(self, wrapped: WrappedDataKeys) -> None:
+        self._storages.client_storage.set(key=config.CS_DATA_KEYS, value=wrapped)
+
+    async def _rotate_data_key(self) -> None:
+        # A rotation which is still running continues with the newest data key
+        if self._key_rotation is None:
+            self._key_rotation = KeyRotation(
+                key_ring=session_keys.key_ring, save_keys=self._save_data_keys
+            )
+        key_rotation: KeyRotation = self._key_rotation
+
+        key_rotation.rotate_data_key()
+        await key_rotation.wait()
 
-        # Update shake detector
-        self._shake_detector.gravity_threshold = new_threshold
+        # Only the first of several waiting calls closes it
+        if self._key_rotation is not key_rotation:
+            return
+        self._key_rotation = None
+        await key_rotation.close()
+
+        # Old data keys are only removed once no row uses them anymore
+        self._show_snack_bar(
+            key=(
+                "key_rotation_alert.stopped"
+                if session_keys.key_ring.old_versions
+                else "key_rotation_alert.done"
+            )
+        )
 
     def _update_sliders(self) -> None:
+        settings: SettingsSnapshot = self._storages.settings.current
+
         # Font size slider
-        self._font_size_slider.slider_value = self._storages.client_storage.get(
-            key=config.CS_FONT_SIZE,
-            default=config.APPEARANCE_FONT_SIZE_DEFAULT,
-        )
+        self._font_size_slider.slider_value = settings.font_size
         # Gravity threshold slider
         self._slider_gravity_threshold.slider_value = (
-            self._storages.client_storage.get(
-                key=config.CS_SHAKE_DETECTION_THRESHOLD_GRAVITY,
-                default=config.SHAKE_DETECTION_THRESHOLD_GRAVITY_DEFAULT,
-            )
+            settings.shake_detection_threshold_gravity
             * config.SHAKE_DETECTION_THRESHOLD_GRAVITY_MULTIPLIER
         )
 
@@ -347,13 +519,7 @@ class SettingsPage:
                 controls=[
                     ft.Column(
                         controls=[
-                            SubPageTopBar(
-                                page=self._page,
-                                translator=self._translator,
-                                router=self._router,
-                                storages=self._storages,
-                                title=self._translator.t(key="settings_page.top_bar"),
-                            ).build(),
+                            self._top_bar.build(),
                             ft.ListView(
                                 controls=[
                                     self._appearance_section.build(),
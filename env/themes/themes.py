@@ -1,103 +1,138 @@
-from typing import Any
+import functools
+from typing import Any, Optional
 
 import flet as ft  # type: ignore
 
+from env.classes.fonts import FontRegistry
+from env.classes.settings import Settings
 from env.classes.storages import Storages
 from env.config import config
 
 
+@functools.lru_cache(maxsize=config.THEME_CACHE_SIZE)
+def _build_text_theme(font_family: str, font_size: int) -> ft.TextTheme:
+    def ts(size_multiplier: float) -> ft.TextStyle:
+        return ft.TextStyle(
+            size=font_size * size_multiplier,
+            font_family=font_family,
+            color=ft.Colors.ON_SURFACE
+        )
+
+    return ft.TextTheme(
+        body_large=ts(size_multiplier=1.1),
+        body_medium=ts(size_multiplier=1.0),
+        body_small=ts(size_multiplier=0.85),
+
+        display_large=ts(size_multiplier=2.2),
+        display_medium=ts(size_multiplier=1.8),
+        display_small=ts(size_multiplier=1.5),
+
+        headline_large=ts(size_multiplier=1.7),
+        headline_medium=ts(size_multiplier=1.5),
+        headline_small=ts(size_multiplier=1.3),
+
+        label_large=ts(size_multiplier=0.95),
+        label_medium=ts(size_multiplier=0.85),
+        label_small=ts(size_multiplier=0.75),
+
+        title_large=ts(size_multiplier=1.4),
+        title_medium=ts(size_multiplier=1.2),
+        title_small=ts(size_multiplier=1.0),
+    )
+
+
+@functools.lru_cache(maxsize=config.THEME_CACHE_SIZE)
+def _build_theme(
+    color_seed: ft.ColorValue,
+    font_family: str,
+    font_size: int,
+    brightness: ft.Brightness,
+) -> ft.Theme:
+    # Cached themes are shared, never change them after creation!
+    # The brightness only decides which page slot (theme or dark theme) the theme is used for.
+    return ft.Theme(
+        color_scheme_seed=color_seed,
+        use_material3=True,
+        text_theme=_build_text_theme(font_family=font_family, font_size=font_size),
+    )
+
+
 class Themes:
     def __init__(
         self,
         page: ft.Page,
         storages: Storages,
+        font_registry: FontRegistry,
     ) -> None:
         self._page: ft.Page = page
         self._storages: Storages = storages
-        self._color_seed: ft.ColorValue = self._storages.client_storage.get(
-            key=config.CS_COLOR_SEED,
-            default=config.APPEARANCE_COLOR_SEED_DEFAULT,
-        )
-        self._font_family: str = self._storages.client_storage.get(
-            key=config.CS_FONT_FAMILY,
-            default=config.APPEARANCE_FONT_FAMILY_DEFAULT,
-        )
-        self._font_size: int = self._storages.client_storage.get(key=config.CS_FONT_SIZE, default=config.APPEARANCE_FONT_SIZE_DEFAULT)
-
-        # Set themes
-        self._light: ft.Theme = ft.Theme(
-            color_scheme_seed=self._color_seed,
-            use_material3=True,
-            text_theme=self._generate_text_theme(),
-        )
-        self._dark: ft.Theme = ft.Theme(
-            color_scheme_seed=self._color_seed,
-            use_material3=True,
-            text_theme=self._generate_text_theme(),
-        )
-        self._all_themes: list[ft.Theme] = [self._light, self._dark]
+        self._font_registry: FontRegistry = font_registry
+        self._settings: Settings = self._storages.settings
+        self._color_seed: ft.ColorValue = self._settings.current.color_seed
+        self._font_family: str = self._settings.current.font_family
+        self._font_size: int = self._settings.current.font_size
+
+        # Only send the active font to the client
+        try:
+            self._font_registry.register(font_family=self._font_family)
+        except ValueError as e:
+            print(f"Active font couldn't be registered. Error: {e}")
+
+        # Themes currently applied to the page
+        self._applied_light: Optional[ft.Theme] = None
+        self._applied_dark: Optional[ft.Theme] = None
 
     def _update(
         self,
-        key: str,
+        name: str,
         value: Any,
     ) -> None:
-        self._storages.client_storage.set(key=key, value=value)
+        self._settings.update(**{name: value})
         self.set_theme()
 
-    def _generate_text_theme(self) -> ft.TextTheme:
-        def ts(size_multiplier: float) -> ft.TextStyle:
-            return ft.TextStyle(
-                size=self._font_size * size_multiplier,
-                font_family=self._font_family,
-                color=ft.Colors.ON_SURFACE
-            )
-
-        return ft.TextTheme(
-            body_large=ts(size_multiplier=1.1),
-            body_medium=ts(size_multiplier=1.0),
-            body_small=ts(size_multiplier=0.85),
-
-            display_large=ts(size_multiplier=2.2),
-            display_medium=ts(size_multiplier=1.8),
-            display_small=ts(size_multiplier=1.5),
-
-            headline_large=ts(size_multiplier=1.7),
-            headline_medium=ts(size_multiplier=1.5),
-            headline_small=ts(size_multiplier=1.3),
-
-            label_large=ts(size_multiplier=0.95),
-            label_medium=ts(size_multiplier=0.85),
-            label_small=ts(size_multiplier=0.75),
-
-            title_large=ts(size_multiplier=1.4),
-            title_medium=ts(size_multiplier=1.2),
-            title_small=ts(size_multiplier=1.0),
+    def _get_theme(self, brightness: ft.Brightness) -> ft.Theme:
+        return _build_theme(
+            color_seed=self._color_seed,
+            font_family=self._font_family,
+            font_size=self._font_size,
+            brightness=brightness,
         )
 
-    def _update_text_themes(self) -> None:
-        for theme in self._all_themes:
-            theme.text_theme = self._generate_text_theme()
+    def set_theme(self, update: bool = True) -> None:
+        """Apply the themes of the current settings to the page.
 
-    def set_theme(self) -> None:
-        if self._page.platform_brightness == ft.Brightness.DARK:
-            self._page.theme = self.DARK
-        else:
-            self._page.theme = self.LIGHT
+        Both themes are set at once, so the client switches them by itself if
+        the platform brightness changes. The page is only updated if one of the
+        themes actually changed.
 
-        self._page.update()  # type: ignore
+        Args:
+            self(Themes): The Themes instance.
+            update(bool): Update the page if the themes changed.
 
-    def change_font_family(self, new_font_family: str) -> None:
-        if not self._page.fonts:
-            raise ValueError("No fonts available!")
+        Returns:
+            None: No return value.
+        """
+        light: ft.Theme = self.LIGHT
+        dark: ft.Theme = self.DARK
+
+        if light is self._applied_light and dark is self._applied_dark:
+            return
+
+        self._page.theme = light
+        self._page.dark_theme = dark
+        self._applied_light = light
+        self._applied_dark = dark
+
+        if update:
+            self._page.update()  # type: ignore
 
-        if new_font_family not in self._page.fonts:
-            raise ValueError(f"Font '{new_font_family}' not found! Use one of these instead: [{", ".join(font_family for font_family in self._page.fonts)}]")
+    def change_font_family(self, new_font_family: str) -> None:
+        # Add the font to the page (sent together with the new theme)
+        self._font_registry.register(font_family=new_font_family)
 
         self._font_family = new_font_family
 
-        self._update_text_themes()
-        self._update(key=config.CS_FONT_FAMILY, value=self._font_family)
+        self._update(name="font_family", value=self._font_family)
 
     def change_font_size(self, new_font_size: int) -> None:
         if new_font_size < 0:
@@ -105,21 +140,24 @@ class Themes:
 
         self._font_size = new_font_size
 
-        self._update_text_themes()
-        self._update(key=config.CS_FONT_SIZE, value=self._font_size)
+        self._update(name="font_size", value=self._font_size)
 
     @property
     def DARK(self) -> ft.Theme:
-        return self._dark
+        return self._get_theme(brightness=ft.Brightness.DARK)
 
     @property
     def LIGHT(self) -> ft.Theme:
-        return self._light
+        return self._get_theme(brightness=ft.Brightness.LIGHT)
 
     @property
     def font_family(self) -> str:
         return self._font_family
 
+    @property
+    def font_families(self) -> list[str]:
+        return self._font_registry.font_families
+
     @property
     def font_size(self) -> int:
         return self._font_size
@@ -132,8 +170,4 @@ class Themes:
     def color_seed(self, value: str) -> None:
         self._color_seed = value
 
-        # Update themes
-        for theme in self._all_themes:
-            theme.color_scheme_seed = self._color_seed
-
-        self._update(key=config.CS_COLOR_SEED, value=self._color_seed)
\ No newline at end of file
+        self._update(name="color_seed", value=self._color_seed)
@@ -1,4 +1,4 @@
-from typing import Any, Callable, Optional, TypedDict
+from typing import Any, Callable, NotRequired, Optional, TypedDict
 
 import flet as ft  # type: ignore[import-untyped]
 
@@ -8,6 +8,7 @@ class PageContent(TypedDict):
     page_content: Optional[list[ft.Control]]
     execute_function: Optional[Callable[..., Any]]
     function_args: Optional[list[Any] | dict[str, Any]]
+    keep_alive: NotRequired[bool]
 
 
 class ContactData(TypedDict):
@@ -31,6 +32,53 @@ class DeviceData(TypedDict):
     uuid: str
     onion_address: str
     name: str
+    public_key: str  # Base64, empty for devices linked before keys were recorded
+
+
+class OutboxEntry(TypedDict):
+    id: int  # Row id in the outbox
+    message_id: int
+    contact_uuid: str
+    message: str
+    timestamp: float
+    enqueued_at: float
+    attempts: int
+
+
+class OutboxMetrics(TypedDict):
+    depth: int  # Queued messages
+    oldest_age: Optional[float]  # Seconds the oldest queued message is waiting
+    waiting_contacts: int  # Contacts with queued messages
+    backing_off_contacts: int  # Contacts waiting for their next retry
+    max_attempts: int  # Failed attempts of the most retried message
+    failed_attempts: int  # Failed sends since start
+    unacknowledged_contacts: int  # Contacts which didn't confirm the sent messages yet
+    frames_sent: int
+    messages_sent: int
+    messages_acknowledged: int  # Messages the contacts confirmed to have stored
+
+
+class AttachmentData(TypedDict):
+    id: int
+    message_id: int
+    address: str  # Keyed hash of the content, shared by identical attachments
+    file_name: str  # Encrypted file in the attachments folder
+    name: str  # Original file name
+    size: int  # Plaintext bytes
+    file_key: bytes
+
+
+class WireMessage(TypedDict):
+    id: int  # Message id of the sender
+    message: str
+    timestamp: float
 
 
 PageRoute = dict[str, PageContent]
+PageFactory = Callable[[], PageContent]
+
+
+class FontInfo(TypedDict):
+    name: str  # Font family name used in themes
+    path: str  # Path passed to 'page.fonts'
+    size: int  # File size in bytes
@@ -0,0 +1,19 @@
+from typing import Callable, TypedDict
+
+
+class WrappedDataKeys(TypedDict):
+    # Data keys encrypted with the password key: key version -> base64 (single
+    # key) or purpose -> base64 (one data key per purpose)
+    current_version: int
+    keys: dict[str, str | dict[str, str]]
+
+
+class PasswordChange(TypedDict):
+    # Everything a password change stores, written as one value first
+    salt: str
+    password_hash: str
+    data_keys: WrappedDataKeys
+
+
+# Stores the wrapped data keys (e.g. in the client storage)
+DataKeysSaver = Callable[[WrappedDataKeys], None]
@@ -0,0 +1,14 @@
+from typing import Any, Optional
+
+# Sorted (attribute, value) pairs of a 'ft.TextStyle'
+StyleKey = tuple[tuple[str, Any], ...]
+
+# Text of a span and its style (None for unstyled line breaks)
+ParsedSpan = tuple[str, Optional[StyleKey]]
+
+# Open styles, combined style and amount of spans of a parser at one point
+SpanBuilderState = tuple[
+    tuple[tuple[str, dict[str, Any], dict[str, Any]], ...],
+    StyleKey,
+    int,
+]
@@ -0,0 +1,8 @@
+from typing import Any, Callable, Optional, TypedDict
+
+
+class SettingSchema(TypedDict):
+    key: str
+    type: type
+    default: Any
+    validator: Optional[Callable[[Any], bool]]
@@ -1,11 +1,12 @@
-from typing import Optional, TypedDict
+from typing import TYPE_CHECKING, Callable, Optional, TypedDict
 
-from nacl.signing import SigningKey, VerifyKey
+if TYPE_CHECKING:
+    from nacl.signing import SigningKey, VerifyKey
 
 
 class MasterKeys(TypedDict):
-    private_key: Optional[SigningKey]
-    public_key: Optional[VerifyKey]
+    private_key: Optional["SigningKey"]
+    public_key: Optional["VerifyKey"]
 
 
 class SignedOnionData(TypedDict):
@@ -14,3 +15,17 @@ class SignedOnionData(TypedDict):
     expires: float
     signed_by: str
     signature: str
+
+
+class SignedIdentityJSON(TypedDict):
+    # JSON form of 'SignedIdentity' (binary format) with integer timestamps
+    version: int
+    onion: str
+    timestamp: int
+    expires: int
+    signed_by: str
+    signature: str
+
+
+# Called with the contact uuids whose signed IDs expired
+ExpiredIdentitiesNotifier = Callable[[list[str]], None]
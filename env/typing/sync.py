@@ -0,0 +1,12 @@
+from typing import Any, Literal, Optional, TypedDict
+
+# 'messages' is used to delete all messages of a contact
+SyncEntity = Literal["contact", "message", "messages"]
+SyncOperation = Literal["upsert", "delete"]
+
+
+class SyncChange(TypedDict):
+    entity: SyncEntity
+    key: str  # Contact uuid or '<device uuid>:<message id>' for a single message
+    operation: SyncOperation
+    data: Optional[dict[str, Any]]  # Current row for upserts
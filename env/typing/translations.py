@@ -0,0 +1,14 @@
+import weakref
+from typing import Any, TypedDict
+
+
+class TranslationCatalog(TypedDict):
+    source_hash: str
+    texts: dict[str, dict[str, str]]  # locale -> key -> text
+    templates: dict[str, dict[str, str]]  # locale -> key -> 'str.format_map()' template
+
+
+class TranslationBinding(TypedDict):
+    target: weakref.ref[Any]
+    key: str
+    kwargs: dict[str, Any]
@@ -0,0 +1,25 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+# Handles a new incoming stream
+ConnectionHandler = Callable[
+    [asyncio.StreamReader, asyncio.StreamWriter], Awaitable[None]
+]
+
+# Handles a received frame: (onion address of the peer, payload)
+FrameHandler = Callable[[str, bytes], Awaitable[None]]
+
+# Known public key of a peer: onion address -> raw Ed25519 key (None if unknown)
+PeerKeyLookup = Callable[[str], Optional[bytes]]
+
+# Sends a frame: (onion address of the peer, payload), e.g. 'PeerEngine.send'
+FrameSender = Callable[[str, bytes], Awaitable[None]]
+
+# Notifies about confirmed messages: (contact uuid, message ids of the sender)
+AcksNotifier = Callable[[str, list[int]], None]
+
+# Notifies about new messages: contact uuid -> amount of new messages
+MessagesNotifier = Callable[[dict[str, int]], None]
+
+# Notifies about changed presence: contact uuid -> online
+PresenceNotifier = Callable[[dict[str, bool]], None]
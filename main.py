@@ -1,8 +1,12 @@
+# Has to be imported first to measure the import times of all other modules
+from env.classes.startup_profiler import profiler  # isort: skip
+
 import os
 
 import flet as ft  # type: ignore[import-untyped]
 
 from env.classes.focus_detection import FocusDetector
+from env.classes.fonts import FontRegistry
 from env.classes.paths import paths
 from env.classes.router import AppRouter
 from env.classes.shake_detector import ShakeDetector
@@ -15,9 +19,12 @@ from env.pages.login import LoginPage
 from env.pages.profiles import UserProfilePage
 from env.pages.settings import SettingsPage
 from env.themes.themes import Themes
+from env.typing.dicts import PageContent
 
 
 def main(page: ft.Page) -> None:
+    profiler.mark(name="main_called")
+
     # Create app path if it doesn't already exist yet
     os.makedirs(name=paths.app_storage_path, exist_ok=True)
 
@@ -28,142 +35,175 @@ def main(page: ft.Page) -> None:
     page.window.height = config.APP_HEIGHT
 
     # TODO: Add the ability to add more fonts (online)
-    # Add global fonts
-    page.fonts = config.FONT_FAMILIES_LOCAL
+    # Index local fonts (only the active one is added to the page by the themes)
+    font_registry: FontRegistry = FontRegistry(page=page)
 
     # Initialize router
-    router: AppRouter = AppRouter(page=page)
+    with profiler.phase(name="router"):
+        router: AppRouter = AppRouter(page=page)
 
     # Initialize storage
-    storages: Storages = Storages(page=page)
+    with profiler.phase(name="storages"):
+        storages: Storages = Storages(page=page)
 
     # Initialize translator
-    translator: Translator = Translator(storages=storages)
+    with profiler.phase(name="translator"):
+        translator: Translator = Translator(storages=storages)
 
     # Initialize shake detector for logging out on shaking
-    shake_detector: ShakeDetector = ShakeDetector(
-        page=page,
-        router=router,
-        storages=storages,
-    )
-    focus_detector: FocusDetector = FocusDetector(
-        page=page,
-        router=router,
-        storages=storages,
-    )
+    with profiler.phase(name="detectors"):
+        shake_detector: ShakeDetector = ShakeDetector(
+            page=page,
+            router=router,
+            storages=storages,
+        )
+        focus_detector: FocusDetector = FocusDetector(
+            page=page,
+            router=router,
+            storages=storages,
+        )
 
     # Initialize themes
-    themes: Themes = Themes(page=page, storages=storages)
+    with profiler.phase(name="themes"):
+        themes: Themes = Themes(
+            page=page,
+            storages=storages,
+            font_registry=font_registry,
+        )
 
-    # Apply theme
-    themes.set_theme()
+        # Apply theme (sent with the following page update)
+        themes.set_theme(update=False)
 
     # Update page to apply visuals
     page.update()  # type: ignore
+    profiler.mark(name="first_page_update")
 
+    # Pages are only built on their first visit to keep startup fast
     # Login page
-    login_page: LoginPage = LoginPage(
-        page=page,
-        translator=translator,
-        storages=storages,
-        router=router,
-        focus_detector=focus_detector,
-        shake_detector=shake_detector,
-    )
-    router.add_route(
-        route=config.ROUTE_LOGIN,
-        content={
+    def build_login_page() -> PageContent:
+        login_page: LoginPage = LoginPage(
+            page=page,
+            translator=translator,
+            storages=storages,
+            router=router,
+            focus_detector=focus_detector,
+            shake_detector=shake_detector,
+        )
+        return {
             "title": translator.t(key="login_page.title"),
             "page_content": [
                 login_page.build(),
             ],
             "execute_function": login_page.initialize,
             "function_args": None,
-        },
+        }
+
+    router.add_route(
+        route=config.ROUTE_LOGIN,
+        content=profiler.wrap(name="build:login", func=build_login_page),
     )
 
     # Contacts Page
-    contacts_page: ContactsPage = ContactsPage(
-        page=page,
-        translator=translator,
-        storages=storages,
-        router=router,
-    )
-    router.add_route(
-        route=config.ROUTE_CONTACTS,
-        content={
+    def build_contacts_page() -> PageContent:
+        contacts_page: ContactsPage = ContactsPage(
+            page=page,
+            translator=translator,
+            storages=storages,
+            router=router,
+        )
+        return {
             "title": translator.t(key="contacts_page.title"),
             "page_content": [
                 contacts_page.build(),
             ],
             "execute_function": contacts_page.initialize,
             "function_args": None,
-        },
+        }
+
+    router.add_route(
+        route=config.ROUTE_CONTACTS,
+        content=profiler.wrap(name="build:contacts", func=build_contacts_page),
     )
 
     # Settings page
-    settings_page: SettingsPage = SettingsPage(
-        page=page,
-        translator=translator,
-        router=router,
-        storages=storages,
-        themes=themes,
-        shake_detector=shake_detector,
-    )
-    router.add_route(
-        route=config.ROUTE_SETTINGS,
-        content={
+    def build_settings_page() -> PageContent:
+        settings_page: SettingsPage = SettingsPage(
+            page=page,
+            translator=translator,
+            router=router,
+            storages=storages,
+            themes=themes,
+            shake_detector=shake_detector,
+        )
+        return {
             "title": translator.t(key="settings_page.title"),
             "page_content": [
                 settings_page.build(),
             ],
             "execute_function": settings_page.initialize,
             "function_args": None,
-        },
+        }
+
+    router.add_route(
+        route=config.ROUTE_SETTINGS,
+        content=profiler.wrap(name="build:settings", func=build_settings_page),
     )
 
     # User profile page
-    user_profile_page: UserProfilePage = UserProfilePage(
-        page=page,
-        translator=translator,
-        router=router,
-        storages=storages,
-    )
-    router.add_route(
-        route="/profile",
-        content={
+    def build_user_profile_page() -> PageContent:
+        user_profile_page: UserProfilePage = UserProfilePage(
+            page=page,
+            translator=translator,
+            router=router,
+            storages=storages,
+        )
+        return {
             "title": translator.t(key="user_profile_page.title"),
             "page_content": [
                 user_profile_page.build(),
             ],
             "execute_function": None,
             "function_args": None,
-        },
+        }
+
+    router.add_route(
+        route=config.ROUTE_PROFILE,
+        content=profiler.wrap(name="build:profile", func=build_user_profile_page),
     )
 
     # Calibration page
-    calibration_page: CalibrationsPage = CalibrationsPage(
-        page=page,
-        translator=translator,
-        router=router,
-        storages=storages,
-    )
-    router.add_route(
-        route=config.ROUTE_CALIBRATIONS,
-        content={
+    def build_calibration_page() -> PageContent:
+        calibration_page: CalibrationsPage = CalibrationsPage(
+            page=page,
+            translator=translator,
+            router=router,
+            storages=storages,
+        )
+        return {
             "title": translator.t(key="calibration_page.title"),
             "page_content": [calibration_page.build()],
             "execute_function": calibration_page.calibrate,
             "function_args": None,
-        },
+            "keep_alive": False,  # Only shown once
+        }
+
+    router.add_route(
+        route=config.ROUTE_CALIBRATIONS,
+        content=profiler.wrap(name="build:calibration", func=build_calibration_page),
     )
 
     # Go to login page
     router.go(route=config.ROUTE_CALIBRATIONS)
 
-    # Add events
+    # Add events (the client switches between light and dark theme by itself)
     page.on_platform_brightness_change = lambda _: themes.set_theme()
 
+    # Write startup report if profiling is enabled
+    profiler.write_report(
+        path=paths.join_with_app_storage(path=config.FILE_STARTUP_PROFILE),
+        import_budget_ms=config.STARTUP_IMPORT_BUDGET_MS,
+    )
+
 
 if __name__ == "__main__":
     ft.app(target=main)  # type: ignore